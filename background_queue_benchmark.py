@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+BACKGROUND QUEUE LATENCY BENCHMARK
+==================================
+Measures job-start latency (submission to a worker picking the job up) of
+MCPBackgroundProcessor against the previous deque + asyncio.sleep(1) polling
+workers, for steady Poisson arrivals and for a burst from one heavy user
+followed by a single job from a light user.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import deque
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from mcp_background_processor import MCPBackgroundProcessor
+
+JOBS = 200
+MEAN_INTERARRIVAL = 0.02
+JOB_SECONDS = 0.01
+WORKERS = 5
+BURST = 50
+
+
+class LegacyProcessor:
+    """Polling workers used before the rework"""
+
+    def __init__(self, workers=WORKERS):
+        self.job_queue = deque()
+        self.latencies = {}
+        self.running = True
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    async def submit(self, user_id, name, priority=1):
+        job = (user_id, name, time.perf_counter())
+        if priority >= 3:
+            self.job_queue.appendleft(job)
+        else:
+            self.job_queue.append(job)
+
+    async def _worker(self):
+        while self.running:
+            if not self.job_queue:
+                await asyncio.sleep(1)
+                continue
+            user_id, name, submitted = self.job_queue.popleft()
+            self.latencies[name] = (time.perf_counter() - submitted) * 1000
+            await asyncio.sleep(JOB_SECONDS)
+
+    async def stop(self):
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+class NewProcessor:
+    """MCPBackgroundProcessor with the MCP calls replaced by a fixed-duration job"""
+
+    def __init__(self):
+        self.processor = MCPBackgroundProcessor(min_workers=1, max_workers=WORKERS)
+        self.processor.rate_limit_max_requests = JOBS * 2
+        self.latencies = {}
+
+        async def fake_process(job):
+            self.latencies[job.parameters['name']] = (job.started_at - job.created_at).total_seconds() * 1000
+            await asyncio.sleep(JOB_SECONDS)
+            return {"success": True}
+
+        self.processor._process_job = fake_process
+
+    async def start(self):
+        await self.processor.initialize()
+
+    async def submit(self, user_id, name, priority=1):
+        await self.processor.submit_job(user_id, "market_analysis", {"name": name}, priority=priority)
+
+    async def stop(self):
+        await self.processor.job_queue.join()
+        await self.processor.stop()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+async def poisson_arrivals(processor):
+    rng = random.Random(5)
+    for n in range(JOBS):
+        await processor.submit(n % 20, f"job{n}")
+        await asyncio.sleep(rng.expovariate(1 / MEAN_INTERARRIVAL))
+
+
+async def heavy_then_light(processor):
+    for n in range(BURST):
+        await processor.submit(1, f"heavy{n}")
+    await processor.submit(2, "light")
+
+
+async def run_scenario(label, factory, scenario):
+    processor = factory()
+    if isinstance(processor, NewProcessor):
+        await processor.start()
+    await asyncio.sleep(0)
+    await scenario(processor)
+    if isinstance(processor, LegacyProcessor):
+        while len(processor.latencies) < (JOBS if scenario is poisson_arrivals else BURST + 1):
+            await asyncio.sleep(0.05)
+    await processor.stop()
+    latencies = processor.latencies
+    light = f"{latencies['light']:>10.1f}" if 'light' in latencies else f"{'':>10}"
+    values = list(latencies.values())
+    print(f"{label:<28} {percentile(values, 0.5):>9.1f} {percentile(values, 0.99):>9.1f} {light}")
+
+
+async def run_benchmark():
+    print(f"{'scenario':<28} {'p50 ms':>9} {'p99 ms':>9} {'light ms':>10}")
+    for scenario_label, scenario in (("poisson", poisson_arrivals), ("heavy burst", heavy_then_light)):
+        await run_scenario(f"legacy {scenario_label}", LegacyProcessor, scenario)
+        await run_scenario(f"new {scenario_label}", NewProcessor, scenario)
+
+
+if __name__ == '__main__':
+    asyncio.run(run_benchmark())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+CACHE TIER WARM-RESTART BENCHMARK
+=================================
+Fills IntelligentCacheManager with a skewed workload, "restarts" the process by
+building a fresh manager, and compares the hit rate and latency of the first
+requests after the restart: L1 only, L1 + SQLite L3, and L1 + Redis L2 + L3.
+L2 uses a local redis-server when REDIS_URL is set, otherwise fakeredis.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core.cache_manager import IntelligentCacheManager
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+KEYS = 2000
+REQUESTS = 5000
+FAKE_SERVER = fakeredis.FakeServer() if fakeredis else None
+
+
+def workload(seed: int):
+    """Zipf-like key popularity, as seen for prices and repeated analyses"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(KEYS)]
+    return rng.choices([f"price:{i}" for i in range(KEYS)], weights=weights, k=REQUESTS)
+
+
+def value_for(key: str):
+    return {'key': key, 'usd': 65000.5, 'history': [65000 + i for i in range(50)]}
+
+
+def redis_client():
+    url = os.getenv('REDIS_URL')
+    if url:
+        import redis.asyncio as aioredis
+        return aioredis.from_url(url)
+    if fakeredis is None:
+        return None
+    return fakeredis.FakeAsyncRedis(server=FAKE_SERVER)
+
+
+async def run_phase(db_path, use_redis: bool, keys):
+    manager = IntelligentCacheManager(enable_predictive_loading=False, db_path=db_path)
+    await manager.initialize(redis_client=redis_client() if use_redis else None)
+    hits = 0
+    start = time.perf_counter()
+    for key in keys:
+        if await manager.get(key) is not None:
+            hits += 1
+        else:
+            await manager.set(key, value_for(key), ttl=3600, tags=['price_data'])
+    elapsed = time.perf_counter() - start
+    metrics = manager.get_performance_metrics()
+    await manager.close()
+    return hits / len(keys), elapsed, metrics
+
+
+async def run_benchmark():
+    before_restart = workload(1)
+    after_restart = workload(2)
+    print(f"{'configuration':<20} {'hit rate':>9} {'ms/request':>11} {'L1':>6} {'L2':>6} {'L3':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, with_l3, use_redis in (("L1 only", False, False), ("L1 + L3", True, False),
+                                          ("L1 + L2 + L3", True, True)):
+            if use_redis and redis_client() is None:
+                print(f"{label:<20} skipped (no REDIS_URL and fakeredis not installed)")
+                continue
+            db_path = os.path.join(tmp, f"{label.replace(' ', '').replace('+', '_')}.db") if with_l3 else None
+            if use_redis and not os.getenv('REDIS_URL'):
+                await redis_client().flushall()
+
+            await run_phase(db_path, use_redis, before_restart)
+            hit_rate, elapsed, metrics = await run_phase(db_path, use_redis, after_restart)
+            print(f"{label:<20} {hit_rate:>8.1%} {elapsed / REQUESTS * 1000:>11.3f} "
+                  f"{metrics['l1_hits']:>6} {metrics['l2_hits']:>6} {metrics['l3_hits']:>6}")
+
+
+if __name__ == '__main__':
+    asyncio.run(run_benchmark())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+CIPHERTEXT STORAGE BENCHMARK
+============================
+Bytes per stored message and decrypt throughput for each messages.encrypted_text
+format: legacy hex Fernet, raw Fernet and AES-GCM.
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from encryption import (
+    encrypt_message, encrypt_message_compact, decrypt_stored_message, legacy_hex_to_raw,
+    FORMAT_HEX_FERNET, FORMAT_RAW_FERNET, FORMAT_AESGCM
+)
+
+MESSAGES = 20000
+
+
+def make_texts():
+    rng = random.Random(42)
+    # Telegram group chat messages are mostly short
+    lengths = [rng.choice([12, 24, 48, 96, 200]) for _ in range(MESSAGES)]
+    return [''.join(rng.choices(string.ascii_letters + ' ', k=n)) for n in lengths]
+
+
+def run_benchmark():
+    texts = make_texts()
+    plaintext_bytes = sum(len(t.encode()) for t in texts) / MESSAGES
+
+    hex_rows = [encrypt_message(t) for t in texts]
+    formats = [
+        ("hex fernet (legacy)", FORMAT_HEX_FERNET, hex_rows),
+        ("raw fernet (migrated)", FORMAT_RAW_FERNET, [legacy_hex_to_raw(v) for v in hex_rows]),
+        ("aes-gcm (current)", FORMAT_AESGCM, [encrypt_message_compact(t) for t in texts]),
+    ]
+
+    print(f"{MESSAGES} messages, {plaintext_bytes:.0f} plaintext bytes/message on average")
+    print(f"{'format':<24} {'bytes/msg':>10} {'decrypts/sec':>14}")
+    for label, format_version, rows in formats:
+        stored_bytes = sum(len(v) for v in rows) / MESSAGES
+
+        start = time.perf_counter()
+        for value in rows:
+            decrypt_stored_message(value, format_version)
+        elapsed = time.perf_counter() - start
+
+        print(f"{label:<24} {stored_bytes:>10.0f} {MESSAGES / elapsed:>14,.0f}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
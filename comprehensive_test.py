@@ -5,6 +5,7 @@ Tests all implemented features and generates a detailed report
 """
 import sys
 import os
+import asyncio
 sys.path.append('src')
 
 def test_comprehensive_features():
@@ -78,7 +79,7 @@ def test_comprehensive_features():
         
         for endpoint in endpoints_to_test:
             try:
-                result = query_defillama(endpoint)
+                result = asyncio.run(query_defillama(endpoint))
                 if result and not result.startswith('❌'):
                     working_endpoints.append(endpoint)
                     print(f"✅ {endpoint}: {len(result)} chars")
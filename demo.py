@@ -22,7 +22,7 @@ async def demo_crypto_research():
     for protocol in protocols:
         for data_type in data_types:
             try:
-                result = query_defillama(data_type, protocol)
+                result = await query_defillama(data_type, protocol)
                 print(f"📊 {protocol.title()} {data_type.upper()}: {result}")
             except Exception as e:
                 print(f"❌ Error querying {protocol} {data_type}: {e}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+INTENT INDEX BENCHMARK
+======================
+Intents/sec for AgentMemoryDatabase.analyze_intent at 1k and 10k patterns:
+the legacy per-message table scan against the compiled keyword-prefiltered index.
+"""
+
+import json
+import os
+import random
+import re
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from agent_memory_database import AgentMemoryDatabase
+
+PATTERN_COUNTS = [1000, 10000]
+MESSAGES = 200
+LEGACY_MESSAGES = 20  # the table scan recompiles every pattern once they overflow re's cache
+
+
+def legacy_analyze_intent(db_path: str, user_input: str):
+    """Per-message scan used before the index: read, JSON-parse and re.search every row"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM intent_patterns')
+
+        best_match = None
+        best_confidence = 0.0
+
+        for row in cursor.fetchall():
+            pattern_id, intent, pattern, threshold, context_clues, disambiguation_questions, created_at = row
+            context_clues = json.loads(context_clues) if context_clues else []
+
+            if re.search(pattern, user_input, re.IGNORECASE):
+                confidence = threshold
+                for clue in context_clues:
+                    if clue.lower() in user_input.lower():
+                        confidence += 0.05
+
+                if confidence > best_confidence:
+                    best_confidence = confidence
+                    best_match = intent
+
+        return best_match or "unknown", best_confidence
+
+
+def make_patterns(count: int, rng: random.Random):
+    vocabulary = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(count // 2)]
+    patterns = []
+    for i in range(count):
+        lead = '|'.join(rng.sample(vocabulary, 3))
+        tail = '|'.join(rng.sample(vocabulary, 2))
+        if i % 20 == 0:
+            # Some patterns have no literal every match must contain
+            pattern = rf"[A-Z]{{3,5}}\s+(?:{tail})?"
+        else:
+            pattern = rf"(?:{lead}).*?(?:{tail})"
+        patterns.append((f"synthetic_{i}", f"intent_{i % 50}", pattern,
+                         round(rng.uniform(0.6, 0.9), 2), json.dumps(rng.sample(vocabulary, 3)), json.dumps([])))
+    return patterns, vocabulary
+
+
+def make_messages(vocabulary, rng: random.Random):
+    filler = "what is the price of btc today and should i set an alert".split()
+    return [' '.join(rng.sample(filler, 5) + rng.sample(vocabulary, 2)) for _ in range(MESSAGES)]
+
+
+def run_benchmark():
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in PATTERN_COUNTS:
+            db_path = os.path.join(tmp, f'agent_memory_{count}.db')
+            memory = AgentMemoryDatabase(db_path)
+            patterns, vocabulary = make_patterns(count, rng)
+            with sqlite3.connect(db_path) as conn:
+                conn.executemany('INSERT OR REPLACE INTO intent_patterns '
+                                 '(pattern_id, intent, pattern, confidence_threshold, context_clues, disambiguation_questions) '
+                                 'VALUES (?, ?, ?, ?, ?, ?)', patterns)
+            messages = make_messages(vocabulary, rng)
+
+            start = time.perf_counter()
+            legacy = [legacy_analyze_intent(db_path, message) for message in messages[:LEGACY_MESSAGES]]
+            legacy_rate = LEGACY_MESSAGES / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            memory.analyze_intent(messages[0])
+            build_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            indexed = [memory.analyze_intent(message) for message in messages]
+            indexed_rate = MESSAGES / (time.perf_counter() - start)
+
+            assert indexed[:LEGACY_MESSAGES] == legacy, "index disagrees with the table scan"
+            matched = sum(1 for intent, _ in indexed if intent != 'unknown')
+            print(f"{count:>6} patterns: legacy {legacy_rate:>10,.0f} intents/sec, "
+                  f"index {indexed_rate:>10,.0f} intents/sec ({build_ms:.0f} ms build, {matched}/{MESSAGES} matched)")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+LRU CACHE MICROBENCHMARK
+========================
+Compares get/set throughput of the production_core LRUCache against the previous
+implementation (json.dumps sizing, asyncio.Lock on every call, datetime TTLs) at
+1k, 100k and 1M resident entries, through the async API and the sync fast path.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core.cache_manager import LRUCache
+
+SIZES = (1_000, 100_000, 1_000_000)
+OPERATIONS = 100_000
+
+
+class LegacyEntry:
+    """Entry bookkeeping used before the rework"""
+
+    def __init__(self, value, ttl, tags):
+        self.value = value
+        self.created_at = datetime.utcnow()
+        self.last_accessed = datetime.utcnow()
+        self.access_count = 1
+        self.ttl = ttl
+        self.tags = tags or []
+        self.size_bytes = len(json.dumps(value, default=str).encode('utf-8'))
+
+    def is_expired(self):
+        return self.ttl is not None and datetime.utcnow() > self.created_at + timedelta(seconds=self.ttl)
+
+
+class LegacyLRUCache:
+    """Locked get/set path used before the rework"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.current_memory = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, key):
+        async with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            if entry.is_expired():
+                del self.cache[key]
+                self.current_memory -= entry.size_bytes
+                return None
+            self.cache.move_to_end(key)
+            entry.last_accessed = datetime.utcnow()
+            entry.access_count += 1
+            return entry.value
+
+    async def set(self, key, value, ttl=None, tags=None):
+        async with self._lock:
+            entry = LegacyEntry(value, ttl, tags)
+            old = self.cache.pop(key, None)
+            if old is not None:
+                self.current_memory -= old.size_bytes
+            self.cache[key] = entry
+            self.current_memory += entry.size_bytes
+            while len(self.cache) > self.max_size:
+                _, evicted = self.cache.popitem(last=False)
+                self.current_memory -= evicted.size_bytes
+            return True
+
+
+def value_for(i: int):
+    return {'symbol': f"TOKEN{i}", 'usd': 1.5 * i, 'change_24h': -0.4, 'sources': ['coingecko', 'dexscreener']}
+
+
+def report(label: str, size: int, elapsed: float):
+    print(f"{label:<28} {size:>10,} {OPERATIONS / elapsed:>14,.0f} ops/sec")
+
+
+async def measure(cache, size: int, label: str):
+    for i in range(size):
+        await cache.set(f"key:{i}", value_for(i), ttl=3600)
+    keys = [f"key:{random.randrange(size)}" for _ in range(OPERATIONS)]
+
+    start = time.perf_counter()
+    for key in keys:
+        await cache.get(key)
+    report(f"{label} get", size, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for n, key in enumerate(keys):
+        await cache.set(key, value_for(n), ttl=3600, tags=['price_data'])
+    report(f"{label} set", size, time.perf_counter() - start)
+
+
+def measure_sync(cache: LRUCache, size: int):
+    keys = [f"key:{random.randrange(size)}" for _ in range(OPERATIONS)]
+    start = time.perf_counter()
+    for key in keys:
+        cache.get_nowait(key)
+    report("new get_nowait", size, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for n, key in enumerate(keys):
+        cache.set_nowait(key, value_for(n), ttl=3600, tags=['price_data'])
+    report("new set_nowait", size, time.perf_counter() - start)
+
+
+async def run_benchmark():
+    random.seed(7)
+    print(f"{'operation':<28} {'entries':>10} {'throughput':>18}")
+    for size in SIZES:
+        await measure(LegacyLRUCache(size), size, "legacy")
+        cache = LRUCache(max_size=size, max_memory_mb=4096)
+        await measure(cache, size, "new")
+        measure_sync(cache, size)
+        start = time.perf_counter()
+        cleared = await cache.clear_by_tags(['price_data'])
+        print(f"{'new clear_by_tags':<28} {size:>10,} {cleared:>10,} keys in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    asyncio.run(run_benchmark())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+MESSAGE INGESTION BENCHMARK
+===========================
+Compares per-message storage (one connection, two subquery upserts and a
+commit per message) against the batched MessageIngestionQueue.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from encryption import encrypt_message
+from message_storage import MessageStorage, MessageIngestionQueue
+
+MESSAGES = 5000
+
+
+def make_messages():
+    return [{
+        'message_id': i,
+        'chat_id': -1000 - (i % 4),
+        'user_id': i % 250,
+        'username': f"user_{i % 250}",
+        'text': f"gm, what do you think about ETH at {i}?",
+        'timestamp': time.time(),
+    } for i in range(MESSAGES)]
+
+
+def legacy_store_message(db_path: str, message_data: dict):
+    """Connect-per-message write path used before the ingestion queue"""
+    encrypted_text = encrypt_message(message_data['text'])
+    now = datetime.now().isoformat()
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO messages (message_id, chat_id, user_id, username, encrypted_text,
+                                  message_type, timestamp, date_created)
+            VALUES (?, ?, ?, ?, ?, 'text', ?, ?)
+        ''', (message_data['message_id'], message_data['chat_id'], message_data['user_id'],
+              message_data['username'], encrypted_text, message_data['timestamp'], now))
+        cursor.execute('''
+            INSERT OR REPLACE INTO chat_metadata (chat_id, last_message_time, total_messages, created_at, updated_at)
+            VALUES (?, ?, COALESCE((SELECT total_messages FROM chat_metadata WHERE chat_id = ?), 0) + 1,
+                    COALESCE((SELECT created_at FROM chat_metadata WHERE chat_id = ?), ?), ?)
+        ''', (message_data['chat_id'], message_data['timestamp'], message_data['chat_id'],
+              message_data['chat_id'], now, now))
+        cursor.execute('''
+            INSERT OR REPLACE INTO user_activity (user_id, username, first_seen, last_seen, total_messages, last_chat_id)
+            VALUES (?, ?, COALESCE((SELECT first_seen FROM user_activity WHERE user_id = ?), ?), ?,
+                    COALESCE((SELECT total_messages FROM user_activity WHERE user_id = ?), 0) + 1, ?)
+        ''', (message_data['user_id'], message_data['username'], message_data['user_id'], now, now,
+              message_data['user_id'], message_data['chat_id']))
+        conn.commit()
+
+
+def run_benchmark():
+    messages = make_messages()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        MessageStorage(legacy_path)
+
+        start = time.perf_counter()
+        for message_data in messages:
+            legacy_store_message(legacy_path, message_data)
+        elapsed = time.perf_counter() - start
+        print(f"{'legacy store_message':<28} {MESSAGES / elapsed:>10,.0f} msgs/sec")
+
+        storage = MessageStorage(os.path.join(tmp, 'batched.db'))
+        queue = MessageIngestionQueue(storage)
+
+        async def ingest():
+            for message_data in messages:
+                await queue.enqueue(message_data)
+            await queue.stop()
+
+        start = time.perf_counter()
+        asyncio.run(ingest())
+        elapsed = time.perf_counter() - start
+        metrics = queue.get_metrics()
+        print(f"{'batched ingestion queue':<28} {MESSAGES / elapsed:>10,.0f} msgs/sec")
+        print(f"{'':<28} {metrics['batches']} batches, avg size {metrics['avg_batch_size']:.0f}, "
+              f"avg flush {metrics['avg_flush_latency_ms']:.1f} ms, max depth {metrics['max_queue_depth']}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+METRICS SKETCH BENCHMARK
+========================
+Compares the production_core MetricCollector timer path against the previous raw-value
+TimeSeries (asyncio.Lock and retention scan per record, copy + three sorts per summary):
+record throughput, summary latency at 10k values, and percentile error of the sketches.
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core.metrics_collector import MetricValue, SketchSeries
+
+RECORDS = 100_000
+SUMMARY_VALUES = 10_000
+SUMMARIES = 200
+
+
+class LegacyTimeSeries:
+    """Raw-value series used for timers before the rework"""
+
+    def __init__(self, max_size=10000, retention_hours=24):
+        self.retention_hours = retention_hours
+        self.values = deque(maxlen=max_size)
+        self._lock = asyncio.Lock()
+
+    async def add_value(self, value, tags=None):
+        async with self._lock:
+            self.values.append(MetricValue(value=value, timestamp=datetime.utcnow(), tags=tags or {}))
+            cutoff_time = datetime.utcnow() - timedelta(hours=self.retention_hours)
+            while self.values and self.values[0].timestamp < cutoff_time:
+                self.values.popleft()
+
+    async def calculate_summary(self):
+        async with self._lock:
+            values = [v.value for v in list(self.values)]
+        ordered = sorted(values)
+        return {
+            'avg': statistics.mean(values),
+            'median': statistics.median(values),
+            'std_dev': statistics.stdev(values),
+            'p90': sorted(values)[int(0.90 * (len(values) - 1))],
+            'p95': sorted(values)[int(0.95 * (len(values) - 1))],
+            'p99': ordered[int(0.99 * (len(values) - 1))],
+        }
+
+
+async def measure_records(series, samples):
+    start = time.perf_counter()
+    for value in samples:
+        await series.add_value(value, None)
+    return RECORDS / (time.perf_counter() - start)
+
+
+async def measure_summary(series):
+    start = time.perf_counter()
+    for _ in range(SUMMARIES):
+        await series.calculate_summary()
+    return (time.perf_counter() - start) / SUMMARIES * 1000
+
+
+async def run_benchmark():
+    rng = random.Random(11)
+    samples = [rng.lognormvariate(5, 1.2) for _ in range(RECORDS)]
+
+    legacy, sketch = LegacyTimeSeries(), SketchSeries()
+    print(f"{'implementation':<16} {'records/sec':>14} {'summary ms':>12}")
+    for label, series in (("legacy", legacy), ("sketch", sketch)):
+        rate = await measure_records(series, samples)
+        print(f"{label:<16} {rate:>14,.0f} {'':>12}")
+
+    legacy_window, sketch_window = LegacyTimeSeries(), SketchSeries()
+    for value in samples[:SUMMARY_VALUES]:
+        await legacy_window.add_value(value)
+        sketch_window.record(value)
+    for label, series in (("legacy", legacy_window), ("sketch", sketch_window)):
+        print(f"{label + ' (10k)':<16} {'':>14} {await measure_summary(series):>12.3f}")
+
+    ordered = sorted(samples)
+    merged = sketch.merged_sketch()
+    print(f"\n{'quantile':<10} {'exact':>12} {'sketch':>12} {'rel error':>10}")
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        estimate = merged.quantile(q)
+        print(f"p{q * 100:<9g} {exact:>12.2f} {estimate:>12.2f} {abs(estimate - exact) / exact:>10.4%}")
+    print(f"\nsketch buckets: {len(merged.positive)} for {merged.count:,} values")
+
+
+if __name__ == '__main__':
+    asyncio.run(run_benchmark())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+RATE LIMITER MEMORY BENCHMARK
+=============================
+Measures resident memory per 1M identifiers for the production_core RateLimiter
+against the previous per-identifier objects (TokenBucket/SlidingWindow with an
+asyncio.Lock each plus a user_metrics dict), and how much state remains after the
+identifiers go idle and the timing wheel evicts them.
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core import rate_limiter as rate_limiter_module
+from production_core.rate_limiter import (
+    RateLimitAlgorithm, RateLimitConfig, RateLimiter, SlidingWindow, TokenBucket
+)
+
+IDENTIFIERS = 1_000_000
+IDS = [str(100_000_000 + i) for i in range(IDENTIFIERS)]
+
+
+def report(label: str, allocated: int):
+    print(f"{label:<34} {allocated / 2**20:>9.1f} MiB {allocated / IDENTIFIERS:>8.0f} B/id")
+
+
+def legacy_state(algorithm: RateLimitAlgorithm):
+    """Per-identifier objects the limiter used to keep forever"""
+    limiters = {}
+    user_metrics = defaultdict(lambda: {'requests': 0, 'allowed': 0, 'denied': 0})
+    for identifier in IDS:
+        if algorithm == RateLimitAlgorithm.TOKEN_BUCKET:
+            limiters[identifier] = TokenBucket(2.0, 10)
+        else:
+            window = limiters[identifier] = SlidingWindow(60, 300)
+            window.requests.append(time.time())
+        user_metrics[identifier]['requests'] += 1
+    return limiters, user_metrics
+
+
+async def new_state(algorithm: RateLimitAlgorithm):
+    limiter = RateLimiter(RateLimitConfig(requests_per_second=2.0 if algorithm == RateLimitAlgorithm.TOKEN_BUCKET else 5.0,
+                                          burst_size=10, algorithm=algorithm, window_size_seconds=60))
+    for identifier in IDS:
+        await limiter.is_allowed(identifier)
+    return limiter
+
+
+def measure(label: str, build):
+    gc.collect()
+    tracemalloc.start()
+    state = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    report(label, allocated)
+    return state
+
+
+def run_benchmark():
+    print(f"{'state for 1M identifiers':<34} {'memory':>13} {'per id':>11}")
+    for algorithm in (RateLimitAlgorithm.TOKEN_BUCKET, RateLimitAlgorithm.SLIDING_WINDOW):
+        legacy = measure(f"legacy {algorithm.value}", lambda: legacy_state(algorithm))
+        del legacy
+        limiter = measure(f"compact {algorithm.value}", lambda: asyncio.run(new_state(algorithm)))
+
+        # Let every identifier go idle, then one request advances the timing wheel
+        real_monotonic = rate_limiter_module.time.monotonic
+        offset = 200.0
+        rate_limiter_module.time.monotonic = lambda: real_monotonic() + offset
+        try:
+            start = time.perf_counter()
+            asyncio.run(limiter.is_allowed('late'))
+            elapsed = time.perf_counter() - start
+        finally:
+            rate_limiter_module.time.monotonic = real_monotonic
+        print(f"{'  after idle eviction':<34} {limiter.store.count():>9,} ids  "
+              f"{limiter.local_store.evicted:>9,} evicted in {elapsed:.2f}s")
+        del limiter
+
+
+if __name__ == '__main__':
+    run_benchmark()
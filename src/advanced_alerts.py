@@ -8,8 +8,6 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-import requests
-import ta
 from textblob import TextBlob
 import tweepy
 
@@ -17,6 +15,10 @@ from config import config
 from user_db import get_user_property, set_user_property, add_alert_to_db
 from security_auditor import security_auditor
 from performance_monitor import track_performance
+from price_oracle import price_oracle
+from alert_evaluation import AlertEvaluationEngine
+from streaming_indicators import indicator_engine
+from async_http import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +77,12 @@ class AdvancedAlertsSystem:
         self.active_alerts: Dict[str, Alert] = {}
         self.price_cache: Dict[str, Dict] = {}
         self.sentiment_cache: Dict[str, SentimentData] = {}
+        self.alert_engine = AlertEvaluationEngine(
+            fetch_prices=lambda symbols: price_oracle.get_prices(symbols, max_age=60),
+            fetch_volatility=self._calculate_volatility,
+            fetch_technical=self._get_technical_indicators,
+            fetch_sentiment=self._get_sentiment_data
+        )
         self._init_external_apis()
         
     def _init_external_apis(self):
@@ -134,6 +142,7 @@ class AdvancedAlertsSystem:
             )
             
             self.active_alerts[alert_id] = alert
+            self.alert_engine.add(alert)
             
             # Store in database
             add_alert_to_db(alert_id, user_id, 0, 'advanced_price', asdict(alert))
@@ -193,6 +202,7 @@ class AdvancedAlertsSystem:
             )
             
             self.active_alerts[alert_id] = alert
+            self.alert_engine.add(alert)
             add_alert_to_db(alert_id, user_id, 0, 'technical', asdict(alert))
             
             return {
@@ -242,6 +252,7 @@ class AdvancedAlertsSystem:
             )
             
             self.active_alerts[alert_id] = alert
+            self.alert_engine.add(alert)
             add_alert_to_db(alert_id, user_id, 0, 'sentiment', asdict(alert))
             
             return {
@@ -291,6 +302,7 @@ class AdvancedAlertsSystem:
             )
             
             self.active_alerts[alert_id] = alert
+            self.alert_engine.add(alert)
             add_alert_to_db(alert_id, user_id, 0, 'whale', asdict(alert))
             
             return {
@@ -306,90 +318,17 @@ class AdvancedAlertsSystem:
     async def _get_current_price(self, symbol: str) -> Optional[float]:
         """Get current price for symbol"""
         try:
-            # Check cache first
-            if symbol in self.price_cache:
-                cache_data = self.price_cache[symbol]
-                if datetime.now() - cache_data['timestamp'] < timedelta(minutes=1):
-                    return cache_data['price']
-            
-            # Fetch from CoinGecko
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={symbol.lower()}&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if symbol.lower() in data:
-                    price = data[symbol.lower()]['usd']
-                    
-                    # Cache the price
-                    self.price_cache[symbol] = {
-                        'price': price,
-                        'timestamp': datetime.now()
-                    }
-                    
-                    return price
-            
-            return None
+            price = await price_oracle.get_price(symbol, max_age=60)
+            return price or None
             
         except Exception as e:
             logger.error(f"Error getting price for {symbol}: {e}")
             return None
 
     async def _get_technical_indicators(self, symbol: str) -> Optional[Dict[str, float]]:
-        """Get technical indicators for symbol"""
+        """Get technical indicators for symbol from the shared streaming indicator engine"""
         try:
-            # Get historical price data
-            url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}/market_chart?vs_currency=usd&days=30"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code != 200:
-                return None
-                
-            data = response.json()
-            prices = [point[1] for point in data['prices']]
-            
-            if len(prices) < 20:
-                return None
-                
-            # Convert to pandas Series for technical analysis
-            price_series = pd.Series(prices)
-            
-            # Calculate indicators
-            indicators = {}
-            
-            # RSI
-            indicators['rsi'] = ta.momentum.RSIIndicator(price_series).rsi().iloc[-1]
-            
-            # MACD
-            macd = ta.trend.MACD(price_series)
-            indicators['macd'] = macd.macd().iloc[-1]
-            indicators['macd_signal'] = macd.macd_signal().iloc[-1]
-            indicators['macd_histogram'] = macd.macd_diff().iloc[-1]
-            
-            # Bollinger Bands
-            bollinger = ta.volatility.BollingerBands(price_series)
-            indicators['bb_upper'] = bollinger.bollinger_hband().iloc[-1]
-            indicators['bb_middle'] = bollinger.bollinger_mavg().iloc[-1]
-            indicators['bb_lower'] = bollinger.bollinger_lband().iloc[-1]
-            indicators['bb_width'] = indicators['bb_upper'] - indicators['bb_lower']
-            
-            # Stochastic
-            # Note: Stochastic requires high, low, close data. Using price as approximation.
-            indicators['stochastic'] = ta.momentum.StochasticOscillator(
-                high=price_series, low=price_series, close=price_series
-            ).stoch().iloc[-1]
-            
-            # Williams %R
-            indicators['williams_r'] = ta.momentum.WilliamsRIndicator(
-                high=price_series, low=price_series, close=price_series
-            ).williams_r().iloc[-1]
-            
-            # CCI
-            indicators['cci'] = ta.trend.CCIIndicator(
-                high=price_series, low=price_series, close=price_series
-            ).cci().iloc[-1]
-            
-            return indicators
+            return await indicator_engine.get_indicators(symbol)
             
         except Exception as e:
             logger.error(f"Error getting technical indicators for {symbol}: {e}")
@@ -412,7 +351,9 @@ class AdvancedAlertsSystem:
             # Twitter sentiment analysis
             if self.twitter_client:
                 try:
-                    tweets = self.twitter_client.search_recent_tweets(
+                    # tweepy's client is synchronous; keep it off the event loop
+                    tweets = await asyncio.to_thread(
+                        self.twitter_client.search_recent_tweets,
                         query=f"${symbol} OR {symbol}",
                         max_results=100,
                         tweet_fields=['public_metrics', 'created_at']
@@ -434,9 +375,9 @@ class AdvancedAlertsSystem:
             if self.news_api_key:
                 try:
                     url = f"https://newsapi.org/v2/everything?q={symbol}&apiKey={self.news_api_key}&pageSize=50"
-                    response = requests.get(url, timeout=10)
+                    response = await http_client.get(url, timeout=10)
                     
-                    if response.status_code == 200:
+                    if response.status == 200:
                         news_data = response.json()
                         for article in news_data.get('articles', []):
                             title = article.get('title', '')
@@ -543,9 +484,9 @@ class AdvancedAlertsSystem:
             
             # Get market cap and volume
             url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}"
-            response = requests.get(url, timeout=10)
+            response = await http_client.get(url, timeout=10, cache_ttl=60)
             
-            if response.status_code == 200:
+            if response.status == 200:
                 data = response.json()
                 market_data = data.get('market_data', {})
                 
@@ -607,174 +548,41 @@ class AdvancedAlertsSystem:
 
     @track_performance.track_function
     async def check_alerts(self) -> List[Dict[str, Any]]:
-        """Check all active alerts and return triggered ones"""
+        """
+        Check all active alerts and return triggered ones.
+        Each symbol's price, indicators and sentiment are fetched once per call, and price
+        thresholds are bisected in per-symbol books, so only triggered alerts are touched.
+        """
         triggered_alerts = []
         
-        for alert_id, alert in list(self.active_alerts.items()):
-            if alert.status != AlertStatus.ACTIVE:
-                continue
-                
-            try:
-                is_triggered = False
-                trigger_data = {}
-                
-                if alert.alert_type == AlertType.PRICE:
-                    is_triggered, trigger_data = await self._check_price_alert(alert)
-                elif alert.alert_type == AlertType.TECHNICAL:
-                    is_triggered, trigger_data = await self._check_technical_alert(alert)
-                elif alert.alert_type == AlertType.SENTIMENT:
-                    is_triggered, trigger_data = await self._check_sentiment_alert(alert)
-                elif alert.alert_type == AlertType.WHALE:
-                    is_triggered, trigger_data = await self._check_whale_alert(alert)
-                
-                if is_triggered:
-                    alert.status = AlertStatus.TRIGGERED
-                    alert.triggered_at = datetime.now()
-                    
-                    triggered_alerts.append({
-                        'alert': alert,
-                        'trigger_data': trigger_data
-                    })
-                    
-                    # Remove from active alerts
-                    del self.active_alerts[alert_id]
-                    
-            except Exception as e:
-                logger.error(f"Error checking alert {alert_id}: {e}")
-        
-        return triggered_alerts
-
-    async def _check_price_alert(self, alert: Alert) -> Tuple[bool, Dict[str, Any]]:
-        """Check if price alert should trigger"""
         try:
-            current_price = await self._get_current_price(alert.symbol)
-            if current_price is None:
-                return False, {}
-            
-            condition = alert.condition
-            threshold = alert.threshold
-            
-            is_triggered = False
-            
-            if condition == '>':
-                is_triggered = current_price > threshold
-            elif condition == '<':
-                is_triggered = current_price < threshold
-            elif condition == '>=':
-                is_triggered = current_price >= threshold
-            elif condition == '<=':
-                is_triggered = current_price <= threshold
-            elif condition == 'crosses_above':
-                # Check if price crossed above threshold
-                is_triggered = alert.current_value <= threshold and current_price > threshold
-            elif condition == 'crosses_below':
-                # Check if price crossed below threshold
-                is_triggered = alert.current_value >= threshold and current_price < threshold
-            elif condition == 'volatility_spike':
-                # Check for volatility spike
-                volatility = await self._calculate_volatility(alert.symbol)
-                is_triggered = volatility > threshold
-            
-            # Update current value
-            alert.current_value = current_price
-            
-            trigger_data = {
-                'current_price': current_price,
-                'threshold': threshold,
-                'condition': condition,
-                'price_change': ((current_price - alert.current_value) / alert.current_value * 100) if alert.current_value > 0 else 0
-            }
-            
-            return is_triggered, trigger_data
-            
+            fired = await self.alert_engine.evaluate()
         except Exception as e:
-            logger.error(f"Error checking price alert: {e}")
-            return False, {}
-
-    async def _check_technical_alert(self, alert: Alert) -> Tuple[bool, Dict[str, Any]]:
-        """Check if technical alert should trigger"""
-        try:
-            technical_data = await self._get_technical_indicators(alert.symbol)
-            if not technical_data:
-                return False, {}
-            
-            indicator = alert.metadata.get('indicator')
-            condition = alert.metadata.get('condition')
-            
-            is_triggered = False
-            trigger_data = {'technical_data': technical_data}
-            
-            if indicator == 'rsi':
-                rsi = technical_data.get('rsi', 50)
-                if condition == 'oversold' and rsi < 30:
-                    is_triggered = True
-                elif condition == 'overbought' and rsi > 70:
-                    is_triggered = True
-                trigger_data['rsi'] = rsi
-                
-            elif indicator == 'macd':
-                macd = technical_data.get('macd', 0)
-                macd_signal = technical_data.get('macd_signal', 0)
-                if condition == 'bullish_crossover' and macd > macd_signal:
-                    is_triggered = True
-                elif condition == 'bearish_crossover' and macd < macd_signal:
-                    is_triggered = True
-                trigger_data.update({'macd': macd, 'macd_signal': macd_signal})
-            
-            # Add more technical indicators as needed
-            
-            return is_triggered, trigger_data
-            
-        except Exception as e:
-            logger.error(f"Error checking technical alert: {e}")
-            return False, {}
-
-    async def _check_sentiment_alert(self, alert: Alert) -> Tuple[bool, Dict[str, Any]]:
-        """Check if sentiment alert should trigger"""
-        try:
-            sentiment_data = await self._get_sentiment_data(alert.symbol)
-            if not sentiment_data:
-                return False, {}
-            
-            baseline_sentiment = alert.metadata.get('baseline_sentiment', 0)
-            threshold = alert.threshold
-            
-            sentiment_change = abs(sentiment_data.sentiment_score - baseline_sentiment)
-            is_triggered = sentiment_change >= threshold
-            
-            trigger_data = {
-                'current_sentiment': sentiment_data.sentiment_score,
-                'baseline_sentiment': baseline_sentiment,
-                'sentiment_change': sentiment_change,
-                'volume': sentiment_data.volume,
-                'trending_keywords': sentiment_data.trending_keywords
-            }
-            
-            return is_triggered, trigger_data
+            logger.error(f"Error evaluating alerts: {e}")
+            return triggered_alerts
+        
+        for alert, trigger_data in fired:
+            alert.status = AlertStatus.TRIGGERED
+            alert.triggered_at = datetime.now()
             
-        except Exception as e:
-            logger.error(f"Error checking sentiment alert: {e}")
-            return False, {}
-
-    async def _check_whale_alert(self, alert: Alert) -> Tuple[bool, Dict[str, Any]]:
-        """Check if whale alert should trigger"""
-        try:
-            # This would typically monitor blockchain transactions
-            # For now, return False as it requires real-time blockchain monitoring
-            return False, {}
+            triggered_alerts.append({
+                'alert': alert,
+                'trigger_data': trigger_data
+            })
             
-        except Exception as e:
-            logger.error(f"Error checking whale alert: {e}")
-            return False, {}
+            # Remove from active alerts
+            self.active_alerts.pop(alert.id, None)
+        
+        return triggered_alerts
 
     async def _calculate_volatility(self, symbol: str) -> float:
         """Calculate current volatility for symbol"""
         try:
             # Get recent price data
             url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}/market_chart?vs_currency=usd&days=7"
-            response = requests.get(url, timeout=10)
+            response = await http_client.get(url, timeout=10, cache_ttl=300)
             
-            if response.status_code == 200:
+            if response.status == 200:
                 data = response.json()
                 prices = [point[1] for point in data['prices']]
                 
@@ -792,12 +600,16 @@ class AdvancedAlertsSystem:
 
     def get_user_alerts(self, user_id: int) -> List[Alert]:
         """Get all alerts for a user"""
-        return [alert for alert in self.active_alerts.values() if alert.user_id == user_id]
+        alerts = [alert for alert in self.active_alerts.values() if alert.user_id == user_id]
+        for alert in alerts:
+            self.alert_engine.refresh_current_value(alert)
+        return alerts
 
     def pause_alert(self, alert_id: str) -> bool:
         """Pause an alert"""
         if alert_id in self.active_alerts:
             self.active_alerts[alert_id].status = AlertStatus.PAUSED
+            self.alert_engine.remove(alert_id)
             return True
         return False
 
@@ -805,6 +617,7 @@ class AdvancedAlertsSystem:
         """Resume a paused alert"""
         if alert_id in self.active_alerts:
             self.active_alerts[alert_id].status = AlertStatus.ACTIVE
+            self.alert_engine.add(self.active_alerts[alert_id])
             return True
         return False
 
@@ -812,6 +625,7 @@ class AdvancedAlertsSystem:
         """Delete an alert"""
         if alert_id in self.active_alerts:
             del self.active_alerts[alert_id]
+            self.alert_engine.remove(alert_id)
             return True
         return False
 
@@ -7,7 +7,6 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
-import requests
 from web3 import Web3
 import ccxt
 from pycoingecko import CoinGeckoAPI
@@ -17,6 +16,8 @@ from config import config
 from user_db import get_user_property, set_user_property
 from security_auditor import security_auditor
 from performance_monitor import track_performance
+from price_oracle import price_oracle
+from async_http import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -176,9 +177,9 @@ class AdvancedPortfolioManager:
         try:
             # Use DeFiLlama API for token balances
             url = f"https://api.llama.fi/balances/{chain}/{wallet_address}"
-            response = requests.get(url, timeout=10)
+            response = await http_client.get(url, timeout=10)
             
-            if response.status_code == 200:
+            if response.status == 200:
                 data = response.json()
                 for token_address, balance_data in data.items():
                     if isinstance(balance_data, dict) and 'amount' in balance_data:
@@ -210,10 +211,9 @@ class AdvancedPortfolioManager:
     async def _get_token_price(self, symbol: str) -> float:
         """Get current token price in USD"""
         try:
-            # Try CoinGecko first
-            price_data = self.cg.get_price(ids=symbol.lower(), vs_currencies='usd')
-            if symbol.lower() in price_data:
-                return price_data[symbol.lower()]['usd']
+            price = await price_oracle.get_price(symbol)
+            if price:
+                return price
                 
             # Fallback to exchange APIs
             for exchange in self.exchanges.values():
@@ -2,6 +2,7 @@
 import asyncio
 import logging
 import json
+import time
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -10,8 +11,6 @@ import plotly.express as px
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
-import requests
-import ta
 from io import BytesIO
 import base64
 
@@ -19,6 +18,8 @@ from config import config
 from ai_providers import get_ai_response
 from security_auditor import security_auditor
 from performance_monitor import track_performance
+from streaming_indicators import compute_indicators, indicator_engine
+from async_http import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +94,9 @@ class OnChainMetrics:
 class AdvancedResearchEngine:
     """Advanced research and analysis tools"""
     
+    # Timeframes served from the shared hourly indicator engine, in days of history
+    ENGINE_TIMEFRAME_DAYS = {"4h": 7, "1d": 30}
+    
     def __init__(self):
         self.cache = {}
         self.analysis_cache = {}
@@ -212,19 +216,11 @@ class AdvancedResearchEngine:
                 {"symbol": symbol, "timeframe": timeframe}
             )
             
-            # Get historical price data
-            price_data = await self._get_historical_data(symbol, timeframe)
-            if not price_data:
+            # Get historical price data with technical indicators
+            df = await self._get_indicator_frame(symbol, timeframe)
+            if df is None:
                 return {"success": False, "message": f"Could not get price data for {symbol}"}
             
-            # Create DataFrame
-            df = pd.DataFrame(price_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df.set_index('timestamp', inplace=True)
-            
-            # Calculate technical indicators
-            df = await self._add_technical_indicators(df)
-            
             # Create interactive chart
             chart = await self._create_interactive_chart(df, symbol, timeframe)
             
@@ -256,9 +252,9 @@ class AdvancedResearchEngine:
             
             # Fetch from CoinGecko
             url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}"
-            response = requests.get(url, timeout=10)
+            response = await http_client.get(url, timeout=10, cache_ttl=60)
             
-            if response.status_code != 200:
+            if response.status != 200:
                 return None
             
             data = response.json()
@@ -300,18 +296,11 @@ class AdvancedResearchEngine:
     async def _perform_technical_analysis(self, symbol: str, timeframe: str) -> Optional[TechnicalAnalysis]:
         """Perform comprehensive technical analysis"""
         try:
-            # Get historical data
-            price_data = await self._get_historical_data(symbol, timeframe)
-            if not price_data:
+            # Get historical data with indicators
+            df = await self._get_indicator_frame(symbol, timeframe)
+            if df is None:
                 return None
             
-            df = pd.DataFrame(price_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df.set_index('timestamp', inplace=True)
-            
-            # Calculate indicators
-            df = await self._add_technical_indicators(df)
-            
             # Determine trend
             trend = await self._determine_trend(df)
             
@@ -455,9 +444,9 @@ class AdvancedResearchEngine:
             days = timeframe_map.get(timeframe, 30)
             
             url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}/market_chart?vs_currency=usd&days={days}"
-            response = requests.get(url, timeout=10)
+            response = await http_client.get(url, timeout=10, cache_ttl=60)
             
-            if response.status_code != 200:
+            if response.status != 200:
                 return None
             
             data = response.json()
@@ -489,39 +478,13 @@ class AdvancedResearchEngine:
             return None
 
     async def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add technical indicators to DataFrame"""
+        """Add technical indicators to DataFrame in one streaming pass over the prices"""
         try:
-            # Use price as close for calculations
-            close = df['price']
-            
-            # Moving averages
-            df['sma_20'] = ta.trend.SMAIndicator(close, window=20).sma_indicator()
-            df['sma_50'] = ta.trend.SMAIndicator(close, window=50).sma_indicator()
-            df['ema_12'] = ta.trend.EMAIndicator(close, window=12).ema_indicator()
-            df['ema_26'] = ta.trend.EMAIndicator(close, window=26).ema_indicator()
-            
-            # RSI
-            df['rsi'] = ta.momentum.RSIIndicator(close).rsi()
-            
-            # MACD
-            macd = ta.trend.MACD(close)
-            df['macd'] = macd.macd()
-            df['macd_signal'] = macd.macd_signal()
-            df['macd_histogram'] = macd.macd_diff()
-            
-            # Bollinger Bands
-            bollinger = ta.volatility.BollingerBands(close)
-            df['bb_upper'] = bollinger.bollinger_hband()
-            df['bb_middle'] = bollinger.bollinger_mavg()
-            df['bb_lower'] = bollinger.bollinger_lband()
-            
-            # Stochastic (using price as approximation for high/low)
-            stoch = ta.momentum.StochasticOscillator(high=close, low=close, close=close)
-            df['stoch_k'] = stoch.stoch()
-            df['stoch_d'] = stoch.stoch_signal()
-            
-            # Williams %R
-            df['williams_r'] = ta.momentum.WilliamsRIndicator(high=close, low=close, close=close).williams_r()
+            indicators = pd.DataFrame(compute_indicators(df['price'].tolist()), index=df.index)
+            columns = ['sma_20', 'sma_50', 'ema_12', 'ema_26', 'rsi', 'macd', 'macd_signal',
+                       'macd_histogram', 'bb_upper', 'bb_middle', 'bb_lower', 'stoch_k', 'stoch_d', 'williams_r']
+            for column in columns:
+                df[column] = indicators[column] if column in indicators else float('nan')
             
             return df
             
@@ -529,6 +492,29 @@ class AdvancedResearchEngine:
             logger.error(f"Error adding technical indicators: {e}")
             return df
 
+    async def _get_indicator_frame(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Price history with technical indicator columns, indexed by timestamp"""
+        try:
+            # Hourly timeframes within the shared engine's window need no fetch or recomputation
+            days = self.ENGINE_TIMEFRAME_DAYS.get(timeframe)
+            if days is not None and await indicator_engine.ensure(symbol):
+                rows = indicator_engine.history(symbol, since=time.time() - days * 86400)
+                if rows:
+                    return pd.DataFrame(rows).set_index('timestamp')
+            
+            price_data = await self._get_historical_data(symbol, timeframe)
+            if not price_data:
+                return None
+            
+            df = pd.DataFrame(price_data)
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df.set_index('timestamp', inplace=True)
+            return await self._add_technical_indicators(df)
+            
+        except Exception as e:
+            logger.error(f"Error building indicator frame for {symbol}: {e}")
+            return None
+
     async def _determine_trend(self, df: pd.DataFrame) -> str:
         """Determine overall trend"""
         try:
@@ -8,6 +8,7 @@ for the Möbius AI Assistant to learn from and improve execution.
 import asyncio
 import logging
 import json
+import os
 import sqlite3
 import time
 from typing import Dict, List, Optional, Any, Tuple
@@ -16,6 +17,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import random
 import re
+import threading
+from intent_pattern_index import IntentPatternIndex
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +68,11 @@ class AgentMemoryDatabase:
     
     def __init__(self, db_path: str = "data/agent_memory.db"):
         self.db_path = db_path
+        self._intent_index: Optional[IntentPatternIndex] = None
+        self._intent_index_version: Optional[int] = None
+        self._intent_data_version: Optional[int] = None
+        self._intent_conn: Optional[sqlite3.Connection] = None
+        self._intent_lock = threading.Lock()
         self.init_database()
         self.populate_initial_data()
         logger.info("Agent Memory Database initialized with comprehensive training data")
@@ -1097,37 +1105,62 @@ class AgentMemoryDatabase:
                     return None
         return None
     
-    def analyze_intent(self, user_input: str) -> Tuple[str, float]:
-        """Analyze user input to determine intent"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM intent_patterns')
+    @staticmethod
+    def _ensure_intent_versioning(conn: sqlite3.Connection):
+        """Create the intent_patterns change counter and its triggers on first use"""
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS intent_patterns_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('INSERT OR IGNORE INTO intent_patterns_version (id, version) VALUES (0, 0)')
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS intent_patterns_{event.lower()}_version
+                    AFTER {event} ON intent_patterns
+                    BEGIN
+                        UPDATE intent_patterns_version SET version = version + 1 WHERE id = 0;
+                    END
+                ''')
+    
+    def _get_intent_index(self) -> IntentPatternIndex:
+        """
+        Compiled intent pattern index, rebuilt only when intent_patterns changed.
+        PRAGMA data_version on a long-lived connection detects commits from any other
+        connection; the trigger-maintained counter tells whether they touched intent_patterns.
+        """
+        with self._intent_lock:
+            if self._intent_conn is None:
+                self._intent_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._ensure_intent_versioning(self._intent_conn)
             
-            best_match = None
-            best_confidence = 0.0
+            data_version = self._intent_conn.execute('PRAGMA data_version').fetchone()[0]
+            if self._intent_index is not None and data_version == self._intent_data_version:
+                return self._intent_index
             
-            for row in cursor.fetchall():
-                pattern_id, intent, pattern, threshold, context_clues, disambiguation_questions, created_at = row
-                try:
-                    context_clues = json.loads(context_clues) if context_clues else []
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.error(f"Error parsing context clues JSON for pattern {pattern_id}: {e}")
-                    context_clues = []
-                
-                # Check regex pattern match
-                if re.search(pattern, user_input, re.IGNORECASE):
-                    confidence = threshold
-                    
-                    # Boost confidence based on context clues
-                    for clue in context_clues:
-                        if clue.lower() in user_input.lower():
-                            confidence += 0.05
-                    
-                    if confidence > best_confidence:
-                        best_confidence = confidence
-                        best_match = intent
-            
-            return best_match or "unknown", best_confidence
+            version = self._intent_conn.execute('SELECT version FROM intent_patterns_version WHERE id = 0').fetchone()[0]
+            if self._intent_index is None or version != self._intent_index_version:
+                rows = self._intent_conn.execute('''
+                    SELECT pattern_id, intent, pattern, confidence_threshold, context_clues
+                    FROM intent_patterns ORDER BY rowid
+                ''').fetchall()
+                self._intent_index = IntentPatternIndex(rows)
+                self._intent_index_version = version
+                logger.info(f"Intent pattern index built: {len(self._intent_index.patterns)} patterns, "
+                            f"{len(self._intent_index.unfiltered)} without keyword prefilter")
+            self._intent_data_version = data_version
+            return self._intent_index
+    
+    def invalidate_intent_index(self):
+        """Force the next analyze_intent call to reload intent patterns"""
+        with self._intent_lock:
+            self._intent_index = None
+    
+    def analyze_intent(self, user_input: str) -> Tuple[str, float]:
+        """Analyze user input to determine intent"""
+        return self._get_intent_index().analyze(user_input)
     
     def get_response_template(self, intent: str, context: Dict[str, Any] = None) -> str:
         """Get appropriate response template for intent"""
@@ -1145,7 +1178,7 @@ class AgentMemoryDatabase:
         return "I understand you're asking about {intent}, but I need more specific information to help you properly."
 
 # Global instance
-agent_memory = AgentMemoryDatabase()
+agent_memory = AgentMemoryDatabase(os.getenv('AGENT_MEMORY_DB_PATH', 'data/agent_memory.db'))
 
 # Export functions for easy access
 def get_conversation_flow(intent: str) -> Optional[ConversationFlow]:
@@ -8,13 +8,19 @@ import logging
 import asyncio
 import json
 import os
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 from config import config
+from response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
+EMPTY_RESPONSE_MESSAGE = "I'm having trouble generating a response right now."
+ALL_PROVIDERS_FAILED_MESSAGE = "I'm experiencing technical difficulties with AI services. Please try again in a moment."
+
 class AIProvider(Enum):
     """Supported AI providers"""
     GROQ = "groq"
@@ -51,6 +57,28 @@ class ModelCapabilities:
     language_support: List[str]
     specializations: List[str]
 
+@dataclass
+class FirstTokenStats:
+    """Time-to-first-token samples for one provider"""
+    samples: deque = field(default_factory=lambda: deque(maxlen=200))
+    streams: int = 0
+
+    def record(self, seconds: float):
+        self.streams += 1
+        self.samples.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"streams": self.streams}
+        ordered = sorted(self.samples)
+        return {
+            "streams": self.streams,
+            "avg": sum(ordered) / len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "last": self.samples[-1]
+        }
+
 class AIProviderManager:
     """Manages AI providers and enables easy switching"""
     
@@ -59,6 +87,7 @@ class AIProviderManager:
         self.current_provider = AIProvider(config.get('AI_PROVIDER', 'groq'))
         self.fallback_providers = [AIProvider.GROQ, AIProvider.GEMINI, AIProvider.OPENAI]
         self.provider_clients = {}
+        self.first_token_stats: Dict[AIProvider, FirstTokenStats] = {}
         self._initialize_clients()
         logger.info(f"AI Provider Manager initialized with {self.current_provider.value} as primary")
     
@@ -232,10 +261,44 @@ class AIProviderManager:
                           model: Optional[str] = None,
                           max_tokens: Optional[int] = None,
                           temperature: float = 0.7,
-                          stream: bool = False) -> str:
-        """Generate text using specified or current provider"""
+                          stream: bool = False,
+                          intent: Optional[str] = None,
+                          use_cache: bool = True) -> str:
+        """Generate text using specified or current provider, answering repeat questions from the response cache"""
         
         provider = provider or self.current_provider
+        model = model or self.providers[provider].default_model
+        if stream:
+            chunks = [chunk async for chunk in self.stream_text(messages, provider, model, max_tokens,
+                                                               temperature, intent, use_cache)]
+            return ''.join(chunks)
+        if not use_cache:
+            content, _, _ = await self._generate_uncached(messages, provider, model, max_tokens, temperature)
+            return content
+        
+        cached = response_cache.get(messages, provider.value, model, max_tokens, intent)
+        if cached is not None:
+            return cached
+        
+        start = time.monotonic()
+        content, answered_by, answered_model = await self._generate_uncached(messages, provider, model,
+                                                                             max_tokens, temperature)
+        if content not in (EMPTY_RESPONSE_MESSAGE, ALL_PROVIDERS_FAILED_MESSAGE):
+            # A fallback's answer is cached under the provider and model that produced it
+            response_cache.put(messages, answered_by.value, answered_model, content, time.monotonic() - start,
+                               max_tokens, intent)
+        return content
+    
+    async def _generate_uncached(self, messages: List[Dict[str, str]], 
+                                 provider: AIProvider,
+                                 model: Optional[str] = None,
+                                 max_tokens: Optional[int] = None,
+                                 temperature: float = 0.7) -> Tuple[str, AIProvider, str]:
+        """
+        Generate text using the given provider, falling back to the others on error.
+        Returns the text with the provider and model that produced it.
+        """
+        
         config_obj = self.providers[provider]
         model = model or config_obj.default_model
         max_tokens = max_tokens or config_obj.max_tokens
@@ -251,11 +314,10 @@ class AIProviderManager:
                     messages=messages,
                     model=model,
                     max_tokens=max_tokens,
-                    temperature=temperature,
-                    stream=stream
+                    temperature=temperature
                 )
                 content = response.choices[0].message.content
-                return content if content else "I'm having trouble generating a response right now."
+                return content or EMPTY_RESPONSE_MESSAGE, provider, model
             
             elif provider == AIProvider.GEMINI:
                 # Convert messages to Gemini format
@@ -269,29 +331,20 @@ class AIProviderManager:
                     }
                 )
                 content = response.text
-                return content if content else "I'm having trouble generating a response right now."
+                return content or EMPTY_RESPONSE_MESSAGE, provider, model
             
             elif provider == AIProvider.OPENAI:
                 response = await client.chat.completions.create(
                     messages=messages,
                     model=model,
                     max_tokens=max_tokens,
-                    temperature=temperature,
-                    stream=stream
+                    temperature=temperature
                 )
                 content = response.choices[0].message.content
-                return content if content else "I'm having trouble generating a response right now."
+                return content or EMPTY_RESPONSE_MESSAGE, provider, model
             
             elif provider == AIProvider.ANTHROPIC:
-                # Convert messages to Anthropic format
-                system_message = ""
-                user_messages = []
-                
-                for msg in messages:
-                    if msg["role"] == "system":
-                        system_message = msg["content"]
-                    else:
-                        user_messages.append(msg)
+                system_message, user_messages = self._split_system_message(messages)
                 
                 response = await client.messages.create(
                     model=model,
@@ -301,18 +354,17 @@ class AIProviderManager:
                     messages=user_messages
                 )
                 content = response.content[0].text
-                return content if content else "I'm having trouble generating a response right now."
+                return content or EMPTY_RESPONSE_MESSAGE, provider, model
             
             elif provider == AIProvider.OPENROUTER:
                 response = await client.chat.completions.create(
                     messages=messages,
                     model=model,
                     max_tokens=max_tokens,
-                    temperature=temperature,
-                    stream=stream
+                    temperature=temperature
                 )
                 content = response.choices[0].message.content
-                return content if content else "I'm having trouble generating a response right now."
+                return content or EMPTY_RESPONSE_MESSAGE, provider, model
             
         except Exception as e:
             logger.error(f"Error with {provider.value}: {e}")
@@ -322,14 +374,139 @@ class AIProviderManager:
                 if fallback != provider and fallback in self.provider_clients:
                     try:
                         logger.info(f"Trying fallback provider: {fallback.value}")
-                        return await self.generate_text(messages, fallback, None, max_tokens, temperature, stream)
+                        return await self._generate_uncached(messages, fallback, None, max_tokens, temperature)
                     except Exception as fallback_error:
                         logger.error(f"Fallback {fallback.value} also failed: {fallback_error}")
                         continue
             
             # If all providers fail, return a fallback message
             logger.error(f"All AI providers failed. Last error: {e}")
-            return "I'm experiencing technical difficulties with AI services. Please try again in a moment."
+            return ALL_PROVIDERS_FAILED_MESSAGE, provider, model
+    
+    async def stream_text(self, messages: List[Dict[str, str]],
+                          provider: Optional[AIProvider] = None,
+                          model: Optional[str] = None,
+                          max_tokens: Optional[int] = None,
+                          temperature: float = 0.7,
+                          intent: Optional[str] = None,
+                          use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Yield the response as the provider produces it. Fallback providers are tried only
+        until the first token arrives; a stream that breaks off later just ends.
+        """
+        provider = provider or self.current_provider
+        model = model or self.providers[provider].default_model
+        if use_cache:
+            cached = response_cache.get(messages, provider.value, model, max_tokens, intent)
+            if cached is not None:
+                yield cached
+                return
+        
+        start = time.monotonic()
+        parts = []
+        answered_by = provider
+        candidates = [provider] + [fallback for fallback in self.fallback_providers
+                                   if fallback != provider and fallback in self.provider_clients]
+        for candidate in candidates:
+            candidate_start = time.monotonic()
+            try:
+                async for chunk in self._stream_provider(candidate, messages, model if candidate == provider else None,
+                                                         max_tokens, temperature):
+                    if not parts:
+                        self.first_token_stats.setdefault(candidate, FirstTokenStats()).record(
+                            time.monotonic() - candidate_start)
+                    parts.append(chunk)
+                    answered_by = candidate
+                    yield chunk
+                break
+            except Exception as e:
+                if parts:
+                    logger.error(f"Stream from {candidate.value} broke off: {e}")
+                    return
+                logger.error(f"Error streaming from {candidate.value}: {e}")
+        
+        if not parts:
+            logger.error("All AI providers failed to stream a response")
+            yield ALL_PROVIDERS_FAILED_MESSAGE
+            return
+        if use_cache:
+            answered_model = model if answered_by == provider else self.providers[answered_by].default_model
+            response_cache.put(messages, answered_by.value, answered_model, ''.join(parts), time.monotonic() - start,
+                               max_tokens, intent)
+    
+    async def _stream_provider(self, provider: AIProvider, messages: List[Dict[str, str]],
+                               model: Optional[str], max_tokens: Optional[int],
+                               temperature: float) -> AsyncIterator[str]:
+        """Raw text deltas from one provider's streaming API"""
+        config_obj = self.providers[provider]
+        model = model or config_obj.default_model
+        max_tokens = max_tokens or config_obj.max_tokens
+        if provider not in self.provider_clients:
+            self.provider_clients[provider] = self._create_client(provider)
+        client = self.provider_clients[provider]
+        
+        if provider in (AIProvider.GROQ, AIProvider.OPENAI, AIProvider.OPENROUTER):
+            stream = await client.chat.completions.create(
+                messages=messages,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        
+        elif provider == AIProvider.GEMINI:
+            model_obj = client.GenerativeModel(model)
+            response = await model_obj.generate_content_async(
+                self._convert_to_gemini_format(messages),
+                generation_config={
+                    "max_output_tokens": max_tokens,
+                    "temperature": temperature
+                },
+                stream=True
+            )
+            async for chunk in response:
+                # .text raises for chunks without text parts (e.g. safety ratings only)
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+        
+        elif provider == AIProvider.ANTHROPIC:
+            system_message, user_messages = self._split_system_message(messages)
+            async with client.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system_message,
+                messages=user_messages
+            ) as stream:
+                async for text in stream.text_stream:
+                    if text:
+                        yield text
+        
+        else:
+            raise ValueError(f"Streaming not supported for provider: {provider.value}")
+    
+    @staticmethod
+    def _split_system_message(messages: List[Dict[str, str]]):
+        """Anthropic takes the system prompt separately from the conversation"""
+        system_message = ""
+        user_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            else:
+                user_messages.append(msg)
+        return system_message, user_messages
+    
+    def get_first_token_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Time-to-first-token per provider, in seconds"""
+        return {provider.value: stats.summary() for provider, stats in self.first_token_stats.items()}
     
     def _convert_to_gemini_format(self, messages: List[Dict[str, str]]) -> str:
         """Convert OpenAI format messages to Gemini format"""
@@ -474,6 +651,8 @@ class AIProviderManager:
         # For now, return mock data
         return {
             "current_provider": self.current_provider.value,
+            "response_cache": response_cache.get_stats(),
+            "time_to_first_token": self.get_first_token_stats(),
             "total_requests": 1000,
             "provider_breakdown": {
                 "groq": {"requests": 600, "success_rate": 0.98, "avg_response_time": 0.5},
@@ -502,6 +681,15 @@ async def generate_ai_response(messages: List[Dict[str, str]],
     provider_enum = AIProvider(provider) if provider else None
     return await ai_provider_manager.generate_text(messages, provider_enum, model, **kwargs)
 
+async def stream_ai_response(messages: List[Dict[str, str]],
+                             provider: Optional[str] = None,
+                             model: Optional[str] = None,
+                             **kwargs) -> AsyncIterator[str]:
+    """Stream an AI response chunk by chunk using current or specified provider"""
+    provider_enum = AIProvider(provider) if provider else None
+    async for chunk in ai_provider_manager.stream_text(messages, provider_enum, model, **kwargs):
+        yield chunk
+
 def switch_ai_provider(provider: str, model: Optional[str] = None) -> bool:
     """Switch AI provider"""
     return ai_provider_manager.switch_provider(provider, model)
@@ -43,7 +43,7 @@ async def generate_text(provider: str, api_key: str, messages: list, model: str
             client = groq.AsyncGroq(api_key=api_key)
             response = await client.chat.completions.create(
                 messages=messages, 
-                model=model or "llama3-70b-8192"
+                model=model or DEFAULT_MODELS['groq']
             )
             return response.choices[0].message.content
             
@@ -53,7 +53,7 @@ async def generate_text(provider: str, api_key: str, messages: list, model: str
             client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
             response = await client.chat.completions.create(
                 messages=messages, 
-                model=model or "gpt-4-turbo"
+                model=model or DEFAULT_MODELS['openai']
             )
             return response.choices[0].message.content
             
@@ -61,7 +61,7 @@ async def generate_text(provider: str, api_key: str, messages: list, model: str
             if not GEMINI_AVAILABLE:
                 return f"Error: Gemini provider not available. Install with: pip install google-generativeai"
             genai.configure(api_key=api_key)
-            model_instance = genai.GenerativeModel(model or "gemini-1.5-pro-latest")
+            model_instance = genai.GenerativeModel(model or DEFAULT_MODELS['gemini'])
             system_instruction = next((msg['content'] for msg in messages if msg['role'] == 'system'), None)
             if system_instruction: 
                 model_instance.system_instruction = system_instruction
@@ -76,7 +76,7 @@ async def generate_text(provider: str, api_key: str, messages: list, model: str
             system_prompt = next((msg['content'] for msg in messages if msg['role'] == 'system'), "")
             user_messages = [msg for msg in messages if msg['role'] == 'user']
             response = await client.messages.create(
-                model=model or "claude-3-sonnet-20240229", 
+                model=model or DEFAULT_MODELS['anthropic'], 
                 max_tokens=4096,
                 system=system_prompt, 
                 messages=user_messages
@@ -89,6 +89,19 @@ async def generate_text(provider: str, api_key: str, messages: list, model: str
         logger.error(f"Error with AI provider '{provider}': {e}")
         return f"An exception occurred while communicating with {provider}. Check the API key and model availability."
 
+# Models generate_text uses when none is given
+DEFAULT_MODELS = {
+    'groq': "llama3-70b-8192",
+    'openai': "gpt-4-turbo",
+    'gemini': "gemini-1.5-pro-latest",
+    'anthropic': "claude-3-sonnet-20240229",
+}
+
+def default_provider_model() -> tuple:
+    """Provider and model get_ai_response calls: the first installed SDK"""
+    provider = "groq" if GROQ_AVAILABLE else "openai" if OPENAI_AVAILABLE else "gemini" if GEMINI_AVAILABLE else "anthropic"
+    return provider, DEFAULT_MODELS[provider]
+
 # Wrapper function for backward compatibility
 async def get_ai_response(prompt: str, user_id: int = 0) -> str:
     """
@@ -107,7 +120,7 @@ async def get_ai_response(prompt: str, user_id: int = 0) -> str:
         ]
         
         # Use first available provider as default
-        provider = "groq" if GROQ_AVAILABLE else "openai" if OPENAI_AVAILABLE else "gemini" if GEMINI_AVAILABLE else "anthropic"
+        provider, _ = default_provider_model()
         api_key = config.get(f'{provider.upper()}_API_KEY', '')
         
         return await generate_text(provider, api_key, messages)
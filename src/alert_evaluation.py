@@ -0,0 +1,345 @@
+# src/alert_evaluation.py
+"""
+Batched alert evaluation for AdvancedAlertsSystem.
+Alerts are indexed by symbol: price thresholds live in sorted arrays per condition, so a
+tick fetches each symbol's data once and bisects straight to the alerts that fire.
+Work per tick is O(symbols + triggered) for price alerts instead of O(alerts).
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_CONDITIONS = ('>', '<', '>=', '<=', 'crosses_above', 'crosses_below', 'volatility_spike')
+CROSSING_CONDITIONS = ('crosses_above', 'crosses_below')
+
+# (indicator, condition) -> predicate over the indicator data of one symbol
+TECHNICAL_RULES: Dict[Tuple[str, str], Callable[[Dict[str, float]], bool]] = {
+    ('rsi', 'oversold'): lambda data: data.get('rsi', 50) < 30,
+    ('rsi', 'overbought'): lambda data: data.get('rsi', 50) > 70,
+    ('macd', 'bullish_crossover'): lambda data: data.get('macd', 0) > data.get('macd_signal', 0),
+    ('macd', 'bearish_crossover'): lambda data: data.get('macd', 0) < data.get('macd_signal', 0),
+}
+
+class ThresholdBook:
+    """Alert ids ordered by threshold for one symbol and condition"""
+
+    __slots__ = ('thresholds', 'alert_ids')
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.alert_ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.thresholds)
+
+    def add(self, threshold: float, alert_id: str):
+        position = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(position, threshold)
+        self.alert_ids.insert(position, alert_id)
+
+    def remove(self, threshold: float, alert_id: str) -> bool:
+        position = bisect_left(self.thresholds, threshold)
+        while position < len(self.thresholds) and self.thresholds[position] == threshold:
+            if self.alert_ids[position] == alert_id:
+                del self.thresholds[position]
+                del self.alert_ids[position]
+                return True
+            position += 1
+        return False
+
+    def pop_range(self, start: int, end: int) -> List[str]:
+        """Remove and return the alert ids at sorted positions [start, end)"""
+        if start >= end:
+            return []
+        popped = self.alert_ids[start:end]
+        del self.thresholds[start:end]
+        del self.alert_ids[start:end]
+        return popped
+
+    def pop_below(self, value: float, inclusive: bool = False) -> List[str]:
+        """Alerts with threshold < value (<= when inclusive)"""
+        end = bisect_right(self.thresholds, value) if inclusive else bisect_left(self.thresholds, value)
+        return self.pop_range(0, end)
+
+    def pop_above(self, value: float, inclusive: bool = False) -> List[str]:
+        """Alerts with threshold > value (>= when inclusive)"""
+        start = bisect_left(self.thresholds, value) if inclusive else bisect_right(self.thresholds, value)
+        return self.pop_range(start, len(self.thresholds))
+
+    def pop_crossed(self, previous: float, current: float) -> List[str]:
+        """Thresholds crossed on the way from previous to current: [previous, current) upward, (current, previous] downward"""
+        if current > previous:
+            return self.pop_range(bisect_left(self.thresholds, previous), bisect_left(self.thresholds, current))
+        return self.pop_range(bisect_right(self.thresholds, current), bisect_right(self.thresholds, previous))
+
+def price_condition_met(condition: str, price: float, threshold: float, previous: float) -> bool:
+    """Reference semantics of a single price alert, used for alerts not yet in a book"""
+    if condition == '>':
+        return price > threshold
+    if condition == '<':
+        return price < threshold
+    if condition == '>=':
+        return price >= threshold
+    if condition == '<=':
+        return price <= threshold
+    if condition == 'crosses_above':
+        return previous <= threshold and price > threshold
+    if condition == 'crosses_below':
+        return previous >= threshold and price < threshold
+    return False
+
+class AlertEvaluationEngine:
+    """Symbol-grouped index of active alerts evaluated once per tick"""
+
+    def __init__(self,
+                 fetch_prices: Callable[[List[str]], Awaitable[Dict[str, float]]],
+                 fetch_volatility: Optional[Callable[[str], Awaitable[float]]] = None,
+                 fetch_technical: Optional[Callable[[str], Awaitable[Optional[Dict[str, float]]]]] = None,
+                 fetch_sentiment: Optional[Callable[[str], Awaitable[Any]]] = None):
+        self.fetch_prices = fetch_prices
+        self.fetch_volatility = fetch_volatility
+        self.fetch_technical = fetch_technical
+        self.fetch_sentiment = fetch_sentiment
+        self.last_prices: Dict[str, float] = {}
+        self.stats = {
+            'ticks': 0,
+            'symbols_fetched': 0,
+            'alerts_touched': 0,
+            'triggered': 0,
+        }
+        self.clear()
+
+    def clear(self):
+        """Drop every indexed alert"""
+        self._alerts: Dict[str, Any] = {}
+        # symbol -> condition -> book
+        self._books: Dict[str, Dict[str, ThresholdBook]] = {}
+        # Crossing alerts wait here until their first tick, which compares against their creation price
+        self._fresh: Dict[str, Dict[str, Any]] = {}
+        # symbol -> (indicator, condition) -> alert ids
+        self._technical: Dict[str, Dict[Tuple[str, str], Set[str]]] = {}
+        # symbol -> alert ids
+        self._sentiment: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self._alerts
+
+    @staticmethod
+    def _kind(alert) -> str:
+        return getattr(alert.alert_type, 'value', alert.alert_type)
+
+    @staticmethod
+    def _key(symbol: str) -> str:
+        return symbol.upper()
+
+    def add(self, alert):
+        """Index an active alert; whale and unsupported alerts are not indexed since nothing can fire them"""
+        self.remove(alert.id)
+        kind = self._kind(alert)
+        symbol = self._key(alert.symbol)
+
+        if kind == 'price' and alert.condition in THRESHOLD_CONDITIONS:
+            if alert.condition in CROSSING_CONDITIONS:
+                self._fresh.setdefault(symbol, {})[alert.id] = alert
+            else:
+                self._books.setdefault(symbol, {}).setdefault(alert.condition, ThresholdBook()).add(alert.threshold, alert.id)
+        elif kind == 'technical':
+            rule = (alert.metadata.get('indicator'), alert.metadata.get('condition'))
+            if rule not in TECHNICAL_RULES:
+                return
+            self._technical.setdefault(symbol, {}).setdefault(rule, set()).add(alert.id)
+        elif kind == 'sentiment':
+            self._sentiment.setdefault(symbol, set()).add(alert.id)
+        else:
+            return
+        self._alerts[alert.id] = alert
+
+    def remove(self, alert_id: str) -> bool:
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return False
+        kind = self._kind(alert)
+        symbol = self._key(alert.symbol)
+
+        if kind == 'price':
+            if alert_id in self._fresh.get(symbol, {}):
+                del self._fresh[symbol][alert_id]
+            else:
+                book = self._books.get(symbol, {}).get(alert.condition)
+                if book is not None:
+                    book.remove(alert.threshold, alert_id)
+        elif kind == 'technical':
+            rule = (alert.metadata.get('indicator'), alert.metadata.get('condition'))
+            self._technical.get(symbol, {}).get(rule, set()).discard(alert_id)
+        elif kind == 'sentiment':
+            self._sentiment.get(symbol, set()).discard(alert_id)
+        return True
+
+    def rebuild(self, alerts: Iterable):
+        """Re-index from scratch, keeping only active alerts"""
+        self.clear()
+        for alert in alerts:
+            if getattr(alert.status, 'value', alert.status) == 'active':
+                self.add(alert)
+
+    def refresh_current_value(self, alert):
+        """Bring a price alert's current_value up to the last evaluated price of its symbol"""
+        if self._kind(alert) == 'price':
+            price = self.last_prices.get(self._key(alert.symbol))
+            if price is not None:
+                alert.current_value = price
+
+    def _price_symbols(self) -> List[str]:
+        symbols = {symbol for symbol, books in self._books.items() if any(books.values())}
+        symbols.update(symbol for symbol, fresh in self._fresh.items() if fresh)
+        return sorted(symbols)
+
+    async def _gather_per_symbol(self, fetch, symbols: List[str]) -> Dict[str, Any]:
+        if not fetch or not symbols:
+            return {}
+        self.stats['symbols_fetched'] += len(symbols)
+        results = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+        data = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching alert data for {symbol}: {result}")
+            elif result is not None:
+                data[symbol] = result
+        return data
+
+    def _fire(self, alert_ids: List[str], trigger_data_for) -> List[Tuple[Any, Dict[str, Any]]]:
+        fired = []
+        for alert_id in alert_ids:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                continue
+            self.stats['alerts_touched'] += 1
+            if getattr(alert.status, 'value', alert.status) != 'active':
+                # Paused outside the engine; resume_alert re-indexes it
+                continue
+            fired.append((alert, trigger_data_for(alert)))
+        return fired
+
+    async def evaluate(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        """One tick: fetch every indexed symbol's data once and pop the alerts that fire"""
+        self.stats['ticks'] += 1
+        triggered: List[Tuple[Any, Dict[str, Any]]] = []
+
+        price_symbols = self._price_symbols()
+        volatility_symbols = [symbol for symbol in price_symbols
+                              if self._books.get(symbol, {}).get('volatility_spike')]
+        technical_symbols = sorted(symbol for symbol, rules in self._technical.items() if any(rules.values()))
+        sentiment_symbols = sorted(symbol for symbol, ids in self._sentiment.items() if ids)
+
+        prices: Dict[str, float] = {}
+        if price_symbols:
+            self.stats['symbols_fetched'] += len(price_symbols)
+            try:
+                prices = await self.fetch_prices(price_symbols)
+            except Exception as e:
+                logger.error(f"Error fetching prices for alerts: {e}")
+        volatility, technical, sentiment = await asyncio.gather(
+            self._gather_per_symbol(self.fetch_volatility, volatility_symbols),
+            self._gather_per_symbol(self.fetch_technical, technical_symbols),
+            self._gather_per_symbol(self.fetch_sentiment, sentiment_symbols),
+        )
+
+        for symbol in price_symbols:
+            price = prices.get(symbol)
+            if not price:
+                continue
+            triggered.extend(self._evaluate_price_symbol(symbol, price, volatility.get(symbol)))
+            self.last_prices[symbol] = price
+
+        for symbol, data in technical.items():
+            for rule, alert_ids in self._technical[symbol].items():
+                if alert_ids and TECHNICAL_RULES[rule](data):
+                    fired_ids = list(alert_ids)
+                    alert_ids.clear()
+                    triggered.extend(self._fire(fired_ids, lambda alert: self._technical_trigger_data(rule, data)))
+
+        for symbol, data in sentiment.items():
+            # Each alert has its own baseline, so this group is scanned rather than bisected
+            alert_ids = self._sentiment[symbol]
+            self.stats['alerts_touched'] += len(alert_ids)
+            fired_ids = [alert_id for alert_id in alert_ids
+                         if abs(data.sentiment_score - self._alerts[alert_id].metadata.get('baseline_sentiment', 0))
+                         >= self._alerts[alert_id].threshold]
+            alert_ids.difference_update(fired_ids)
+            triggered.extend(self._fire(fired_ids, lambda alert: self._sentiment_trigger_data(alert, data)))
+
+        self.stats['triggered'] += len(triggered)
+        return triggered
+
+    def _evaluate_price_symbol(self, symbol: str, price: float, volatility: Optional[float]):
+        previous = self.last_prices.get(symbol)
+        books = self._books.setdefault(symbol, {})
+        fired_ids: List[str] = []
+
+        for condition, book in books.items():
+            if not book:
+                continue
+            if condition == '>':
+                fired_ids += book.pop_below(price)
+            elif condition == '>=':
+                fired_ids += book.pop_below(price, inclusive=True)
+            elif condition == '<':
+                fired_ids += book.pop_above(price)
+            elif condition == '<=':
+                fired_ids += book.pop_above(price, inclusive=True)
+            elif condition in CROSSING_CONDITIONS and previous is not None and previous != price:
+                if (condition == 'crosses_above') == (price > previous):
+                    fired_ids += book.pop_crossed(previous, price)
+            elif condition == 'volatility_spike' and volatility is not None:
+                fired_ids += book.pop_below(volatility)
+
+        # Crossing alerts on their first tick compare against the price they were created at
+        for alert_id, alert in list(self._fresh.get(symbol, {}).items()):
+            self.stats['alerts_touched'] += 1
+            del self._fresh[symbol][alert_id]
+            if price_condition_met(alert.condition, price, alert.threshold, alert.current_value):
+                fired_ids.append(alert_id)
+            else:
+                books.setdefault(alert.condition, ThresholdBook()).add(alert.threshold, alert_id)
+
+        def trigger_data(alert):
+            reference = previous if previous is not None else alert.current_value
+            alert.current_value = price
+            data = {
+                'current_price': price,
+                'threshold': alert.threshold,
+                'condition': alert.condition,
+                'price_change': ((price - reference) / reference * 100) if reference else 0
+            }
+            if alert.condition == 'volatility_spike':
+                data['volatility'] = volatility
+            return data
+
+        return self._fire(fired_ids, trigger_data)
+
+    @staticmethod
+    def _technical_trigger_data(rule: Tuple[str, str], data: Dict[str, float]) -> Dict[str, Any]:
+        trigger_data = {'technical_data': data}
+        if rule[0] == 'rsi':
+            trigger_data['rsi'] = data.get('rsi', 50)
+        elif rule[0] == 'macd':
+            trigger_data.update({'macd': data.get('macd', 0), 'macd_signal': data.get('macd_signal', 0)})
+        return trigger_data
+
+    @staticmethod
+    def _sentiment_trigger_data(alert, data) -> Dict[str, Any]:
+        baseline_sentiment = alert.metadata.get('baseline_sentiment', 0)
+        return {
+            'current_sentiment': data.sentiment_score,
+            'baseline_sentiment': baseline_sentiment,
+            'sentiment_change': abs(data.sentiment_score - baseline_sentiment),
+            'volume': data.volume,
+            'trending_keywords': data.trending_keywords
+        }
@@ -0,0 +1,234 @@
+# src/async_http.py
+"""
+Shared async HTTP client for code running on the event loop.
+Requests go through the process-wide per-host sessions of session_registry
+(pooled connections, DNS cache, keep-alive) and replace blocking requests calls.
+Requests get a default timeout, retries with exponential backoff on connection errors, 429 and 5xx,
+and GET responses can be cached for a TTL with concurrent identical requests
+sharing one upstream call.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import aiohttp
+
+from session_registry import session_registry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+}
+
+class HTTPError(Exception):
+    """Non-2xx response"""
+
+    def __init__(self, status: int, url: str, body: bytes = b''):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+@dataclass
+class HTTPResponse:
+    """Fully read response; safe to keep after the connection is released"""
+    status: int
+    url: str
+    headers: Mapping[str, str]
+    body: bytes
+    from_cache: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPError(self.status, self.url, self.body)
+
+@dataclass
+class _CacheEntry:
+    expires_at: float
+    response: HTTPResponse = field(repr=False)
+
+class AsyncHTTPClient:
+    """Retrying, optionally caching HTTP client over the shared session registry"""
+
+    def __init__(self, timeout: float = 10.0, retries: int = 2, backoff: float = 0.5,
+                 max_backoff: float = 8.0, cache_size: int = 512):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache_size = cache_size
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cache: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.stats = {
+            'requests': 0,
+            'upstream_requests': 0,
+            'retries': 0,
+            'errors': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+        }
+
+    async def get_session(self):
+        """Session view of the shared registry, bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # In-flight futures of a previous event loop cannot be awaited from this one
+            self._loop = loop
+            self._in_flight = {}
+        if self._session is None:
+            self._session = session_registry.session(headers=DEFAULT_HEADERS, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        """Drop cached responses and release the borrowed session view"""
+        self._cache.clear()
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    @staticmethod
+    def _cache_key(method: str, url: str, params: Optional[Mapping], headers: Optional[Mapping]) -> Tuple:
+        return (method, url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+
+    def _cached(self, key: Tuple) -> Optional[HTTPResponse]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.expires_at:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry.response
+
+    def _store(self, key: Tuple, response: HTTPResponse, ttl: float):
+        self._cache[key] = _CacheEntry(time.monotonic() + ttl, response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = min(self.backoff * (2 ** attempt), self.max_backoff)
+        return delay * (0.5 + random.random() / 2)
+
+    async def _send(self, method: str, url: str, params, headers, json_body, data,
+                    timeout: Optional[float], retries: int) -> HTTPResponse:
+        session = await self.get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            self.stats['upstream_requests'] += 1
+            try:
+                async with session.request(method, url, params=params, headers=headers, json=json_body,
+                                           data=data, timeout=request_timeout) as response:
+                    body = await response.read()
+                    result = HTTPResponse(response.status, str(response.url), dict(response.headers), body,
+                                          elapsed=time.monotonic() - start)
+                if result.status not in RETRY_STATUSES or attempt >= retries:
+                    return result
+                delay = self._retry_delay(attempt, result.headers.get('Retry-After'))
+                logger.debug(f"HTTP {result.status} from {url}, retrying in {delay:.2f}s")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= retries:
+                    self.stats['errors'] += 1
+                    raise
+                delay = self._retry_delay(attempt, None)
+                logger.debug(f"{type(e).__name__} for {url}, retrying in {delay:.2f}s")
+            attempt += 1
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+    async def request(self, method: str, url: str, *, params: Optional[Mapping] = None,
+                      headers: Optional[Mapping] = None, json_body: Any = None, data: Any = None,
+                      timeout: Optional[float] = None, retries: Optional[int] = None,
+                      cache_ttl: Optional[float] = None) -> HTTPResponse:
+        """
+        Send a request and read the whole body. cache_ttl caches successful GET responses
+        for that many seconds; identical GETs in flight at the same time share one call.
+        Connection errors raise once retries are exhausted; HTTP errors are returned.
+        """
+        self.stats['requests'] += 1
+        retries = self.retries if retries is None else retries
+        if method != 'GET' or not cache_ttl:
+            return await self._send(method, url, params, headers, json_body, data, timeout, retries)
+
+        key = self._cache_key(method, url, params, headers)
+        cached = self._cached(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return HTTPResponse(cached.status, cached.url, cached.headers, cached.body, from_cache=True)
+
+        await self.get_session()
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        future = self._loop.create_future()
+        self._in_flight[key] = future
+        try:
+            response = await self._send(method, url, params, headers, json_body, data, timeout, retries)
+            if response.ok:
+                self._store(key, response, cache_ttl)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters get the exception; mark it retrieved so an unwaited future does not warn
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def get(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        """GET and decode JSON; raises HTTPError on a non-2xx status"""
+        response = await self.request('GET', url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'cached_responses': len(self._cache), 'in_flight': len(self._in_flight)}
+
+# Global instance
+http_client = AsyncHTTPClient()
@@ -15,6 +15,8 @@ from config import config
 from user_db import get_user_property, set_user_property
 from security_auditor import security_auditor
 from performance_monitor import track_performance
+from vectorized_backtest import run_backtest
+from parameter_sweep import run_parameter_sweep
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +105,15 @@ class BacktestResult:
     avg_trade_duration: float
     trades: List[Dict[str, Any]]
 
+# Strategy-specific keys accepted at the top level of create_strategy parameters
+BACKTEST_PARAM_KEYS = ('grid_levels', 'grid_lower', 'grid_upper', 'grid_range_percent',
+                       'momentum_period', 'momentum_threshold', 'reversion_period',
+                       'entry_z', 'exit_z', 'fee_rate')
+
+# Parameters a backtest sweep may vary, and the metrics it may rank by
+SWEEPABLE_PARAMS = ('base_amount', 'max_position_size', 'rebalance_frequency') + BACKTEST_PARAM_KEYS
+SWEEP_RANK_METRICS = ('sharpe_ratio', 'total_return', 'annual_return', 'win_rate', 'final_capital')
+
 class AutomatedTradingSystem:
     """Automated trading and strategy management system"""
     
@@ -193,7 +204,10 @@ class AutomatedTradingSystem:
                 take_profit_percent=parameters.get('take_profit_percent'),
                 rebalance_frequency=parameters.get('rebalance_frequency', 'daily'),
                 risk_management=parameters.get('risk_management', {}),
-                custom_params=parameters.get('custom_params', {})
+                custom_params={
+                    **{key: parameters[key] for key in BACKTEST_PARAM_KEYS if key in parameters},
+                    **parameters.get('custom_params', {})
+                }
             )
             
             # Create strategy
@@ -241,8 +255,15 @@ class AutomatedTradingSystem:
     @track_performance.track_function
     async def backtest_strategy(self, user_id: int, strategy_id: str, 
                               start_date: str, end_date: str, 
-                              initial_capital: float = 10000) -> Dict[str, Any]:
-        """Backtest a trading strategy"""
+                              initial_capital: float = 10000,
+                              parameter_ranges: Optional[Dict[str, Any]] = None,
+                              rank_by: str = 'sharpe_ratio', prune: bool = True,
+                              top_n: int = 20) -> Dict[str, Any]:
+        """
+        Backtest a trading strategy. With parameter_ranges ({name: [values] or
+        (start, stop, step)}), sweep every combination across a process pool and return
+        the top_n ranked by rank_by instead of a single result.
+        """
         try:
             # Security audit
             security_auditor.log_sensitive_action(
@@ -270,9 +291,15 @@ class AutomatedTradingSystem:
                 strategy.parameters.symbol, start_dt, end_dt
             )
             
-            if not historical_data:
+            if historical_data is None or historical_data.empty:
                 return {"success": False, "message": "Could not fetch historical data"}
             
+            if parameter_ranges:
+                return await self._sweep_backtest(
+                    strategy, historical_data, initial_capital,
+                    parameter_ranges, rank_by, prune, top_n
+                )
+            
             # Run backtest
             backtest_result = await self._run_backtest(
                 strategy, historical_data, initial_capital
@@ -496,8 +523,8 @@ class AutomatedTradingSystem:
                 # Convert dates to timestamps
                 since = int(start_date.timestamp() * 1000)
                 
-                # Fetch OHLCV data
-                ohlcv = exchange.fetch_ohlcv(symbol, '1d', since)
+                # Fetch OHLCV data; the ccxt client is synchronous, so it runs in a thread
+                ohlcv = await asyncio.to_thread(exchange.fetch_ohlcv, symbol, '1d', since)
                 
                 # Convert to DataFrame
                 df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
@@ -515,82 +542,86 @@ class AutomatedTradingSystem:
             logger.error(f"Error getting historical data: {e}")
             return None
 
+    def _backtest_params(self, strategy: TradingStrategy) -> Dict[str, Any]:
+        """Flatten strategy parameters into vectorized_backtest.run_backtest params"""
+        parameters = strategy.parameters
+        return {
+            'base_amount': parameters.base_amount,
+            'max_position_size': parameters.max_position_size,
+            'rebalance_frequency': parameters.rebalance_frequency,
+            **parameters.custom_params
+        }
+
+    async def _sweep_backtest(self, strategy: TradingStrategy, historical_data: pd.DataFrame,
+                            initial_capital: float, parameter_ranges: Dict[str, Any],
+                            rank_by: str, prune: bool, top_n: int) -> Dict[str, Any]:
+        """Ranked parameter sweep of a strategy over one price history"""
+        try:
+            unknown = [name for name in parameter_ranges if name not in SWEEPABLE_PARAMS]
+            if unknown:
+                return {"success": False, "message": f"Cannot sweep parameters: {', '.join(unknown)}"}
+            if rank_by not in SWEEP_RANK_METRICS:
+                return {"success": False, "message": f"Cannot rank by {rank_by}"}
+            
+            # Blocks on the worker pool, so it runs in a thread
+            sweep = await asyncio.to_thread(
+                run_parameter_sweep,
+                strategy.strategy_type.value,
+                historical_data['close'].to_numpy(dtype=float),
+                historical_data.index.to_numpy(),
+                initial_capital,
+                parameter_ranges,
+                base_params=self._backtest_params(strategy),
+                rank_by=rank_by,
+                prune=prune
+            )
+            sweep['results'] = sweep['results'][:top_n]
+            
+            return {
+                "success": True,
+                "sweep": sweep,
+                "message": f"Parameter sweep completed: {sweep['evaluated']} of {sweep['combinations']} "
+                           f"combinations backtested, {sweep['pruned']} pruned"
+            }
+            
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.error(f"Error in parameter sweep: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            strategy.status = StrategyStatus.DRAFT
+
     async def _run_backtest(self, strategy: TradingStrategy, 
                           historical_data: pd.DataFrame, 
                           initial_capital: float) -> BacktestResult:
-        """Run strategy backtest"""
+        """Run strategy backtest on the vectorized engine"""
         try:
-            trades = []
-            capital = initial_capital
-            position = 0
-            max_drawdown = 0
-            peak_capital = initial_capital
-            
-            # Strategy-specific backtesting logic
-            if strategy.strategy_type == StrategyType.DCA:
-                trades, capital, position = await self._backtest_dca(
-                    strategy, historical_data, initial_capital
-                )
-            elif strategy.strategy_type == StrategyType.GRID:
-                trades, capital, position = await self._backtest_grid(
-                    strategy, historical_data, initial_capital
-                )
-            # Add other strategy types...
-            
-            # Calculate performance metrics
-            total_return = ((capital - initial_capital) / initial_capital) * 100
-            
-            # Calculate annual return
-            days = (historical_data.index[-1] - historical_data.index[0]).days
-            annual_return = ((capital / initial_capital) ** (365 / days) - 1) * 100 if days > 0 else 0
-            
-            # Calculate max drawdown
-            equity_curve = [initial_capital]
-            running_capital = initial_capital
-            
-            for trade in trades:
-                running_capital += trade['pnl']
-                equity_curve.append(running_capital)
-                
-                if running_capital > peak_capital:
-                    peak_capital = running_capital
-                
-                drawdown = (peak_capital - running_capital) / peak_capital * 100
-                max_drawdown = max(max_drawdown, drawdown)
-            
-            # Calculate Sharpe ratio (simplified)
-            if trades:
-                returns = [trade['pnl'] / initial_capital for trade in trades]
-                avg_return = np.mean(returns)
-                std_return = np.std(returns)
-                sharpe_ratio = (avg_return / std_return) * np.sqrt(252) if std_return > 0 else 0
-            else:
-                sharpe_ratio = 0
-            
-            # Calculate win rate
-            winning_trades = len([t for t in trades if t['pnl'] > 0])
-            win_rate = (winning_trades / len(trades)) * 100 if trades else 0
-            
-            # Calculate average trade duration
-            avg_duration = np.mean([
-                (trade['exit_time'] - trade['entry_time']).total_seconds() / 3600 
-                for trade in trades if 'exit_time' in trade and 'entry_time' in trade
-            ]) if trades else 0
+            # The engine is pure NumPy; long histories are still worth keeping off the event loop
+            backtest = await asyncio.to_thread(
+                run_backtest,
+                strategy.strategy_type.value,
+                historical_data['close'].to_numpy(dtype=float),
+                historical_data.index.to_numpy(),
+                initial_capital,
+                self._backtest_params(strategy)
+            )
+            metrics = backtest.metrics
             
             return BacktestResult(
                 strategy_id=strategy.id,
                 start_date=historical_data.index[0],
                 end_date=historical_data.index[-1],
                 initial_capital=initial_capital,
-                final_capital=capital,
-                total_return=total_return,
-                annual_return=annual_return,
-                max_drawdown=max_drawdown,
-                sharpe_ratio=sharpe_ratio,
-                win_rate=win_rate,
-                total_trades=len(trades),
-                avg_trade_duration=avg_duration,
-                trades=trades
+                final_capital=metrics['final_capital'],
+                total_return=metrics['total_return'],
+                annual_return=metrics['annual_return'],
+                max_drawdown=metrics['max_drawdown'],
+                sharpe_ratio=metrics['sharpe_ratio'],
+                win_rate=metrics['win_rate'],
+                total_trades=metrics['total_trades'],
+                avg_trade_duration=metrics['avg_trade_duration'],
+                trades=backtest.trades()
             )
             
         except Exception as e:
@@ -611,71 +642,6 @@ class AutomatedTradingSystem:
                 trades=[]
             )
 
-    async def _backtest_dca(self, strategy: TradingStrategy, 
-                          historical_data: pd.DataFrame, 
-                          initial_capital: float) -> Tuple[List[Dict], float, float]:
-        """Backtest DCA strategy"""
-        try:
-            trades = []
-            capital = initial_capital
-            position = 0
-            dca_amount = strategy.parameters.base_amount
-            
-            # Simulate DCA purchases
-            frequency_days = {
-                'daily': 1,
-                'weekly': 7,
-                'monthly': 30
-            }
-            
-            freq_days = frequency_days.get(strategy.parameters.rebalance_frequency, 7)
-            
-            for i in range(0, len(historical_data), freq_days):
-                if i >= len(historical_data):
-                    break
-                    
-                row = historical_data.iloc[i]
-                price = row['close']
-                
-                if capital >= dca_amount:
-                    # Buy
-                    shares_bought = dca_amount / price
-                    position += shares_bought
-                    capital -= dca_amount
-                    
-                    trades.append({
-                        'type': 'buy',
-                        'price': price,
-                        'amount': shares_bought,
-                        'cost': dca_amount,
-                        'timestamp': row.name,
-                        'entry_time': row.name,
-                        'pnl': 0  # Will be calculated at the end
-                    })
-            
-            # Calculate final value
-            if position > 0:
-                final_price = historical_data.iloc[-1]['close']
-                position_value = position * final_price
-                capital += position_value
-                
-                # Calculate PnL for each trade
-                for trade in trades:
-                    trade['pnl'] = (final_price - trade['price']) * trade['amount']
-            
-            return trades, capital, position
-            
-        except Exception as e:
-            logger.error(f"Error in DCA backtest: {e}")
-            return [], initial_capital, 0
-
-    async def _backtest_grid(self, strategy: TradingStrategy, 
-                           historical_data: pd.DataFrame, 
-                           initial_capital: float) -> Tuple[List[Dict], float, float]:
-        """Backtest Grid strategy"""
-        # Placeholder for grid strategy backtesting
-        return [], initial_capital, 0
-
     async def _check_user_balance(self, user_id: int, strategy: TradingStrategy) -> Dict[str, Any]:
         """Check if user has sufficient balance for strategy"""
         try:
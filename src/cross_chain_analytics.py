@@ -15,6 +15,7 @@ from config import config
 from user_db import get_user_property, set_user_property
 from security_auditor import security_auditor
 from performance_monitor import track_performance
+from price_oracle import price_oracle
 
 logger = logging.getLogger(__name__)
 
@@ -724,22 +725,13 @@ class CrossChainAnalytics:
     async def _get_token_price(self, symbol: str) -> float:
         """Get token price in USD"""
         try:
-            # Use CoinGecko API
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={symbol.lower()}&vs_currencies=usd"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get(symbol.lower(), {}).get('usd', 0.0)
-            
-            return 0.0
+            return await price_oracle.get_price(symbol)
             
         except Exception as e:
             logger.warning(f"Failed to get price for {symbol}: {e}")
             return 0.0
 
 
-
 class CrossChainAnalyzer:
     """Cross-chain analyzer for compatibility"""
     
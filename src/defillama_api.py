@@ -4,10 +4,11 @@ DeFiLlama API Integration for Möbius AI Assistant
 Provides comprehensive DeFi data and analytics
 """
 import logging
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
+from protocol_snapshot import protocol_snapshot
+from session_registry import session_registry
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,9 @@ class DeFiLlamaAPI:
         self.session = None
     
     async def _get_session(self):
-        """Get or create aiohttp session"""
+        """Shared per-host session from the registry, borrowed on first use"""
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            self.session = session_registry.session()
         return self.session
     
     async def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
@@ -142,40 +143,25 @@ class DeFiLlamaAPI:
             return {}
     
     async def search_protocols(self, query: str) -> Optional[List[Dict]]:
-        """Search for protocols by name"""
-        protocols = await self.get_protocols()
-        if not protocols:
+        """Search for protocols by name, symbol or slug in the local catalogue snapshot"""
+        if not await protocol_snapshot.ensure_ready():
             return None
         
-        query_lower = query.lower()
-        matches = []
-        
-        for protocol in protocols:
-            name = protocol.get('name', '').lower()
-            symbol = protocol.get('symbol', '').lower()
-            
-            if query_lower in name or query_lower in symbol:
-                matches.append(protocol)
-        
-        return matches[:10]  # Return top 10 matches
+        return protocol_snapshot.search(query, limit=10)  # Return top 10 matches
     
     async def get_top_protocols(self, limit: int = 10) -> Optional[List[Dict]]:
-        """Get top protocols by TVL"""
-        protocols = await self.get_protocols()
-        if not protocols:
+        """Get top protocols by TVL from the local catalogue snapshot"""
+        if not await protocol_snapshot.ensure_ready():
             return None
         
-        # Sort by TVL and return top N (handle None values)
-        sorted_protocols = sorted(
-            protocols, 
-            key=lambda x: x.get('tvl', 0) or 0, 
-            reverse=True
-        )
-        return sorted_protocols[:limit]
+        return protocol_snapshot.top(limit)
     
     async def get_protocol_summary(self, protocol_slug: str) -> Optional[str]:
-        """Get formatted protocol summary"""
-        protocol = await self.get_protocol(protocol_slug)
+        """Get formatted protocol summary from the local catalogue snapshot"""
+        if not await protocol_snapshot.ensure_ready():
+            return None
+        
+        protocol = protocol_snapshot.get(protocol_slug)
         if not protocol:
             return None
         
@@ -254,10 +240,10 @@ class DeFiLlamaAPI:
         return summary
     
     async def close(self):
-        """Close the aiohttp session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the borrowed session view"""
+        if self.session is not None:
+            session, self.session = self.session, None
+            await session.close()
 
 # Global instance
 defillama_api = DeFiLlamaAPI()
@@ -1,13 +1,30 @@
 # src/encryption.py
+import asyncio
+import base64
 import logging
-from typing import Optional
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
 from encryption_manager import EncryptionManager
 
 logger = logging.getLogger(__name__)
 
+# Storage formats for messages.encrypted_text, recorded in messages.format_version
+FORMAT_HEX_FERNET = 0   # legacy: hex-encoded Fernet token (TEXT)
+FORMAT_RAW_FERNET = 1   # migrated legacy rows: base64-decoded Fernet token (BLOB)
+FORMAT_AESGCM = 2       # nonce || ciphertext || tag (BLOB)
+FORMAT_PLAINTEXT = 3    # encryption unavailable: stored as plaintext (TEXT)
+CURRENT_FORMAT = FORMAT_AESGCM
+
 # Global encryption manager instance
 _encryption_manager = EncryptionManager()
 
+# The message key is volatile and lives only in this process, so bulk decryption
+# runs on threads rather than worker processes
+DECRYPT_WORKERS = min(4, os.cpu_count() or 1)
+_decrypt_executor = ThreadPoolExecutor(max_workers=DECRYPT_WORKERS, thread_name_prefix='decrypt')
+
 def encrypt_message(text: str) -> Optional[str]:
     """Encrypt a message using the global encryption manager"""
     try:
@@ -32,6 +49,71 @@ def decrypt_message(encrypted_hex: str) -> Optional[str]:
         logger.error(f"Error decrypting message: {e}")
         return None
 
+def encrypt_message_compact(text: str) -> Optional[bytes]:
+    """Encrypt a message into the compact binary CURRENT_FORMAT for BLOB storage"""
+    try:
+        if not text:
+            return None
+        return _encryption_manager.encrypt_compact(text)
+    except Exception as e:
+        logger.error(f"Error encrypting message: {e}")
+        return None
+
+def legacy_hex_to_raw(encrypted_hex: str) -> Optional[bytes]:
+    """Convert a FORMAT_HEX_FERNET value to FORMAT_RAW_FERNET without decrypting it"""
+    try:
+        return base64.urlsafe_b64decode(bytes.fromhex(encrypted_hex))
+    except (ValueError, TypeError):
+        return None
+
+def decrypt_stored_message(value: Union[str, bytes], format_version: int = FORMAT_HEX_FERNET) -> Optional[str]:
+    """Decrypt a stored message according to its format version"""
+    try:
+        if not value:
+            return None
+        if format_version == FORMAT_PLAINTEXT:
+            return value
+        if format_version == FORMAT_AESGCM:
+            return _encryption_manager.decrypt_compact(value)
+        if format_version == FORMAT_RAW_FERNET:
+            return _encryption_manager.decrypt(base64.urlsafe_b64encode(value))
+        return decrypt_message(value)
+    except Exception as e:
+        logger.error(f"Error decrypting message: {e}")
+        return None
+
+async def bulk_decrypt_stream(chunks: Union[Iterable[List], AsyncIterable[List]],
+                              decrypt_chunk: Callable[[List], List[Dict]],
+                              max_in_flight: int = DECRYPT_WORKERS) -> AsyncIterator[Dict]:
+    """
+    Decrypt chunks of rows on the decryption thread pool and yield the results in order.
+    Up to max_in_flight chunks are decrypted concurrently while the caller consumes earlier ones.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+
+    async def _chunks():
+        if hasattr(chunks, '__aiter__'):
+            async for chunk in chunks:
+                yield chunk
+        else:
+            for chunk in chunks:
+                yield chunk
+
+    try:
+        async for chunk in _chunks():
+            pending.append(loop.run_in_executor(_decrypt_executor, decrypt_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                for row in await pending.popleft():
+                    yield row
+        while pending:
+            for row in await pending.popleft():
+                yield row
+    finally:
+        # Consumer stopped early, drop chunks it will never read
+        for future in pending:
+            future.cancel()
+
 def rotate_encryption_key():
     """Rotate the encryption key"""
     try:
@@ -1,16 +1,28 @@
 # src/encryption_manager.py
+import os
 import logging
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 logger = logging.getLogger(__name__)
 
+NONCE_SIZE = 12
+
 class EncryptionManager:
     """Manages the VOLATILE encryption key for in-memory message logs."""
     def __init__(self):
         self._key = Fernet.generate_key()
         self._fernet = Fernet(self._key)
+        self._aead = AESGCM(AESGCM.generate_key(bit_length=256))
         logger.info("Volatile encryption manager initialized.")
     def rotate_key(self):
         logger.info("Rotating volatile encryption key for message log.")
         self._key = Fernet.generate_key(); self._fernet = Fernet(self._key)
+        self._aead = AESGCM(AESGCM.generate_key(bit_length=256))
     def encrypt(self, text: str) -> bytes: return self._fernet.encrypt(text.encode('utf-8'))
-    def decrypt(self, token: bytes) -> str: return self._fernet.decrypt(token).decode('utf-8')
\ No newline at end of file
+    def decrypt(self, token: bytes) -> str: return self._fernet.decrypt(token).decode('utf-8')
+    def encrypt_compact(self, text: str) -> bytes:
+        """AES-GCM encrypt to nonce || ciphertext || tag, 28 bytes of overhead per message."""
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, text.encode('utf-8'), None)
+    def decrypt_compact(self, blob: bytes) -> str:
+        return self._aead.decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], None).decode('utf-8')
@@ -7,7 +7,6 @@ Prioritizes real-time data and built-in commands over templates and MCP
 import asyncio
 import logging
 import json
-import requests
 from typing import Dict, List, Optional, Tuple, Any, Union
 from datetime import datetime, timedelta
 
@@ -17,6 +16,7 @@ from defillama_api import defillama_api, get_protocol_data, search_defi_protocol
 from crypto_research import query_defillama, get_arkham_data, get_nansen_data
 from ai_provider_manager import generate_ai_response
 from config import config
+from async_http import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -125,13 +125,14 @@ class EnhancedResponseHandler:
         Focus on being accurate and helpful, using the real data provided.
         """
         
-        ai_response = await generate_ai_response(enhanced_prompt, str(user_id))
+        ai_response, streamed = await self._generate_reply(enhanced_prompt, context)
         
         return {
             "type": "ai_with_data",
-            "message": ai_response.get("message", "I couldn't generate a response with the available data."),
+            "message": ai_response or "I couldn't generate a response with the available data.",
             "data_context": data_context,
-            "confidence": analysis.confidence
+            "confidence": analysis.confidence,
+            "streamed": streamed
         }
     
     async def _handle_template_response(self, analysis: EnhancedIntentAnalysis, text: str, user_id: int, context: Dict) -> Dict[str, Any]:
@@ -153,12 +154,13 @@ class EnhancedResponseHandler:
     async def _handle_simple_ai(self, analysis: EnhancedIntentAnalysis, text: str, user_id: int, context: Dict) -> Dict[str, Any]:
         """Handle simple AI responses"""
         try:
-            ai_response = await generate_ai_response(text, str(user_id))
+            ai_response, streamed = await self._generate_reply(text, context)
             
             return {
                 "type": "ai_simple",
-                "message": ai_response.get("message", "I'm not sure how to help with that. Could you rephrase your question?"),
-                "confidence": analysis.confidence
+                "message": ai_response or "I'm not sure how to help with that. Could you rephrase your question?",
+                "confidence": analysis.confidence,
+                "streamed": streamed
             }
         except Exception as e:
             logger.error(f"Error generating AI response: {e}")
@@ -168,6 +170,18 @@ class EnhancedResponseHandler:
                 "confidence": analysis.confidence
             }
     
+    async def _generate_reply(self, prompt: str, context: Optional[Dict]) -> Tuple[str, bool]:
+        """
+        LLM answer to prompt. With a Telegram update in the context the answer is streamed
+        into the chat token by token; returns the text and whether it was already sent.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        update = (context or {}).get("telegram_update")
+        if update is not None:
+            from streaming_response_engine import stream_ai_reply
+            return await stream_ai_reply(update, messages), True
+        return await generate_ai_response(messages), False
+    
     async def _handle_fallback(self, analysis: EnhancedIntentAnalysis, text: str, user_id: int, context: Dict) -> Dict[str, Any]:
         """Handle fallback strategies"""
         if analysis.fallback_strategy == ResponseStrategy.SIMPLE_AI:
@@ -216,9 +230,9 @@ class EnhancedResponseHandler:
                 'include_24hr_vol': 'true'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await http_client.get(url, params=params, timeout=10)
             
-            if response.status_code == 200:
+            if response.status == 200:
                 data = response.json()
                 
                 if symbol in data:
@@ -265,7 +279,7 @@ class EnhancedResponseHandler:
                     }
             
             else:
-                logger.error(f"CoinGecko API error: {response.status_code}")
+                logger.error(f"CoinGecko API error: {response.status}")
                 return {
                     "type": "error",
                     "message": "Unable to fetch price data at the moment. Please try again later."
@@ -8,10 +8,12 @@ import logging
 import asyncio
 import math
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import AsyncIterable, AsyncIterator, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 from config import config
-from ai_providers import get_ai_response
+from ai_providers import get_ai_response, default_provider_model
+from llm_scheduler import RateLimitedScheduler, default_llm_budgets
+from token_counter import TokenCounter, get_context_limit, get_token_counter, pack_contiguous
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +28,56 @@ class SummaryPage:
 class EnhancedSummarizer:
     """Enhanced summarizer with token limit handling and pagination"""
     
-    def __init__(self, max_tokens_per_request: int = 100000):  # Leave buffer for 125k limit
-        self.max_tokens_per_request = max_tokens_per_request
+    def __init__(self, max_tokens_per_request: Optional[int] = None,
+                 scheduler: Optional[RateLimitedScheduler] = None,
+                 provider: Optional[str] = None, model: Optional[str] = None,
+                 token_counter: Optional[TokenCounter] = None):
+        default_provider, default_model = default_provider_model()
+        self.provider = provider or default_provider
+        self.model = model or default_model
+        self.token_counter = token_counter or get_token_counter(self.provider, self.model)
+        # Fill requests up to the model's real context window unless a smaller cap is given
+        context_limit = get_context_limit(self.provider, self.model)
+        self.max_tokens_per_request = min(max_tokens_per_request or context_limit, context_limit)
         self.estimated_tokens_per_message = 50  # Conservative estimate
+        self.response_token_reserve = 1000
+        # Estimated counts only fill this share of the budget
+        self.estimate_safety_margin = 0.95
+        self._scheduler = scheduler
+    
+    @property
+    def scheduler(self) -> RateLimitedScheduler:
+        """Chunk scheduler, built on first use so provider budgets reflect the installed SDKs"""
+        if self._scheduler is None:
+            self._scheduler = RateLimitedScheduler(default_llm_budgets())
+        return self._scheduler
     
     def estimate_tokens(self, text: str) -> int:
-        """Estimate token count for text (rough approximation)"""
-        # Rough estimation: 1 token ≈ 4 characters for English text
-        return len(text) // 4
+        """Token count of text for the configured provider and model"""
+        return self.token_counter.count(text)
+    
+    def message_tokens(self, message: Dict) -> int:
+        """Tokens a message occupies in the transcript, including its timestamp, author and line break"""
+        return self.estimate_tokens(self._format_line(message)) + 1
+    
+    def request_budget(self, max_tokens: int) -> int:
+        """Transcript tokens that fit in one chunk request next to the prompt and the reply"""
+        prompt_tokens = self.estimate_tokens(
+            self._chunk_prompt("", 9999, 9999, "0000-00-00 00:00 - 0000-00-00 00:00", 99999)
+        )
+        budget = max_tokens - prompt_tokens - self.response_token_reserve
+        if not self.token_counter.exact:
+            budget = int(budget * self.estimate_safety_margin)
+        return max(budget, 1)
+    
+    def _fit_message(self, message: Dict, tokens: int, budget: int) -> Tuple[Dict, int]:
+        """Truncate a message too large for any request so it fits on its own"""
+        text = message.get('text', '')
+        while tokens > budget and text:
+            text = text[:int(len(text) * budget / tokens * 0.9)]
+            message = {**message, 'text': text + ' [truncated]'}
+            tokens = self.message_tokens(message)
+        return message, tokens
     
     def chunk_messages(self, messages: List[Dict], max_tokens: int) -> List[List[Dict]]:
         """Split messages into chunks that fit within token limits"""
@@ -42,11 +86,10 @@ class EnhancedSummarizer:
         current_tokens = 0
         
         # Reserve tokens for prompt and response
-        available_tokens = max_tokens - 2000  # Reserve 2k tokens for prompt/response
+        available_tokens = self.request_budget(max_tokens)
         
         for message in messages:
-            message_text = message.get('text', '')
-            message_tokens = self.estimate_tokens(message_text)
+            message_tokens = self.message_tokens(message)
             
             # If adding this message would exceed limit, start new chunk
             if current_tokens + message_tokens > available_tokens and current_chunk:
@@ -63,26 +106,60 @@ class EnhancedSummarizer:
         
         return chunks
     
+    def pack_messages(self, messages: List[Dict], max_tokens: int) -> List[List[Dict]]:
+        """
+        Split timestamp-ordered messages into the fewest chunks that fit max_tokens per request,
+        balanced so every chunk is about the same size. Oversized messages are truncated.
+        """
+        budget = self.request_budget(max_tokens)
+        fitted, costs = [], []
+        for message in messages:
+            message, tokens = self._fit_message(message, self.message_tokens(message), budget)
+            fitted.append(message)
+            costs.append(tokens)
+        return [fitted[start:end] for start, end in pack_contiguous(costs, budget)]
+    
+    async def chunk_message_stream(self, message_stream: AsyncIterable[Dict], max_tokens: int) -> AsyncIterator[List[Dict]]:
+        """Streaming variant of chunk_messages: yields each chunk as soon as it is full"""
+        current_chunk = []
+        current_tokens = 0
+        
+        # Reserve tokens for prompt and response
+        available_tokens = self.request_budget(max_tokens)
+        
+        async for message in message_stream:
+            message, message_tokens = self._fit_message(message, self.message_tokens(message), available_tokens)
+            
+            if current_tokens + message_tokens > available_tokens and current_chunk:
+                yield current_chunk
+                current_chunk = [message]
+                current_tokens = message_tokens
+            else:
+                current_chunk.append(message)
+                current_tokens += message_tokens
+        
+        if current_chunk:
+            yield current_chunk
+    
     def format_transcript(self, messages: List[Dict]) -> str:
         """Format messages into a readable transcript"""
         if not messages:
             return "No messages to format."
         
-        transcript_parts = []
-        for msg in sorted(messages, key=lambda x: x.get('timestamp', 0)):
-            timestamp = datetime.fromtimestamp(msg.get('timestamp', 0)).strftime('%H:%M')
-            username = msg.get('username', 'Unknown')
-            text = msg.get('text', '')
-            
-            # Handle different message types
-            if msg.get('is_edit'):
-                transcript_parts.append(f"[{timestamp}] {username} (edited): {text}")
-            elif msg.get('is_deleted'):
-                transcript_parts.append(f"[{timestamp}] {username} (deleted message)")
-            else:
-                transcript_parts.append(f"[{timestamp}] {username}: {text}")
+        return "\n".join(self._format_line(msg) for msg in sorted(messages, key=lambda x: x.get('timestamp', 0)))
+    
+    def _format_line(self, msg: Dict) -> str:
+        """One transcript line"""
+        timestamp = datetime.fromtimestamp(msg.get('timestamp', 0)).strftime('%H:%M')
+        username = msg.get('username', 'Unknown')
+        text = msg.get('text', '')
         
-        return "\n".join(transcript_parts)
+        # Handle different message types
+        if msg.get('is_edit'):
+            return f"[{timestamp}] {username} (edited): {text}"
+        elif msg.get('is_deleted'):
+            return f"[{timestamp}] {username} (deleted message)"
+        return f"[{timestamp}] {username}: {text}"
     
     def get_time_range(self, messages: List[Dict]) -> str:
         """Get time range for a chunk of messages"""
@@ -101,22 +178,14 @@ class EnhancedSummarizer:
         else:
             return f"{start_time.strftime('%Y-%m-%d %H:%M')} - {end_time.strftime('%Y-%m-%d %H:%M')}"
     
-    async def generate_chunk_summary(self, messages: List[Dict], chunk_number: int, total_chunks: int) -> str:
-        """Generate summary for a single chunk of messages"""
-        if not messages:
-            return "No messages in this chunk."
-        
-        try:
-            transcript = self.format_transcript(messages)
-            time_range = self.get_time_range(messages)
-            
-            # Create focused prompt for chunk summarization
-            prompt = f"""
+    def _chunk_prompt(self, transcript: str, chunk_number: int, total_chunks: int, time_range: str, message_count: int) -> str:
+        """Prompt for summarizing one chunk"""
+        return f"""
 You are creating a concise summary of a chat conversation chunk.
 
 **Chunk {chunk_number} of {total_chunks}**
 **Time Range:** {time_range}
-**Messages:** {len(messages)}
+**Messages:** {message_count}
 
 Analyze this conversation chunk and provide a structured summary:
 
@@ -132,6 +201,18 @@ Keep it concise and focus on the most important information. Use bullet points f
 
 Provide only the final summary without any meta-commentary, analysis steps, or thinking process. Do not include phrases like "thinking about", "analyzing", or "processing".
 """
+    
+    async def generate_chunk_summary(self, messages: List[Dict], chunk_number: int, total_chunks: int) -> str:
+        """Generate summary for a single chunk of messages"""
+        if not messages:
+            return "No messages in this chunk."
+        
+        try:
+            transcript = self.format_transcript(messages)
+            time_range = self.get_time_range(messages)
+            
+            # Create focused prompt for chunk summarization
+            prompt = self._chunk_prompt(transcript, chunk_number, total_chunks, time_range, len(messages))
             
             # Process in background
             logger.info(f"🧠 Processing chunk {chunk_number}/{total_chunks} ({len(messages)} messages)")
@@ -150,66 +231,93 @@ Provide only the final summary without any meta-commentary, analysis steps, or t
             logger.error(f"Error generating chunk summary: {e}")
             return f"**Chunk {chunk_number} Summary**\n\nError processing {len(messages)} messages from {time_range}."
     
-    async def generate_paginated_summary(self, messages: List[Dict]) -> List[SummaryPage]:
-        """Generate paginated summaries for large message volumes"""
-        if not messages:
-            return [SummaryPage(1, 1, "No conversations to summarize.", 0, "No time range")]
-        
-        # Sort messages by timestamp
-        sorted_messages = sorted(messages, key=lambda x: x.get('timestamp', 0))
+    async def generate_paginated_summary(self, messages: Union[List[Dict], AsyncIterable[Dict]]) -> List[SummaryPage]:
+        """Generate paginated summaries for large message volumes. Accepts a list or a timestamp-ordered async stream."""
+        pages = [page async for page in self.stream_paginated_summary(messages)]
+        # Chunk pages arrive in completion order; present them overview first, then by page number
+        return sorted(pages, key=lambda page: page.page_number)
+    
+    async def stream_paginated_summary(self, messages: Union[List[Dict], AsyncIterable[Dict]]) -> AsyncIterator[SummaryPage]:
+        """
+        Yield summary pages as soon as each is ready. Chunk pages are summarized concurrently
+        and arrive in completion order; the overview page (page 0) is generated from them last.
+        """
+        if hasattr(messages, '__aiter__'):
+            # Pack the stream as messages arrive instead of collecting it first; it is already timestamp-ordered
+            chunks = [chunk async for chunk in self.chunk_message_stream(messages, self.max_tokens_per_request)]
+        elif messages:
+            sorted_messages = sorted(messages, key=lambda x: x.get('timestamp', 0))
+            chunks = self.pack_messages(sorted_messages, self.max_tokens_per_request)
+        else:
+            chunks = []
         
-        # Check if we need to paginate
-        total_tokens = sum(self.estimate_tokens(msg.get('text', '')) for msg in sorted_messages)
+        if not chunks:
+            yield SummaryPage(1, 1, "No conversations to summarize.", 0, "No time range")
+            return
         
-        if total_tokens <= self.max_tokens_per_request:
+        if len(chunks) == 1:
             # Single page summary
-            logger.info(f"📊 Generating single summary for {len(sorted_messages)} messages")
-            summary_content = await self.generate_single_summary(sorted_messages)
-            time_range = self.get_time_range(sorted_messages)
+            logger.info(f"📊 Generating single summary for {len(chunks[0])} messages")
+            summary_content = await self.generate_single_summary(chunks[0])
+            time_range = self.get_time_range(chunks[0])
             
-            return [SummaryPage(1, 1, summary_content, len(sorted_messages), time_range)]
+            yield SummaryPage(1, 1, summary_content, len(chunks[0]), time_range)
+            return
         
         # Multi-page summary needed
-        logger.info(f"📚 Large conversation detected ({total_tokens} tokens). Creating paginated summary...")
+        logger.info(f"📚 Large conversation detected ({sum(len(chunk) for chunk in chunks)} messages). Creating paginated summary...")
         
-        # Split into chunks
-        chunks = self.chunk_messages(sorted_messages, self.max_tokens_per_request)
+        async for page in self._summarize_chunks(chunks):
+            yield page
+    
+    async def _summarize_chunks(self, chunks: List[List[Dict]]) -> AsyncIterator[SummaryPage]:
+        """Summarize the chunks concurrently through the scheduler, yielding each page, then the overview"""
         total_pages = len(chunks)
+        sorted_messages = [message for chunk in chunks for message in chunk]
         
         logger.info(f"📄 Creating {total_pages} summary pages")
         
-        # Generate summaries for each chunk
-        summary_pages = []
+        def chunk_job(chunk: List[Dict], page_number: int):
+            return lambda: self.generate_chunk_summary(chunk, page_number, total_pages)
         
-        for i, chunk in enumerate(chunks, 1):
-            logger.info(f"📝 Processing page {i}/{total_pages}...")
-            
-            chunk_summary = await self.generate_chunk_summary(chunk, i, total_pages)
-            time_range = self.get_time_range(chunk)
+        jobs = [
+            (self.estimate_tokens(self._chunk_prompt(self.format_transcript(chunk), i, total_pages,
+                                                     self.get_time_range(chunk), len(chunk)))
+             + self.response_token_reserve,
+             chunk_job(chunk, i))
+            for i, chunk in enumerate(chunks, 1)
+        ]
+        
+        summary_pages = []
+        async for index, chunk_summary in self.scheduler.run(jobs):
+            chunk = chunks[index]
+            if isinstance(chunk_summary, Exception):
+                logger.error(f"Error summarizing page {index + 1}: {chunk_summary}")
+                chunk_summary = f"**Chunk {index + 1} Summary**\n\nError processing {len(chunk)} messages from {self.get_time_range(chunk)}."
+            logger.info(f"📝 Page {index + 1}/{total_pages} ready")
             
             summary_page = SummaryPage(
-                page_number=i,
+                page_number=index + 1,
                 total_pages=total_pages,
                 content=chunk_summary,
                 message_count=len(chunk),
-                time_range=time_range
+                time_range=self.get_time_range(chunk)
             )
             
             summary_pages.append(summary_page)
+            yield summary_page
         
         # Generate overview page if multiple pages
         if total_pages > 1:
+            summary_pages.sort(key=lambda page: page.page_number)
             overview_content = await self.generate_overview_summary(summary_pages, sorted_messages)
-            overview_page = SummaryPage(
+            yield SummaryPage(
                 page_number=0,  # Overview page
                 total_pages=total_pages,
                 content=overview_content,
                 message_count=len(sorted_messages),
                 time_range=self.get_time_range(sorted_messages)
             )
-            summary_pages.insert(0, overview_page)
-        
-        return summary_pages
     
     async def generate_single_summary(self, messages: List[Dict]) -> str:
         """Generate a single comprehensive summary"""
@@ -281,14 +389,13 @@ Keep it brief but comprehensive.
             return f"**📋 Conversation Overview**\n\nMulti-page summary with {len(all_messages)} messages across {len(summary_pages)} sections."
 
 # Enhanced summary function for backward compatibility
-async def generate_daily_summary(decrypted_messages: List[Dict]) -> Optional[str]:
+async def generate_daily_summary(decrypted_messages: Union[List[Dict], AsyncIterable[Dict]]) -> Optional[str]:
     """Enhanced daily summary with automatic pagination handling"""
-    if not decrypted_messages:
+    if not hasattr(decrypted_messages, '__aiter__') and not decrypted_messages:
         return "No conversations to summarize today."
     
     try:
-        summarizer = EnhancedSummarizer()
-        summary_pages = await summarizer.generate_paginated_summary(decrypted_messages)
+        summary_pages = await enhanced_summarizer.generate_paginated_summary(decrypted_messages)
         
         if not summary_pages:
             return "No summary could be generated."
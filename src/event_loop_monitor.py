@@ -0,0 +1,119 @@
+# src/event_loop_monitor.py
+"""
+Event-loop lag monitor.
+A heartbeat task sleeps for a fixed interval and measures how late it wakes up; the
+difference is the time the loop spent running other callbacks. A watchdog thread
+watches the heartbeat and, when the loop stops ticking for longer than the threshold,
+captures the loop thread's stack so the report names the code that was blocking.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from performance_monitor import performance_monitor
+
+logger = logging.getLogger(__name__)
+
+class EventLoopLagMonitor:
+    """Reports callbacks that block the running event loop longer than a threshold"""
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05,
+                 capture_stacks: bool = True, history_size: int = 50):
+        self.threshold = threshold
+        self.interval = interval
+        self.capture_stacks = capture_stacks
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._stall_stack: Optional[List[str]] = None
+        self.recent_stalls: deque = deque(maxlen=history_size)
+        self.stats = {
+            'samples': 0,
+            'stalls': 0,
+            'max_lag': 0.0,
+            'total_lag': 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info(f"Event loop lag monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 4)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            self.record(max(0.0, now - expected))
+
+    def _watch(self):
+        """Runs in its own thread so it can observe the loop while the loop is stuck"""
+        while not self._stopping.wait(self.interval):
+            if self._stall_stack is not None:
+                continue
+            if time.monotonic() - self._last_beat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._stall_stack = traceback.format_stack(frame)
+
+    def record(self, lag: float):
+        """Account one heartbeat that woke up lag seconds late"""
+        self.stats['samples'] += 1
+        self.stats['total_lag'] += lag
+        self.stats['max_lag'] = max(self.stats['max_lag'], lag)
+        stack, self._stall_stack = self._stall_stack, None
+        if lag < self.threshold:
+            return
+
+        self.stats['stalls'] += 1
+        # The innermost frames outside the monitor itself are the ones that were blocking
+        location = ''.join(stack[-6:]).rstrip() if stack else 'stack not captured'
+        self.recent_stalls.append({'lag': lag, 'at': time.time(), 'stack': location})
+        performance_monitor.track_error('event_loop_blocked')
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms (threshold {self.threshold * 1000:.0f} ms)\n{location}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = self.stats['samples']
+        return {
+            **self.stats,
+            'avg_lag': self.stats['total_lag'] / samples if samples else 0.0,
+            'running': self.running,
+            'recent_stalls': list(self.recent_stalls),
+        }
+
+# Global instance
+event_loop_monitor = EventLoopLagMonitor()
@@ -0,0 +1,186 @@
+# src/intent_pattern_index.py
+"""
+In-memory index over the intent_patterns table.
+Patterns are compiled once and prefiltered with an Aho-Corasick automaton over
+the literal keywords every match must contain, so scoring a message only runs the
+regexes that can possibly match.
+"""
+
+import json
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+logger = logging.getLogger(__name__)
+
+class AhoCorasick:
+    """Multi-literal substring matcher: one pass over the text finds every keyword it contains"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[str]] = [set()]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build()
+
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+            state = next_state
+        self._out[state].add(keyword)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] |= self._out[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Set[str]:
+        """Distinct keywords occurring anywhere in text"""
+        found: Set[str] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+def _required_literals(parsed) -> Optional[Set[str]]:
+    """
+    Literal strings of which at least one occurs in every match of the parsed pattern,
+    or None when no such set can be derived. Prefers the most selective candidate.
+    """
+    candidates: List[Set[str]] = []
+    run: List[str] = []
+
+    def close_run():
+        if run:
+            candidates.append({''.join(run)})
+            run.clear()
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        close_run()
+        if op is sre_constants.SUBPATTERN:
+            literals = _required_literals(av[-1])
+        elif op is sre_constants.BRANCH:
+            alternatives = [_required_literals(alt) for alt in av[1]]
+            literals = set().union(*alternatives) if all(alternatives) else None
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            literals = _required_literals(av[2])
+        else:
+            literals = None
+        if literals:
+            candidates.append(literals)
+    close_run()
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda literals: min(len(literal) for literal in literals))
+
+def extract_keywords(pattern: str) -> Optional[Set[str]]:
+    """Lowercased prefilter keywords for a case-insensitive pattern, or None if it must always be checked"""
+    try:
+        literals = _required_literals(sre_parse.parse(pattern, re.IGNORECASE))
+    except Exception:
+        return None
+    # Case folding beyond ASCII does not round-trip through lower(); check those patterns unfiltered
+    if not literals or not all(literal.isascii() for literal in literals):
+        return None
+    return {literal.lower() for literal in literals}
+
+@dataclass
+class IndexedPattern:
+    pattern_id: str
+    intent: str
+    regex: re.Pattern
+    confidence_threshold: float
+    context_clues: List[str]
+
+class IntentPatternIndex:
+    """Compiled intent patterns with a keyword prefilter"""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self.patterns: List[IndexedPattern] = []
+        self.unfiltered: List[int] = []
+        keyword_patterns: Dict[str, List[int]] = {}
+
+        for pattern_id, intent, pattern, threshold, context_clues in rows:
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                logger.error(f"Invalid regex for intent pattern {pattern_id}: {e}")
+                continue
+            try:
+                clues = json.loads(context_clues) if context_clues else []
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.error(f"Error parsing context clues JSON for pattern {pattern_id}: {e}")
+                clues = []
+
+            position = len(self.patterns)
+            self.patterns.append(IndexedPattern(pattern_id, intent, regex, threshold,
+                                                [clue.lower() for clue in clues]))
+            keywords = extract_keywords(pattern)
+            if keywords is None:
+                self.unfiltered.append(position)
+            else:
+                for keyword in keywords:
+                    keyword_patterns.setdefault(keyword, []).append(position)
+
+        self._keyword_patterns = keyword_patterns
+        self._matcher = AhoCorasick(keyword_patterns)
+
+    def candidates(self, lowered_input: str) -> List[int]:
+        """Positions of patterns that may match, in table order"""
+        positions = set(self.unfiltered)
+        for keyword in self._matcher.find_all(lowered_input):
+            positions.update(self._keyword_patterns[keyword])
+        return sorted(positions)
+
+    def analyze(self, user_input: str) -> Tuple[str, float]:
+        """Best scoring intent: pattern threshold plus 0.05 per context clue present"""
+        lowered_input = user_input.lower()
+        best_match = None
+        best_confidence = 0.0
+
+        for position in self.candidates(lowered_input):
+            pattern = self.patterns[position]
+            if pattern.regex.search(user_input):
+                confidence = pattern.confidence_threshold
+                for clue in pattern.context_clues:
+                    if clue in lowered_input:
+                        confidence += 0.05
+
+                if confidence > best_confidence:
+                    best_confidence = confidence
+                    best_match = pattern.intent
+
+        return best_match or "unknown", best_confidence
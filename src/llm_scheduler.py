@@ -0,0 +1,150 @@
+# src/llm_scheduler.py
+"""
+Rate-limit-aware scheduler for concurrent LLM calls.
+Jobs are admitted in submission order once every token budget grants their
+estimated tokens, run concurrently up to a fixed limit, and their results are
+yielded in completion order. Budgets wrap the per-provider limiters that already
+track usage, so scheduled calls and ordinary calls draw from the same minute windows.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ProviderRateBudget:
+    """Token budget of one provider/model in ai_providers_enhanced.RateLimiter"""
+
+    def __init__(self, rate_limiter, provider: str, model: str):
+        self.rate_limiter = rate_limiter
+        self.provider = provider
+        self.model = model
+        self.name = f"{provider}:{model}"
+
+    def _tpm(self) -> Optional[int]:
+        from ai_providers_enhanced import PROVIDER_CONFIGS
+        provider_config = PROVIDER_CONFIGS.get(self.provider)
+        model_config = provider_config.models.get(self.model) if provider_config else None
+        return model_config.tpm if model_config else None
+
+    async def try_acquire(self, tokens: int) -> bool:
+        tpm = self._tpm()
+        # A request larger than the whole minute budget waits for an empty window
+        if tpm is not None:
+            tokens = min(tokens, tpm)
+        return await self.rate_limiter.can_make_request(self.provider, self.model, tokens)
+
+class GroqTokenBudget:
+    """Token budget of natural_language_processor.GroqRateLimiter"""
+
+    name = 'groq_tpm'
+
+    def __init__(self, rate_limiter):
+        self.rate_limiter = rate_limiter
+
+    async def try_acquire(self, tokens: int) -> bool:
+        return await self.rate_limiter.can_make_request(min(tokens, self.rate_limiter.max_tokens_per_minute))
+
+class RateLimitedScheduler:
+    """Bounded-concurrency job runner gated by token budgets"""
+
+    def __init__(self, budgets: Sequence = (), max_concurrency: int = 4, poll_interval: float = 1.0):
+        self.budgets = list(budgets)
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.stats = {
+            'jobs': 0,
+            'completed': 0,
+            'failed': 0,
+            'budget_waits': 0,
+            'max_in_flight': 0,
+        }
+        self._in_flight = 0
+
+    async def acquire(self, tokens: int):
+        """Wait until every budget grants tokens; budgets already granted are kept while the others are retried"""
+        pending = list(self.budgets)
+        while True:
+            still_pending = []
+            for budget in pending:
+                try:
+                    granted = await budget.try_acquire(tokens)
+                except Exception as e:
+                    logger.error(f"Error checking budget {getattr(budget, 'name', budget)}: {e}")
+                    granted = True
+                if not granted:
+                    still_pending.append(budget)
+            if not still_pending:
+                return
+            pending = still_pending
+            self.stats['budget_waits'] += 1
+            await asyncio.sleep(self.poll_interval)
+
+    async def run(self, jobs: Sequence[Tuple[int, Callable[[], Awaitable[Any]]]]) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Run (estimated_tokens, job) pairs and yield (index, result) as each finishes.
+        A failing job yields its exception as the result. Closing the iterator early
+        cancels every job not yet finished.
+        """
+        results: asyncio.Queue = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def run_job(index: int, job):
+            try:
+                result = await job()
+                self.stats['completed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['failed'] += 1
+                result = e
+            finally:
+                self._in_flight -= 1
+                slots.release()
+            await results.put((index, result))
+
+        async def admit():
+            loop = asyncio.get_running_loop()
+            for index, (tokens, job) in enumerate(jobs):
+                await slots.acquire()
+                try:
+                    await self.acquire(tokens)
+                except BaseException:
+                    slots.release()
+                    raise
+                self.stats['jobs'] += 1
+                self._in_flight += 1
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+                tasks.append(loop.create_task(run_job(index, job)))
+
+        admission = asyncio.get_running_loop().create_task(admit())
+        try:
+            for _ in range(len(jobs)):
+                yield await results.get()
+        finally:
+            admission.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(admission, *tasks, return_exceptions=True)
+
+def default_llm_budgets() -> List:
+    """Budgets for the provider ai_providers.get_ai_response will call"""
+    budgets = []
+    try:
+        from ai_providers import default_provider_model
+        from ai_providers_enhanced import ai_manager
+        provider, model = default_provider_model()
+        budgets.append(ProviderRateBudget(ai_manager.rate_limiter, provider, model))
+    except Exception as e:
+        logger.warning(f"Provider rate budget unavailable: {e}")
+        provider = 'groq'
+
+    if provider == 'groq':
+        try:
+            from natural_language_processor import nlp_processor
+            budgets.append(GroqTokenBudget(nlp_processor.rate_limiter))
+        except Exception as e:
+            logger.warning(f"Groq token budget unavailable: {e}")
+    return budgets
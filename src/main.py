@@ -6,7 +6,6 @@ import re
 from datetime import time, datetime, timedelta
 from typing import Dict, Any, List, Optional, Union
 import pytz
-import requests
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, ConversationHandler,
@@ -24,9 +23,14 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 # Core imports
-from user_db import init_db, set_user_property, get_user_property, count_user_alerts, add_alert_to_db, update_username_mapping
+from user_db import init_db, close_db, get_database, set_user_property, get_user_property, count_user_alerts, add_alert_to_db, update_username_mapping
 from encryption_manager import EncryptionManager
 from telegram_handler import handle_message
+from message_storage import message_ingestion_queue
+from rolling_summarizer import rolling_summarizer
+from protocol_snapshot import protocol_snapshot
+from session_registry import session_registry
+from event_loop_monitor import event_loop_monitor
 from enhanced_summarizer import generate_daily_summary, enhanced_summarizer
 from persistent_storage import save_summary, get_summaries_for_week
 from message_intelligence import message_intelligence
@@ -389,45 +393,47 @@ async def enhanced_handle_message(update: Update, context: ContextTypes.DEFAULT_
                         pass
             
             # If natural language processing didn't work, try enhanced analysis
-            enhanced_analysis = await analyze_user_intent_enhanced(
-                processed_text, 
-                user_id, 
-                {
-                    "username": username,
-                    "chat_id": update.effective_chat.id,
-                    "chat_type": chat_type,
-                    "is_reply_to_bot": is_reply_to_bot,
-                    "is_mentioned": is_mentioned
-                }
-            )
+            try:
+                enhanced_analysis = await analyze_user_intent_enhanced(
+                    processed_text, 
+                    user_id, 
+                    {
+                        "username": username,
+                        "chat_id": update.effective_chat.id,
+                        "chat_type": chat_type,
+                        "is_reply_to_bot": is_reply_to_bot,
+                        "is_mentioned": is_mentioned
+                    }
+                )
             
-            logger.info(f"Enhanced intent analysis: {enhanced_analysis.intent_type.value} "
-                       f"(confidence: {enhanced_analysis.confidence:.2f}, "
-                       f"strategy: {enhanced_analysis.response_strategy.value})")
+                logger.info(f"Enhanced intent analysis: {enhanced_analysis.intent_type.value} "
+                           f"(confidence: {enhanced_analysis.confidence:.2f}, "
+                           f"strategy: {enhanced_analysis.response_strategy.value})")
             
-            # Handle the intent using enhanced response handler
-            response = await handle_enhanced_response(
-                enhanced_analysis, 
-                processed_text, 
-                user_id, 
-                {
-                    "username": username,
-                    "chat_id": update.effective_chat.id,
-                    "chat_type": chat_type,
-                    "telegram_context": context
-                }
-            )
+                # Handle the intent using enhanced response handler
+                response = await handle_enhanced_response(
+                    enhanced_analysis, 
+                    processed_text, 
+                    user_id, 
+                    {
+                        "username": username,
+                        "chat_id": update.effective_chat.id,
+                        "chat_type": chat_type,
+                        "telegram_context": context,
+                        "telegram_update": update
+                    }
+                )
             
-        except Exception as e:
-            logger.error(f"Error in enhanced intent processing: {e}")
-            # Fallback to simple AI response
-            response = {
-                "type": "error",
-                "message": "I'm having trouble understanding that. Could you rephrase your question?"
-            }
+            except Exception as e:
+                logger.error(f"Error in enhanced intent processing: {e}")
+                # Fallback to simple AI response
+                response = {
+                    "type": "error",
+                    "message": "I'm having trouble understanding that. Could you rephrase your question?"
+                }
 
-            # Send response
-            if response and response.get("message"):
+            # Send response; AI answers were already streamed into the chat
+            if response and response.get("message") and not response.get("streamed"):
                 # Format for group if needed
                 if chat_type in ['group', 'supergroup']:
                     strategy = get_group_response_strategy(update.effective_chat.id, update.effective_message)
@@ -442,9 +448,9 @@ async def enhanced_handle_message(update: Update, context: ContextTypes.DEFAULT_
                     parse_mode=ParseMode.MARKDOWN
                 )
 
-                # Update context
-                if chat_type in ['group', 'supergroup']:
-                    update_group_context(update.effective_chat.id, update.effective_message, bot_responded=True)
+            # Update context
+            if response and response.get("message") and chat_type in ['group', 'supergroup']:
+                update_group_context(update.effective_chat.id, update.effective_message, bot_responded=True)
 
         except Exception as e:
             logger.error(f"Error processing message: {e}")
@@ -627,7 +633,7 @@ async def process_ai_response(text: str, user_id: int, username: str) -> Dict[st
             {
                 "role": "system", 
                 "content": f"You are Möbius, a helpful crypto trading assistant. "
-                          f"User intent: {intent} (confidence: {confidence:.2f}). "
+                          f"User intent: {intent}. "
                           f"Be informative, accurate, and user-friendly. "
                           f"If this is about crypto prices, portfolio, or trading, provide specific guidance."
             },
@@ -641,7 +647,7 @@ async def process_ai_response(text: str, user_id: int, username: str) -> Dict[st
         else:
             # Generate AI response
             try:
-                ai_response = await generate_ai_response(messages)
+                ai_response = await generate_ai_response(messages, intent=intent)
                 if not ai_response or ai_response.strip() == "":
                     ai_response = "I'm having trouble generating a response right now. Could you try rephrasing your question?"
             except Exception as ai_error:
@@ -719,6 +725,8 @@ async def post_init(application: Application):
 
         logger.info("✅ Bot data initialized successfully")
 
+        await event_loop_monitor.start()
+
         # Initialize enhanced scheduler
         try:
             from scheduler import get_scheduler
@@ -741,6 +749,18 @@ async def post_init(application: Application):
                 name="daily_summary_job"
             )
             logger.info(f"✅ Daily summary job scheduled for {run_time}")
+            job_queue.run_repeating(
+                refresh_rolling_summaries_job,
+                interval=rolling_summarizer.bucket_seconds,
+                first=60,
+                name="rolling_summary_job"
+            )
+            job_queue.run_repeating(
+                refresh_protocol_snapshot_job,
+                interval=protocol_snapshot.refresh_interval,
+                first=5,
+                name="protocol_snapshot_job"
+            )
         except Exception as e:
             logger.error(f"Failed to schedule daily job: {e}")
 
@@ -783,6 +803,23 @@ async def post_init(application: Application):
     except Exception as e:
         logger.error(f"Error in post_init: {e}")
 
+async def post_shutdown(application: Application):
+    """Flush write-behind buffers while the event loop is still running"""
+    try:
+        await message_ingestion_queue.stop()
+        logger.info("✅ Queued messages written")
+        await get_database().activity_buffer.stop()
+        logger.info("✅ Buffered user activity flushed")
+        await event_loop_monitor.stop()
+        from async_http import http_client
+        from defillama_api import defillama_api
+        await http_client.close()
+        await defillama_api.close()
+        await session_registry.close()
+        logger.info("✅ HTTP sessions closed")
+    except Exception as e:
+        logger.error(f"Error in post_shutdown: {e}")
+
 async def send_daily_summary_job(context: ContextTypes.DEFAULT_TYPE):
     """Send daily summary job with enhanced error handling"""
     try:
@@ -799,39 +836,47 @@ async def send_daily_summary_job(context: ContextTypes.DEFAULT_TYPE):
             return
 
         async with lock:
-            if not store:
-                await context.bot.send_message(
-                    context.job.chat_id,
-                    "📊 **Möbius Daily Briefing**\n\nNo significant conversations were recorded.",
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                enc_manager.rotate_key()
-                return
-            messages_to_process = list(store.values())
             store.clear()
+        enc_manager.rotate_key()
 
-        decrypted_messages = []
-        for msg in messages_to_process:
-            try:
-                decrypted_text = enc_manager.decrypt(msg['encrypted_text'])
-                decrypted_messages.append({'text': decrypted_text, **msg})
-            except Exception as e:
-                logger.error(f"Error decrypting message: {e}")
+        # Closed hours are already summarized by the rolling summary job; only the open hour is new
+        await message_ingestion_queue.drain()
+        result = await rolling_summarizer.summarize_period(context.job.chat_id, hours=24)
 
-        enc_manager.rotate_key()
+        if not result.message_count:
+            await context.bot.send_message(
+                context.job.chat_id,
+                "📊 **Möbius Daily Briefing**\n\nNo significant conversations were recorded.",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
 
-        if decrypted_messages:
-            summary_text = await generate_daily_summary(decrypted_messages)
-            if summary_text:
-                save_summary(summary_text)
-                await context.bot.send_message(
-                    context.job.chat_id,
-                    f"📊 **Möbius Daily Briefing**\n\n{summary_text}",
-                    parse_mode=ParseMode.MARKDOWN
-                )
+        save_summary(result.text)
+        await context.bot.send_message(
+            context.job.chat_id,
+            f"📊 **Möbius Daily Briefing**\n\n{result.text}",
+            parse_mode=ParseMode.MARKDOWN
+        )
     except Exception as e:
         logger.error(f"Error in daily summary job: {e}")
 
+async def refresh_rolling_summaries_job(context: ContextTypes.DEFAULT_TYPE):
+    """Summarize the hour that just closed for every active chat"""
+    try:
+        await message_ingestion_queue.drain()
+        await rolling_summarizer.refresh_active_chats(hours=24)
+    except Exception as e:
+        logger.error(f"Error in rolling summary job: {e}")
+
+async def refresh_protocol_snapshot_job(context: ContextTypes.DEFAULT_TYPE):
+    """Refresh the local DeFiLlama protocol catalogue unless a recent snapshot is on disk"""
+    try:
+        await protocol_snapshot.ensure_ready()
+        if protocol_snapshot.is_stale(max_age=protocol_snapshot.refresh_interval / 2):
+            await protocol_snapshot.refresh()
+    except Exception as e:
+        logger.error(f"Error in protocol snapshot job: {e}")
+
 # --- FIXED COMMAND IMPLEMENTATIONS ---
 
 @safe_command
@@ -965,14 +1010,14 @@ async def ask_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "user_id": user_id
         })
 
-        # Delete thinking message
-        try:
-            await thinking_msg.delete()
-        except:
-            pass
-
         # Send response
         if nlp_result.get("success"):
+            # Delete thinking message
+            try:
+                await thinking_msg.delete()
+            except:
+                pass
+
             response_data = nlp_result["response"]
             message_text = response_data.get("message", "I processed your question but couldn't generate a response.")
             
@@ -989,9 +1034,14 @@ async def ask_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 parse_mode=ParseMode.MARKDOWN
             )
         else:
-            await update.effective_message.reply_text(
-                nlp_result.get("fallback_response", "I'm having trouble understanding that question. Could you rephrase it?")
-            )
+            # Stream a direct LLM answer into the thinking message, token by token
+            from streaming_response_engine import stream_ai_reply
+            messages = [
+                {"role": "system", "content": "You are Möbius, a helpful crypto trading assistant. "
+                                              "Be informative, accurate, and user-friendly."},
+                {"role": "user", "content": question}
+            ]
+            await stream_ai_reply(update, messages, placeholder=thinking_msg, prefix="🤖 ")
 
     except Exception as e:
         logger.error(f"Error in ask command: {e}")
@@ -1012,56 +1062,28 @@ async def summarynow_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         # Show thinking indicator
         thinking_msg = await update.effective_message.reply_text("🤔 Analyzing conversations and generating summary...")
 
-        lock = context.bot_data.get('lock')
-        store = context.bot_data.get('message_store', {})
-        enc_manager = context.bot_data.get('encryption_manager')
-
-        if not lock or not enc_manager:
-            await thinking_msg.edit_text("❌ Bot not properly initialized. Please try again.")
-            return
-
-        async with lock:
-            # Filter messages for current chat only
-            chat_messages = []
-            for key, msg in store.items():
-                if msg.get('chat_id') == chat_id:
-                    chat_messages.append(msg)
-
-            logger.info(f"📊 Found {len(chat_messages)} messages for chat {chat_id} out of {len(store)} total messages")
-
-            if not chat_messages:
-                if chat_type != 'private':
-                    await thinking_msg.edit_text("📊 No recent conversations to summarize in this chat. I'll send you a DM when ready.")
-                    try:
-                        await context.bot.send_message(
-                            chat_id=user_id,
-                            text="📊 **Conversation Summary**\n\nNo recent conversations found in this group to summarize. Make sure I have permission to read messages and that there have been recent conversations.",
-                            parse_mode=ParseMode.MARKDOWN
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to send DM to user {user_id}: {e}")
-                        await thinking_msg.edit_text("❌ Could not send DM. Please start a conversation with me first.")
-                else:
-                    await thinking_msg.edit_text("📊 No recent conversations to summarize.")
-                return
-
-            messages_to_process = chat_messages
+        # Cached hourly summaries plus the messages since the last closed hour
+        await message_ingestion_queue.drain()
+        result = await rolling_summarizer.summarize_period(chat_id, hours=24, user_id=user_id)
+        logger.info(f"📊 Summarized {result.message_count} messages for chat {chat_id} with {result.llm_calls} LLM call(s)")
 
-        # Process messages
-        decrypted_messages = []
-        for msg in messages_to_process:
-            try:
-                decrypted_text = enc_manager.decrypt(msg['encrypted_text'])
-                decrypted_messages.append({'text': decrypted_text, **msg})
-            except Exception as e:
-                logger.error(f"Error decrypting message: {e}")
-
-        if not decrypted_messages:
-            await thinking_msg.edit_text("📊 No messages available for summarization.")
+        if not result.message_count:
+            if chat_type != 'private':
+                await thinking_msg.edit_text("📊 No recent conversations to summarize in this chat. I'll send you a DM when ready.")
+                try:
+                    await context.bot.send_message(
+                        chat_id=user_id,
+                        text="📊 **Conversation Summary**\n\nNo recent conversations found in this group to summarize. Make sure I have permission to read messages and that there have been recent conversations.",
+                        parse_mode=ParseMode.MARKDOWN
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to send DM to user {user_id}: {e}")
+                    await thinking_msg.edit_text("❌ Could not send DM. Please start a conversation with me first.")
+            else:
+                await thinking_msg.edit_text("📊 No recent conversations to summarize.")
             return
 
-        # Generate summary
-        summary_text = await generate_daily_summary(decrypted_messages)
+        summary_text = result.text
 
         # Delete thinking message
         try:
@@ -1117,7 +1139,7 @@ async def research_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         from crypto_research import query_defillama
 
         # Search for specific protocol
-        result = query_defillama("protocols", protocol_name=protocol_name)
+        result = await query_defillama("protocols", protocol_name=protocol_name)
 
         # Delete thinking message
         try:
@@ -1277,8 +1299,25 @@ async def summary_page_command(update: Update, context: ContextTypes.DEFAULT_TYP
             except Exception as e:
                 logger.error(f"Error decrypting message: {e}")
 
-        # Generate paginated summary
-        summary_pages = await enhanced_summarizer.generate_paginated_summary(decrypted_messages)
+        # Stream pages as they finish and stop as soon as the requested one is ready
+        summary_pages = []
+        requested_page = None
+        page_stream = enhanced_summarizer.stream_paginated_summary(decrypted_messages)
+        try:
+            async for page in page_stream:
+                summary_pages.append(page)
+                if page.page_number == page_number:
+                    requested_page = page
+                    break
+                if page.page_number > 0 and page.total_pages > 1:
+                    try:
+                        await thinking_msg.edit_text(
+                            f"📚 Summarizing... {len(summary_pages)}/{page.total_pages} pages ready"
+                        )
+                    except Exception:
+                        pass
+        finally:
+            await page_stream.aclose()
 
         # Delete thinking message
         try:
@@ -1286,15 +1325,9 @@ async def summary_page_command(update: Update, context: ContextTypes.DEFAULT_TYP
         except:
             pass
 
-        # Find requested page
-        requested_page = None
-        for page in summary_pages:
-            if page.page_number == page_number:
-                requested_page = page
-                break
-
         if not requested_page:
-            available_pages = [str(p.page_number) for p in summary_pages if p.page_number > 0]
+            available_pages = [str(p.page_number) for p in sorted(summary_pages, key=lambda p: p.page_number)
+                               if p.page_number > 0]
             await update.effective_message.reply_text(
                 f"📄 **Page {page_number} not found**\n\n"
                 f"Available pages: {', '.join(available_pages)}\n"
@@ -2147,7 +2180,7 @@ def main():
 
         # Create application with enhanced configuration and job queue
         from telegram.ext import JobQueue
-        application = Application.builder().token(config.get('TELEGRAM_BOT_TOKEN')).post_init(post_init).job_queue(JobQueue()).build()
+        application = Application.builder().token(config.get('TELEGRAM_BOT_TOKEN')).post_init(post_init).post_shutdown(post_shutdown).job_queue(JobQueue()).build()
         logger.info("✅ Application created")
 
         # Onboarding conversation handler
@@ -2249,6 +2282,9 @@ def main():
                 asyncio.run(stop_mcp_integration())
             except Exception as e:
                 logger.error(f"Error stopping MCP integration: {e}")
+
+            close_db()
+            logger.info("🗄️ User database connections closed")
             logger.info("✅ Bot shutdown complete")
 
     except Exception as e:
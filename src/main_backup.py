@@ -360,7 +360,7 @@ async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try: amount_usd = float(context.args[1])
     except ValueError: await update.message.reply_text("❌ Invalid amount format."); return
     await update.message.reply_text("⚙️ Creating alert on Arkham...")
-    result = create_arkham_alert(user_id, context.args[0], amount_usd)
+    result = await create_arkham_alert(user_id, context.args[0], amount_usd)
     if result.get("success"):
         add_alert_to_db(result["alert_id"], user_id, update.effective_chat.id, 'arkham_tx', {'address': context.args[0], 'amount': amount_usd})
         await update.message.reply_text(f"✅ {result['message']} You have used {current + 1}/{limit} alerts.", parse_mode=ParseMode.MARKDOWN)
@@ -478,7 +478,7 @@ async def llama_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 return
             
             data_type, slug = context.args[0].lower(), context.args[1]
-            result = query_defillama(data_type, slug)
+            result = await query_defillama(data_type, slug)
             
             # Use rich formatter for better presentation
             if isinstance(result, dict):
@@ -521,7 +521,7 @@ async def arkham_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     query = " ".join(context.args)
     await update.message.reply_text("⚙️ Querying Arkham Intelligence...")
-    result = get_arkham_data(query)
+    result = await get_arkham_data(query)
     await update.message.reply_text(result, parse_mode=ParseMode.MARKDOWN)
 
 async def nansen_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -530,7 +530,7 @@ async def nansen_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     address = context.args[0]
     await update.message.reply_text("⚙️ Querying Nansen...")
-    result = get_nansen_data(address)
+    result = await get_nansen_data(address)
     await update.message.reply_text(result, parse_mode=ParseMode.MARKDOWN)
 
 async def set_calendly_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1024,7 +1024,7 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
                 # These don't need a protocol slug
                 await query.edit_message_text("📊 Fetching data...")
                 try:
-                    result = query_defillama(data_type)
+                    result = await query_defillama(data_type)
                     await query.edit_message_text(result, parse_mode=ParseMode.MARKDOWN)
                 except Exception as e:
                     await query.edit_message_text(f"❌ Error: {str(e)}")
@@ -647,7 +647,7 @@ async def research_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         from crypto_research import query_defillama
         
         # Search for specific protocol
-        result = query_defillama("protocols", protocol_name=protocol_name)
+        result = await query_defillama("protocols", protocol_name=protocol_name)
         
         # Delete thinking message
         try:
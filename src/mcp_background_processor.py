@@ -1,5 +1,6 @@
 # src/mcp_background_processor.py - Background MCP Processing to Prevent Chat Flooding
 import asyncio
+import itertools
 import logging
 from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime, timedelta
@@ -24,7 +25,8 @@ class ProcessingJob:
     created_at: datetime = field(default_factory=datetime.now)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
-    status: str = "pending"  # pending, processing, completed, failed
+    deadline: Optional[datetime] = None
+    status: str = "pending"  # pending, processing, completed, failed, cancelled, expired
     result: Optional[dict] = None
     error: Optional[str] = None
 
@@ -39,37 +41,88 @@ class UserRateLimit:
 class MCPBackgroundProcessor:
     """Background processor for MCP operations to prevent chat flooding"""
 
-    def __init__(self):
-        self.job_queue: deque = deque()
+    def __init__(self, min_workers: int = 1, max_workers: int = 5, worker_idle_timeout: float = 30.0):
+        # Entries are (-priority, fair_tag, sequence, job): higher priority first, then
+        # start-time fair queuing across users, then submission order
+        self.job_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.queued_jobs: Dict[str, ProcessingJob] = {}
         self.processing_jobs: Dict[str, ProcessingJob] = {}
+        self.running_tasks: Dict[str, asyncio.Task] = {}
         self.completed_jobs: Dict[str, ProcessingJob] = {}
         self.user_rate_limits: Dict[int, UserRateLimit] = {}
         self.worker_tasks: List[asyncio.Task] = []
+        self.workers: Dict[str, asyncio.Task] = {}
+        self.busy_workers = 0
         self.running = False
-        self.max_concurrent_jobs = 5
+        self.min_workers = min_workers
+        self.max_concurrent_jobs = max_workers
+        self.worker_idle_timeout = worker_idle_timeout
         self.rate_limit_window = 60  # seconds
         self.rate_limit_max_requests = 10  # per window
 
+        # Fair queuing state: each user's next tag starts after their previous one
+        self.virtual_time = 0.0
+        self.user_virtual_finish: Dict[int, float] = {}
+        self._sequence = itertools.count()
+        self._worker_ids = itertools.count()
+
+        self.start_latencies_ms: deque = deque(maxlen=1000)
+        self.queue_stats = {
+            'submitted': 0,
+            'started': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'expired': 0,
+            'workers_started': 0,
+            'workers_retired': 0
+        }
+
     async def initialize(self):
         """Initialize background processor"""
         try:
-            # Start worker tasks
-            for i in range(self.max_concurrent_jobs):
-                task = asyncio.create_task(self._worker(f"worker-{i}"))
-                self.worker_tasks.append(task)
+            self.running = True
+
+            # Start the minimum worker pool; more are added on queue depth
+            for _ in range(self.min_workers):
+                self._start_worker()
+            self._scale_workers()
 
             # Start cleanup task
             cleanup_task = asyncio.create_task(self._cleanup_worker())
             self.worker_tasks.append(cleanup_task)
 
-            self.running = True
-            logger.info(f"🔄 Background processor initialized with {self.max_concurrent_jobs} workers")
+            logger.info(f"🔄 Background processor initialized with {len(self.workers)} workers "
+                        f"(min {self.min_workers}, max {self.max_concurrent_jobs})")
 
         except Exception as e:
             logger.error(f"❌ Background processor initialization failed: {e}")
 
+    def _start_worker(self):
+        """Start one worker task"""
+        worker_name = f"worker-{next(self._worker_ids)}"
+        task = asyncio.create_task(self._worker(worker_name))
+        self.workers[worker_name] = task
+        self.worker_tasks.append(task)
+        self.queue_stats['workers_started'] += 1
+
+    def _scale_workers(self):
+        """Add workers while queued jobs outnumber idle workers"""
+        if not self.running:
+            return
+        while (len(self.workers) < self.max_concurrent_jobs and
+               len(self.queued_jobs) > len(self.workers) - self.busy_workers):
+            self._start_worker()
+
+    def _fair_tag(self, user_id: int) -> float:
+        """Start-time fair queuing tag: a user's jobs are spaced one slot apart"""
+        tag = max(self.virtual_time, self.user_virtual_finish.get(user_id, 0.0)) + 1.0
+        self.user_virtual_finish[user_id] = tag
+        return tag
+
     async def submit_job(self, user_id: int, job_type: str, parameters: dict,
-                        callback: Optional[Callable] = None, priority: int = 1) -> Optional[str]:
+                        callback: Optional[Callable] = None, priority: int = 1,
+                        deadline_seconds: Optional[float] = None) -> Optional[str]:
         """Submit job for background processing with rate limiting"""
         try:
             # Security: Check rate limits
@@ -86,7 +139,8 @@ class MCPBackgroundProcessor:
             sanitized_params = self._sanitize_parameters(parameters)
 
             # Create job
-            job_id = f"{user_id}_{job_type}_{datetime.now().timestamp()}"
+            sequence = next(self._sequence)
+            job_id = f"{user_id}_{job_type}_{datetime.now().timestamp()}_{sequence}"
             job = ProcessingJob(
                 job_id=job_id,
                 user_id=user_id,
@@ -95,12 +149,14 @@ class MCPBackgroundProcessor:
                 callback=callback,
                 priority=priority
             )
+            if deadline_seconds is not None:
+                job.deadline = job.created_at + timedelta(seconds=deadline_seconds)
 
-            # Add to queue (higher priority first)
-            if priority >= 3:
-                self.job_queue.appendleft(job)
-            else:
-                self.job_queue.append(job)
+            # Higher priority first, round-robin between users within a priority
+            self.queued_jobs[job_id] = job
+            self.job_queue.put_nowait((-priority, self._fair_tag(user_id), sequence, job))
+            self.queue_stats['submitted'] += 1
+            self._scale_workers()
 
             logger.info(f"✅ Job submitted: {job_id} (priority: {priority})")
             return job_id
@@ -167,52 +223,109 @@ class MCPBackgroundProcessor:
         """Background worker to process jobs"""
         logger.info(f"🔄 Worker {worker_name} started")
 
-        while self.running:
-            try:
-                # Get next job
-                if not self.job_queue:
-                    await asyncio.sleep(1)
+        try:
+            while self.running:
+                # Wait for the next job; idle workers above the minimum retire
+                try:
+                    _, tag, _, job = await asyncio.wait_for(self.job_queue.get(), timeout=self.worker_idle_timeout)
+                except asyncio.TimeoutError:
+                    if len(self.workers) > self.min_workers:
+                        self.queue_stats['workers_retired'] += 1
+                        break
                     continue
 
-                job = self.job_queue.popleft()
-
-                # Start processing
-                job.status = "processing"
-                job.started_at = datetime.now()
-                self.processing_jobs[job.job_id] = job
-
-                logger.info(f"🔄 {worker_name} processing job {job.job_id}")
-
-                # Process the job
-                result = await self._process_job(job)
-
-                # Complete job
-                job.status = "completed" if result.get("success") else "failed"
-                job.completed_at = datetime.now()
-                job.result = result
-
-                # Move to completed jobs
-                self.completed_jobs[job.job_id] = job
-                if job.job_id in self.processing_jobs:
-                    del self.processing_jobs[job.job_id]
-
-                # Call callback if provided (non-blocking)
-                if job.callback:
-                    try:
-                        asyncio.create_task(job.callback(job))
-                    except Exception as e:
-                        logger.error(f"❌ Callback failed for job {job.job_id}: {e}")
-
-                logger.info(f"✅ {worker_name} completed job {job.job_id}")
-
+                self.virtual_time = max(self.virtual_time, tag)
+                self.busy_workers += 1
+                try:
+                    await self._run_job(job, worker_name)
+                except Exception as e:
+                    logger.error(f"❌ Worker {worker_name} error: {e}")
+                    self._finish_job(job, "failed", error=str(e))
+                finally:
+                    self.busy_workers -= 1
+                    self.job_queue.task_done()
+        finally:
+            task = self.workers.pop(worker_name, None)
+            if task in self.worker_tasks:
+                self.worker_tasks.remove(task)
+
+    async def _run_job(self, job: ProcessingJob, worker_name: str):
+        """Run one dequeued job, honouring cancellation and its deadline"""
+        # Cancelled while queued; already recorded by cancel_job
+        if self.queued_jobs.pop(job.job_id, None) is None:
+            return
+
+        now = datetime.now()
+        if job.deadline and now >= job.deadline:
+            self._finish_job(job, "expired", error="Deadline passed before the job started")
+            return
+
+        # Start processing
+        job.status = "processing"
+        job.started_at = now
+        self.processing_jobs[job.job_id] = job
+        self.queue_stats['started'] += 1
+        self.start_latencies_ms.append((now - job.created_at).total_seconds() * 1000)
+
+        logger.info(f"🔄 {worker_name} processing job {job.job_id}")
+
+        task = asyncio.create_task(self._process_job(job))
+        self.running_tasks[job.job_id] = task
+        timeout = (job.deadline - now).total_seconds() if job.deadline else None
+        try:
+            result = await asyncio.wait_for(task, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._finish_job(job, "expired", error="Deadline exceeded")
+            return
+        except asyncio.CancelledError:
+            # Only swallow cancellations requested through cancel_job
+            if job.status != "cancelled":
+                task.cancel()
+                raise
+            self._finish_job(job, "cancelled", error="Cancelled")
+            return
+
+        self._finish_job(job, "completed" if result.get("success") else "failed",
+                         result=result, error=result.get("error"))
+        logger.info(f"✅ {worker_name} completed job {job.job_id}")
+
+    def _finish_job(self, job: ProcessingJob, status: str, result: Optional[dict] = None,
+                    error: Optional[str] = None):
+        """Move a job to completed_jobs and notify its callback"""
+        job.status = status
+        job.completed_at = datetime.now()
+        job.result = result
+        job.error = error
+        self.queued_jobs.pop(job.job_id, None)
+        self.processing_jobs.pop(job.job_id, None)
+        self.running_tasks.pop(job.job_id, None)
+        self.completed_jobs[job.job_id] = job
+        self.queue_stats[status] += 1
+
+        # Call callback if provided (non-blocking)
+        if job.callback and status != "cancelled":
+            try:
+                asyncio.create_task(job.callback(job))
             except Exception as e:
-                logger.error(f"❌ Worker {worker_name} error: {e}")
-                if 'job' in locals():
-                    job.status = "failed"
-                    job.error = str(e)
-                    job.completed_at = datetime.now()
+                logger.error(f"❌ Callback failed for job {job.job_id}: {e}")
+
+    async def cancel_job(self, job_id: str) -> bool:
+        """Cancel a queued or running job"""
+        job = self.queued_jobs.pop(job_id, None)
+        if job is not None:
+            # The queue entry is skipped when a worker reaches it
+            self._finish_job(job, "cancelled", error="Cancelled")
+            logger.info(f"🛑 Job cancelled before start: {job_id}")
+            return True
 
-                await asyncio.sleep(5)  # Wait before retrying
+        task = self.running_tasks.get(job_id)
+        if task is not None and not task.done():
+            self.processing_jobs[job_id].status = "cancelled"
+            task.cancel()
+            logger.info(f"🛑 Running job cancelled: {job_id}")
+            return True
+
+        return False
 
     async def _process_job(self, job: ProcessingJob) -> dict:
         """Process individual job based on type"""
@@ -362,6 +475,15 @@ class MCPBackgroundProcessor:
                 for user_id in users_to_clean:
                     del self.user_rate_limits[user_id]
 
+                # Users whose last tag is behind the virtual clock have no queued backlog
+                idle_users = [
+                    user_id for user_id, finish in self.user_virtual_finish.items()
+                    if finish <= self.virtual_time
+                ]
+
+                for user_id in idle_users:
+                    del self.user_virtual_finish[user_id]
+
                 await asyncio.sleep(300)  # Run cleanup every 5 minutes
 
             except Exception as e:
@@ -370,6 +492,16 @@ class MCPBackgroundProcessor:
 
     async def get_job_status(self, job_id: str) -> Optional[dict]:
         """Get job status"""
+        # Check queued jobs
+        if job_id in self.queued_jobs:
+            job = self.queued_jobs[job_id]
+            return {
+                "job_id": job_id,
+                "status": job.status,
+                "created_at": job.created_at.isoformat(),
+                "deadline": job.deadline.isoformat() if job.deadline else None
+            }
+
         # Check processing jobs
         if job_id in self.processing_jobs:
             job = self.processing_jobs[job_id]
@@ -395,8 +527,31 @@ class MCPBackgroundProcessor:
 
         return None
 
+    def get_queue_stats(self) -> dict:
+        """Queue depth, worker pool and job-start latency (submission to start)"""
+        latencies = sorted(self.start_latencies_ms)
+
+        def percentile(q: float) -> float:
+            return latencies[int(q * (len(latencies) - 1))] if latencies else 0.0
+
+        return {
+            **self.queue_stats,
+            "queued": len(self.queued_jobs),
+            "processing": len(self.processing_jobs),
+            "workers": len(self.workers),
+            "busy_workers": self.busy_workers,
+            "min_workers": self.min_workers,
+            "max_workers": self.max_concurrent_jobs,
+            "start_latency_ms": {
+                "samples": len(latencies),
+                "p50": percentile(0.50),
+                "p99": percentile(0.99)
+            }
+        }
+
     async def get_user_jobs(self, user_id: int) -> dict:
         """Get user's job statistics"""
+        queued_count = len([job for job in self.queued_jobs.values() if job.user_id == user_id])
         processing_count = len([job for job in self.processing_jobs.values() if job.user_id == user_id])
         completed_count = len([job for job in self.completed_jobs.values() if job.user_id == user_id])
 
@@ -404,6 +559,7 @@ class MCPBackgroundProcessor:
 
         return {
             "user_id": user_id,
+            "queued_jobs": queued_count,
             "processing_jobs": processing_count,
             "completed_jobs": completed_count,
             "rate_limit": {
@@ -417,7 +573,7 @@ class MCPBackgroundProcessor:
         """Stop background processor"""
         self.running = False
 
-        for task in self.worker_tasks:
+        for task in list(self.worker_tasks):
             if not task.done():
                 task.cancel()
                 try:
@@ -437,9 +593,15 @@ async def initialize_background_processor():
 
 # Convenience functions
 async def submit_background_job(user_id: int, job_type: str, parameters: dict,
-                               callback: Optional[Callable] = None, priority: int = 1) -> Optional[str]:
+                               callback: Optional[Callable] = None, priority: int = 1,
+                               deadline_seconds: Optional[float] = None) -> Optional[str]:
     """Submit job for background processing"""
-    return await background_processor.submit_job(user_id, job_type, parameters, callback, priority)
+    return await background_processor.submit_job(user_id, job_type, parameters, callback, priority,
+                                                 deadline_seconds)
+
+async def cancel_background_job(job_id: str) -> bool:
+    """Cancel a queued or running job"""
+    return await background_processor.cancel_job(job_id)
 
 async def get_job_result(job_id: str) -> Optional[dict]:
     """Get job result"""
@@ -19,7 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # MCP imports
 from mcp.server.fastmcp import FastMCP
 from mcp.types import Tool, TextContent
-import aiohttp
+from session_registry import session_registry
 from dotenv import load_dotenv
 from web3 import Web3
 
@@ -56,15 +56,12 @@ class RealBlockchainDataProvider:
             'base': Web3(Web3.HTTPProvider(os.getenv('BASE_RPC_URL', 'https://mainnet.base.org')))
         }
         
-        self.session = None
+        self.session = session_registry.session(timeout=30)
         self.rate_limit_delay = 0.2  # 5 requests per second
         self.last_request_time = 0
         
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session"""
-        if not self.session or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+    async def get_session(self):
+        """Shared per-host session from the registry"""
         return self.session
     
     async def rate_limit(self):
@@ -96,9 +93,8 @@ class RealBlockchainDataProvider:
         return self.web3_providers.get(chain.lower())
     
     async def close(self):
-        """Close HTTP session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Release this provider's session view; the shared sessions stay open for other clients"""
+        await self.session.close()
 
 # Global provider instance
 provider = RealBlockchainDataProvider()
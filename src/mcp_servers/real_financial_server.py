@@ -19,7 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # MCP imports
 from mcp.server.fastmcp import FastMCP
 from mcp.types import Tool, TextContent
-import aiohttp
+from session_registry import session_registry
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -38,15 +38,12 @@ class RealFinancialDataProvider:
     def __init__(self):
         self.coingecko_base = "https://api.coingecko.com/api/v3"
         self.defillama_base = "https://api.llama.fi"
-        self.session = None
+        self.session = session_registry.session(timeout=30)
         self.rate_limit_delay = 1.0  # seconds between requests
         self.last_request_time = 0
         
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session"""
-        if not self.session or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+    async def get_session(self):
+        """Shared per-host session from the registry"""
         return self.session
     
     async def rate_limit(self):
@@ -74,9 +71,8 @@ class RealFinancialDataProvider:
             return {"error": str(e)}
     
     async def close(self):
-        """Close HTTP session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Release this provider's session view; the shared sessions stay open for other clients"""
+        await self.session.close()
 
 # Global provider instance
 provider = RealFinancialDataProvider()
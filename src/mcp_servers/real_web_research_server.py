@@ -21,7 +21,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # MCP imports
 from mcp.server.fastmcp import FastMCP
 from mcp.types import Tool, TextContent
-import aiohttp
+from session_registry import session_registry
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
@@ -39,10 +39,10 @@ class RealWebResearchProvider:
     """Production-grade web research provider"""
     
     def __init__(self):
-        self.session = None
         self.rate_limit_delay = 1.0  # 1 second between requests
         self.last_request_time = 0
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        self.session = session_registry.session(headers={'User-Agent': self.user_agent}, timeout=30)
         
         # News API sources
         self.news_sources = {
@@ -59,15 +59,8 @@ class RealWebResearchProvider:
             ]
         }
         
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session"""
-        if not self.session or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            headers = {'User-Agent': self.user_agent}
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers=headers
-            )
+    async def get_session(self):
+        """Shared per-host session from the registry"""
         return self.session
     
     async def rate_limit(self):
@@ -154,9 +147,8 @@ class RealWebResearchProvider:
             return []
     
     async def close(self):
-        """Close HTTP session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Release this provider's session view; the shared sessions stay open for other clients"""
+        await self.session.close()
 
 # Global provider instance
 provider = RealWebResearchProvider()
@@ -19,7 +19,7 @@ from urllib.parse import urljoin, urlparse
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastmcp import FastMCP
-import aiohttp
+from session_registry import session_registry
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
@@ -40,10 +40,10 @@ class WebResearcher:
     """Enhanced web research and browsing capabilities"""
     
     def __init__(self):
-        self.session = None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.session = session_registry.session(headers=self.headers, timeout=30)
         
         # Crypto news sources
         self.news_sources = {
@@ -78,21 +78,12 @@ class WebResearcher:
         }
     
     async def get_session(self):
-        """Get or create aiohttp session"""
-        if not self.session:
-            connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers=self.headers
-            )
+        """Shared per-host session from the registry"""
         return self.session
     
     async def close(self):
-        """Close aiohttp session"""
-        if self.session:
-            await self.session.close()
+        """Release this provider's session view; the shared sessions stay open for other clients"""
+        await self.session.close()
     
     def extract_text_content(self, html: str, max_length: int = 5000) -> str:
         """Extract clean text content from HTML"""
@@ -5,13 +5,21 @@ Stores all chat messages in encrypted format for later summarization
 """
 
 import sqlite3
+import asyncio
 import logging
 import json
+import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from pathlib import Path
-from encryption import encrypt_message, decrypt_message
+from encryption import (
+    encrypt_message_compact, decrypt_stored_message, legacy_hex_to_raw, bulk_decrypt_stream,
+    CURRENT_FORMAT, FORMAT_HEX_FERNET, FORMAT_RAW_FERNET, FORMAT_PLAINTEXT
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,8 @@ class MessageStorage:
     
     def __init__(self, db_path: str = "data/messages.db"):
         self.db_path = db_path
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
         self.init_database()
         
     def init_database(self):
@@ -46,10 +56,16 @@ class MessageStorage:
                     reply_to_message_id INTEGER,
                     forward_from_chat_id INTEGER,
                     media_file_id TEXT,
-                    media_caption TEXT
+                    media_caption TEXT,
+                    format_version INTEGER NOT NULL DEFAULT 0
                 )
             ''')
             
+            # Databases created before format_version existed hold hex-encoded ciphertext
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(messages)')}
+            if 'format_version' not in columns:
+                cursor.execute('ALTER TABLE messages ADD COLUMN format_version INTEGER NOT NULL DEFAULT 0')
+            
             # Chat metadata table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS chat_metadata (
@@ -90,6 +106,21 @@ class MessageStorage:
                 )
             ''')
             
+            # Rolling summaries of closed time buckets (kept alongside daily summaries)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bucket_summaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chat_id INTEGER NOT NULL,
+                    bucket_start REAL NOT NULL,
+                    bucket_seconds INTEGER NOT NULL,
+                    summary_text TEXT NOT NULL,
+                    message_count INTEGER DEFAULT 0,
+                    participants TEXT NOT NULL DEFAULT '[]',
+                    created_at TEXT NOT NULL,
+                    UNIQUE(chat_id, bucket_seconds, bucket_start)
+                )
+            ''')
+            
             # Create indexes for better performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_chat_timestamp ON messages(chat_id, timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_user_timestamp ON messages(user_id, timestamp)')
@@ -99,93 +130,212 @@ class MessageStorage:
             
             conn.commit()
             logger.info("Message storage database initialized")
+        
+        self.migrate_legacy_ciphertext()
+    
+    def migrate_legacy_ciphertext(self, batch_size: int = 1000) -> int:
+        """Rewrite hex-encoded Fernet rows as raw binary tokens; no key is needed, so it is lossless"""
+        migrated = 0
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                last_id = 0
+                while True:
+                    rows = conn.execute(
+                        'SELECT id, encrypted_text FROM messages WHERE format_version = ? AND id > ? ORDER BY id LIMIT ?',
+                        (FORMAT_HEX_FERNET, last_id, batch_size)
+                    ).fetchall()
+                    if not rows:
+                        break
+                    last_id = rows[-1][0]
+                    
+                    # Plaintext rows written before FORMAT_PLAINTEXT existed are not valid hex and stay as they are
+                    updates = []
+                    for row_id, encrypted_text in rows:
+                        raw = legacy_hex_to_raw(encrypted_text) if isinstance(encrypted_text, str) else None
+                        if raw:
+                            updates.append((raw, FORMAT_RAW_FERNET, row_id))
+                    
+                    conn.executemany('UPDATE messages SET encrypted_text = ?, format_version = ? WHERE id = ?', updates)
+                    conn.commit()
+                    migrated += len(updates)
+            
+            if migrated:
+                logger.info(f"Migrated {migrated} hex-encoded messages to binary ciphertext")
+        except Exception as e:
+            logger.error(f"Error migrating legacy ciphertext: {e}")
+        return migrated
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        """Persistent WAL-mode connection shared by all message writes"""
+        if self._writer is None:
+            self._writer = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+            self._writer.execute("PRAGMA journal_mode=WAL")
+            self._writer.execute("PRAGMA synchronous=NORMAL")
+        return self._writer
     
     def store_message(self, message_data: Dict[str, Any]) -> bool:
         """Store a message with encryption"""
+        return self.store_messages_batch([message_data]) == 1
+    
+    def store_messages_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Encrypt and store a batch of messages in a single transaction, returning how many were stored"""
+        if not batch:
+            return 0
+        
+        now = datetime.now().isoformat()
+        message_rows = []
+        for message_data in batch:
+            try:
+                message_rows.append(self._prepare_row(message_data, now))
+            except Exception as e:
+                logger.error(f"Skipping unstorable message {message_data.get('message_id')}: {e}")
+        
+        stored = 0
         try:
-            # Encrypt the message text
-            text_to_encrypt = str(message_data.get('text', ''))
-            encrypted_text = encrypt_message(text_to_encrypt)
-            
-            if not encrypted_text:
-                logger.warning("Failed to encrypt message, storing as plaintext")
-                encrypted_text = text_to_encrypt
+            stored = self._write_rows(message_rows, now)
+        except Exception as e:
+            # One bad row rolls back the whole transaction; retry row by row so only it is lost
+            logger.warning(f"Batch insert of {len(message_rows)} messages failed, retrying row by row: {e}")
+            for row in message_rows:
+                try:
+                    stored += self._write_rows([row], now)
+                except Exception as row_error:
+                    logger.error(f"Error storing message {row[0]} in chat {row[1]}: {row_error}")
+        
+        dropped = len(batch) - stored
+        if dropped:
+            logger.error(f"Dropped {dropped} of {len(batch)} messages in batch")
+        logger.debug(f"Stored {stored} encrypted messages")
+        return stored
+    
+    def _prepare_row(self, message_data: Dict[str, Any], now: str) -> tuple:
+        """Encrypt one message into a messages table row"""
+        # Encrypt the message text
+        text_to_encrypt = str(message_data.get('text', ''))
+        encrypted_text = encrypt_message_compact(text_to_encrypt)
+        format_version = CURRENT_FORMAT
+        
+        if not encrypted_text:
+            logger.warning("Failed to encrypt message, storing as plaintext")
+            encrypted_text = text_to_encrypt
+            format_version = FORMAT_PLAINTEXT
+        
+        return (
+            message_data.get('message_id'),
+            message_data.get('chat_id'),
+            message_data.get('user_id'),
+            message_data.get('username'),
+            encrypted_text,
+            message_data.get('message_type', 'text'),
+            message_data.get('timestamp'),
+            now,
+            message_data.get('is_edit', False),
+            message_data.get('is_deleted', False),
+            message_data.get('reply_to_message_id'),
+            message_data.get('forward_from_chat_id'),
+            message_data.get('media_file_id'),
+            message_data.get('media_caption'),
+            format_version
+        )
+    
+    def _write_rows(self, message_rows: List[tuple], now: str) -> int:
+        """Insert rows and their chat/user counter updates in one transaction"""
+        if not message_rows:
+            return 0
+        
+        # Fold per-chat and per-user counters so each key is upserted once per batch
+        chat_updates: Dict[int, List] = {}
+        user_updates: Dict[int, List] = {}
+        for row in message_rows:
+            chat_id, user_id, username, timestamp = row[1], row[2], row[3], row[6]
+            chat = chat_updates.setdefault(chat_id, [chat_id, None, 0, now, now])
+            chat[1] = timestamp
+            chat[2] += 1
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Store the message
-                cursor.execute('''
+            user = user_updates.setdefault(user_id, [user_id, None, now, now, 0, None])
+            user[1] = username
+            user[4] += 1
+            user[5] = chat_id
+        
+        with self._writer_lock:
+            conn = self._get_writer()
+            with conn:
+                conn.executemany('''
                     INSERT INTO messages 
                     (message_id, chat_id, user_id, username, encrypted_text, 
                      message_type, timestamp, date_created, is_edit, is_deleted,
-                     reply_to_message_id, forward_from_chat_id, media_file_id, media_caption)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    message_data.get('message_id'),
-                    message_data.get('chat_id'),
-                    message_data.get('user_id'),
-                    message_data.get('username'),
-                    encrypted_text,
-                    message_data.get('message_type', 'text'),
-                    message_data.get('timestamp'),
-                    datetime.now().isoformat(),
-                    message_data.get('is_edit', False),
-                    message_data.get('is_deleted', False),
-                    message_data.get('reply_to_message_id'),
-                    message_data.get('forward_from_chat_id'),
-                    message_data.get('media_file_id'),
-                    message_data.get('media_caption')
-                ))
+                     reply_to_message_id, forward_from_chat_id, media_file_id, media_caption,
+                     format_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', message_rows)
                 
                 # Update chat metadata
-                self._update_chat_metadata(cursor, message_data)
+                self._update_chat_metadata(conn, list(chat_updates.values()))
                 
                 # Update user activity
-                self._update_user_activity(cursor, message_data)
-                
-                conn.commit()
-                logger.debug(f"Stored encrypted message from user {message_data.get('user_id')} in chat {message_data.get('chat_id')}")
-                return True
-                
-        except Exception as e:
-            logger.error(f"Error storing message: {e}")
-            return False
-    
-    def _update_chat_metadata(self, cursor, message_data: Dict[str, Any]):
-        """Update chat metadata"""
-        chat_id = message_data.get('chat_id')
-        timestamp = message_data.get('timestamp')
+                self._update_user_activity(conn, list(user_updates.values()))
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO chat_metadata 
+        return len(message_rows)
+    
+    def _update_chat_metadata(self, conn, rows: List[List]):
+        """Increment chat metadata counters, one row per (chat_id, last_timestamp, count, now, now)"""
+        conn.executemany('''
+            INSERT INTO chat_metadata 
             (chat_id, last_message_time, total_messages, created_at, updated_at)
-            VALUES (
-                ?, ?, 
-                COALESCE((SELECT total_messages FROM chat_metadata WHERE chat_id = ?), 0) + 1,
-                COALESCE((SELECT created_at FROM chat_metadata WHERE chat_id = ?), ?),
-                ?
-            )
-        ''', (chat_id, timestamp, chat_id, chat_id, datetime.now().isoformat(), datetime.now().isoformat()))
-    
-    def _update_user_activity(self, cursor, message_data: Dict[str, Any]):
-        """Update user activity"""
-        user_id = message_data.get('user_id')
-        username = message_data.get('username')
-        chat_id = message_data.get('chat_id')
-        now = datetime.now().isoformat()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_activity 
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(chat_id) DO UPDATE SET
+                last_message_time = excluded.last_message_time,
+                total_messages = total_messages + excluded.total_messages,
+                updated_at = excluded.updated_at
+        ''', rows)
+    
+    def _update_user_activity(self, conn, rows: List[List]):
+        """Increment user activity counters, one row per (user_id, username, now, now, count, last_chat_id)"""
+        conn.executemany('''
+            INSERT INTO user_activity 
             (user_id, username, first_seen, last_seen, total_messages, last_chat_id)
-            VALUES (
-                ?, ?, 
-                COALESCE((SELECT first_seen FROM user_activity WHERE user_id = ?), ?),
-                ?,
-                COALESCE((SELECT total_messages FROM user_activity WHERE user_id = ?), 0) + 1,
-                ?
-            )
-        ''', (user_id, username, user_id, now, now, user_id, chat_id))
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                username = excluded.username,
+                last_seen = excluded.last_seen,
+                total_messages = total_messages + excluded.total_messages,
+                last_chat_id = excluded.last_chat_id
+        ''', rows)
+    
+    _MESSAGE_COLUMNS = '''message_id, chat_id, user_id, username, encrypted_text,
+                           message_type, timestamp, is_edit, is_deleted,
+                           reply_to_message_id, media_caption, format_version, id'''
+    
+    def _decrypt_rows(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        """Turn raw message rows into decrypted message dicts"""
+        messages = []
+        for row in rows:
+            message_data = {
+                'message_id': row[0],
+                'chat_id': row[1],
+                'user_id': row[2],
+                'username': row[3],
+                'encrypted_text': row[4],
+                'message_type': row[5],
+                'timestamp': row[6],
+                'is_edit': row[7],
+                'is_deleted': row[8],
+                'reply_to_message_id': row[9],
+                'media_caption': row[10]
+            }
+            
+            # Decrypt the message
+            decrypted_text = decrypt_stored_message(message_data['encrypted_text'], row[11])
+            if decrypted_text:
+                message_data['text'] = decrypted_text
+            elif isinstance(message_data['encrypted_text'], str):
+                # Fallback to stored text if decryption fails (plaintext rows)
+                message_data['text'] = message_data['encrypted_text']
+            else:
+                message_data['text'] = '[Unreadable message]'
+            
+            messages.append(message_data)
+        return messages
     
     def get_messages_for_period(self, chat_id: int, hours: int = 24) -> List[Dict[str, Any]]:
         """Get and decrypt messages for a specific time period"""
@@ -194,40 +344,14 @@ class MessageStorage:
             
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT message_id, chat_id, user_id, username, encrypted_text,
-                           message_type, timestamp, is_edit, is_deleted,
-                           reply_to_message_id, media_caption
+                cursor.execute(f'''
+                    SELECT {self._MESSAGE_COLUMNS}
                     FROM messages 
                     WHERE chat_id = ? AND timestamp >= ?
                     ORDER BY timestamp ASC
                 ''', (chat_id, cutoff_time))
                 
-                messages = []
-                for row in cursor.fetchall():
-                    message_data = {
-                        'message_id': row[0],
-                        'chat_id': row[1],
-                        'user_id': row[2],
-                        'username': row[3],
-                        'encrypted_text': row[4],
-                        'message_type': row[5],
-                        'timestamp': row[6],
-                        'is_edit': row[7],
-                        'is_deleted': row[8],
-                        'reply_to_message_id': row[9],
-                        'media_caption': row[10]
-                    }
-                    
-                    # Decrypt the message
-                    decrypted_text = decrypt_message(message_data['encrypted_text'])
-                    if decrypted_text:
-                        message_data['text'] = decrypted_text
-                    else:
-                        # Fallback to encrypted text if decryption fails
-                        message_data['text'] = message_data['encrypted_text']
-                    
-                    messages.append(message_data)
+                messages = self._decrypt_rows(cursor.fetchall())
                 
                 logger.info(f"Retrieved {len(messages)} messages for chat {chat_id} from last {hours} hours")
                 return messages
@@ -236,6 +360,68 @@ class MessageStorage:
             logger.error(f"Error retrieving messages: {e}")
             return []
     
+    def _fetch_rows_after(self, chat_id: int, cutoff_time: float, after_timestamp: float,
+                          after_id: int, limit: int, end_time: float = float('inf')) -> List[tuple]:
+        """Fetch the next page of encrypted rows in (timestamp, id) order"""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(f'''
+                SELECT {self._MESSAGE_COLUMNS}
+                FROM messages 
+                WHERE chat_id = ? AND timestamp >= ? AND timestamp < ?
+                  AND (timestamp > ? OR (timestamp = ? AND id > ?))
+                ORDER BY timestamp ASC, id ASC
+                LIMIT ?
+            ''', (chat_id, cutoff_time, end_time, after_timestamp, after_timestamp, after_id, limit)).fetchall()
+    
+    async def _iter_row_chunks(self, chat_id: int, start_time: float, end_time: float, chunk_size: int):
+        loop = asyncio.get_running_loop()
+        after_timestamp, after_id = start_time, 0
+        while True:
+            rows = await loop.run_in_executor(
+                None, self._fetch_rows_after, chat_id, start_time, after_timestamp, after_id, chunk_size, end_time)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            after_timestamp, after_id = rows[-1][6], rows[-1][12]
+    
+    async def stream_messages_for_period(self, chat_id: int, hours: int = 24,
+                                         chunk_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream decrypted messages for a time period in timestamp order.
+        Rows are read in pages and decrypted in parallel chunks off the event loop.
+        """
+        count = 0
+        try:
+            chunks = self._iter_row_chunks(chat_id, time.time() - (hours * 3600), float('inf'), chunk_size)
+            async for message in bulk_decrypt_stream(chunks, self._decrypt_rows):
+                count += 1
+                yield message
+        except Exception as e:
+            logger.error(f"Error streaming messages: {e}")
+        logger.info(f"Streamed {count} messages for chat {chat_id} from last {hours} hours")
+    
+    async def stream_messages_between(self, chat_id: int, start_time: float, end_time: float,
+                                      chunk_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Stream decrypted messages with start_time <= timestamp < end_time in timestamp order"""
+        try:
+            chunks = self._iter_row_chunks(chat_id, start_time, end_time, chunk_size)
+            async for message in bulk_decrypt_stream(chunks, self._decrypt_rows):
+                yield message
+        except Exception as e:
+            logger.error(f"Error streaming messages: {e}")
+    
+    def get_active_chat_ids(self, since: float) -> List[int]:
+        """Chats that received messages at or after the given timestamp"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute('SELECT chat_id FROM chat_metadata WHERE last_message_time >= ?', (since,)).fetchall()
+                return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Error retrieving active chats: {e}")
+            return []
+    
     def get_chat_statistics(self, chat_id: int) -> Dict[str, Any]:
         """Get statistics for a chat"""
         try:
@@ -374,6 +560,58 @@ class MessageStorage:
             logger.error(f"Error retrieving summaries: {e}")
             return []
     
+    def store_bucket_summary(self, chat_id: int, bucket_start: float, bucket_seconds: int, summary_text: str,
+                             message_count: int = 0, participants: Optional[List[int]] = None) -> bool:
+        """Store the summary of one closed time bucket (kept for 7 days)"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO bucket_summaries
+                    (chat_id, bucket_start, bucket_seconds, summary_text, message_count, participants, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    chat_id,
+                    bucket_start,
+                    bucket_seconds,
+                    summary_text,
+                    message_count,
+                    json.dumps(sorted(participants or [])),
+                    datetime.now().isoformat()
+                ))
+                conn.commit()
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error storing bucket summary: {e}")
+            return False
+    
+    def get_bucket_summaries(self, chat_id: int, bucket_seconds: int, start_time: float,
+                             end_time: float) -> Dict[float, Dict[str, Any]]:
+        """Get stored bucket summaries of one size starting in [start_time, end_time), keyed by bucket start"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute('''
+                    SELECT bucket_start, summary_text, message_count, participants
+                    FROM bucket_summaries
+                    WHERE chat_id = ? AND bucket_seconds = ? AND bucket_start >= ? AND bucket_start < ?
+                    ORDER BY bucket_start ASC
+                ''', (chat_id, bucket_seconds, start_time, end_time)).fetchall()
+                
+                return {
+                    row[0]: {
+                        'bucket_start': row[0],
+                        'bucket_seconds': bucket_seconds,
+                        'summary': row[1],
+                        'message_count': row[2],
+                        'participants': json.loads(row[3]),
+                    }
+                    for row in rows
+                }
+                
+        except Exception as e:
+            logger.error(f"Error retrieving bucket summaries: {e}")
+            return {}
+    
     def cleanup_old_summaries(self, days: int = 7):
         """Clean up summaries older than specified days"""
         try:
@@ -388,6 +626,8 @@ class MessageStorage:
                 
                 # Delete old summaries
                 cursor.execute('DELETE FROM daily_summaries WHERE summary_date < ?', (cutoff_date,))
+                cursor.execute('DELETE FROM bucket_summaries WHERE bucket_start < ?',
+                               (time.time() - days * 86400,))
                 
                 conn.commit()
                 logger.info(f"🔒 Security cleanup: Deleted {count} summaries older than {days} days")
@@ -430,5 +670,129 @@ class MessageStorage:
             logger.error(f"Error exporting messages: {e}")
             return f"Error exporting messages: {e}"
 
+class MessageIngestionQueue:
+    """
+    Async ingestion pipeline in front of MessageStorage.
+    Messages are queued on the hot path and written by a background worker that
+    groups them into one transaction per batch. A bounded queue gives backpressure
+    when the database falls behind.
+    """
+    
+    def __init__(self, storage: MessageStorage, max_queue_size: int = 10000,
+                 batch_size: int = 200, max_latency_ms: int = 250):
+        self.storage = storage
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.max_latency = max_latency_ms / 1000
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='message_ingest')
+        
+        self._batch_sizes: deque = deque(maxlen=100)
+        self._flush_latencies: deque = deque(maxlen=100)
+        self.stats = {
+            'enqueued': 0,
+            'stored': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'backpressure_waits': 0,
+        }
+    
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+    
+    def _ensure_worker(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+    
+    async def enqueue(self, message_data: Dict[str, Any]) -> bool:
+        """Queue a message for storage, waiting only if the queue is full"""
+        try:
+            self._ensure_worker()
+            if self._queue.full():
+                self.stats['backpressure_waits'] += 1
+            await self._queue.put(message_data)
+            self.stats['enqueued'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue.qsize())
+            return True
+        except Exception as e:
+            logger.error(f"Error queueing message for storage: {e}")
+            return False
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
+            
+            # Keep filling the batch until it is full or the oldest message has waited long enough
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        stored = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.storage.store_messages_batch, batch)
+        
+        self._batch_sizes.append(len(batch))
+        self._flush_latencies.append((time.perf_counter() - start) * 1000)
+        self.stats['batches'] += 1
+        self.stats['stored'] += stored
+        self.stats['failed'] += len(batch) - stored
+    
+    async def drain(self):
+        """Wait until every queued message has been written"""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+    
+    async def stop(self):
+        """Flush everything still queued and stop the worker"""
+        await self.drain()
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Backpressure and throughput metrics for monitoring"""
+        batch_sizes = list(self._batch_sizes)
+        latencies = list(self._flush_latencies)
+        return {
+            **self.stats,
+            'queue_depth': self.queue_depth,
+            'max_queue_size': self.max_queue_size,
+            'last_batch_size': batch_sizes[-1] if batch_sizes else 0,
+            'avg_batch_size': sum(batch_sizes) / len(batch_sizes) if batch_sizes else 0.0,
+            'last_flush_latency_ms': latencies[-1] if latencies else 0.0,
+            'avg_flush_latency_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+            'max_flush_latency_ms': max(latencies) if latencies else 0.0,
+        }
+
 # Global instance
-message_storage = MessageStorage()
\ No newline at end of file
+message_storage = MessageStorage(os.getenv('MESSAGE_DB_PATH', 'data/messages.db'))
+message_ingestion_queue = MessageIngestionQueue(message_storage)
\ No newline at end of file
@@ -6,7 +6,6 @@ import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
-import requests
 import pandas as pd
 import numpy as np
 from textblob import TextBlob
@@ -20,6 +19,8 @@ from ai_providers import get_ai_response
 from crypto_research import query_defillama
 from advanced_portfolio_manager import advanced_portfolio_manager
 from advanced_alerts import advanced_alerts
+from streaming_indicators import indicator_engine
+from async_http import http_client
 from security_auditor import security_auditor
 from performance_monitor import track_performance
 
@@ -649,9 +650,9 @@ class NaturalLanguageQueryEngine:
         try:
             # Use CoinGecko API
             url = f"https://api.coingecko.com/api/v3/coins/{token.lower()}"
-            response = requests.get(url, timeout=10)
+            response = await http_client.get(url, timeout=10, cache_ttl=60)
             
-            if response.status_code == 200:
+            if response.status == 200:
                 data = response.json()
                 market_data = data.get('market_data', {})
                 
@@ -675,9 +676,8 @@ class NaturalLanguageQueryEngine:
     async def _get_technical_analysis(self, token: str) -> Optional[Dict[str, float]]:
         """Get technical analysis data for a token"""
         try:
-            # This would typically use the advanced_alerts technical analysis
-            from advanced_alerts import advanced_alerts
-            return await advanced_alerts._get_technical_indicators(token)
+            # Same streaming indicator state the alerts and research engines read
+            return await indicator_engine.get_indicators(token)
             
         except Exception as e:
             logger.error(f"Error getting technical analysis: {e}")
@@ -0,0 +1,220 @@
+# src/parameter_sweep.py
+"""
+Parallel parameter sweeps over the vectorized backtest engine.
+The close and timestamp arrays are placed in shared memory once and attached by
+each worker process, so tasks only carry parameter dicts. With pruning enabled, a
+coarse lattice of the grid is evaluated first and only the neighbourhoods of its
+non-dominated points are refined.
+"""
+
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vectorized_backtest import run_backtest, to_epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+MAX_COMBINATIONS = 20000
+BATCH_SIZE = 16
+# Sweeps run inside the bot process, so their pools are kept small and one at a time
+MAX_WORKERS = 4
+MAX_CONCURRENT_SWEEPS = 1
+
+# Workers are started by a fork server (or spawned), never forked from the bot's threads
+_mp_context = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+_sweep_slots = threading.BoundedSemaphore(MAX_CONCURRENT_SWEEPS)
+
+# Arrays attached by each worker process
+_worker_arrays: Dict[str, Any] = {}
+
+def expand_range(spec) -> List[Any]:
+    """
+    Values of one swept parameter: a list of values, a (start, stop, step) tuple or a
+    {'start', 'stop', 'step'} dict; stop is inclusive
+    """
+    if isinstance(spec, dict):
+        spec = (spec['start'], spec['stop'], spec.get('step', 1))
+    if isinstance(spec, tuple) and len(spec) == 3 and all(isinstance(v, (int, float)) for v in spec):
+        start, stop, step = spec
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {spec}")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        values = [start + i * step for i in range(max(count, 0))]
+        if all(isinstance(v, int) for v in spec):
+            return values
+        return [round(value, 10) for value in values]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+def _attach_shared(close_name: str, timestamps_name: str, length: int):
+    """Pool initializer: map the shared arrays into this worker"""
+    for key, name, dtype in (('close', close_name, np.float64), ('timestamps', timestamps_name, np.int64)):
+        block = shared_memory.SharedMemory(name=name)
+        _worker_arrays[key + '_block'] = block
+        _worker_arrays[key] = np.ndarray((length,), dtype=dtype, buffer=block.buf)
+
+def _backtest_metrics(strategy_type: str, close: np.ndarray, timestamps: np.ndarray,
+                      initial_capital: float, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return run_backtest(strategy_type, close, timestamps, initial_capital, params).metrics
+    except Exception as e:
+        return {'error': str(e)}
+
+def _run_batch(strategy_type: str, initial_capital: float, batch: List[Tuple[int, Dict[str, Any]]]):
+    close = _worker_arrays['close']
+    timestamps = _worker_arrays['timestamps']
+    return [(combo_id, _backtest_metrics(strategy_type, close, timestamps, initial_capital, params))
+            for combo_id, params in batch]
+
+def _dominates(a: Dict[str, float], b: Dict[str, float], objective: str) -> bool:
+    """a is at least as good as b on objective and drawdown, and better on one"""
+    return (a[objective] >= b[objective] and a['max_drawdown'] <= b['max_drawdown']
+            and (a[objective] > b[objective] or a['max_drawdown'] < b['max_drawdown']))
+
+class ParameterSweep:
+    """Grid of backtests for one strategy type over one price history"""
+
+    def __init__(self, strategy_type: str, close: Sequence[float], timestamps, initial_capital: float,
+                 base_params: Optional[Dict[str, Any]] = None, max_workers: Optional[int] = None):
+        self.strategy_type = strategy_type
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.timestamps = np.ascontiguousarray(to_epoch_seconds(timestamps), dtype=np.int64)
+        self.initial_capital = initial_capital
+        self.base_params = dict(base_params or {})
+        self.max_workers = min(max_workers or os.cpu_count() or 1, MAX_WORKERS)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def _share(self, values: np.ndarray) -> shared_memory.SharedMemory:
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        self._blocks.append(block)
+        return block
+
+    def __enter__(self):
+        if self.max_workers > 1:
+            close_block = self._share(self.close)
+            timestamps_block = self._share(self.timestamps)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=_mp_context,
+                initializer=_attach_shared,
+                initargs=(close_block.name, timestamps_block.name, len(self.close))
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def evaluate(self, combos: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, Dict[str, float]]:
+        """Metrics of each (combo_id, overrides) pair, fanned out across the pool in batches"""
+        tasks = [(combo_id, {**self.base_params, **overrides}) for combo_id, overrides in combos]
+        if not self._pool:
+            # Single worker: no pool, the engine reads the arrays directly
+            return {combo_id: _backtest_metrics(self.strategy_type, self.close, self.timestamps,
+                                                self.initial_capital, params)
+                    for combo_id, params in tasks}
+        batch_size = max(1, min(BATCH_SIZE, math.ceil(len(tasks) / (self.max_workers * 4))))
+        futures = [self._pool.submit(_run_batch, self.strategy_type, self.initial_capital, tasks[i:i + batch_size])
+                   for i in range(0, len(tasks), batch_size)]
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return results
+
+    def run(self, ranges: Dict[str, Any], rank_by: str = 'sharpe_ratio', prune: bool = True,
+            coarse_stride: int = 2, keep_fraction: float = 0.25) -> Dict[str, Any]:
+        """
+        Backtest every combination of the swept parameters and rank them by rank_by
+        (ties by lower drawdown). With prune, a coarse lattice (every coarse_stride-th
+        value per axis, endpoints included) runs first; only points within one coarse
+        step of a lattice point that is Pareto-optimal on rank_by and drawdown, or in
+        the top keep_fraction by rank_by, are evaluated afterwards.
+        """
+        start = time.perf_counter()
+        names = list(ranges)
+        axes = [expand_range(ranges[name]) for name in names]
+        shape = tuple(len(values) for values in axes)
+        total = math.prod(shape)
+        if not names or total == 0:
+            raise ValueError("No parameter ranges to sweep")
+        if total > MAX_COMBINATIONS:
+            raise ValueError(f"Sweep of {total} combinations exceeds the limit of {MAX_COMBINATIONS}")
+
+        def overrides(point: Tuple[int, ...]) -> Dict[str, Any]:
+            return {name: axes[axis][i] for axis, (name, i) in enumerate(zip(names, point))}
+
+        points = list(itertools.product(*(range(size) for size in shape)))
+        point_ids = {point: combo_id for combo_id, point in enumerate(points)}
+        metrics: Dict[int, Dict[str, float]] = {}
+
+        if prune and coarse_stride > 1 and total > 1:
+            coarse_axes = [sorted(set(range(0, size, coarse_stride)) | {size - 1}) for size in shape]
+            coarse = list(itertools.product(*coarse_axes))
+            metrics.update(self.evaluate([(point_ids[point], overrides(point)) for point in coarse]))
+
+            scored = [point for point in coarse if 'error' not in metrics[point_ids[point]]]
+            ordered = sorted(scored, key=lambda point: metrics[point_ids[point]][rank_by], reverse=True)
+            survivors = set(ordered[:max(1, math.ceil(len(ordered) * keep_fraction))])
+            for point in scored:
+                point_metrics = metrics[point_ids[point]]
+                if not any(_dominates(metrics[point_ids[other]], point_metrics, rank_by) for other in scored):
+                    survivors.add(point)
+
+            refine = set()
+            for point in survivors:
+                neighbourhood = [range(max(0, i - coarse_stride + 1), min(size, i + coarse_stride))
+                                 for i, size in zip(point, shape)]
+                refine.update(itertools.product(*neighbourhood))
+            pending = sorted(point_ids[point] for point in refine if point_ids[point] not in metrics)
+        else:
+            pending = list(range(total))
+
+        metrics.update(self.evaluate([(combo_id, overrides(points[combo_id])) for combo_id in pending]))
+
+        rows = [{'params': overrides(points[combo_id]), **result}
+                for combo_id, result in metrics.items() if 'error' not in result]
+        rows.sort(key=lambda row: (-row[rank_by], row['max_drawdown']))
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+
+        return {
+            'parameters': names,
+            'rank_by': rank_by,
+            'combinations': total,
+            'evaluated': len(metrics),
+            'pruned': total - len(metrics),
+            'failed': sum(1 for result in metrics.values() if 'error' in result),
+            'workers': self.max_workers if self._pool else 1,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+            'results': rows,
+        }
+
+def run_parameter_sweep(strategy_type: str, close: Sequence[float], timestamps, initial_capital: float,
+                        ranges: Dict[str, Any], base_params: Optional[Dict[str, Any]] = None,
+                        max_workers: Optional[int] = None, **options) -> Dict[str, Any]:
+    """
+    Set up shared memory and the worker pool, run one sweep and release both; concurrent
+    callers wait for a free sweep slot
+    """
+    with _sweep_slots:
+        with ParameterSweep(strategy_type, close, timestamps, initial_capital, base_params, max_workers) as sweep:
+            return sweep.run(ranges, **options)
@@ -4,11 +4,12 @@ Provides comprehensive portfolio analysis, risk metrics, and rebalancing suggest
 """
 import logging
 import numpy as np
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from config import config
+from price_oracle import price_oracle
+from async_http import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -46,22 +47,8 @@ class PortfolioAnalyzer:
         
     async def get_asset_price(self, symbol: str) -> float:
         """Get current price for an asset"""
-        if symbol in self.price_cache:
-            cache_time, price = self.price_cache[symbol]
-            if datetime.now() - cache_time < timedelta(minutes=5):
-                return price
-        
         try:
-            # Use CoinGecko API for price data
-            url = f"https://api.coingecko.com/api/v3/simple/price"
-            params = {"ids": symbol.lower(), "vs_currencies": "usd"}
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            price = data.get(symbol.lower(), {}).get('usd', 0)
-            self.price_cache[symbol] = (datetime.now(), price)
-            return price
+            return await price_oracle.get_price(symbol, max_age=300)
         except Exception as e:
             self.logger.error(f"Failed to get price for {symbol}: {e}")
             return 0.0
@@ -71,7 +58,7 @@ class PortfolioAnalyzer:
         try:
             url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}/market_chart"
             params = {"vs_currency": "usd", "days": days}
-            response = requests.get(url, params=params, timeout=15)
+            response = await http_client.get(url, params=params, timeout=15)
             response.raise_for_status()
             data = response.json()
             
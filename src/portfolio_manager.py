@@ -10,6 +10,7 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import json
 import math
+from price_oracle import price_oracle
 
 logger = logging.getLogger(__name__)
 
@@ -298,17 +299,12 @@ class PortfolioManager:
         return mock_assets
     
     async def _get_asset_price(self, symbol: str) -> float:
-        """Get current asset price with caching"""
-        cache_key = f"price_{symbol}"
-        current_time = datetime.now()
+        """Get current asset price from the shared price oracle"""
+        price = await price_oracle.get_price(symbol, max_age=self.cache_ttl)
+        if price:
+            return price
         
-        # Check cache
-        if cache_key in self.price_cache:
-            cached_data = self.price_cache[cache_key]
-            if (current_time - cached_data["timestamp"]).seconds < self.cache_ttl:
-                return cached_data["price"]
-        
-        # Fetch new price (mock implementation)
+        # Static fallback when no price source is reachable
         price_map = {
             "ETH": 2000.0,
             "BTC": 45000.0,
@@ -320,15 +316,7 @@ class PortfolioManager:
             "LINK": 15.0
         }
         
-        price = price_map.get(symbol.upper(), 1.0)
-        
-        # Cache the price
-        self.price_cache[cache_key] = {
-            "price": price,
-            "timestamp": current_time
-        }
-        
-        return price
+        return price_map.get(symbol.upper(), 1.0)
     
     def _consolidate_assets(self, assets: List[Asset]) -> List[Asset]:
         """Consolidate duplicate assets across chains"""
@@ -0,0 +1,217 @@
+# src/price_oracle.py
+"""
+Shared in-process price oracle.
+Every module asks this oracle for spot prices instead of calling price APIs itself.
+Quotes are cached for a short TTL, concurrent requests for the same coin share one
+upstream call, and symbols requested within a few milliseconds of each other are
+fetched together in one multi-symbol CoinGecko request. The quote cache is a bounded
+LRU, so lookups of arbitrary user-typed symbols cannot grow it without limit.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Ticker symbols to CoinGecko ids; anything else is treated as a CoinGecko id already
+SYMBOL_TO_COINGECKO_ID = {
+    'BTC': 'bitcoin', 'ETH': 'ethereum', 'SOL': 'solana', 'ADA': 'cardano',
+    'DOT': 'polkadot', 'LINK': 'chainlink', 'UNI': 'uniswap', 'AAVE': 'aave',
+    'COMP': 'compound-governance-token', 'MATIC': 'matic-network', 'AVAX': 'avalanche-2',
+    'BNB': 'binancecoin', 'XRP': 'ripple', 'DOGE': 'dogecoin', 'ARB': 'arbitrum',
+    'OP': 'optimism', 'USDC': 'usd-coin', 'USDT': 'tether', 'DAI': 'dai',
+    'ATOM': 'cosmos', 'LTC': 'litecoin', 'TRX': 'tron', 'NEAR': 'near',
+}
+
+COINGECKO_SIMPLE_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+BatchFetcher = Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]
+SingleFetcher = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+def resolve_coin_id(symbol: str) -> str:
+    """CoinGecko id for a ticker symbol or coin id"""
+    symbol = symbol.strip()
+    return SYMBOL_TO_COINGECKO_ID.get(symbol.upper(), symbol.lower())
+
+class PriceOracle:
+    """TTL-cached, single-flight, micro-batched spot price lookups in USD"""
+
+    def __init__(self, ttl: float = 30.0, negative_ttl: float = 10.0, batch_window_ms: int = 20,
+                 max_batch_size: int = 50, fetch_batch: Optional[BatchFetcher] = None,
+                 fetch_single: Optional[SingleFetcher] = None, max_entries: int = 1024):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_entries = max_entries
+        self.fetch_batch = fetch_batch or self._fetch_coingecko_batch
+        self.fetch_single = fetch_single or self._fetch_public_fallback
+
+        # coin id -> (expires_at monotonic, fetched_at monotonic, quote or None)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'upstream_batches': 0,
+            'upstream_symbols': 0,
+            'fallback_lookups': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+    def _cached(self, coin_id: str, max_age: Optional[float]):
+        entry = self._cache.get(coin_id)
+        if entry is None:
+            return False, None
+        expires_at, fetched_at, quote = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            del self._cache[coin_id]
+            return False, None
+        if max_age is not None and now - fetched_at > max_age:
+            return False, None
+        self._cache.move_to_end(coin_id)
+        return True, quote
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures and timers from a previous event loop can never complete here
+            self._loop = loop
+            self._in_flight = {}
+            self._pending = []
+            self._flush_handle = None
+        return loop
+
+    async def get_quote(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Spot quote for a ticker symbol or CoinGecko id: price, change_24h, volume_24h,
+        market_cap and source. Returns None when no source knows the coin.
+        """
+        self.stats['requests'] += 1
+        coin_id = resolve_coin_id(symbol)
+
+        hit, quote = self._cached(coin_id, max_age)
+        if hit:
+            self.stats['cache_hits'] += 1
+        else:
+            loop = self._bind_loop()
+            future = self._in_flight.get(coin_id)
+            if future is not None:
+                self.stats['coalesced'] += 1
+            else:
+                future = loop.create_future()
+                self._in_flight[coin_id] = future
+                self._pending.append(coin_id)
+                if len(self._pending) >= self.max_batch_size:
+                    self._start_flush()
+                elif self._flush_handle is None:
+                    self._flush_handle = loop.call_later(self.batch_window, self._start_flush)
+            quote = await asyncio.shield(future)
+
+        if quote is None:
+            return None
+        return {**quote, 'symbol': symbol.upper()}
+
+    async def get_price(self, symbol: str, max_age: Optional[float] = None) -> float:
+        """Spot price in USD, 0.0 when unknown"""
+        quote = await self.get_quote(symbol, max_age)
+        return quote['price'] if quote else 0.0
+
+    async def get_prices(self, symbols: Iterable[str], max_age: Optional[float] = None) -> Dict[str, float]:
+        """Spot prices for several symbols; they share one upstream batch"""
+        symbols = list(symbols)
+        prices = await asyncio.gather(*(self.get_price(symbol, max_age) for symbol in symbols))
+        return dict(zip(symbols, prices))
+
+    def _start_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._loop.create_task(self._flush(batch))
+
+    async def _flush(self, coin_ids: List[str]):
+        self.stats['upstream_batches'] += 1
+        self.stats['upstream_symbols'] += len(coin_ids)
+        quotes: Dict[str, Dict[str, Any]] = {}
+        try:
+            try:
+                quotes = await self.fetch_batch(coin_ids)
+            except Exception as e:
+                logger.warning(f"Batched price fetch failed for {len(coin_ids)} coins: {e}")
+
+            missing = [coin_id for coin_id in coin_ids if coin_id not in quotes]
+            if missing:
+                self.stats['fallback_lookups'] += len(missing)
+                results = await asyncio.gather(*(self.fetch_single(coin_id) for coin_id in missing),
+                                               return_exceptions=True)
+                for coin_id, result in zip(missing, results):
+                    if isinstance(result, dict) and result.get('price', 0) > 0:
+                        quotes[coin_id] = result
+        finally:
+            # Always release the waiters, even if the flush itself was cancelled
+            now = time.monotonic()
+            for coin_id in coin_ids:
+                quote = quotes.get(coin_id)
+                if quote is None:
+                    self.stats['misses'] += 1
+                self._cache[coin_id] = (now + (self.ttl if quote else self.negative_ttl), now, quote)
+                self._cache.move_to_end(coin_id)
+                future = self._in_flight.pop(coin_id, None)
+                if future is not None and not future.done():
+                    future.set_result(quote)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    async def _fetch_coingecko_batch(self, coin_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One CoinGecko simple/price request for every coin in the batch"""
+        from public_api_endpoints import public_apis
+        session = await public_apis.get_session()
+        params = {
+            'ids': ','.join(coin_ids),
+            'vs_currencies': 'usd',
+            'include_24hr_change': 'true',
+            'include_24hr_vol': 'true',
+            'include_market_cap': 'true'
+        }
+        async with session.get(COINGECKO_SIMPLE_PRICE_URL, params=params) as response:
+            if response.status != 200:
+                raise Exception(f"CoinGecko API error: {response.status}")
+            data = await response.json()
+
+        return {
+            coin_id: {
+                'price': coin_data.get('usd', 0),
+                'change_24h': coin_data.get('usd_24h_change', 0),
+                'volume_24h': coin_data.get('usd_24h_vol', 0),
+                'market_cap': coin_data.get('usd_market_cap', 0),
+                'source': 'coingecko_public'
+            }
+            for coin_id, coin_data in data.items()
+            if coin_data.get('usd')
+        }
+
+    async def _fetch_public_fallback(self, coin_id: str) -> Optional[Dict[str, Any]]:
+        """Hedged lookup across the other public sources for coins the batch did not return"""
+        from public_api_endpoints import public_apis
+        symbol = next((ticker for ticker, known_id in SYMBOL_TO_COINGECKO_ID.items() if known_id == coin_id), coin_id)
+        result = await public_apis.get_crypto_price_multi_source(symbol)
+        return None if 'error' in result else result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit, coalescing and upstream counters"""
+        return {**self.stats, 'cached_coins': len(self._cache), 'in_flight': len(self._in_flight)}
+
+# Global instance
+price_oracle = PriceOracle()
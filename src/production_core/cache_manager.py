@@ -6,6 +6,7 @@ Production-grade caching system with:
 - L1 (Memory): Ultra-fast access <10ms
 - L2 (Redis): Fast distributed cache <50ms  
 - L3 (Database): Persistent cache <200ms
+- Promotion between tiers on hit and tag invalidation across all tiers
 - Predictive pre-loading based on usage patterns
 - Intelligent cache invalidation and warming
 - Performance monitoring and optimization
@@ -14,150 +15,252 @@ Production-grade caching system with:
 import asyncio
 import hashlib
 import json
+import math
+import os
+import sqlite3
+import sys
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union, Callable
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 from collections import defaultdict, OrderedDict
 import logging
 import weakref
 
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# L2/L3 payloads: one marker byte, then JSON of {"v": value, "t": tags}, zlib-compressed when large
+_RAW_PAYLOAD = b'j'
+_COMPRESSED_PAYLOAD = b'z'
+
+# (value, remaining ttl in seconds or None, tags) as read back from L2 or L3
+TierHit = Tuple[Any, Optional[int], List[str]]
+
+# Adds a key to an L2 tag set and keeps the set alive at least as long as its longest-lived member:
+# a new set takes the member's TTL, a longer TTL extends it, and a member without one makes it persistent
+_L2_TAG_ADD_SCRIPT = """
+local existed = redis.call('EXISTS', KEYS[1])
+redis.call('SADD', KEYS[1], ARGV[1])
+local ttl = tonumber(ARGV[2])
+if ttl <= 0 then
+    redis.call('PERSIST', KEYS[1])
+elseif existed == 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+else
+    local remaining = redis.call('TTL', KEYS[1])
+    if remaining >= 0 and remaining < ttl then
+        redis.call('EXPIRE', KEYS[1], ttl)
+    end
+end
+"""
+
+
+def encode_payload(value: Any, tags: Optional[List[str]] = None, compress_min_bytes: int = 512) -> bytes:
+    """Serialize a value for the shared tiers; raises TypeError for values JSON cannot represent"""
+    raw = json.dumps({'v': value, 't': tags or []}, separators=(',', ':')).encode('utf-8')
+    if len(raw) >= compress_min_bytes:
+        return _COMPRESSED_PAYLOAD + zlib.compress(raw, 6)
+    return _RAW_PAYLOAD + raw
+
+
+def decode_payload(payload: bytes) -> Tuple[Any, List[str]]:
+    marker, body = payload[:1], payload[1:]
+    if marker == _COMPRESSED_PAYLOAD:
+        body = zlib.decompress(body)
+    data = json.loads(body)
+    return data['v'], data.get('t') or []
+
+
+_SCALAR_TYPES = frozenset({bool, int, float, type(None)})
+
+
+def estimate_size(value: Any, sample: int = 4, depth: int = 3) -> int:
+    """
+    Approximate payload size in bytes without serializing. Strings and bytes are
+    measured exactly; containers are extrapolated from their first few items.
+    """
+    kind = type(value)
+    if kind is str or kind is bytes or kind is bytearray:
+        return len(value)
+    if kind in _SCALAR_TYPES:
+        return 8
+    if depth <= 0:
+        return sys.getsizeof(value)
+    if kind is dict:
+        count = len(value)
+        if not count:
+            return 2
+        total = seen = 0
+        for key, item in value.items():
+            key_size = len(key) if type(key) is str else estimate_size(key, sample, depth - 1)
+            total += key_size + estimate_size(item, sample, depth - 1)
+            seen += 1
+            if seen == sample:
+                break
+        return 2 + total * count // seen
+    if kind is list or kind is tuple or kind is set or kind is frozenset:
+        count = len(value)
+        if not count:
+            return 2
+        total = seen = 0
+        for item in value:
+            total += estimate_size(item, sample, depth - 1)
+            seen += 1
+            if seen == sample:
+                break
+        return 2 + total * count // seen
+    return sys.getsizeof(value)
+
+
+def json_size(value: Any) -> int:
+    """Exact serialized size; precise but costs a full json.dumps per set"""
+    try:
+        return len(json.dumps(value, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return len(str(value).encode('utf-8'))
+
 
-@dataclass
 class CacheEntry:
-    """Represents a cache entry with metadata"""
-    value: Any
-    created_at: datetime
-    last_accessed: datetime
-    access_count: int
-    ttl: Optional[int] = None
-    tags: List[str] = None
-    size_bytes: int = 0
-    
-    def __post_init__(self):
-        if self.tags is None:
-            self.tags = []
-        if self.size_bytes == 0:
-            self.size_bytes = self._calculate_size()
-    
-    def _calculate_size(self) -> int:
-        """Estimate memory size of cached value"""
-        try:
-            return len(json.dumps(self.value, default=str).encode('utf-8'))
-        except (TypeError, ValueError):
-            return len(str(self.value).encode('utf-8'))
-    
-    def is_expired(self) -> bool:
+    """Represents a cache entry with metadata; expiry uses the monotonic clock"""
+    
+    __slots__ = ('value', 'created_at', 'expires_at', 'access_count', 'ttl', 'tags', 'size_bytes')
+    
+    def __init__(self, value: Any, ttl: Optional[int] = None, tags: Optional[List[str]] = None,
+                 size_bytes: int = 0, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.value = value
+        self.created_at = now
+        self.expires_at = now + ttl if ttl else None
+        self.access_count = 1
+        self.ttl = ttl
+        self.tags = tags or []
+        self.size_bytes = size_bytes
+    
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Check if cache entry has expired"""
-        if self.ttl is None:
+        if self.expires_at is None:
             return False
-        return datetime.utcnow() > self.created_at + timedelta(seconds=self.ttl)
+        return (time.monotonic() if now is None else now) >= self.expires_at
     
     def update_access(self):
         """Update access statistics"""
-        self.last_accessed = datetime.utcnow()
         self.access_count += 1
 
 
 class LRUCache:
-    """Thread-safe LRU cache with size limits"""
+    """
+    LRU cache with entry-count and memory limits.
+    Every operation runs without awaiting, so it is atomic on the event loop and
+    needs no lock; reads are a dict lookup, an expiry check and an LRU bump. Sizes come
+    from a pluggable estimator (sampled by default), and a tag -> keys index makes
+    clear_by_tags proportional to the number of tagged entries.
+    """
     
-    def __init__(self, max_size: int = 1000, max_memory_mb: int = 100):
+    def __init__(self, max_size: int = 1000, max_memory_mb: int = 100,
+                 size_estimator: Callable[[Any], int] = estimate_size):
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.size_estimator = size_estimator
         self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.tag_index: Dict[str, set] = {}
         self.current_memory = 0
-        self._lock = asyncio.Lock()
+        self.evictions = 0
+    
+    def get_nowait(self, key: str) -> Optional[Any]:
+        """Synchronous read fast path"""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+            self._remove(key)
+            return None
+        
+        # Move to end (most recently used)
+        self.cache.move_to_end(key)
+        entry.access_count += 1
+        return entry.value
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache with LRU update"""
-        async with self._lock:
-            if key not in self.cache:
-                return None
-            
-            entry = self.cache[key]
-            if entry.is_expired():
-                del self.cache[key]
-                self.current_memory -= entry.size_bytes
-                return None
-            
-            # Move to end (most recently used)
-            self.cache.move_to_end(key)
-            entry.update_access()
-            return entry.value
+        return self.get_nowait(key)
+    
+    def set_nowait(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None,
+                   size_bytes: Optional[int] = None) -> bool:
+        """Synchronous write; size_bytes skips estimation when the caller already knows it"""
+        if size_bytes is None:
+            size_bytes = self.size_estimator(value)
+        entry = CacheEntry(value, ttl, tags, size_bytes)
+        
+        # Remove existing entry if present
+        if key in self.cache:
+            self._remove(key)
+        
+        # Check memory limits
+        while self.current_memory + entry.size_bytes > self.max_memory_bytes and self.cache:
+            self._evict_lru()
+        
+        # Add new entry
+        self.cache[key] = entry
+        self.current_memory += entry.size_bytes
+        for tag in entry.tags:
+            self.tag_index.setdefault(tag, set()).add(key)
+        
+        # Evict if size limit exceeded
+        while len(self.cache) > self.max_size:
+            self._evict_lru()
+        
+        return True
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None) -> bool:
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None,
+                  size_bytes: Optional[int] = None) -> bool:
         """Set value in cache with automatic eviction"""
-        async with self._lock:
-            entry = CacheEntry(
-                value=value,
-                created_at=datetime.utcnow(),
-                last_accessed=datetime.utcnow(),
-                access_count=1,
-                ttl=ttl,
-                tags=tags or []
-            )
-            
-            # Remove existing entry if present
-            if key in self.cache:
-                old_entry = self.cache[key]
-                self.current_memory -= old_entry.size_bytes
-                del self.cache[key]
-            
-            # Check memory limits
-            if self.current_memory + entry.size_bytes > self.max_memory_bytes:
-                await self._evict_to_fit(entry.size_bytes)
-            
-            # Add new entry
-            self.cache[key] = entry
-            self.current_memory += entry.size_bytes
-            
-            # Evict if size limit exceeded
-            while len(self.cache) > self.max_size:
-                await self._evict_lru()
-            
-            return True
+        return self.set_nowait(key, value, ttl, tags, size_bytes)
     
-    async def _evict_to_fit(self, required_bytes: int):
-        """Evict entries to fit new entry"""
-        while self.current_memory + required_bytes > self.max_memory_bytes and self.cache:
-            await self._evict_lru()
-    
-    async def _evict_lru(self):
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return None
+        self.current_memory -= entry.size_bytes
+        for tag in entry.tags:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+        return entry
+    
+    def _evict_lru(self):
         """Evict least recently used entry"""
         if not self.cache:
             return
         
-        key, entry = self.cache.popitem(last=False)
-        self.current_memory -= entry.size_bytes
+        key = next(iter(self.cache))
+        self._remove(key)
+        self.evictions += 1
         logger.debug(f"Evicted cache entry: {key}")
     
     async def delete(self, key: str) -> bool:
         """Delete specific cache entry"""
-        async with self._lock:
-            if key in self.cache:
-                entry = self.cache[key]
-                self.current_memory -= entry.size_bytes
-                del self.cache[key]
-                return True
-            return False
+        return self._remove(key) is not None
     
     async def clear_by_tags(self, tags: List[str]) -> int:
         """Clear all entries with specified tags"""
-        async with self._lock:
-            keys_to_delete = []
-            for key, entry in self.cache.items():
-                if any(tag in entry.tags for tag in tags):
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                entry = self.cache[key]
-                self.current_memory -= entry.size_bytes
-                del self.cache[key]
-            
-            return len(keys_to_delete)
+        keys_to_delete = set()
+        for tag in tags:
+            keys_to_delete.update(self.tag_index.get(tag, ()))
+        
+        for key in keys_to_delete:
+            self._remove(key)
+        
+        return len(keys_to_delete)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -166,7 +269,9 @@ class LRUCache:
             'max_size': self.max_size,
             'memory_usage_mb': self.current_memory / (1024 * 1024),
             'max_memory_mb': self.max_memory_bytes / (1024 * 1024),
-            'memory_utilization': self.current_memory / self.max_memory_bytes if self.max_memory_bytes > 0 else 0
+            'memory_utilization': self.current_memory / self.max_memory_bytes if self.max_memory_bytes > 0 else 0,
+            'tags': len(self.tag_index),
+            'evictions': self.evictions
         }
 
 
@@ -256,18 +361,29 @@ class IntelligentCacheManager:
                  l1_max_size: int = 1000,
                  l1_max_memory_mb: int = 100,
                  enable_predictive_loading: bool = True,
-                 enable_performance_monitoring: bool = True):
+                 enable_performance_monitoring: bool = True,
+                 redis_url: Optional[str] = None,
+                 db_path: Optional[str] = None,
+                 namespace: str = "mobius:cache",
+                 compress_min_bytes: int = 512):
         
         # L1 Cache (Memory)
         self.l1_cache = LRUCache(l1_max_size, l1_max_memory_mb)
         
-        # L2 Cache (Redis) - Will be initialized if Redis is available
+        # L2 Cache (Redis) - connected by initialize() if Redis is reachable
+        self.redis_url = redis_url
+        self.namespace = namespace
+        self.compress_min_bytes = compress_min_bytes
         self.l2_cache = None
+        self._l2_tag_add = None
         self.redis_available = False
         
-        # L3 Cache (Database) - Will be initialized if database is available
-        self.l3_cache = None
+        # L3 Cache (SQLite) - opened by initialize(); one connection used from a single thread
+        self.db_path = db_path
+        self.l3_cache: Optional[sqlite3.Connection] = None
         self.db_available = False
+        self._l3_executor: Optional[ThreadPoolExecutor] = None
+        self._l3_writes = 0
         
         # Predictive loading
         self.predictive_loader = PredictiveLoader() if enable_predictive_loading else None
@@ -283,7 +399,12 @@ class IntelligentCacheManager:
             'l3_misses': 0,
             'total_requests': 0,
             'avg_response_time_ms': 0,
-            'predictive_hits': 0
+            'predictive_hits': 0,
+            'l2_errors': 0,
+            'l3_errors': 0,
+            'l2_bytes_written': 0,
+            'l3_bytes_written': 0,
+            'uncacheable_values': 0
         }
         
         # Cache warming tasks
@@ -291,6 +412,59 @@ class IntelligentCacheManager:
         
         logger.info("Intelligent Cache Manager initialized")
     
+    async def initialize(self, redis_client: Optional[Any] = None) -> Dict[str, bool]:
+        """
+        Connect the L2 and L3 tiers. Either tier is skipped when unconfigured or
+        unreachable, leaving the cache working with the tiers that are available.
+        
+        Args:
+            redis_client: Ready redis.asyncio-compatible client to use instead of redis_url
+        """
+        if redis_client is None and self.redis_url and REDIS_AVAILABLE:
+            redis_client = aioredis.from_url(self.redis_url)
+        elif redis_client is None and self.redis_url:
+            logger.warning("redis package not installed, L2 cache disabled")
+        
+        if redis_client is not None:
+            try:
+                await redis_client.ping()
+                self.l2_cache = redis_client
+                self._l2_tag_add = redis_client.register_script(_L2_TAG_ADD_SCRIPT)
+                self.redis_available = True
+                logger.info("L2 cache (Redis) connected")
+            except Exception as e:
+                logger.warning(f"L2 cache (Redis) unavailable: {e}")
+        
+        if self.db_path and not self.db_available:
+            try:
+                self._l3_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-l3")
+                self.l3_cache = await self._run_l3(self._open_l3)
+                self.db_available = True
+                purged = await self._run_l3(self._purge_l3_expired)
+                logger.info(f"L3 cache (SQLite) opened at {self.db_path}, purged {purged} expired entries")
+            except Exception as e:
+                logger.warning(f"L3 cache (SQLite) unavailable: {e}")
+        
+        return {'l2': self.redis_available, 'l3': self.db_available}
+    
+    async def close(self):
+        """Release the L2 connection pool and the L3 database"""
+        if self.l2_cache is not None:
+            try:
+                await self.l2_cache.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing L2 cache: {e}")
+            self.l2_cache = None
+            self._l2_tag_add = None
+            self.redis_available = False
+        
+        if self.l3_cache is not None:
+            connection, self.l3_cache = self.l3_cache, None
+            self.db_available = False
+            await asyncio.get_running_loop().run_in_executor(self._l3_executor, connection.close)
+            self._l3_executor.shutdown(wait=True)
+            self._l3_executor = None
+    
     async def get(self, key: str, user_id: Optional[int] = None) -> Optional[Any]:
         """
         Get value from cache with intelligent tier fallback
@@ -318,11 +492,12 @@ class IntelligentCacheManager:
             
             # Try L2 cache (Redis)
             if self.redis_available and self.l2_cache:
-                value = await self._get_from_l2(key)
-                if value is not None:
+                hit = await self._get_from_l2(key)
+                if hit is not None:
+                    value, ttl, tags = hit
                     self.metrics['l2_hits'] += 1
-                    # Promote to L1
-                    await self.l1_cache.set(key, value)
+                    # Promote to L1 with the remaining lifetime
+                    await self.l1_cache.set(key, value, ttl, tags)
                     await self._record_access(key, user_id)
                     await self._trigger_predictive_loading(key, user_id)
                     return value
@@ -331,13 +506,14 @@ class IntelligentCacheManager:
             
             # Try L3 cache (Database)
             if self.db_available and self.l3_cache:
-                value = await self._get_from_l3(key)
-                if value is not None:
+                hit = await self._get_from_l3(key)
+                if hit is not None:
+                    value, ttl, tags = hit
                     self.metrics['l3_hits'] += 1
-                    # Promote to L1 and L2
-                    await self.l1_cache.set(key, value)
+                    # Promote to L1 and L2 with the remaining lifetime
+                    await self.l1_cache.set(key, value, ttl, tags)
                     if self.redis_available and self.l2_cache:
-                        await self._set_to_l2(key, value)
+                        await self._set_to_l2(key, value, ttl, tags)
                     await self._record_access(key, user_id)
                     await self._trigger_predictive_loading(key, user_id)
                     return value
@@ -524,52 +700,253 @@ class IntelligentCacheManager:
             'l1_hit_rate_percent': (self.metrics['l1_hits'] / total_requests * 100) if total_requests > 0 else 0,
             'cache_efficiency': hit_rate,
             'l1_stats': self.l1_cache.get_stats(),
+            'l2_available': self.redis_available,
+            'l3_available': self.db_available,
             'active_warming_tasks': len(self._warming_tasks)
         }
     
-    # Placeholder methods for L2 and L3 cache operations
-    # These would be implemented with actual Redis and Database connections
+    # L2 cache operations (Redis)
+    # Values live under <namespace>:v:<key> with a native expiry; each tag is a set of the keys carrying it,
+    # expiring no earlier than its longest-lived member and pruned when members are deleted or invalidated
     
-    async def _get_from_l2(self, key: str) -> Optional[Any]:
+    def _l2_key(self, key: str) -> str:
+        return f"{self.namespace}:v:{key}"
+    
+    def _l2_tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+    
+    def _encode(self, key: str, value: Any, tags: Optional[List[str]]) -> Optional[bytes]:
+        try:
+            return encode_payload(value, tags, self.compress_min_bytes)
+        except (TypeError, ValueError):
+            self.metrics['uncacheable_values'] += 1
+            logger.debug(f"Value for '{key}' is not JSON serializable, kept in L1 only")
+            return None
+    
+    @staticmethod
+    def _payload_tags(payload: Optional[bytes]) -> List[str]:
+        if payload is None:
+            return []
+        try:
+            return decode_payload(payload)[1]
+        except Exception:
+            return []
+    
+    async def _get_from_l2(self, key: str) -> Optional[TierHit]:
         """Get from L2 cache (Redis)"""
-        # Placeholder - would implement Redis get
-        return None
+        try:
+            async with self.l2_cache.pipeline(transaction=False) as pipe:
+                pipe.get(self._l2_key(key))
+                pipe.pttl(self._l2_key(key))
+                payload, pttl = await pipe.execute()
+            if payload is None:
+                return None
+            value, tags = decode_payload(payload)
+            ttl = math.ceil(pttl / 1000) if pttl and pttl > 0 else None
+            return value, ttl, tags
+        except Exception as e:
+            self.metrics['l2_errors'] += 1
+            logger.warning(f"L2 cache get failed for '{key}': {e}")
+            return None
     
     async def _set_to_l2(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None):
         """Set to L2 cache (Redis)"""
-        # Placeholder - would implement Redis set
-        pass
+        payload = self._encode(key, value, tags)
+        if payload is None:
+            return
+        try:
+            async with self.l2_cache.pipeline(transaction=False) as pipe:
+                pipe.set(self._l2_key(key), payload, ex=ttl if ttl else None)
+                for tag in tags or []:
+                    await self._l2_tag_add(keys=[self._l2_tag_key(tag)], args=[key, ttl or 0], client=pipe)
+                await pipe.execute()
+            self.metrics['l2_bytes_written'] += len(payload)
+        except Exception as e:
+            self.metrics['l2_errors'] += 1
+            logger.warning(f"L2 cache set failed for '{key}': {e}")
     
     async def _delete_from_l2(self, key: str):
         """Delete from L2 cache (Redis)"""
-        # Placeholder - would implement Redis delete
-        pass
+        try:
+            value_key = self._l2_key(key)
+            tags = self._payload_tags(await self.l2_cache.get(value_key))
+            async with self.l2_cache.pipeline(transaction=False) as pipe:
+                pipe.delete(value_key)
+                for tag in tags:
+                    pipe.srem(self._l2_tag_key(tag), key)
+                await pipe.execute()
+        except Exception as e:
+            self.metrics['l2_errors'] += 1
+            logger.warning(f"L2 cache delete failed for '{key}': {e}")
     
     async def _clear_l2_by_tags(self, tags: List[str]) -> int:
         """Clear L2 cache by tags"""
-        # Placeholder - would implement Redis tag-based clearing
-        return 0
-    
-    async def _get_from_l3(self, key: str) -> Optional[Any]:
+        cleared = 0
+        try:
+            for tag in tags:
+                tag_key = self._l2_tag_key(tag)
+                members = [member.decode('utf-8') if isinstance(member, bytes) else member
+                           for member in await self.l2_cache.smembers(tag_key)]
+                if not members:
+                    await self.l2_cache.delete(tag_key)
+                    continue
+                keys = [self._l2_key(member) for member in members]
+                payloads = await self.l2_cache.mget(keys)
+                async with self.l2_cache.pipeline(transaction=False) as pipe:
+                    pipe.delete(*keys)
+                    # Drop the cleared keys from the other tag sets they were in
+                    for member, payload in zip(members, payloads):
+                        for other in self._payload_tags(payload):
+                            if other != tag:
+                                pipe.srem(self._l2_tag_key(other), member)
+                    pipe.delete(tag_key)
+                    results = await pipe.execute()
+                cleared += results[0]
+        except Exception as e:
+            self.metrics['l2_errors'] += 1
+            logger.warning(f"L2 cache tag clear failed for {tags}: {e}")
+        return cleared
+    
+    # L3 cache operations (SQLite)
+    # Blocking sqlite3 calls run on a dedicated single-thread executor so the event loop never waits on disk
+    
+    async def _run_l3(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._l3_executor, func, *args)
+    
+    def _open_l3(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at);
+            CREATE TABLE IF NOT EXISTS cache_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags(key);
+        """)
+        connection.commit()
+        return connection
+    
+    def _purge_l3_expired(self) -> int:
+        connection = self.l3_cache
+        now = time.time()
+        connection.execute(
+            "DELETE FROM cache_tags WHERE key IN (SELECT key FROM cache_entries WHERE expires_at <= ?)", (now,)
+        )
+        purged = connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,)).rowcount
+        connection.commit()
+        return purged
+    
+    def _l3_get(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        row = self.l3_cache.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self._l3_delete(key)
+            return None
+        return row
+    
+    def _l3_set(self, key: str, payload: bytes, expires_at: Optional[float], tags: List[str]):
+        connection = self.l3_cache
+        connection.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+            (key, payload, expires_at, time.time())
+        )
+        if tags:
+            connection.executemany("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)",
+                                   [(tag, key) for tag in tags])
+        connection.commit()
+        self._l3_writes += 1
+        if self._l3_writes % 1000 == 0:
+            self._purge_l3_expired()
+    
+    def _l3_delete(self, key: str):
+        connection = self.l3_cache
+        connection.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+        connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        connection.commit()
+    
+    def _l3_clear_tags(self, tags: List[str]) -> int:
+        connection = self.l3_cache
+        placeholders = ",".join("?" * len(tags))
+        keys = [row[0] for row in connection.execute(
+            f"SELECT DISTINCT key FROM cache_tags WHERE tag IN ({placeholders})", tags
+        )]
+        cleared = 0
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            batch_placeholders = ",".join("?" * len(batch))
+            connection.execute(f"DELETE FROM cache_tags WHERE key IN ({batch_placeholders})", batch)
+            cleared += connection.execute(
+                f"DELETE FROM cache_entries WHERE key IN ({batch_placeholders})", batch
+            ).rowcount
+        connection.commit()
+        return cleared
+    
+    async def _get_from_l3(self, key: str) -> Optional[TierHit]:
         """Get from L3 cache (Database)"""
-        # Placeholder - would implement database get
-        return None
+        try:
+            row = await self._run_l3(self._l3_get, key)
+            if row is None:
+                return None
+            payload, expires_at = row
+            value, tags = decode_payload(payload)
+            ttl = max(1, math.ceil(expires_at - time.time())) if expires_at is not None else None
+            return value, ttl, tags
+        except Exception as e:
+            self.metrics['l3_errors'] += 1
+            logger.warning(f"L3 cache get failed for '{key}': {e}")
+            return None
     
     async def _set_to_l3(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None):
         """Set to L3 cache (Database)"""
-        # Placeholder - would implement database set
-        pass
+        payload = self._encode(key, value, tags)
+        if payload is None:
+            return
+        try:
+            expires_at = time.time() + ttl if ttl else None
+            await self._run_l3(self._l3_set, key, payload, expires_at, tags or [])
+            self.metrics['l3_bytes_written'] += len(payload)
+        except Exception as e:
+            self.metrics['l3_errors'] += 1
+            logger.warning(f"L3 cache set failed for '{key}': {e}")
     
     async def _delete_from_l3(self, key: str):
         """Delete from L3 cache (Database)"""
-        # Placeholder - would implement database delete
-        pass
+        try:
+            await self._run_l3(self._l3_delete, key)
+        except Exception as e:
+            self.metrics['l3_errors'] += 1
+            logger.warning(f"L3 cache delete failed for '{key}': {e}")
     
     async def _clear_l3_by_tags(self, tags: List[str]) -> int:
         """Clear L3 cache by tags"""
-        # Placeholder - would implement database tag-based clearing
-        return 0
+        if not tags:
+            return 0
+        try:
+            return await self._run_l3(self._l3_clear_tags, list(tags))
+        except Exception as e:
+            self.metrics['l3_errors'] += 1
+            logger.warning(f"L3 cache tag clear failed for {tags}: {e}")
+            return 0
 
 
-# Global cache manager instance
-cache_manager = IntelligentCacheManager()
\ No newline at end of file
+# Global cache manager instance; L2/L3 are connected by initialize()
+cache_manager = IntelligentCacheManager(
+    redis_url=os.getenv('REDIS_URL'),
+    db_path=os.getenv('CACHE_DB_PATH', 'data/cache_l3.db')
+)
\ No newline at end of file
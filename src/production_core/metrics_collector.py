@@ -9,12 +9,17 @@ Comprehensive metrics collection and analysis system with:
 - Alerting based on metric thresholds
 - Export capabilities for monitoring systems
 - Historical data retention and analysis
+
+Timers and histograms are stored as time-bucketed DDSketch rollups rather than raw
+values: recording is O(1), summaries merge one sketch per bucket, and sketches exported
+by other worker processes merge into the Prometheus output.
 """
 
 import asyncio
+import math
 import time
 import statistics
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Callable, Union
 from dataclasses import dataclass, field
 from collections import defaultdict, deque
@@ -76,6 +81,10 @@ class MetricDefinition:
     retention_hours: int = 24
     max_values: int = 10000
     
+    # Sketch settings (timers and histograms)
+    rollup_seconds: int = 60
+    relative_accuracy: float = 0.01
+    
     # Alerting thresholds
     warning_threshold: Optional[float] = None
     critical_threshold: Optional[float] = None
@@ -125,24 +134,20 @@ class TimeSeries:
         self.max_size = max_size
         self.retention_hours = retention_hours
         self.values: deque[MetricValue] = deque(maxlen=max_size)
-        self._lock = asyncio.Lock()
+    
+    # No method awaits while touching self.values, so each one is atomic on the event loop
     
     async def add_value(self, value: Union[int, float], tags: Dict[str, str] = None):
         """Add a value to the time series"""
-        async with self._lock:
-            metric_value = MetricValue(
-                value=value,
-                timestamp=datetime.utcnow(),
-                tags=tags or {}
-            )
-            self.values.append(metric_value)
-            
-            # Clean old values based on retention
-            await self._clean_old_values()
+        now = datetime.utcnow()
+        self.values.append(MetricValue(value=value, timestamp=now, tags=tags or {}))
+        
+        # Clean old values based on retention
+        self._clean_old_values(now)
     
-    async def _clean_old_values(self):
+    def _clean_old_values(self, now: datetime):
         """Remove values older than retention period"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        cutoff_time = now - timedelta(hours=self.retention_hours)
         
         while self.values and self.values[0].timestamp < cutoff_time:
             self.values.popleft()
@@ -150,22 +155,20 @@ class TimeSeries:
     async def get_values(self, start_time: Optional[datetime] = None, 
                         end_time: Optional[datetime] = None) -> List[MetricValue]:
         """Get values within time range"""
-        async with self._lock:
-            if not start_time and not end_time:
-                return list(self.values)
-            
-            start_time = start_time or datetime.min
-            end_time = end_time or datetime.utcnow()
-            
-            return [
-                value for value in self.values
-                if start_time <= value.timestamp <= end_time
-            ]
+        if not start_time and not end_time:
+            return list(self.values)
+        
+        start_time = start_time or datetime.min
+        end_time = end_time or datetime.utcnow()
+        
+        return [
+            value for value in self.values
+            if start_time <= value.timestamp <= end_time
+        ]
     
     async def get_latest_value(self) -> Optional[MetricValue]:
         """Get the most recent value"""
-        async with self._lock:
-            return self.values[-1] if self.values else None
+        return self.values[-1] if self.values else None
     
     async def calculate_summary(self, start_time: Optional[datetime] = None,
                                end_time: Optional[datetime] = None) -> Optional[MetricSummary]:
@@ -204,6 +207,266 @@ class TimeSeries:
         return sorted_values[index]
 
 
+# Magnitudes below this are counted as zero by DDSketch
+MIN_INDEXABLE_VALUE = 1e-9
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch with relative accuracy (DDSketch). Values fall into
+    logarithmic buckets of ratio gamma, so every quantile is within relative_accuracy
+    of the true value; recording is O(1) and two sketches merge by adding bucket counts.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float, weight: int = 1):
+        if value > MIN_INDEXABLE_VALUE:
+            store = self.positive
+            key = math.ceil(math.log(value) / self._log_gamma)
+        elif value < -MIN_INDEXABLE_VALUE:
+            store = self.negative
+            key = math.ceil(math.log(-value) / self._log_gamma)
+        else:
+            store = None
+            self.zero_count += weight
+        if store is not None:
+            store[key] = store.get(key, 0) + weight
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        
+        self.count += weight
+        self.sum += value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def _collapse(self, store: Dict[int, int]):
+        """Fold the smallest-magnitude buckets together to stay within max_buckets"""
+        keys = sorted(store)
+        excess = len(keys) - self.max_buckets
+        store[keys[excess]] = sum(store.pop(key) for key in keys[:excess + 1])
+    
+    def merge(self, other: "DDSketch"):
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, weight in other_store.items():
+                store[key] = store.get(key, 0) + weight
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+    
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        # Ascending order: most negative values first, then zero, then positive values
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(-self._bucket_value(key), self.min)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self._bucket_value(key), self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, for merging across processes"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(key): weight for key, weight in self.positive.items()},
+            'negative': {str(key): weight for key, weight in self.negative.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = {int(key): weight for key, weight in data['positive'].items()}
+        sketch.negative = {int(key): weight for key, weight in data['negative'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+
+class SketchRollup:
+    """One time bucket of a SketchSeries"""
+    
+    __slots__ = ('start', 'sketch', 'mean', 'm2', 'first_timestamp', 'last_timestamp')
+    
+    def __init__(self, start: float, relative_accuracy: float):
+        self.start = start
+        self.sketch = DDSketch(relative_accuracy)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.first_timestamp = start
+        self.last_timestamp = start
+
+
+class SketchSeries:
+    """
+    Timer/histogram storage: one DDSketch (plus running mean and variance) per
+    rollup_seconds bucket, kept for retention_hours. A small ring of recent raw values
+    serves latest-value lookups and exports. Lifetime count and sum are kept apart from the
+    buckets, so they only grow as buckets age out.
+    """
+    
+    def __init__(self, rollup_seconds: int = 60, retention_hours: int = 24,
+                 relative_accuracy: float = 0.01, recent_values: int = 100):
+        self.rollup_seconds = rollup_seconds
+        self.retention_hours = retention_hours
+        self.relative_accuracy = relative_accuracy
+        self.rollups: deque[SketchRollup] = deque()
+        self.recent: deque = deque(maxlen=recent_values)
+        self.total_count = 0
+        self.total_sum = 0.0
+    
+    def record(self, value: Union[int, float], tags: Dict[str, str] = None, timestamp: Optional[float] = None):
+        now = time.time() if timestamp is None else timestamp
+        rollup = self.rollups[-1] if self.rollups else None
+        if rollup is None or now >= rollup.start + self.rollup_seconds:
+            start = now - now % self.rollup_seconds
+            rollup = SketchRollup(start, self.relative_accuracy)
+            rollup.first_timestamp = now
+            self.rollups.append(rollup)
+            # Retention is only checked when a new bucket opens
+            cutoff = now - self.retention_hours * 3600
+            while self.rollups[0].start + self.rollup_seconds <= cutoff:
+                self.rollups.popleft()
+        
+        rollup.sketch.add(value)
+        delta = value - rollup.mean
+        rollup.mean += delta / rollup.sketch.count
+        rollup.m2 += delta * (value - rollup.mean)
+        rollup.last_timestamp = now
+        self.recent.append((value, now, tags))
+        self.total_count += 1
+        self.total_sum += value
+    
+    async def add_value(self, value: Union[int, float], tags: Dict[str, str] = None):
+        """Add a value to the series"""
+        self.record(value, tags)
+    
+    @staticmethod
+    def _to_timestamp(moment: Optional[datetime], default: float) -> float:
+        if moment is None:
+            return default
+        return moment.replace(tzinfo=timezone.utc).timestamp()
+    
+    def _rollups_in_range(self, start_time: Optional[datetime], end_time: Optional[datetime]) -> List[SketchRollup]:
+        start = self._to_timestamp(start_time, -math.inf)
+        end = self._to_timestamp(end_time, math.inf)
+        return [rollup for rollup in self.rollups
+                if rollup.start <= end and rollup.start + self.rollup_seconds > start]
+    
+    def merged_sketch(self, start_time: Optional[datetime] = None,
+                      end_time: Optional[datetime] = None) -> DDSketch:
+        """Merge the sketches of every bucket overlapping the range"""
+        sketch = DDSketch(self.relative_accuracy)
+        for rollup in self._rollups_in_range(start_time, end_time):
+            sketch.merge(rollup.sketch)
+        return sketch
+    
+    async def get_values(self, start_time: Optional[datetime] = None,
+                         end_time: Optional[datetime] = None) -> List[MetricValue]:
+        """Recent raw values within time range"""
+        start = self._to_timestamp(start_time, -math.inf)
+        end = self._to_timestamp(end_time, math.inf)
+        return [
+            MetricValue(value=value, timestamp=datetime.utcfromtimestamp(timestamp), tags=tags or {})
+            for value, timestamp, tags in self.recent
+            if start <= timestamp <= end
+        ]
+    
+    async def get_latest_value(self) -> Optional[MetricValue]:
+        """Get the most recent value"""
+        if not self.recent:
+            return None
+        value, timestamp, tags = self.recent[-1]
+        return MetricValue(value=value, timestamp=datetime.utcfromtimestamp(timestamp), tags=tags or {})
+    
+    async def calculate_summary(self, start_time: Optional[datetime] = None,
+                                end_time: Optional[datetime] = None) -> Optional[MetricSummary]:
+        """Summary over the buckets overlapping the range (bucket granularity)"""
+        rollups = [rollup for rollup in self._rollups_in_range(start_time, end_time) if rollup.sketch.count]
+        if not rollups:
+            return None
+        
+        sketch = DDSketch(self.relative_accuracy)
+        count, mean, m2 = 0, 0.0, 0.0
+        for rollup in rollups:
+            sketch.merge(rollup.sketch)
+            # Chan et al. parallel variance combination
+            n = rollup.sketch.count
+            delta = rollup.mean - mean
+            total = count + n
+            mean += delta * n / total
+            m2 += rollup.m2 + delta * delta * count * n / total
+            count = total
+        
+        return MetricSummary(
+            name="",  # Will be set by caller
+            count=count,
+            sum_value=sketch.sum,
+            min_value=sketch.min,
+            max_value=sketch.max,
+            avg_value=mean,
+            median_value=sketch.quantile(0.5),
+            std_dev=math.sqrt(m2 / (count - 1)) if count > 1 else 0,
+            percentile_90=sketch.quantile(0.90),
+            percentile_95=sketch.quantile(0.95),
+            percentile_99=sketch.quantile(0.99),
+            first_timestamp=datetime.utcfromtimestamp(rollups[0].first_timestamp),
+            last_timestamp=datetime.utcfromtimestamp(rollups[-1].last_timestamp)
+        )
+
+
+# Metric types stored as sketches rather than raw values
+SKETCH_METRIC_TYPES = frozenset({MetricType.TIMER, MetricType.HISTOGRAM})
+
+# Quantiles reported for sketch-backed metrics in the Prometheus export
+PROMETHEUS_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# The quantiles cover this recent window; _sum and _count are cumulative since the series started
+PROMETHEUS_QUANTILE_WINDOW_SECONDS = 300
+
+
 class MetricCollector:
     """
     Production-grade metrics collection system
@@ -218,7 +481,7 @@ class MetricCollector:
     
     def __init__(self):
         self.metrics: Dict[str, MetricDefinition] = {}
-        self.time_series: Dict[str, TimeSeries] = {}
+        self.time_series: Dict[str, Union[TimeSeries, SketchSeries]] = {}
         self.alert_handlers: List[Callable] = []
         
         # Aggregation tasks
@@ -238,12 +501,22 @@ class MetricCollector:
     def define_metric(self, definition: MetricDefinition):
         """Define a new metric for collection"""
         self.metrics[definition.name] = definition
-        self.time_series[definition.name] = TimeSeries(
+        self.time_series[definition.name] = self._create_series(definition)
+        
+        logger.info(f"Defined metric: {definition.name} ({definition.metric_type.value})")
+    
+    @staticmethod
+    def _create_series(definition: MetricDefinition) -> Union[TimeSeries, SketchSeries]:
+        if definition.metric_type in SKETCH_METRIC_TYPES:
+            return SketchSeries(
+                rollup_seconds=definition.rollup_seconds,
+                retention_hours=definition.retention_hours,
+                relative_accuracy=definition.relative_accuracy
+            )
+        return TimeSeries(
             max_size=definition.max_values,
             retention_hours=definition.retention_hours
         )
-        
-        logger.info(f"Defined metric: {definition.name} ({definition.metric_type.value})")
     
     def add_alert_handler(self, handler: Callable[[str, MetricValue, MetricDefinition], None]):
         """Add alert handler for threshold violations"""
@@ -402,12 +675,18 @@ class MetricCollector:
     
     async def export_metrics(self, format_type: str = "json", 
                            start_time: Optional[datetime] = None,
-                           end_time: Optional[datetime] = None) -> str:
-        """Export metrics in specified format"""
+                           end_time: Optional[datetime] = None,
+                           peer_sketches: Optional[List[Dict[str, Dict[str, Any]]]] = None) -> str:
+        """
+        Export metrics in specified format; peer_sketches are other workers' "sketch" exports.
+        Sketch exports cover the Prometheus quantile window unless a start_time is given.
+        """
         if format_type.lower() == "json":
             return await self._export_json(start_time, end_time)
         elif format_type.lower() == "prometheus":
-            return await self._export_prometheus()
+            return await self._export_prometheus(peer_sketches)
+        elif format_type.lower() == "sketch":
+            return json.dumps(self.export_sketches(start_time or self._quantile_window_start(), end_time))
         else:
             raise ValueError(f"Unsupported export format: {format_type}")
     
@@ -436,13 +715,64 @@ class MetricCollector:
                 'values': [value.to_dict() for value in values]
             }
         
-        return json.dumps(export_data, indent=2)
+        return json.dumps(export_data, indent=2, default=str)
+    
+    def export_sketches(self, start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Merged sketch of every timer and histogram, serializable for other processes, with the
+        series' lifetime count and sum as total_count and total_sum
+        """
+        return {
+            name: {**series.merged_sketch(start_time, end_time).to_dict(),
+                   'total_count': series.total_count, 'total_sum': series.total_sum}
+            for name, series in self.time_series.items()
+            if isinstance(series, SketchSeries)
+        }
+    
+    @staticmethod
+    def _quantile_window_start() -> datetime:
+        return datetime.utcnow() - timedelta(seconds=PROMETHEUS_QUANTILE_WINDOW_SECONDS)
     
-    async def _export_prometheus(self) -> str:
+    async def _export_prometheus(self, peer_sketches: Optional[List[Dict[str, Dict[str, Any]]]] = None) -> str:
         """Export metrics in Prometheus format"""
         lines = []
         
+        # Timers and histograms: recent-window quantiles of the local sketch merged with peer sketches,
+        # and the summed lifetime totals, which never decrease
+        sketches: Dict[str, DDSketch] = {}
+        totals: Dict[str, List[float]] = {}
+        for export in [self.export_sketches(self._quantile_window_start())] + list(peer_sketches or []):
+            for name, data in export.items():
+                sketch = DDSketch.from_dict(data)
+                if name in sketches:
+                    sketches[name].merge(sketch)
+                else:
+                    sketches[name] = sketch
+                total = totals.setdefault(name, [0, 0.0])
+                total[0] += data.get('total_count', data['count'])
+                total[1] += data.get('total_sum', data['sum'])
+        
+        for name, sketch in sketches.items():
+            count, total_sum = totals[name]
+            if not count:
+                continue
+            definition = self.metrics.get(name)
+            if definition is not None and definition.description:
+                lines.append(f"# HELP {name} {definition.description}")
+            lines.append(f"# TYPE {name} summary")
+            tag_pairs = [f'{k}="{v}"' for k, v in definition.tags.items()] if definition is not None else []
+            for quantile in PROMETHEUS_QUANTILES:
+                quantile_tags = ",".join(tag_pairs + [f'quantile="{quantile}"'])
+                value = sketch.quantile(quantile) if sketch.count else float('nan')
+                lines.append(f"{name}{{{quantile_tags}}} {value}")
+            tags_str = "{" + ",".join(tag_pairs) + "}" if tag_pairs else ""
+            lines.append(f"{name}_sum{tags_str} {total_sum}")
+            lines.append(f"{name}_count{tags_str} {count}")
+        
         for name, definition in self.metrics.items():
+            if definition.metric_type in SKETCH_METRIC_TYPES:
+                continue
             latest_value = await self.get_latest_value(name)
             
             if latest_value is None:
@@ -471,8 +801,8 @@ class MetricCollector:
         mapping = {
             MetricType.COUNTER: "counter",
             MetricType.GAUGE: "gauge",
-            MetricType.HISTOGRAM: "histogram",
-            MetricType.TIMER: "histogram",
+            MetricType.HISTOGRAM: "summary",
+            MetricType.TIMER: "summary",
             MetricType.RATE: "gauge"
         }
         return mapping.get(metric_type, "gauge")
@@ -493,10 +823,7 @@ class MetricCollector:
         
         for name in metric_names:
             if name in self.time_series:
-                self.time_series[name] = TimeSeries(
-                    max_size=self.metrics[name].max_values,
-                    retention_hours=self.metrics[name].retention_hours
-                )
+                self.time_series[name] = self._create_series(self.metrics[name])
         
         logger.info(f"Reset {len(metric_names)} metrics")
 
@@ -23,7 +23,8 @@ from collections import defaultdict, deque
 import logging
 import threading
 from concurrent.futures import ThreadPoolExecutor
-import aiohttp
+
+from session_registry import SessionView, session_registry
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +69,7 @@ class OptimizationRule:
 
 
 class ConnectionPool:
-    """Advanced connection pool with health monitoring"""
+    """Keyed handles over the process-wide session registry with usage tracking"""
     
     def __init__(self, max_connections: int = 100, min_connections: int = 10,
                  connection_timeout: float = 30.0, idle_timeout: float = 300.0):
@@ -77,86 +78,45 @@ class ConnectionPool:
         self.connection_timeout = connection_timeout
         self.idle_timeout = idle_timeout
         
-        self.active_connections: Dict[str, aiohttp.ClientSession] = {}
-        self.idle_connections: deque = deque()
+        # Sockets live in the registry's per-host connectors; keys only track who is using them
+        self.active_connections: Dict[str, SessionView] = {}
         self.connection_stats: Dict[str, Dict[str, Any]] = defaultdict(dict)
         
         self._lock = asyncio.Lock()
         self._cleanup_task: Optional[asyncio.Task] = None
         
-    async def get_connection(self, key: str = "default") -> aiohttp.ClientSession:
-        """Get connection from pool"""
+    async def get_connection(self, key: str = "default") -> SessionView:
+        """Get a session handle for a key"""
         async with self._lock:
-            # Check if we have an active connection for this key
-            if key in self.active_connections:
-                connection = self.active_connections[key]
-                if not connection.closed:
-                    return connection
-                else:
-                    # Remove closed connection
-                    del self.active_connections[key]
-            
-            # Try to get from idle pool
-            if self.idle_connections:
-                connection = self.idle_connections.popleft()
-                if not connection.closed:
-                    self.active_connections[key] = connection
-                    return connection
-            
-            # Create new connection if under limit
-            if len(self.active_connections) < self.max_connections:
-                connection = aiohttp.ClientSession(
-                    timeout=aiohttp.ClientTimeout(total=self.connection_timeout)
-                )
+            connection = self.active_connections.get(key)
+            if connection is None:
+                connection = session_registry.session(timeout=self.connection_timeout)
                 self.active_connections[key] = connection
                 self.connection_stats[key] = {
                     'created_at': datetime.utcnow(),
                     'requests_count': 0,
                     'last_used': datetime.utcnow()
                 }
-                return connection
-            
-            # Pool is full, wait and retry
-            await asyncio.sleep(0.1)
-            return await self.get_connection(key)
+            self.connection_stats[key]['requests_count'] += 1
+            self.connection_stats[key]['last_used'] = datetime.utcnow()
+            return connection
     
     async def release_connection(self, key: str):
-        """Release connection back to pool"""
+        """Mark a key's handle as idle; its connections stay pooled in the registry"""
         async with self._lock:
-            if key in self.active_connections:
-                connection = self.active_connections[key]
-                del self.active_connections[key]
-                
-                # Add to idle pool if not closed and under limit
-                if not connection.closed and len(self.idle_connections) < self.max_connections:
-                    self.idle_connections.append(connection)
-                    self.connection_stats[key]['last_used'] = datetime.utcnow()
-                else:
-                    await connection.close()
+            if key in self.connection_stats:
+                self.connection_stats[key]['last_used'] = datetime.utcnow()
     
     async def cleanup_idle_connections(self):
-        """Clean up idle connections that have timed out"""
+        """Release handles unused for longer than the idle timeout"""
         async with self._lock:
-            now = datetime.utcnow()
-            cutoff_time = now - timedelta(seconds=self.idle_timeout)
-            
-            # Clean idle connections
-            active_idle = []
-            while self.idle_connections:
-                connection = self.idle_connections.popleft()
-                
-                # Find the key for this connection
-                connection_key = None
-                for key, stats in self.connection_stats.items():
-                    if stats.get('last_used', now) > cutoff_time:
-                        active_idle.append(connection)
-                        break
-                else:
-                    # Connection is too old, close it
-                    await connection.close()
-            
-            # Put back active idle connections
-            self.idle_connections.extend(active_idle)
+            cutoff_time = datetime.utcnow() - timedelta(seconds=self.idle_timeout)
+            for key, stats in list(self.connection_stats.items()):
+                if stats.get('last_used', cutoff_time) < cutoff_time:
+                    connection = self.active_connections.pop(key, None)
+                    del self.connection_stats[key]
+                    if connection is not None:
+                        await connection.close()
     
     async def start_cleanup_task(self):
         """Start background cleanup task"""
@@ -176,29 +136,27 @@ class ConnectionPool:
                 await asyncio.sleep(60)
     
     async def close_all(self):
-        """Close all connections"""
+        """Release all handles; the shared sessions close once no handle holds them"""
         if self._cleanup_task:
             self._cleanup_task.cancel()
         
         async with self._lock:
-            # Close active connections
-            for connection in self.active_connections.values():
-                await connection.close()
+            connections = list(self.active_connections.values())
             self.active_connections.clear()
-            
-            # Close idle connections
-            while self.idle_connections:
-                connection = self.idle_connections.popleft()
+            self.connection_stats.clear()
+            for connection in connections:
                 await connection.close()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get connection pool statistics"""
+        registry_stats = session_registry.get_stats()
         return {
             'active_connections': len(self.active_connections),
-            'idle_connections': len(self.idle_connections),
+            'open_connections': registry_stats['open_connections'],
             'max_connections': self.max_connections,
             'min_connections': self.min_connections,
-            'connection_stats': dict(self.connection_stats)
+            'connection_stats': dict(self.connection_stats),
+            'hosts': registry_stats['hosts']
         }
 
 
@@ -9,6 +9,11 @@ Multi-algorithm rate limiting with:
 - Distributed rate limiting support
 - User-based and IP-based limiting
 - Adaptive rate limiting based on system load
+
+Per-identifier state is compact: token and leaky buckets are evaluated with GCRA
+(one float per identifier) and windows with two counters. Identifiers whose state has
+decayed back to a full allowance are dropped by a timing wheel, and a Redis backend
+running the same algorithms as Lua scripts lets several bot instances share limits.
 """
 
 import asyncio
@@ -29,6 +34,11 @@ class RateLimitAlgorithm(Enum):
     SLIDING_WINDOW = "sliding_window"
     LEAKY_BUCKET = "leaky_bucket"
     FIXED_WINDOW = "fixed_window"
+    GCRA = "gcra"
+
+
+# Token and leaky buckets are both the generic cell rate algorithm with burst = capacity
+GCRA_ALGORITHMS = frozenset({RateLimitAlgorithm.TOKEN_BUCKET, RateLimitAlgorithm.LEAKY_BUCKET, RateLimitAlgorithm.GCRA})
 
 
 @dataclass
@@ -61,6 +71,315 @@ class RateLimitResult:
     limit: int = 0
 
 
+@dataclass
+class LimitDecision:
+    """Outcome of one limiter evaluation"""
+    allowed: bool
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+def gcra_acquire(tat: float, now: float, rate: float, burst: int, tokens: int = 1) -> Tuple[float, LimitDecision]:
+    """
+    Generic cell rate algorithm. The whole state is the theoretical arrival time (TAT):
+    a request is allowed while TAT stays within burst emission intervals of now. Once
+    TAT <= now the identifier has its full allowance back and its state can be dropped.
+    """
+    interval = 1.0 / rate
+    tolerance = burst * interval
+    tat = max(tat, now)
+    new_tat = tat + tokens * interval
+    if new_tat - now <= tolerance + 1e-9:
+        remaining = int((tolerance - (new_tat - now)) / interval + 1e-9)
+        return new_tat, LimitDecision(True, remaining, 0.0, new_tat - now)
+    remaining = int((tolerance - (tat - now)) / interval + 1e-9)
+    return tat, LimitDecision(False, remaining, new_tat - tolerance - now, tat - now)
+
+
+class WindowState:
+    """Counters of the current and previous fixed window"""
+    
+    __slots__ = ('index', 'previous', 'current')
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.previous = 0
+        self.current = 0
+
+
+def window_acquire(state: WindowState, now: float, window: float, limit: int, tokens: int = 1,
+                   weighted: bool = True) -> LimitDecision:
+    """
+    Fixed-size approximation of a sliding window: the previous window's count is weighted
+    by how much of it still overlaps the sliding window. weighted=False is a fixed window.
+    """
+    index = int(now // window)
+    if index != state.index:
+        state.previous = state.current if index == state.index + 1 else 0
+        state.current = 0
+        state.index = index
+    elapsed = now / window - index
+    used = (state.previous * (1 - elapsed) if weighted else 0.0) + state.current
+    window_end = (index + 1) * window
+    reset_after = window_end - now + (window if weighted else 0.0)
+    
+    if used + tokens <= limit + 1e-9:
+        state.current += tokens
+        return LimitDecision(True, int(limit - used - tokens + 1e-9), 0.0, reset_after)
+    
+    spare = limit - state.current - tokens
+    if weighted and state.previous and spare >= 0:
+        # Wait until enough of the previous window has slid out
+        retry_after = (1 - spare / state.previous - elapsed) * window
+    else:
+        retry_after = window_end - now
+    return LimitDecision(False, max(0, int(limit - used)), max(retry_after, 0.0), reset_after)
+
+
+def window_expiry(state: WindowState, window: float, weighted: bool = True) -> float:
+    """Time after which the state no longer affects decisions"""
+    return (state.index + (2 if weighted else 1)) * window
+
+
+class TimingWheel:
+    """
+    Buckets keys by expiry time (one slot per tick) so idle state is found without scanning
+    every key. Expiries past the wheel's horizon wrap around and are simply re-checked.
+    """
+    
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots: List[set] = [set() for _ in range(slots)]
+        self._cursor: Optional[int] = None
+    
+    def _slot(self, expiry: float) -> set:
+        return self.slots[int(expiry // self.tick) % len(self.slots)]
+    
+    def schedule(self, key: str, expiry: float, previous_expiry: Optional[float] = None):
+        if previous_expiry is not None:
+            if int(previous_expiry // self.tick) == int(expiry // self.tick):
+                return
+            self._slot(previous_expiry).discard(key)
+        self._slot(expiry).add(key)
+    
+    def cancel(self, key: str, expiry: float):
+        self._slot(expiry).discard(key)
+    
+    def advance(self, now: float, is_expired) -> List[str]:
+        """Remove and return keys in the slots passed since the last call that is_expired confirms"""
+        current = int(now // self.tick)
+        if self._cursor is None:
+            self._cursor = current
+        expired = []
+        for index in range(max(self._cursor, current - len(self.slots)), current):
+            slot = self.slots[index % len(self.slots)]
+            for key in [key for key in slot if is_expired(key)]:
+                slot.discard(key)
+                expired.append(key)
+        self._cursor = current
+        return expired
+    
+    def clear(self):
+        for slot in self.slots:
+            slot.clear()
+
+
+class LocalLimiterStore:
+    """In-process limiter state with idle-entry eviction"""
+    
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self._tats: Dict[str, float] = {}
+        self._windows: Dict[str, WindowState] = {}
+        self._wheel = TimingWheel(tick, slots)
+        self._window_params: Tuple[float, bool] = (60.0, True)
+        self.evicted = 0
+    
+    def count(self) -> Optional[int]:
+        return len(self._tats) + len(self._windows)
+    
+    def _expiry(self, identifier: str) -> Optional[float]:
+        tat = self._tats.get(identifier)
+        if tat is not None:
+            return tat
+        state = self._windows.get(identifier)
+        if state is not None:
+            return window_expiry(state, *self._window_params)
+        return None
+    
+    def _evict_idle(self, now: float):
+        def is_expired(identifier: str) -> bool:
+            expiry = self._expiry(identifier)
+            return expiry is None or expiry <= now
+        
+        for identifier in self._wheel.advance(now, is_expired):
+            if self._tats.pop(identifier, None) is not None or self._windows.pop(identifier, None) is not None:
+                self.evicted += 1
+    
+    async def acquire(self, identifier: str, algorithm: RateLimitAlgorithm, rate: float, limit: int,
+                      window: float, tokens: int = 1) -> LimitDecision:
+        now = time.monotonic()
+        self._evict_idle(now)
+        
+        if algorithm in GCRA_ALGORITHMS:
+            previous = self._tats.get(identifier)
+            tat, decision = gcra_acquire(previous if previous is not None else now, now, rate, limit, tokens)
+            if tat > now:
+                self._tats[identifier] = tat
+                self._wheel.schedule(identifier, tat, previous)
+            elif previous is not None:
+                del self._tats[identifier]
+                self._wheel.cancel(identifier, previous)
+            return decision
+        
+        weighted = algorithm == RateLimitAlgorithm.SLIDING_WINDOW
+        self._window_params = (window, weighted)
+        state = self._windows.get(identifier)
+        previous = window_expiry(state, window, weighted) if state is not None else None
+        if state is None:
+            state = self._windows[identifier] = WindowState(int(now // window))
+        decision = window_acquire(state, now, window, limit, tokens, weighted)
+        self._wheel.schedule(identifier, window_expiry(state, window, weighted), previous)
+        return decision
+    
+    async def reset(self, identifier: str):
+        expiry = self._expiry(identifier)
+        if expiry is not None:
+            self._wheel.cancel(identifier, expiry)
+        self._tats.pop(identifier, None)
+        self._windows.pop(identifier, None)
+    
+    async def clear(self):
+        self._tats.clear()
+        self._windows.clear()
+        self._wheel.clear()
+
+
+# Lua versions of gcra_acquire and window_acquire. Both use the Redis server clock so that
+# instances with skewed clocks agree, and set key expiry so Redis drops idle identifiers.
+# Results are returned as strings because Redis truncates Lua numbers to integers.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + tokens * interval
+if new_tat - now <= tolerance + 1e-9 then
+    redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+    return {1, tostring((tolerance - (new_tat - now)) / interval), '0', tostring(new_tat - now)}
+end
+return {0, tostring((tolerance - (tat - now)) / interval), tostring(new_tat - tolerance - now), tostring(tat - now)}
+"""
+
+WINDOW_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local weighted = ARGV[4] == '1'
+local index = math.floor(now / window)
+local fields = redis.call('HMGET', KEYS[1], 'index', 'previous', 'current')
+local stored_index = tonumber(fields[1])
+local previous = tonumber(fields[2]) or 0
+local current = tonumber(fields[3]) or 0
+if stored_index ~= index then
+    if stored_index == index - 1 then previous = current else previous = 0 end
+    current = 0
+end
+local elapsed = now / window - index
+local used = current
+if weighted then used = used + previous * (1 - elapsed) end
+local window_end = (index + 1) * window
+local reset_after = window_end - now
+if weighted then reset_after = reset_after + window end
+local allowed = 0
+local remaining
+local retry_after = 0
+if used + tokens <= limit + 1e-9 then
+    allowed = 1
+    current = current + tokens
+    remaining = limit - used - tokens
+else
+    remaining = math.max(0, limit - used)
+    local spare = limit - current - tokens
+    if weighted and previous > 0 and spare >= 0 then
+        retry_after = math.max(0, (1 - spare / previous - elapsed) * window)
+    else
+        retry_after = window_end - now
+    end
+end
+redis.call('HSET', KEYS[1], 'index', index, 'previous', previous, 'current', current)
+redis.call('PEXPIRE', KEYS[1], math.ceil(reset_after * 1000))
+return {allowed, tostring(remaining), tostring(retry_after), tostring(reset_after)}
+"""
+
+
+class RedisLimiterStore:
+    """Limiter state shared through Redis; every decision is one atomic script call"""
+    
+    def __init__(self, client, key_prefix: str):
+        self.client = client
+        self.key_prefix = key_prefix
+        self._gcra = client.register_script(GCRA_SCRIPT)
+        self._window = client.register_script(WINDOW_SCRIPT)
+    
+    def count(self) -> Optional[int]:
+        # Identifiers live in Redis and expire there
+        return None
+    
+    def _key(self, identifier: str) -> str:
+        return f"{self.key_prefix}:{identifier}"
+    
+    async def acquire(self, identifier: str, algorithm: RateLimitAlgorithm, rate: float, limit: int,
+                      window: float, tokens: int = 1) -> LimitDecision:
+        if algorithm in GCRA_ALGORITHMS:
+            result = await self._gcra(keys=[self._key(identifier)], args=[1.0 / rate, limit / rate, tokens])
+        else:
+            weighted = 1 if algorithm == RateLimitAlgorithm.SLIDING_WINDOW else 0
+            result = await self._window(keys=[self._key(identifier)], args=[window, limit, tokens, weighted])
+        allowed, remaining, retry_after, reset_after = result
+        return LimitDecision(bool(int(allowed)), int(float(remaining) + 1e-9), float(retry_after), float(reset_after))
+    
+    async def reset(self, identifier: str):
+        await self.client.delete(self._key(identifier))
+    
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=f"{self.key_prefix}:*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+class TopTalkers:
+    """
+    Bounded per-identifier request counters for the busiest identifiers. The table grows
+    to twice its capacity and is then pruned back to the `capacity` busiest entries, so
+    one-off identifiers cost amortized O(1) and never accumulate.
+    """
+    
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counters: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, identifier: str, allowed: bool):
+        counters = self.counters.get(identifier)
+        if counters is None:
+            if len(self.counters) >= 2 * self.capacity:
+                self.counters = dict(self.top(self.capacity))
+            counters = self.counters[identifier] = {'requests': 0, 'allowed': 0, 'denied': 0}
+        counters['requests'] += 1
+        counters['allowed' if allowed else 'denied'] += 1
+    
+    def top(self, limit: int) -> List[Tuple[str, Dict[str, int]]]:
+        return sorted(self.counters.items(), key=lambda item: item[1]['requests'], reverse=True)[:limit]
+    
+    def clear(self):
+        self.counters.clear()
+
+
 class TokenBucket:
     """Token bucket rate limiter implementation"""
     
@@ -235,23 +554,38 @@ class RateLimiter:
     - Adaptive rate limiting
     - Distributed rate limiting support
     - Comprehensive metrics and monitoring
+    - Bounded memory: O(1) state per active identifier, idle identifiers evicted
     """
     
-    def __init__(self, config: RateLimitConfig):
+    def __init__(self, config: RateLimitConfig, redis_client=None, name: str = "default",
+                 top_users_capacity: int = 100):
         self.config = config
-        self.limiters: Dict[str, Union[TokenBucket, SlidingWindow, LeakyBucket]] = {}
+        self.name = name
+        self.local_store = LocalLimiterStore()
+        self.store: Union[LocalLimiterStore, RedisLimiterStore] = self.local_store
+        if redis_client is not None:
+            self.use_redis(redis_client)
         self.adaptive_limiter = AdaptiveRateLimiter(config) if config.adaptive_limiting else None
         
         # Metrics
         self.total_requests = 0
         self.allowed_requests = 0
         self.denied_requests = 0
-        self.user_metrics: Dict[str, Dict[str, int]] = defaultdict(lambda: {'requests': 0, 'allowed': 0, 'denied': 0})
-        
-        self._lock = asyncio.Lock()
+        self.backend_errors = 0
+        self.user_metrics = TopTalkers(top_users_capacity)
         
         logger.info(f"Rate limiter initialized with algorithm: {config.algorithm.value}")
     
+    def use_redis(self, redis_client):
+        """Share limits with other instances through Redis (only for distributed configs)"""
+        if self.config.distributed:
+            self.store = RedisLimiterStore(redis_client, f"{self.config.redis_key_prefix}:{self.name}")
+    
+    def _limit(self, current_rate: float) -> int:
+        if self.config.algorithm in GCRA_ALGORITHMS:
+            return self.config.burst_size
+        return max(1, int(current_rate * self.config.window_size_seconds))
+    
     async def is_allowed(self, identifier: str, tokens: int = 1) -> RateLimitResult:
         """
         Check if request is allowed for given identifier
@@ -264,93 +598,48 @@ class RateLimiter:
             RateLimitResult with decision and metadata
         """
         self.total_requests += 1
-        self.user_metrics[identifier]['requests'] += 1
         
         # Get current rate limit (may be adjusted)
         current_rate = self.config.requests_per_second
         if self.adaptive_limiter:
             current_rate = await self.adaptive_limiter.get_current_limit()
         
-        # Get or create limiter for identifier
-        limiter = await self._get_limiter(identifier, current_rate)
-        
-        # Check rate limit based on algorithm
-        allowed = False
-        remaining = 0
-        reset_time = datetime.utcnow()
-        
-        if self.config.algorithm == RateLimitAlgorithm.TOKEN_BUCKET:
-            allowed = await limiter.consume(tokens)
-            current_tokens, capacity = await limiter.get_status()
-            remaining = int(current_tokens)
-            reset_time = datetime.utcnow() + timedelta(seconds=(capacity - current_tokens) / current_rate)
-        
-        elif self.config.algorithm == RateLimitAlgorithm.SLIDING_WINDOW:
-            allowed = await limiter.is_allowed()
-            current_count, max_requests, reset_timestamp = await limiter.get_status()
-            remaining = max_requests - current_count
-            reset_time = datetime.fromtimestamp(reset_timestamp)
-        
-        elif self.config.algorithm == RateLimitAlgorithm.LEAKY_BUCKET:
-            allowed = await limiter.add_request()
-            current_level, capacity = await limiter.get_status()
-            remaining = capacity - int(current_level)
-            reset_time = datetime.utcnow() + timedelta(seconds=current_level / current_rate)
+        limit = self._limit(current_rate)
+        args = (identifier, self.config.algorithm, current_rate, limit, float(self.config.window_size_seconds), tokens)
+        try:
+            decision = await self.store.acquire(*args)
+        except Exception as e:
+            # Keep limiting per process while the shared backend is unreachable
+            self.backend_errors += 1
+            logger.warning(f"Rate limit backend error, using local limits: {e}")
+            decision = await self.local_store.acquire(*args)
         
         # Update metrics
-        if allowed:
+        if decision.allowed:
             self.allowed_requests += 1
-            self.user_metrics[identifier]['allowed'] += 1
         else:
             self.denied_requests += 1
-            self.user_metrics[identifier]['denied'] += 1
-        
-        # Calculate retry after time
-        retry_after = None
-        if not allowed:
-            if self.config.algorithm == RateLimitAlgorithm.TOKEN_BUCKET:
-                retry_after = tokens / current_rate
-            else:
-                retry_after = (reset_time - datetime.utcnow()).total_seconds()
+        self.user_metrics.record(identifier, decision.allowed)
         
         return RateLimitResult(
-            allowed=allowed,
-            remaining=remaining,
-            reset_time=reset_time,
-            retry_after=retry_after,
-            current_usage=self.user_metrics[identifier]['requests'],
-            limit=int(current_rate * self.config.window_size_seconds) if self.config.algorithm == RateLimitAlgorithm.SLIDING_WINDOW else self.config.burst_size
+            allowed=decision.allowed,
+            remaining=decision.remaining,
+            reset_time=datetime.utcnow() + timedelta(seconds=decision.reset_after),
+            retry_after=None if decision.allowed else decision.retry_after,
+            current_usage=max(0, limit - decision.remaining),
+            limit=limit
         )
     
-    async def _get_limiter(self, identifier: str, current_rate: float):
-        """Get or create rate limiter for identifier"""
-        async with self._lock:
-            if identifier not in self.limiters:
-                if self.config.algorithm == RateLimitAlgorithm.TOKEN_BUCKET:
-                    self.limiters[identifier] = TokenBucket(current_rate, self.config.burst_size)
-                
-                elif self.config.algorithm == RateLimitAlgorithm.SLIDING_WINDOW:
-                    max_requests = int(current_rate * self.config.window_size_seconds)
-                    self.limiters[identifier] = SlidingWindow(self.config.window_size_seconds, max_requests)
-                
-                elif self.config.algorithm == RateLimitAlgorithm.LEAKY_BUCKET:
-                    self.limiters[identifier] = LeakyBucket(self.config.burst_size, current_rate)
-            
-            return self.limiters[identifier]
-    
     async def reset_limiter(self, identifier: str):
         """Reset rate limiter for specific identifier"""
-        async with self._lock:
-            if identifier in self.limiters:
-                del self.limiters[identifier]
-                logger.info(f"Rate limiter reset for identifier: {identifier}")
+        await self.store.reset(identifier)
+        logger.info(f"Rate limiter reset for identifier: {identifier}")
     
     async def reset_all_limiters(self):
         """Reset all rate limiters"""
-        async with self._lock:
-            self.limiters.clear()
-            self.user_metrics.clear()
-            logger.info("All rate limiters reset")
+        await self.store.clear()
+        self.user_metrics.clear()
+        logger.info("All rate limiters reset")
     
     async def get_metrics(self) -> Dict[str, any]:
         """Get comprehensive rate limiting metrics"""
@@ -360,7 +649,10 @@ class RateLimiter:
             'denied_requests': self.denied_requests,
             'allow_rate': self.allowed_requests / self.total_requests if self.total_requests > 0 else 0,
             'deny_rate': self.denied_requests / self.total_requests if self.total_requests > 0 else 0,
-            'active_limiters': len(self.limiters),
+            'active_limiters': self.store.count(),
+            'evicted_limiters': self.local_store.evicted,
+            'backend': 'redis' if isinstance(self.store, RedisLimiterStore) else 'local',
+            'backend_errors': self.backend_errors,
             'config': {
                 'algorithm': self.config.algorithm.value,
                 'requests_per_second': self.config.requests_per_second,
@@ -373,12 +665,6 @@ class RateLimiter:
     
     async def _get_top_users(self, limit: int = 10) -> List[Dict[str, any]]:
         """Get top users by request count"""
-        sorted_users = sorted(
-            self.user_metrics.items(),
-            key=lambda x: x[1]['requests'],
-            reverse=True
-        )[:limit]
-        
         return [
             {
                 'identifier': identifier,
@@ -387,7 +673,7 @@ class RateLimiter:
                 'denied': metrics['denied'],
                 'deny_rate': metrics['denied'] / metrics['requests'] if metrics['requests'] > 0 else 0
             }
-            for identifier, metrics in sorted_users
+            for identifier, metrics in self.user_metrics.top(limit)
         ]
 
 
@@ -396,15 +682,22 @@ class RateLimiterManager:
     
     def __init__(self):
         self.rate_limiters: Dict[str, RateLimiter] = {}
+        self.redis_client = None
         self._lock = asyncio.Lock()
     
+    def attach_redis(self, redis_client):
+        """Share distributed limiters' state through Redis, including limiters created later"""
+        self.redis_client = redis_client
+        for rate_limiter in self.rate_limiters.values():
+            rate_limiter.use_redis(redis_client)
+    
     async def get_rate_limiter(self, name: str, config: Optional[RateLimitConfig] = None) -> RateLimiter:
         """Get or create rate limiter by name"""
         async with self._lock:
             if name not in self.rate_limiters:
                 if config is None:
                     config = RateLimitConfig()
-                self.rate_limiters[name] = RateLimiter(config)
+                self.rate_limiters[name] = RateLimiter(config, self.redis_client, name)
             return self.rate_limiters[name]
     
     async def check_rate_limit(self, limiter_name: str, identifier: str, 
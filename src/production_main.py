@@ -111,6 +111,9 @@ class ProductionMobiusBot:
         logger.info("🚀 Initializing production systems...")
         
         try:
+            # Connect the shared L2 (Redis) and persistent L3 (SQLite) cache tiers
+            await self.cache_manager.initialize()
+            
             # Initialize metrics definitions
             await self._setup_metrics()
             
@@ -355,12 +358,17 @@ class ProductionMobiusBot:
     async def _setup_rate_limiters(self):
         """Setup rate limiting for different operations"""
         
+        # Share limits across bot instances when the L2 cache's Redis is reachable
+        if self.cache_manager.redis_available:
+            self.rate_limiter_manager.attach_redis(self.cache_manager.l2_cache)
+        
         # User message rate limiting
         user_message_config = RateLimitConfig(
             requests_per_second=2.0,
             burst_size=10,
             algorithm=RateLimitAlgorithm.TOKEN_BUCKET,
-            adaptive_limiting=True
+            adaptive_limiting=True,
+            distributed=True
         )
         
         await self.rate_limiter_manager.get_rate_limiter("user_messages", user_message_config)
@@ -370,7 +378,8 @@ class ProductionMobiusBot:
             requests_per_second=5.0,
             burst_size=20,
             algorithm=RateLimitAlgorithm.SLIDING_WINDOW,
-            window_size_seconds=60
+            window_size_seconds=60,
+            distributed=True
         )
         
         await self.rate_limiter_manager.get_rate_limiter("crypto_prices", crypto_price_config)
@@ -806,6 +815,8 @@ All metrics within normal ranges! 📊
             # Export final metrics and logs
             await self._export_final_reports()
             
+            await self.cache_manager.close()
+            
             logger.info("✅ Graceful shutdown completed")
             
         except Exception as e:
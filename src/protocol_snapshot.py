@@ -0,0 +1,291 @@
+# src/protocol_snapshot.py
+"""
+Local snapshot of the DeFiLlama protocol catalogue.
+The /protocols list is downloaded on a schedule, persisted to SQLite and loaded into
+an immutable in-memory index: records pre-sorted by TVL, a sorted term list for
+prefix search and a trigram index for substring and fuzzy matching. Lookups never
+touch the network; only the very first call on an empty store waits for a download.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields kept from each /protocols entry; the rest (per-chain TVL maps, descriptions) is dropped
+SNAPSHOT_FIELDS = ('slug', 'name', 'symbol', 'category', 'tvl', 'change_1h', 'change_1d', 'change_7d',
+                   'chains', 'chain', 'mcap', 'gecko_id', 'url', 'logo')
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+def _normalize(text: str) -> str:
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+def _trigrams(term: str) -> set:
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ProtocolIndex:
+    """Immutable search structures over one catalogue snapshot"""
+
+    FUZZY_THRESHOLD = 0.35
+    SEARCH_CACHE_SIZE = 4096
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self._search_cache: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self.records: List[Dict[str, Any]] = sorted(records, key=lambda record: record.get('tvl') or 0, reverse=True)
+        self.by_slug: Dict[str, int] = {}
+
+        # Distinct search terms; each maps to the TVL positions of the protocols it names
+        term_positions: Dict[str, List[int]] = {}
+        for position, record in enumerate(self.records):
+            slug = (record.get('slug') or '').lower()
+            if slug:
+                self.by_slug.setdefault(slug, position)
+            name = _normalize(record.get('name') or '')
+            symbol = _normalize(record.get('symbol') or '')
+            terms = {name, symbol, _normalize(slug.replace('-', ' '))}
+            terms.update(name.split())
+            for term in terms:
+                if term:
+                    term_positions.setdefault(term, []).append(position)
+
+        self.terms: List[str] = sorted(term_positions)
+        self.term_positions: List[List[int]] = [term_positions[term] for term in self.terms]
+        self.term_ids: Dict[str, int] = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.term_trigrams: List[frozenset] = [frozenset(_trigrams(term)) for term in self.terms]
+        self.trigram_terms: Dict[str, List[int]] = {}
+        for term_id, trigrams in enumerate(self.term_trigrams):
+            for trigram in trigrams:
+                self.trigram_terms.setdefault(trigram, []).append(term_id)
+        # Trigrams shared by this many terms are too common to select fuzzy candidates
+        self.common_trigram_terms = max(64, len(self.terms) // 20)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Protocol by slug, or by exact name"""
+        position = self.by_slug.get(slug.lower())
+        if position is None:
+            term_id = self.term_ids.get(_normalize(slug))
+            if term_id is None:
+                return None
+            position = self.term_positions[term_id][0]
+        return self.records[position]
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        return self.records[:limit]
+
+    def _prefix_term_ids(self, query: str) -> Iterable[int]:
+        term_id = bisect_left(self.terms, query)
+        while term_id < len(self.terms) and self.terms[term_id].startswith(query):
+            yield term_id
+            term_id += 1
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Ranked matches: exact name/symbol/slug/word first, then prefix, then substring,
+        each by TVL, then fuzzy matches by trigram similarity
+        """
+        query = _normalize(query)
+        if not query:
+            return []
+        cached = self._search_cache.get((query, limit))
+        if cached is not None:
+            return cached
+
+        ranked: Dict[int, Tuple[int, float, int]] = {}
+
+        def consider(term_id: int, tier: int, score: float = 0.0):
+            # Positions are in TVL order, so only the first `limit` can make the cut for this tier
+            for position in self.term_positions[term_id][:limit]:
+                key = (tier, -score, position)
+                if position not in ranked or key < ranked[position]:
+                    ranked[position] = key
+
+        exact = self.term_ids.get(query)
+        if exact is not None:
+            consider(exact, 0)
+        for term_id in self._prefix_term_ids(query):
+            consider(term_id, 1)
+
+        # Lower tiers only matter while the better ones leave places free
+        if len(query) >= 3 and len(ranked) < limit:
+            # Every term containing the query contains its rarest inner trigram
+            inner = [query[i:i + 3] for i in range(len(query) - 2)]
+            rarest = min(inner, key=lambda trigram: len(self.trigram_terms.get(trigram, ())))
+            for term_id in self.trigram_terms.get(rarest, ()):
+                if query in self.terms[term_id]:
+                    consider(term_id, 2)
+
+            # Fuzzy matches only fill the places exact, prefix and substring matches left
+            if len(ranked) < limit:
+                query_trigrams = _trigrams(query)
+                candidates = set()
+                for trigram in query_trigrams:
+                    postings = self.trigram_terms.get(trigram, ())
+                    if len(postings) <= self.common_trigram_terms:
+                        candidates.update(postings)
+                for term_id in candidates:
+                    term_trigrams = self.term_trigrams[term_id]
+                    shared = len(query_trigrams & term_trigrams)
+                    similarity = shared / (len(query_trigrams) + len(term_trigrams) - shared)
+                    if similarity >= self.FUZZY_THRESHOLD:
+                        consider(term_id, 3, similarity)
+
+        best = heapq.nsmallest(limit, ranked.items(), key=lambda item: item[1])
+        results = [self.records[position] for position, _ in best]
+        if len(self._search_cache) >= self.SEARCH_CACHE_SIZE:
+            self._search_cache.clear()
+        self._search_cache[(query, limit)] = results
+        return results
+
+class ProtocolSnapshotStore:
+    """Persisted, periodically refreshed protocol catalogue with an in-memory index"""
+
+    def __init__(self, db_path: str = "data/defillama_protocols.db",
+                 fetch: Optional[Callable[[], Awaitable[Optional[List[Dict]]]]] = None,
+                 refresh_interval: int = 3600):
+        self.db_path = db_path
+        self.fetch = fetch or self._fetch_protocols
+        self.refresh_interval = refresh_interval
+        self.fetched_at = 0.0
+        self._index = ProtocolIndex([])
+        self._loaded = False
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._database_ready = False
+        self.stats = {
+            'refreshes': 0,
+            'failed_refreshes': 0,
+            'lookups': 0,
+        }
+
+    def _init_database(self):
+        """Create the database on first load or persist, not at construction"""
+        if self._database_ready:
+            return
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS protocols (
+                        slug TEXT PRIMARY KEY,
+                        tvl REAL,
+                        data TEXT NOT NULL
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS snapshot_meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT
+                    )
+                ''')
+            self._database_ready = True
+        except Exception as e:
+            logger.error(f"Error initializing protocol snapshot database: {e}")
+
+    @staticmethod
+    def _compact(protocol: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: protocol.get(field) for field in SNAPSHOT_FIELDS if protocol.get(field) is not None}
+
+    def load(self) -> bool:
+        """Load the persisted snapshot; True when it holds any protocols"""
+        self._init_database()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute('SELECT data FROM protocols').fetchall()
+                meta = conn.execute("SELECT value FROM snapshot_meta WHERE key = 'fetched_at'").fetchone()
+            self._index = ProtocolIndex(json.loads(data) for (data,) in rows)
+            self.fetched_at = float(meta[0]) if meta else 0.0
+        except Exception as e:
+            logger.error(f"Error loading protocol snapshot: {e}")
+        self._loaded = True
+        return len(self._index) > 0
+
+    def _persist(self, records: List[Dict[str, Any]], fetched_at: float):
+        self._init_database()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM protocols')
+            conn.executemany('INSERT OR REPLACE INTO protocols (slug, tvl, data) VALUES (?, ?, ?)',
+                             [(record.get('slug') or record.get('name'), record.get('tvl') or 0,
+                               json.dumps(record, separators=(',', ':'))) for record in records])
+            conn.execute("INSERT OR REPLACE INTO snapshot_meta (key, value) VALUES ('fetched_at', ?)",
+                         (str(fetched_at),))
+
+    async def refresh(self) -> bool:
+        """Download the catalogue, rebuild the index off the event loop and swap it in"""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            try:
+                protocols = await self.fetch()
+                if not protocols or not isinstance(protocols, list):
+                    raise ValueError("empty protocol list")
+                records = [self._compact(protocol) for protocol in protocols if isinstance(protocol, dict)]
+                fetched_at = time.time()
+
+                def build():
+                    index = ProtocolIndex(records)
+                    self._persist(index.records, fetched_at)
+                    return index
+
+                self._index = await asyncio.to_thread(build)
+                self.fetched_at = fetched_at
+                self._loaded = True
+                self.stats['refreshes'] += 1
+                logger.info(f"Protocol snapshot refreshed: {len(records)} protocols")
+                return True
+            except Exception as e:
+                self.stats['failed_refreshes'] += 1
+                logger.error(f"Error refreshing protocol snapshot: {e}")
+                return False
+
+    def is_stale(self, max_age: Optional[float] = None) -> bool:
+        """True when the snapshot is older than max_age seconds (default: the refresh interval)"""
+        return time.time() - self.fetched_at >= (self.refresh_interval if max_age is None else max_age)
+
+    async def ensure_ready(self) -> bool:
+        """Load from disk on first use; download only when there is no snapshot at all"""
+        if not self._loaded:
+            self.load()
+        if not len(self._index):
+            await self.refresh()
+        return len(self._index) > 0
+
+    async def _fetch_protocols(self) -> Optional[List[Dict]]:
+        from defillama_api import defillama_api
+        return await defillama_api.get_protocols()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Protocols matching a name, symbol or slug by exact, prefix, substring or fuzzy match"""
+        self.stats['lookups'] += 1
+        return [dict(record) for record in self._index.search(query, limit)]
+
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Protocols with the highest TVL"""
+        self.stats['lookups'] += 1
+        return [dict(record) for record in self._index.top(limit)]
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Protocol by slug or exact name"""
+        self.stats['lookups'] += 1
+        record = self._index.get(slug)
+        return dict(record) if record else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'protocols': len(self._index), 'terms': len(self._index.terms),
+                'age_seconds': time.time() - self.fetched_at if self.fetched_at else None}
+
+# Global instance
+protocol_snapshot = ProtocolSnapshotStore(os.getenv('DEFILLAMA_SNAPSHOT_DB_PATH', 'data/defillama_protocols.db'))
@@ -5,19 +5,93 @@ Researched and tested public endpoints for crypto data
 """
 
 import asyncio
-import aiohttp
+import bisect
 import json
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from session_registry import session_registry
+
 logger = logging.getLogger(__name__)
 
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram for one price source.
+    Counts decay by half once they pass max_samples so the ordering follows recent behaviour.
+    Requests cancelled because another source won are censored samples: their elapsed time is
+    a lower bound on the real latency, so it is counted, but not as a success or a failure.
+    """
+
+    # 10ms .. ~15s in 1.25x steps
+    BOUNDS = [0.01 * 1.25 ** i for i in range(33)]
+
+    def __init__(self, max_samples: int = 500):
+        self.max_samples = max_samples
+        self.counts = [0.0] * (len(self.BOUNDS) + 1)
+        self.successes = 0.0
+        self.failures = 0.0
+        self.censored = 0.0
+
+    @property
+    def samples(self) -> float:
+        return self.successes + self.failures + self.censored
+
+    @property
+    def success_rate(self) -> float:
+        completed = self.successes + self.failures
+        return self.successes / completed if completed else 1.0
+
+    def record(self, latency: float, success: bool):
+        self.counts[bisect.bisect_left(self.BOUNDS, latency)] += 1
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+        self._decay()
+
+    def record_censored(self, latency: float):
+        """A request abandoned after `latency` seconds without an answer"""
+        self.counts[bisect.bisect_left(self.BOUNDS, latency)] += 1
+        self.censored += 1
+        self._decay()
+
+    def _decay(self):
+        if self.samples > self.max_samples:
+            self.counts = [count / 2 for count in self.counts]
+            self.successes /= 2
+            self.failures /= 2
+            self.censored /= 2
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile q, or None without samples"""
+        total = sum(self.counts)
+        if not total:
+            return None
+        target = q * total
+        cumulative = 0.0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.BOUNDS[min(i, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
 class PublicCryptoAPIs:
     """Collection of public crypto APIs that don't require API keys"""
 
-    def __init__(self):
-        self.session = None
+    # Hedge delay used before a source has latency history, and the bounds for p50-based delays
+    DEFAULT_HEDGE_DELAY = 0.3
+    MIN_HEDGE_DELAY = 0.05
+    MAX_HEDGE_DELAY = 2.0
+    MIN_SAMPLES_FOR_ORDERING = 5
+
+    def __init__(self, hedged: bool = True):
+        self.session = session_registry.session(
+            headers={'User-Agent': 'Mobius-Crypto-Bot/1.0'},
+            timeout=10
+        )
+        self.hedged = hedged
         self.fallback_apis = [
             'coingecko_public',
             'coinpaprika',
@@ -25,45 +99,93 @@ class PublicCryptoAPIs:
             'binance_public',
             'cryptocompare_public'
         ]
+        self.latency = {name: LatencyHistogram() for name in self.fallback_apis}
+        self.hedge_stats = {
+            'requests': 0,
+            'hedged_launches': 0,
+            'cancelled': 0,
+            'all_failed': 0,
+        }
 
     async def get_session(self):
-        """Get or create aiohttp session"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=10),
-                headers={'User-Agent': 'Mobius-Crypto-Bot/1.0'}
-            )
+        """Shared per-host session from the registry"""
         return self.session
 
     async def close_session(self):
-        """Close aiohttp session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release this client's session view; the shared sessions stay open for other clients"""
+        await self.session.close()
 
-    async def get_crypto_price_multi_source(self, symbol: str, vs_currency: str = 'usd') -> Dict[str, Any]:
-        """Get crypto price from multiple sources with fallback"""
-
-        # Try multiple sources in order
-        sources = [
-            self._get_price_coingecko_public,
-            self._get_price_coinpaprika,
-            self._get_price_coincap,
-            self._get_price_binance_public,
-            self._get_price_cryptocompare_public
-        ]
+    def _price_sources(self) -> Dict[str, Any]:
+        return {
+            'coingecko_public': self._get_price_coingecko_public,
+            'coinpaprika': self._get_price_coinpaprika,
+            'coincap': self._get_price_coincap,
+            'binance_public': self._get_price_binance_public,
+            'cryptocompare_public': self._get_price_cryptocompare_public
+        }
 
-        for source_func in sources:
-            try:
-                result = await source_func(symbol, vs_currency)
-                if result and 'price' in result and result['price'] > 0:
-                    logger.info(f"✅ Got price for {symbol} from {result.get('source', 'unknown')}")
-                    return result
-            except Exception as e:
-                logger.warning(f"⚠️ {source_func.__name__} failed for {symbol}: {e}")
-                continue
+    def _source_score(self, name: str) -> float:
+        """Expected seconds to a valid answer: p50 latency inflated by the failure rate"""
+        histogram = self.latency[name]
+        if histogram.samples < self.MIN_SAMPLES_FOR_ORDERING:
+            return self.DEFAULT_HEDGE_DELAY
+        return histogram.quantile(0.5) / max(histogram.success_rate, 0.05)
+
+    def get_source_order(self) -> List[str]:
+        """Sources fastest-first by latency history; ties keep the configured order"""
+        return sorted(self.fallback_apis, key=self._source_score)
+
+    def _hedge_delay(self, name: str) -> float:
+        """How long to wait on a source before hedging with the next one"""
+        p50 = self.latency[name].quantile(0.5)
+        if p50 is None or self.latency[name].samples < self.MIN_SAMPLES_FOR_ORDERING:
+            return self.DEFAULT_HEDGE_DELAY
+        return min(max(p50, self.MIN_HEDGE_DELAY), self.MAX_HEDGE_DELAY)
+
+    async def _timed_source(self, name: str, source_func, symbol: str, vs_currency: str) -> Optional[Dict[str, Any]]:
+        """Call one source, recording its latency and outcome; returns None for failures and invalid prices"""
+        start = time.perf_counter()
+        try:
+            result = await source_func(symbol, vs_currency)
+        except asyncio.CancelledError:
+            # Hedge losers are the slow sources; without this their p50 would never rise
+            self.latency[name].record_censored(time.perf_counter() - start)
+            raise
+        except Exception as e:
+            self.latency[name].record(time.perf_counter() - start, False)
+            logger.warning(f"⚠️ {source_func.__name__} failed for {symbol}: {e}")
+            return None
+
+        valid = bool(result and 'price' in result and result['price'] > 0)
+        self.latency[name].record(time.perf_counter() - start, valid)
+        return result if valid else None
+
+    async def get_crypto_price_multi_source(self, symbol: str, vs_currency: str = 'usd') -> Dict[str, Any]:
+        """
+        Get crypto price from multiple sources with fallback.
+        In hedged mode the fastest source starts first; the next one is launched if no answer
+        arrives within the running source's p50 latency (or immediately when it fails), and the
+        first valid result wins while the other in-flight requests are cancelled.
+        """
+        self.hedge_stats['requests'] += 1
+        sources = self._price_sources()
+        order = self.get_source_order()
+
+        if self.hedged:
+            result = await self._get_price_hedged(symbol, vs_currency, order, sources)
+        else:
+            result = None
+            for name in order:
+                result = await self._timed_source(name, sources[name], symbol, vs_currency)
+                if result:
+                    break
+
+        if result:
+            logger.info(f"✅ Got price for {symbol} from {result.get('source', 'unknown')}")
+            return result
 
         # If all sources fail, return error
+        self.hedge_stats['all_failed'] += 1
         return {
             'error': f'All price sources failed for {symbol}',
             'symbol': symbol.upper(),
@@ -71,6 +193,57 @@ class PublicCryptoAPIs:
             'source': 'failed'
         }
 
+    async def _get_price_hedged(self, symbol: str, vs_currency: str, order: List[str],
+                                sources: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        remaining = list(order)
+        pending: Dict[asyncio.Task, str] = {}
+
+        def launch():
+            name = remaining.pop(0)
+            task = asyncio.create_task(self._timed_source(name, sources[name], symbol, vs_currency))
+            pending[task] = name
+            return name
+
+        last_launched = launch()
+        try:
+            while pending:
+                timeout = self._hedge_delay(last_launched) if remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # The running sources are slower than usual: hedge with the next one
+                    self.hedge_stats['hedged_launches'] += 1
+                    last_launched = launch()
+                    continue
+
+                for task in done:
+                    del pending[task]
+                    result = task.result()
+                    if result:
+                        return result
+
+                # Every finished source failed; replace it right away
+                if remaining:
+                    last_launched = launch()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            self.hedge_stats['cancelled'] += len(pending)
+
+    def get_source_stats(self) -> Dict[str, Any]:
+        """Per-source latency percentiles and success rates plus hedging counters"""
+        sources = {}
+        for name, histogram in self.latency.items():
+            p50, p95 = histogram.quantile(0.5), histogram.quantile(0.95)
+            sources[name] = {
+                'samples': round(histogram.samples),
+                'success_rate': round(histogram.success_rate, 3),
+                'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            }
+        return {'order': self.get_source_order(), 'sources': sources, **self.hedge_stats}
+
     async def _get_price_coingecko_public(self, symbol: str, vs_currency: str = 'usd') -> Dict[str, Any]:
         """CoinGecko public API (no key required, but rate limited)"""
         session = await self.get_session()
@@ -0,0 +1,258 @@
+# src/response_cache.py
+"""
+Response cache in front of LLM generation.
+The exact tier is keyed by normalized messages, provider, model and token budget. The
+optional semantic tier embeds short user questions as hashed word and character-trigram
+vectors and answers from the nearest cached question asked with the same preceding
+context, when the cosine similarity clears a threshold. Entry lifetimes depend on the
+intent; time-sensitive intents such as prices and portfolios are never cached.
+"""
+
+import hashlib
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Seconds an answer stays valid, by the intents agent_memory_database.analyze_user_intent returns
+# (the shipped pattern set and the comprehensive training set); 'unknown' gets DEFAULT_TTL
+INTENT_TTLS = {
+    'explain_defi': 24 * 3600,
+    'learn_crypto_basics': 24 * 3600,
+    'wallet_security_advice': 24 * 3600,
+    'get_historical_price': 6 * 3600,
+    'clarify_unclear_request': 3600,
+    'compare_cryptocurrencies': 900,
+    'query_specific_protocol': 900,
+    'analyze_defi_protocol': 900,
+    'find_yield_opportunities': 900,
+    'find_yield_farming': 900,
+    'perform_complex_analysis': 900,
+    'query_defillama_tvl': 300,
+}
+DEFAULT_TTL = 3600
+
+# Intents whose answers depend on live or per-user data
+BYPASS_INTENTS = frozenset({
+    'get_crypto_price', 'get_realtime_price', 'get_trading_volume', 'analyze_market_trends',
+    'get_market_overview', 'get_crypto_news', 'analyze_social_sentiment', 'perform_technical_analysis',
+    'request_trading_advice', 'get_trading_advice', 'analyze_portfolio', 'optimize_portfolio',
+    'create_price_alert', 'audit_wallet_security', 'maintain_conversation_context', 'handle_api_error',
+})
+# Backstop for intents not listed above
+TIME_SENSITIVE_INTENT_RE = re.compile(r'price|portfolio|alert|market|balance|gas|whale|news')
+# Questions about the present are not cached whatever intent they were classified as
+TIME_SENSITIVE_TEXT_RE = re.compile(r'\b(prices?|now|today|tonight|current(ly)?|latest|live|yesterday|this (week|month))\b',
+                                    re.IGNORECASE)
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(' ', _PUNCTUATION_RE.sub(' ', text.lower())).strip()
+
+# Question scaffolding that carries no topic; left out of embeddings
+EMBEDDING_STOP_WORDS = frozenset(
+    'a an the is are was were be been what whats s how does do did can could would should will you your '
+    'me my i we us please tell explain describe define definition meaning mean means about of to in on '
+    'for and or with exactly really briefly simply work works working give show some any this that it'.split()
+)
+
+def embed_text(text: str, dim: int = 256) -> np.ndarray:
+    """Unit-length hashed bag of topic words and their character trigrams (signed feature hashing)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in normalize_text(text).split():
+        if word in EMBEDDING_STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        features = [(word, 1.0)]
+        padded = f"#{word}#"
+        features.extend((padded[i:i + 3], 0.5) for i in range(len(padded) - 2))
+        for feature, weight in features:
+            digest = zlib.crc32(feature.encode('utf-8'))
+            vector[digest % dim] += weight if digest & 0x80000000 else -weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+@dataclass
+class CacheEntry:
+    response: str
+    expires_at: float
+    latency: float
+    context_key: Optional[str] = None
+
+class _SemanticBucket:
+    """Brute-force nearest-neighbour index over the questions sharing one context"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.vectors: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def add(self, key: str, vector: np.ndarray):
+        self.keys.append(key)
+        self.vectors.append(vector)
+        self._matrix = None
+
+    def remove(self, key: str):
+        try:
+            position = self.keys.index(key)
+        except ValueError:
+            return
+        del self.keys[position]
+        del self.vectors[position]
+        self._matrix = None
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self.keys:
+            return None, 0.0
+        if self._matrix is None:
+            self._matrix = np.vstack(self.vectors)
+        similarities = self._matrix @ vector
+        position = int(np.argmax(similarities))
+        return self.keys[position], float(similarities[position])
+
+class ResponseCache:
+    """Exact and semantic LLM response cache with per-intent TTLs"""
+
+    def __init__(self, max_entries: int = 2048, semantic: bool = True, similarity_threshold: float = 0.9,
+                 semantic_max_chars: int = 300, max_response_chars: int = 8000, embedding_dim: int = 256):
+        self.max_entries = max_entries
+        self.semantic = semantic
+        self.similarity_threshold = similarity_threshold
+        # Only short questions are matched semantically; long prompts carry data that must match exactly
+        self.semantic_max_chars = semantic_max_chars
+        self.max_response_chars = max_response_chars
+        self.embedding_dim = embedding_dim
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._buckets: Dict[str, _SemanticBucket] = {}
+        self.stats = {
+            'exact_hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'stores': 0,
+            'evictions': 0,
+            'latency_saved': 0.0,
+        }
+
+    @staticmethod
+    def ttl_for(intent: Optional[str]) -> float:
+        """Entry lifetime for an intent; 0 means the intent must not be cached"""
+        if intent:
+            if intent in INTENT_TTLS:
+                return INTENT_TTLS[intent]
+            if intent in BYPASS_INTENTS or TIME_SENSITIVE_INTENT_RE.search(intent):
+                return 0
+        return DEFAULT_TTL
+
+    def _bypass(self, messages: List[Dict[str, str]], intent: Optional[str]) -> bool:
+        if not messages or not self.ttl_for(intent):
+            return True
+        last = messages[-1]
+        return last.get('role') == 'user' and bool(TIME_SENSITIVE_TEXT_RE.search(last.get('content') or ''))
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def _keys(self, messages: List[Dict[str, str]], provider: str, model: str,
+              max_tokens: Optional[int]) -> Tuple[str, Optional[str], Optional[str]]:
+        """Exact key, semantic context key and the question to embed (None when not semantic)"""
+        normalized = [f"{message.get('role', '')}:{normalize_text(message.get('content') or '')}" for message in messages]
+        prefix = (provider, model or '', str(max_tokens or ''))
+        exact_key = self._digest(*prefix, *normalized)
+        last = messages[-1] if messages else {}
+        question = last.get('content') or ''
+        if not self.semantic or last.get('role') != 'user' or len(question) > self.semantic_max_chars:
+            return exact_key, None, None
+        return exact_key, self._digest(*prefix, *normalized[:-1]), question
+
+    def _live(self, key: str, now: float) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now >= entry.expires_at:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.context_key is not None:
+            bucket = self._buckets.get(entry.context_key)
+            if bucket is not None:
+                bucket.remove(key)
+                if not bucket.keys:
+                    del self._buckets[entry.context_key]
+
+    def get(self, messages: List[Dict[str, str]], provider: str, model: str,
+            max_tokens: Optional[int] = None, intent: Optional[str] = None) -> Optional[str]:
+        if self._bypass(messages, intent):
+            self.stats['bypassed'] += 1
+            return None
+
+        now = time.monotonic()
+        exact_key, context_key, question = self._keys(messages, provider, model, max_tokens)
+        entry = self._live(exact_key, now)
+        if entry is not None:
+            self.stats['exact_hits'] += 1
+            self.stats['latency_saved'] += entry.latency
+            return entry.response
+
+        bucket = self._buckets.get(context_key) if context_key else None
+        if bucket is not None:
+            key, similarity = bucket.nearest(embed_text(question, self.embedding_dim))
+            if key is not None and similarity >= self.similarity_threshold:
+                entry = self._live(key, now)
+                if entry is not None:
+                    self.stats['semantic_hits'] += 1
+                    self.stats['latency_saved'] += entry.latency
+                    logger.debug(f"Semantic cache hit (similarity {similarity:.3f})")
+                    return entry.response
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, messages: List[Dict[str, str]], provider: str, model: str, response: str,
+            latency: float, max_tokens: Optional[int] = None, intent: Optional[str] = None):
+        if self._bypass(messages, intent) or not response or len(response) > self.max_response_chars:
+            return
+
+        exact_key, context_key, question = self._keys(messages, provider, model, max_tokens)
+        self._remove(exact_key)
+        entry = CacheEntry(response, time.monotonic() + self.ttl_for(intent), latency, context_key)
+        if context_key is not None:
+            self._buckets.setdefault(context_key, _SemanticBucket()).add(exact_key, embed_text(question, self.embedding_dim))
+        self._entries[exact_key] = entry
+        self.stats['stores'] += 1
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._buckets.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats['exact_hits'] + self.stats['semantic_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+# Global instance
+response_cache = ResponseCache()
@@ -0,0 +1,286 @@
+# src/rolling_summarizer.py
+"""
+Incremental Rolling Summaries
+Summarizes each closed time bucket of a chat once, persists it next to the daily
+summaries and merges buckets hierarchically, so an on-demand summary only sends
+the cached bucket summaries plus the still-open bucket to the LLM.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ai_providers import get_ai_response
+from message_storage import MessageStorage, message_storage
+from summarizer import NO_CONVERSATIONS_SUMMARY, _format_transcript_line
+
+logger = logging.getLogger(__name__)
+
+# get_ai_response reports failures as text; never persist those as summaries
+_LLM_FAILURE_PREFIXES = ("Error", "An exception occurred", "AI features unavailable", "AI response unavailable")
+
+BUCKET_PROMPT = """
+Summarize this slice of a Telegram conversation ({label}) as a few short bullet points.
+Keep names, tickers, numbers, decisions, action items and open questions. Do not add commentary.
+
+TRANSCRIPT:
+{transcript}
+"""
+
+MERGE_PROMPT = """
+Combine these consecutive summaries of a Telegram conversation ({label}) into one list of short bullet points.
+Keep names, tickers, numbers, decisions, action items and open questions. Drop repetition.
+
+{sections}
+"""
+
+FINAL_PROMPT = """
+Create a daily summary of this Telegram conversation from the time-ordered section summaries
+and the most recent messages below.
+
+{sections}
+
+Please provide a structured summary with:
+
+1. **Key Topics Discussed** - Main themes and subjects
+2. **Important Decisions** - Any decisions made or planned
+3. **Action Items** - Tasks or follow-ups mentioned
+4. **Notable Insights** - Interesting observations or learnings
+5. **Questions Raised** - Unanswered questions or concerns
+6. **Sentiment Analysis** - Overall mood and tone
+
+Format as a clean, professional summary suitable for a daily digest.
+Use emojis sparingly and focus on actionable insights.
+Keep it concise but comprehensive.
+"""
+
+@dataclass
+class RollingSummary:
+    text: str
+    message_count: int
+    participant_count: int
+    llm_calls: int
+
+class RollingSummarizer:
+    """Per-chat bucket summaries with hierarchical merging"""
+
+    def __init__(self, storage: MessageStorage, llm: Optional[Callable[[str, int], Awaitable[str]]] = None,
+                 bucket_seconds: int = 3600, merge_factor: int = 6, max_bucket_tokens: int = 6000):
+        self.storage = storage
+        self.llm = llm or get_ai_response
+        self.bucket_seconds = bucket_seconds
+        self.merge_factor = merge_factor
+        self.max_bucket_tokens = max_bucket_tokens
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self.stats = {
+            'bucket_calls': 0,
+            'merge_calls': 0,
+            'final_calls': 0,
+            'failed_calls': 0,
+        }
+
+    @property
+    def llm_calls(self) -> int:
+        return self.stats['bucket_calls'] + self.stats['merge_calls'] + self.stats['final_calls']
+
+    def _lock(self, chat_id: int) -> asyncio.Lock:
+        if chat_id not in self._locks:
+            self._locks[chat_id] = asyncio.Lock()
+        return self._locks[chat_id]
+
+    def _label(self, start: float, end: float) -> str:
+        return f"{datetime.fromtimestamp(start).strftime('%H:%M')}-{datetime.fromtimestamp(end).strftime('%H:%M')}"
+
+    async def _call(self, prompt: str, user_id: int, kind: str) -> Optional[str]:
+        """One LLM call; returns None when the provider failed"""
+        self.stats[f'{kind}_calls'] += 1
+        try:
+            result = await self.llm(prompt, user_id)
+        except Exception as e:
+            logger.error(f"Rolling summary {kind} call failed: {e}")
+            result = None
+        if not result or result.startswith(_LLM_FAILURE_PREFIXES):
+            self.stats['failed_calls'] += 1
+            return None
+        return result.strip()
+
+    def _pack_transcript(self, messages: List[Dict]) -> List[str]:
+        """Split a transcript into parts of at most max_bucket_tokens (≈4 characters per token)"""
+        parts, current, current_tokens = [], [], 0
+        for msg in messages:
+            line = _format_transcript_line(msg)
+            line_tokens = len(line) // 4 + 1
+            if current and current_tokens + line_tokens > self.max_bucket_tokens:
+                parts.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += line_tokens
+        if current:
+            parts.append("\n".join(current))
+        return parts
+
+    async def _summarize_messages(self, messages: List[Dict], label: str, user_id: int) -> Optional[str]:
+        """Summarize one bucket of messages, splitting it only when it is too large for a single call"""
+        summaries = []
+        for transcript in self._pack_transcript(messages):
+            summary = await self._call(BUCKET_PROMPT.format(label=label, transcript=transcript), user_id, 'bucket')
+            if summary is None:
+                return None
+            summaries.append(summary)
+        if len(summaries) == 1:
+            return summaries[0]
+        return await self._call(MERGE_PROMPT.format(label=label, sections="\n\n".join(summaries)), user_id, 'merge')
+
+    async def _store(self, chat_id: int, bucket_start: float, bucket_seconds: int, entry: Dict):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, self.storage.store_bucket_summary, chat_id, bucket_start, bucket_seconds,
+            entry['summary'], entry['message_count'], entry['participants'])
+
+    async def _summarize_bucket(self, chat_id: int, bucket_start: float, user_id: int) -> Dict:
+        """Summarize and persist one closed hourly bucket"""
+        bucket_end = bucket_start + self.bucket_seconds
+        messages = [msg async for msg in self.storage.stream_messages_between(chat_id, bucket_start, bucket_end)]
+        entry = {
+            'bucket_start': bucket_start,
+            'bucket_seconds': self.bucket_seconds,
+            'summary': '',
+            'message_count': len(messages),
+            'participants': sorted({msg.get('user_id') for msg in messages}),
+        }
+        if messages:
+            summary = await self._summarize_messages(messages, self._label(bucket_start, bucket_end), user_id)
+            if summary is None:
+                # Leave it unpersisted so the next run retries
+                entry['summary'] = "(summary unavailable)"
+                entry['failed'] = True
+                return entry
+            entry['summary'] = summary
+        # Empty buckets are persisted too so they are not re-read
+        await self._store(chat_id, bucket_start, self.bucket_seconds, entry)
+        return entry
+
+    async def _merge_block(self, chat_id: int, block_start: float, children: List[Dict], user_id: int) -> Dict:
+        """Merge consecutive hourly summaries into one persisted block summary"""
+        block_seconds = self.bucket_seconds * self.merge_factor
+        summarized = [child for child in children if child['message_count']]
+        entry = {
+            'bucket_start': block_start,
+            'bucket_seconds': block_seconds,
+            'summary': summarized[0]['summary'] if len(summarized) == 1 else '',
+            'message_count': sum(child['message_count'] for child in children),
+            'participants': sorted({uid for child in children for uid in child['participants']}),
+        }
+        # A block built on an unpersisted child is only used for this run, so the child is retried
+        entry['failed'] = any(child.get('failed') for child in children)
+        if len(summarized) > 1:
+            sections = "\n\n".join(
+                f"[{self._label(child['bucket_start'], child['bucket_start'] + self.bucket_seconds)}]\n{child['summary']}"
+                for child in summarized)
+            summary = await self._call(
+                MERGE_PROMPT.format(label=self._label(block_start, block_start + block_seconds), sections=sections),
+                user_id, 'merge')
+            if summary is None:
+                entry['summary'] = "\n".join(child['summary'] for child in summarized)
+                entry['failed'] = True
+                return entry
+            entry['summary'] = summary
+        if not entry['failed']:
+            await self._store(chat_id, block_start, block_seconds, entry)
+        return entry
+
+    def _window(self, hours: int, now: float):
+        first_bucket = int(now - hours * 3600) // self.bucket_seconds * self.bucket_seconds
+        open_bucket = int(now) // self.bucket_seconds * self.bucket_seconds
+        return first_bucket, open_bucket
+
+    async def refresh(self, chat_id: int, hours: int = 24, user_id: int = 0,
+                      now: Optional[float] = None) -> List[Dict]:
+        """
+        Summarize any closed buckets in the window that have no stored summary yet and
+        return the coarsest available time-ordered sections covering the closed part of the window.
+        """
+        now = now or time.time()
+        first_bucket, open_bucket = self._window(hours, now)
+        block_seconds = self.bucket_seconds * self.merge_factor
+        loop = asyncio.get_running_loop()
+
+        async with self._lock(chat_id):
+            hourly = await loop.run_in_executor(
+                None, self.storage.get_bucket_summaries, chat_id, self.bucket_seconds, first_bucket, open_bucket)
+            blocks = await loop.run_in_executor(
+                None, self.storage.get_bucket_summaries, chat_id, block_seconds, first_bucket, open_bucket)
+
+            sections = []
+            start = first_bucket
+            while start < open_bucket:
+                if start % block_seconds == 0 and start + block_seconds <= open_bucket:
+                    block = blocks.get(start)
+                    if block is None:
+                        children = []
+                        for child_start in range(start, start + block_seconds, self.bucket_seconds):
+                            child = hourly.get(child_start) or await self._summarize_bucket(chat_id, child_start, user_id)
+                            children.append(child)
+                        block = await self._merge_block(chat_id, start, children, user_id)
+                    sections.append(block)
+                    start += block_seconds
+                else:
+                    sections.append(hourly.get(start) or await self._summarize_bucket(chat_id, start, user_id))
+                    start += self.bucket_seconds
+
+        return [section for section in sections if section['message_count']]
+
+    async def refresh_active_chats(self, hours: int = 24):
+        """Pre-summarize closed buckets for every chat with recent messages"""
+        now = time.time()
+        for chat_id in self.storage.get_active_chat_ids(now - hours * 3600):
+            try:
+                await self.refresh(chat_id, hours, now=now)
+            except Exception as e:
+                logger.error(f"Error refreshing rolling summaries for chat {chat_id}: {e}")
+
+    async def summarize_period(self, chat_id: int, hours: int = 24, user_id: int = 0,
+                               now: Optional[float] = None) -> RollingSummary:
+        """Summary of the last `hours` hours: cached bucket summaries plus the open bucket in one final call"""
+        now = now or time.time()
+        calls_before = self.llm_calls
+        sections = await self.refresh(chat_id, hours, user_id, now)
+
+        _, open_bucket = self._window(hours, now)
+        recent = [msg async for msg in self.storage.stream_messages_between(chat_id, open_bucket, float('inf'))]
+
+        message_count = sum(section['message_count'] for section in sections) + len(recent)
+        participants = {uid for section in sections for uid in section['participants']}
+        participants.update(msg.get('user_id') for msg in recent)
+
+        if not message_count:
+            return RollingSummary(NO_CONVERSATIONS_SUMMARY, 0, 0, self.llm_calls - calls_before)
+
+        parts = [
+            f"[{self._label(section['bucket_start'], section['bucket_start'] + section['bucket_seconds'])}]\n{section['summary']}"
+            for section in sections
+        ]
+        if recent:
+            transcripts = self._pack_transcript(recent)
+            if len(transcripts) == 1:
+                parts.append(f"RECENT MESSAGES (since {datetime.fromtimestamp(open_bucket).strftime('%H:%M')}):\n{transcripts[0]}")
+            else:
+                summary = await self._summarize_messages(recent, self._label(open_bucket, now), user_id)
+                parts.append(f"[{self._label(open_bucket, now)}]\n{summary or '(summary unavailable)'}")
+
+        summary = await self._call(FINAL_PROMPT.format(sections="\n\n".join(parts)), user_id, 'final')
+        if summary is None:
+            text = "📝 **Daily Summary**\n\n❌ Unable to generate summary at this time."
+        else:
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
+            text = f"📋 **Daily Summary** - {current_time}\n\n{summary}"
+
+        logger.info(f"Rolling summary for chat {chat_id}: {len(sections)} cached sections, "
+                    f"{len(recent)} recent messages, {self.llm_calls - calls_before} LLM calls")
+        return RollingSummary(text, message_count, len(participants), self.llm_calls - calls_before)
+
+# Global instance
+rolling_summarizer = RollingSummarizer(message_storage)
@@ -11,12 +11,15 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 import pytz
 from config import config
+from encryption import bulk_decrypt_stream
 
 logger = logging.getLogger(__name__)
 
 class MobiusScheduler:
     """Scheduler for automated tasks"""
     
+    DECRYPT_CHUNK_SIZE = 500
+    
     def __init__(self, bot_application):
         self.scheduler = AsyncIOScheduler()
         self.bot_application = bot_application
@@ -125,28 +128,33 @@ class MobiusScheduler:
                 logger.info("No messages to summarize today")
                 return
             
-            # Decrypt messages
-            decrypted_messages = []
-            for msg_id, msg_data in message_store.items():
-                try:
-                    decrypted_text = encryption_manager.decrypt(msg_data['encrypted_text'])
-                    decrypted_messages.append({
-                        'user': msg_data['user'],
-                        'text': decrypted_text,
-                        'timestamp': msg_data['timestamp'],
-                        'status': msg_data.get('status', 'new')
-                    })
-                except Exception as e:
-                    logger.error(f"Failed to decrypt message {msg_id}: {e}")
-            
-            if not decrypted_messages:
-                logger.info("No valid messages to summarize")
-                return
+            # Decrypt messages in parallel chunks off the event loop, streaming them into the summarizer
+            def decrypt_chunk(items):
+                decrypted = []
+                for msg_id, msg_data in items:
+                    try:
+                        decrypted.append({
+                            'user': msg_data['user'],
+                            'text': encryption_manager.decrypt(msg_data['encrypted_text']),
+                            'timestamp': msg_data['timestamp'],
+                            'status': msg_data.get('status', 'new')
+                        })
+                    except Exception as e:
+                        logger.error(f"Failed to decrypt message {msg_id}: {e}")
+                return decrypted
+            
+            items = sorted(message_store.items(), key=lambda item: item[1].get('timestamp', 0))
+            chunks = (items[i:i + self.DECRYPT_CHUNK_SIZE] for i in range(0, len(items), self.DECRYPT_CHUNK_SIZE))
+            decrypted_messages = bulk_decrypt_stream(chunks, decrypt_chunk)
             
             # Generate summary
-            from summarizer import generate_daily_summary
+            from summarizer import generate_daily_summary, NO_CONVERSATIONS_SUMMARY
             summary = await generate_daily_summary(decrypted_messages)
             
+            if summary == NO_CONVERSATIONS_SUMMARY:
+                logger.info("No valid messages to summarize")
+                return
+            
             if summary:
                 # Send to target chat
                 chat_id = int(config.get('TELEGRAM_CHAT_ID'))
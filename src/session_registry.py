@@ -0,0 +1,224 @@
+# src/session_registry.py
+"""
+Process-wide registry of aiohttp sessions, one per upstream host.
+Every HTTP client in the process borrows its session from here instead of opening its
+own, so DNS results, TLS handshakes and keep-alive connections are shared. Each host
+gets a TCPConnector with a bounded connection count, a DNS cache and keep-alive, and
+trace hooks that count requests, new connections (handshakes) and connection reuse.
+aiohttp speaks HTTP/1.1 only, so reuse comes from keep-alive rather than HTTP/2
+multiplexing.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Mapping, Optional, Set, Union
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_lookups: int = 0
+    dns_cache_hits: int = 0
+    errors: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        acquired = self.connections_created + self.connections_reused
+        return self.connections_reused / acquired if acquired else 0.0
+
+class SessionView:
+    """
+    Session-like handle over the registry. Requests are routed to the session of the
+    URL's host, with this view's default headers and timeout applied. close() only releases
+    this view's reference; the shared sessions close when the last view is released or
+    when the registry is closed on shutdown.
+    """
+
+    def __init__(self, registry: "SessionRegistry", headers: Optional[Mapping[str, str]] = None,
+                 timeout: Optional[Union[aiohttp.ClientTimeout, float]] = None):
+        self._registry = registry
+        self._headers = dict(headers or {})
+        if isinstance(timeout, (int, float)):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        self._timeout = timeout
+        self._released = False
+
+    @property
+    def closed(self) -> bool:
+        return self._released or self._registry.closed
+
+    def request(self, method: str, url: str, **kwargs):
+        if self._released:
+            raise RuntimeError("Session is closed")
+        if self._headers:
+            kwargs['headers'] = {**self._headers, **(kwargs.get('headers') or {})}
+        if self._timeout is not None and kwargs.get('timeout') is None:
+            kwargs['timeout'] = self._timeout
+        return self._registry.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    async def close(self):
+        if not self._released:
+            self._released = True
+            await self._registry.release()
+
+    async def __aenter__(self) -> "SessionView":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+class SessionRegistry:
+    """One pooled aiohttp session per scheme://host:port, bound to the running event loop"""
+
+    def __init__(self, limit_per_host: int = 20, dns_cache_ttl: int = 300,
+                 keepalive_timeout: float = 30.0, timeout: float = 30.0):
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.closed = False
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._host_stats: Dict[str, HostStats] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._views = 0
+        self._closing: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        parts = urlsplit(str(url))
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme in ('https', 'wss') else 80)
+        return f"{scheme}://{(parts.hostname or '').lower()}:{port}"
+
+    def _trace_config(self, stats: HostStats) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_dns_resolvehost_end(session, ctx, params):
+            stats.dns_lookups += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_request_exception(session, ctx, params):
+            stats.errors += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """Shared session for the URL's host; must be called from the event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Sessions of a previous event loop cannot be used from this one; close them here
+            self._loop = loop
+            stale, self._sessions = list(self._sessions.values()), {}
+            if stale:
+                task = loop.create_task(self._close_sessions(stale, settle=False))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+        self.closed = False
+        key = self.host_key(url)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            stats = self._host_stats.setdefault(key, HostStats())
+            connector = aiohttp.TCPConnector(
+                limit=self.limit_per_host,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[self._trace_config(stats)],
+            )
+            self._sessions[key] = session
+        return session
+
+    def session(self, headers: Optional[Mapping[str, str]] = None,
+                timeout: Optional[Union[aiohttp.ClientTimeout, float]] = None) -> SessionView:
+        """Session-like view with default headers and timeout, usable for any host; close() releases it"""
+        self._views += 1
+        return SessionView(self, headers=headers, timeout=timeout)
+
+    async def release(self):
+        """Drop one view's reference; the sessions are closed once no view holds them"""
+        self._views = max(self._views - 1, 0)
+        if self._views == 0:
+            await self.close()
+
+    @staticmethod
+    def _connection_counts(session: aiohttp.ClientSession) -> Dict[str, int]:
+        connector = session.connector
+        in_use = len(getattr(connector, '_acquired', ()) or ())
+        idle = sum(len(conns) for conns in (getattr(connector, '_conns', {}) or {}).values())
+        return {'open_connections': in_use + idle, 'in_use': in_use, 'idle': idle}
+
+    def get_stats(self) -> Dict[str, Any]:
+        hosts = {}
+        for key, stats in self._host_stats.items():
+            session = self._sessions.get(key)
+            counts = (self._connection_counts(session) if session is not None and not session.closed
+                      else {'open_connections': 0, 'in_use': 0, 'idle': 0})
+            hosts[key] = {**asdict(stats), **counts, 'reuse_rate': stats.reuse_rate}
+        return {
+            'sessions': sum(1 for session in self._sessions.values() if not session.closed),
+            'open_connections': sum(host['open_connections'] for host in hosts.values()),
+            'hosts': hosts,
+        }
+
+    async def close(self):
+        """Close every session; call once on shutdown while the event loop is still running"""
+        self.closed = True
+        sessions, self._sessions = list(self._sessions.values()), {}
+        await self._close_sessions(sessions)
+
+    async def _close_sessions(self, sessions: List[aiohttp.ClientSession], settle: bool = True):
+        open_sessions = [session for session in sessions if not session.closed]
+        for session in open_sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP session: {e}")
+        # Give SSL transports a moment to finish their close handshake
+        if open_sessions and settle:
+            await asyncio.sleep(0.25)
+
+# Global instance
+session_registry = SessionRegistry()
@@ -0,0 +1,343 @@
+# src/streaming_indicators.py
+"""
+Streaming technical indicator engine.
+Each symbol keeps a ring buffer of hourly candles and the running state of every
+indicator (EMA, Wilder RSI, windowed mean/variance, rolling extremes), so a new
+candle updates all of them in constant time. History is fetched asynchronously:
+the full window once, then only the newest candles on each refresh. Alerts,
+research and the natural language query engine all read from the same instance.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from price_oracle import resolve_coin_id
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_MARKET_CHART_URL = "https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+# CoinGecko returns hourly points for 2-90 day windows and 5-minute points below that
+CANDLE_SECONDS = 3600
+INCREMENTAL_DAYS = 2
+
+Candle = Tuple[float, float, float]  # (unix seconds, price, volume)
+HistoryFetcher = Callable[[str, int], Awaitable[List[Candle]]]
+
+class RollingWindow:
+    """Mean and population variance of the last `size` values (windowed Welford updates)"""
+
+    __slots__ = ('size', 'values', 'mean', '_m2')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Deque[float] = deque(maxlen=size)
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self._m2 / len(self.values), 0.0)) if self.values else 0.0
+
+    def push(self, value: float):
+        if self.full:
+            old = self.values[0]
+            self.values.append(value)
+            old_mean = self.mean
+            self.mean += (value - old) / self.size
+            self._m2 += (value - old) * (value - self.mean + old - old_mean)
+        else:
+            self.values.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self._m2 += delta * (value - self.mean)
+
+class RollingExtremes:
+    """Max and min of the last `size` values with monotonic deques (amortized O(1))"""
+
+    __slots__ = ('size', 'count', '_max', '_min')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._min: Deque[Tuple[int, float]] = deque()
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.size
+
+    @property
+    def high(self) -> float:
+        return self._max[0][1]
+
+    @property
+    def low(self) -> float:
+        return self._min[0][1]
+
+    def push(self, value: float):
+        index = self.count
+        self.count += 1
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        expired = index - self.size
+        if self._max[0][0] <= expired:
+            self._max.popleft()
+        if self._min[0][0] <= expired:
+            self._min.popleft()
+
+class StreamingEMA:
+    """Exponential moving average seeded with the first value; ready after `period` values"""
+
+    __slots__ = ('period', 'alpha', 'value', 'count')
+
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2 / (period + 1)
+        self.value = 0.0
+        self.count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def push(self, value: float) -> float:
+        self.value = value if self.count == 0 else self.value + self.alpha * (value - self.value)
+        self.count += 1
+        return self.value
+
+class SymbolIndicators:
+    """
+    Candle ring buffer and indicator state of one symbol. Periods follow the usual
+    defaults: SMA 20/50, EMA 12/26, MACD 12/26/9, Wilder RSI 14, Bollinger 20 x 2,
+    Stochastic 14/3, Williams %R 14 and CCI 20. Prices stand in for high and low.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.candles: Deque[Tuple[float, float, float, Dict[str, float]]] = deque(maxlen=capacity)
+        self.last_price: Optional[float] = None
+        self.sma_20 = RollingWindow(20)
+        self.sma_50 = RollingWindow(50)
+        self.ema_12 = StreamingEMA(12)
+        self.ema_26 = StreamingEMA(26)
+        self.macd_signal = StreamingEMA(9)
+        self.rsi_gain = StreamingEMA(14, alpha=1 / 14)
+        self.rsi_loss = StreamingEMA(14, alpha=1 / 14)
+        self.extremes = RollingExtremes(14)
+        self.stoch_d = RollingWindow(3)
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.candles[-1][0] if self.candles else float('-inf')
+
+    def update(self, timestamp: float, price: float, volume: float = 0.0) -> Dict[str, float]:
+        """Advance every indicator by one candle and return the indicator values at it"""
+        indicators: Dict[str, float] = {}
+
+        self.sma_20.push(price)
+        self.sma_50.push(price)
+        self.ema_12.push(price)
+        self.ema_26.push(price)
+        if self.sma_20.full:
+            middle = self.sma_20.mean
+            band = 2 * self.sma_20.std
+            indicators.update(sma_20=middle, bb_middle=middle, bb_upper=middle + band,
+                              bb_lower=middle - band, bb_width=2 * band)
+            # Mean deviation is over the fixed 20-candle window, so still constant per update
+            deviation = sum(abs(value - middle) for value in self.sma_20.values) / 20
+            indicators['cci'] = (price - middle) / (0.015 * deviation) if deviation > 0 else 0.0
+        if self.sma_50.full:
+            indicators['sma_50'] = self.sma_50.mean
+        if self.ema_12.ready:
+            indicators['ema_12'] = self.ema_12.value
+        if self.ema_26.ready:
+            macd = self.ema_12.value - self.ema_26.value
+            self.macd_signal.push(macd)
+            indicators.update(ema_26=self.ema_26.value, macd=macd)
+            if self.macd_signal.ready:
+                indicators['macd_signal'] = self.macd_signal.value
+                indicators['macd_histogram'] = macd - self.macd_signal.value
+
+        if self.last_price is not None:
+            change = price - self.last_price
+            self.rsi_gain.push(max(change, 0.0))
+            self.rsi_loss.push(max(-change, 0.0))
+            if self.rsi_gain.ready:
+                loss = self.rsi_loss.value
+                indicators['rsi'] = 100.0 if loss == 0 else 100 - 100 / (1 + self.rsi_gain.value / loss)
+        self.last_price = price
+
+        self.extremes.push(price)
+        if self.extremes.full:
+            high, low = self.extremes.high, self.extremes.low
+            stoch_k = 100 * (price - low) / (high - low) if high > low else 50.0
+            self.stoch_d.push(stoch_k)
+            indicators.update(stoch_k=stoch_k, stochastic=stoch_k,
+                              williams_r=-100 * (high - price) / (high - low) if high > low else -50.0)
+            if self.stoch_d.full:
+                indicators['stoch_d'] = self.stoch_d.mean
+
+        indicators['current_price'] = price
+        self.candles.append((timestamp, price, volume, indicators))
+        return indicators
+
+def compute_indicators(prices: Iterable[float]) -> List[Dict[str, float]]:
+    """Indicator values at every point of a price series, in one pass"""
+    state = SymbolIndicators(capacity=1)
+    return [state.update(index, price) for index, price in enumerate(prices)]
+
+class StreamingIndicatorEngine:
+    """Per-symbol streaming indicators over an incrementally fetched candle history"""
+
+    def __init__(self, capacity: int = 1000, history_days: int = 30, refresh_interval: float = 300.0,
+                 min_candles: int = 20, fetch_history: Optional[HistoryFetcher] = None):
+        self.capacity = capacity
+        self.history_days = history_days
+        self.refresh_interval = refresh_interval
+        self.min_candles = min_candles
+        self.fetch_history = fetch_history or self._fetch_market_chart
+        self._symbols: Dict[str, SymbolIndicators] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {
+            'candles': 0,
+            'stale_candles': 0,
+            'fetches': 0,
+            'failed_fetches': 0,
+            'coalesced': 0,
+        }
+
+    def update(self, symbol: str, timestamp: float, price: float, volume: float = 0.0) -> bool:
+        """
+        Append one candle; candles closer than 0.9 candle lengths to the previous one are
+        dropped, which also discards the partial "now" point of each API response
+        """
+        coin_id = resolve_coin_id(symbol)
+        state = self._symbols.get(coin_id)
+        if state is None:
+            state = self._symbols[coin_id] = SymbolIndicators(self.capacity)
+        if timestamp < state.last_timestamp + 0.9 * CANDLE_SECONDS or not price:
+            self.stats['stale_candles'] += 1
+            return False
+        state.update(timestamp, price, volume)
+        self.stats['candles'] += 1
+        return True
+
+    def feed(self, symbol: str, candles: Iterable[Candle]) -> int:
+        """Append candles in time order; returns how many were new"""
+        return sum(self.update(symbol, timestamp, price, volume) for timestamp, price, volume in candles)
+
+    def latest(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Indicator values at the newest candle, None while fewer than min_candles are known"""
+        state = self._symbols.get(resolve_coin_id(symbol))
+        if state is None or len(state.candles) < self.min_candles:
+            return None
+        return dict(state.candles[-1][3])
+
+    def history(self, symbol: str, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Candles with their indicator values, oldest first, optionally from unix time `since`"""
+        state = self._symbols.get(resolve_coin_id(symbol))
+        if state is None:
+            return []
+        return [
+            {'timestamp': datetime.fromtimestamp(timestamp), 'price': price, 'volume': volume,
+             'open': price, 'high': price, 'low': price, 'close': price, **indicators}
+            for timestamp, price, volume, indicators in state.candles
+            if since is None or timestamp >= since
+        ]
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures from a previous event loop can never complete here
+            self._loop = loop
+            self._in_flight = {}
+        return loop
+
+    async def ensure(self, symbol: str) -> bool:
+        """
+        Bring a symbol up to date: the full history on first use, then only the last
+        INCREMENTAL_DAYS once refresh_interval has passed. Concurrent callers share one fetch.
+        True when at least min_candles are known.
+        """
+        coin_id = resolve_coin_id(symbol)
+        refreshed_at = self._refreshed_at.get(coin_id)
+        if refreshed_at is None or time.monotonic() - refreshed_at >= self.refresh_interval:
+            loop = self._bind_loop()
+            future = self._in_flight.get(coin_id)
+            if future is not None:
+                self.stats['coalesced'] += 1
+            else:
+                future = loop.create_future()
+                self._in_flight[coin_id] = future
+                loop.create_task(self._refresh(coin_id, future))
+            await asyncio.shield(future)
+        state = self._symbols.get(coin_id)
+        return state is not None and len(state.candles) >= self.min_candles
+
+    def _fetch_days(self, coin_id: str) -> int:
+        """Days of history to fetch: enough to cover the gap since the newest known candle"""
+        state = self._symbols.get(coin_id)
+        if state is None or not state.candles:
+            return self.history_days
+        missing_days = math.ceil((time.time() - state.last_timestamp) / 86400)
+        if missing_days >= self.history_days:
+            # Too far behind to continue the stream; rebuild from a full window
+            del self._symbols[coin_id]
+            return self.history_days
+        return max(INCREMENTAL_DAYS, missing_days + 1)
+
+    async def _refresh(self, coin_id: str, future: asyncio.Future):
+        days = self._fetch_days(coin_id)
+        try:
+            self.stats['fetches'] += 1
+            candles = await self.fetch_history(coin_id, days)
+            added = self.feed(coin_id, sorted(candles))
+            logger.debug(f"Indicator history for {coin_id}: {added} new candles")
+        except Exception as e:
+            self.stats['failed_fetches'] += 1
+            logger.error(f"Error fetching indicator history for {coin_id}: {e}")
+        finally:
+            # Failures are retried on the next refresh interval too, not on every call
+            self._refreshed_at[coin_id] = time.monotonic()
+            self._in_flight.pop(coin_id, None)
+            if not future.done():
+                future.set_result(None)
+
+    async def get_indicators(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Up-to-date indicator values for a symbol, None when there is not enough history"""
+        if not await self.ensure(symbol):
+            return None
+        return self.latest(symbol)
+
+    async def _fetch_market_chart(self, coin_id: str, days: int) -> List[Candle]:
+        """CoinGecko market_chart prices and volumes as (seconds, price, volume) candles"""
+        from public_api_endpoints import public_apis
+        session = await public_apis.get_session()
+        params = {'vs_currency': 'usd', 'days': str(days)}
+        async with session.get(COINGECKO_MARKET_CHART_URL.format(coin_id=coin_id), params=params) as response:
+            if response.status != 200:
+                raise Exception(f"CoinGecko API error: {response.status}")
+            data = await response.json()
+
+        volumes = {int(point[0]): point[1] for point in data.get('total_volumes', [])}
+        return [(point[0] / 1000, point[1], volumes.get(int(point[0]), 0.0)) for point in data.get('prices', [])]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'symbols': len(self._symbols), 'in_flight': len(self._in_flight)}
+
+# Global instance
+indicator_engine = StreamingIndicatorEngine()
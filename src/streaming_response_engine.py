@@ -2,11 +2,13 @@
 import asyncio
 import time
 import logging
-from typing import AsyncGenerator, Dict, Any, Optional, List
+from typing import AsyncGenerator, AsyncIterator, Dict, Any, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 import json
-from telegram import Update
+from telegram import Message, Update
+from telegram.constants import ChatType, MessageLimit, ParseMode
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import ContextTypes
 
 logger = logging.getLogger(__name__)
@@ -277,9 +279,134 @@ class TelegramStreamingHandler:
                 parse_mode="Markdown"
             )
 
+class TelegramTokenStreamer:
+    """
+    Streams LLM tokens into a Telegram message by editing it in place. The first tokens are
+    shown as soon as they arrive; after that edits are throttled per chat (Telegram allows
+    roughly one edit per second in private chats and far fewer in groups), RetryAfter pushes
+    the next edit back, and text past the message length limit continues in a new message.
+    """
+    
+    CURSOR = " ▌"
+    
+    def __init__(self, private_interval: float = 1.0, group_interval: float = 3.0,
+                 first_flush_chars: int = 1):
+        self.private_interval = private_interval
+        self.group_interval = group_interval
+        self.first_flush_chars = first_flush_chars
+        self.max_length = MessageLimit.MAX_TEXT_LENGTH - len(self.CURSOR)
+        self._next_edit_at: Dict[int, float] = {}
+        self.stats = {
+            "streams": 0,
+            "edits": 0,
+            "skipped_edits": 0,
+            "rate_limited": 0,
+            "first_token_latency_total": 0.0,
+            "first_token_samples": 0
+        }
+    
+    def edit_interval(self, chat_type: Optional[str]) -> float:
+        return self.private_interval if chat_type in (None, ChatType.PRIVATE) else self.group_interval
+    
+    async def _edit(self, message: Message, text: str, final: bool = False) -> bool:
+        """Edit one message; returns False when the edit was rate limited"""
+        try:
+            if final:
+                try:
+                    await message.edit_text(text, parse_mode=ParseMode.MARKDOWN)
+                except BadRequest as e:
+                    if "not modified" in str(e).lower():
+                        return True
+                    # Partial Markdown entities from the model are common; fall back to plain text
+                    await message.edit_text(text)
+            else:
+                await message.edit_text(text)
+            self.stats["edits"] += 1
+            return True
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+            self._next_edit_at[message.chat_id] = time.monotonic() + delay
+            self.stats["rate_limited"] += 1
+            logger.warning(f"Telegram edit rate limited in chat {message.chat_id}, retrying in {delay:.1f}s")
+            return False
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                logger.warning(f"Message edit failed: {e}")
+            return True
+    
+    async def stream(self, chunks: AsyncIterator[str], message: Message,
+                     chat_type: Optional[str] = None, prefix: str = "") -> str:
+        """Stream chunks into an already sent (placeholder) message; returns the full text"""
+        interval = self.edit_interval(chat_type)
+        chat_id = message.chat_id
+        start = time.monotonic()
+        self.stats["streams"] += 1
+        
+        current = message
+        text = prefix
+        answer = []
+        shown = False
+        rate_limited = False
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if not answer:
+                self.stats["first_token_latency_total"] += time.monotonic() - start
+                self.stats["first_token_samples"] += 1
+            answer.append(chunk)
+            text += chunk
+            
+            # Finish the current message and continue in a new one at the length limit
+            while len(text) > self.max_length:
+                cut = text.rfind("\n", 0, self.max_length)
+                if cut <= 0:
+                    cut = self.max_length
+                await self._wait_for_slot(chat_id)
+                await self._edit(current, text[:cut], final=True)
+                text = text[cut:].lstrip("\n")
+                current = await current.reply_text(text[:self.max_length] + self.CURSOR)
+                self._next_edit_at[chat_id] = time.monotonic() + interval
+                shown = True
+            
+            # The first flush goes out immediately (unless Telegram asked us to back off);
+            # later ones wait for the chat's edit slot
+            if (shown or rate_limited) and time.monotonic() < self._next_edit_at.get(chat_id, 0.0):
+                self.stats["skipped_edits"] += 1
+                continue
+            if not shown and len(text) - len(prefix) < self.first_flush_chars:
+                continue
+            if await self._edit(current, text + self.CURSOR):
+                shown = True
+                self._next_edit_at[chat_id] = time.monotonic() + interval
+            else:
+                rate_limited = True
+        
+        # Final edit drops the cursor and applies Markdown
+        final_text = text if text.strip() else "…"
+        for _ in range(2):
+            await self._wait_for_slot(chat_id)
+            if await self._edit(current, final_text, final=True):
+                break
+        self._next_edit_at[chat_id] = time.monotonic() + interval
+        return "".join(answer)
+    
+    async def _wait_for_slot(self, chat_id: int):
+        delay = self._next_edit_at.get(chat_id, 0.0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        samples = self.stats["first_token_samples"]
+        return {
+            **self.stats,
+            "avg_first_token_latency": self.stats["first_token_latency_total"] / samples if samples else 0.0
+        }
+
 # Global streaming engine instance
 streaming_engine = StreamingResponseEngine()
 telegram_streaming_handler = TelegramStreamingHandler(streaming_engine)
+token_streamer = TelegramTokenStreamer()
 
 # Convenience functions
 async def send_streaming_response(update: Update, context: ContextTypes.DEFAULT_TYPE,
@@ -289,6 +416,15 @@ async def send_streaming_response(update: Update, context: ContextTypes.DEFAULT_
         update, context, message, processing_function
     )
 
+async def stream_ai_reply(update: Update, messages: List[Dict[str, str]],
+                          placeholder: Optional[Message] = None, prefix: str = "", **kwargs) -> str:
+    """Stream an LLM answer into the chat, reusing the placeholder message if one was sent"""
+    from ai_provider_manager import stream_ai_response
+    
+    message = placeholder or await update.effective_message.reply_text("🤔 Thinking...")
+    chat_type = update.effective_chat.type if update.effective_chat else None
+    return await token_streamer.stream(stream_ai_response(messages, **kwargs), message, chat_type, prefix)
+
 def get_streaming_metrics() -> Dict[str, Any]:
     """Get streaming performance metrics"""
     active_streams = streaming_engine.get_active_streams()
@@ -301,5 +437,6 @@ def get_streaming_metrics() -> Dict[str, Any]:
         },
         "average_processing_time": sum(
             time.time() - s["start_time"] for s in active_streams.values()
-        ) / max(len(active_streams), 1)
+        ) / max(len(active_streams), 1),
+        "token_streaming": token_streamer.get_stats()
     }
\ No newline at end of file
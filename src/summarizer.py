@@ -2,44 +2,64 @@
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterable, List, Dict, Optional, Any, Union
 from config import config
 from ai_providers import get_ai_response
 
 logger = logging.getLogger(__name__)
 
+NO_MESSAGES_TRANSCRIPT = "No messages to format."
+NO_CONVERSATIONS_SUMMARY = "No conversations to summarize today."
+
+def _format_transcript_line(msg: Dict) -> str:
+    """Format a single decrypted message as a transcript line"""
+    timestamp = datetime.fromtimestamp(msg.get('timestamp', 0)).strftime('%H:%M')
+    username = msg.get('username', 'Unknown')
+    text = msg.get('text', '')
+    
+    # Handle different message types
+    if msg.get('is_edit'):
+        return f"[{timestamp}] {username} (edited): {text}"
+    elif msg.get('is_deleted'):
+        return f"[{timestamp}] {username} (deleted message)"
+    else:
+        return f"[{timestamp}] {username}: {text}"
+
 def format_transcript(decrypted_messages: List[Dict]) -> str:
     """Format decrypted messages into a readable transcript"""
     if not decrypted_messages:
-        return "No messages to format."
+        return NO_MESSAGES_TRANSCRIPT
     
-    transcript_parts = []
-    for msg in sorted(decrypted_messages, key=lambda x: x.get('timestamp', 0)):
-        timestamp = datetime.fromtimestamp(msg.get('timestamp', 0)).strftime('%H:%M')
-        username = msg.get('username', 'Unknown')
-        text = msg.get('text', '')
-        
-        # Handle different message types
-        if msg.get('is_edit'):
-            transcript_parts.append(f"[{timestamp}] {username} (edited): {text}")
-        elif msg.get('is_deleted'):
-            transcript_parts.append(f"[{timestamp}] {username} (deleted message)")
-        else:
-            transcript_parts.append(f"[{timestamp}] {username}: {text}")
+    transcript_parts = [_format_transcript_line(msg) for msg in sorted(decrypted_messages, key=lambda x: x.get('timestamp', 0))]
     
     return "\n".join(transcript_parts)
 
-async def generate_daily_summary(decrypted_messages: List[Dict], user_id: int = None) -> Optional[str]:
-    """Generate daily summary using AI with background processing"""
-    if not decrypted_messages:
-        return "No conversations to summarize today."
+async def format_transcript_stream(message_stream: AsyncIterable[Dict]) -> str:
+    """Format a timestamp-ordered stream of decrypted messages (e.g. MessageStorage.stream_messages_for_period)"""
+    transcript_parts = [_format_transcript_line(msg) async for msg in message_stream]
+    
+    if not transcript_parts:
+        return NO_MESSAGES_TRANSCRIPT
+    
+    return "\n".join(transcript_parts)
+
+async def generate_daily_summary(decrypted_messages: Union[List[Dict], AsyncIterable[Dict]], user_id: int = None) -> Optional[str]:
+    """Generate daily summary using AI with background processing. Accepts a list or an async message stream."""
+    streaming = hasattr(decrypted_messages, '__aiter__')
+    if not streaming and not decrypted_messages:
+        return NO_CONVERSATIONS_SUMMARY
     
     try:
         # Process in background - user doesn't see this
         logger.info("🤔 Analyzing conversation patterns and extracting key themes...")
         
         # Format the transcript
-        transcript = format_transcript(decrypted_messages)
+        if streaming:
+            transcript = await format_transcript_stream(decrypted_messages)
+            if transcript == NO_MESSAGES_TRANSCRIPT:
+                return NO_CONVERSATIONS_SUMMARY
+        else:
+            transcript = format_transcript(decrypted_messages)
         
         if len(transcript.strip()) < 50:  # Very short conversations
             return "📝 **Daily Summary**\n\nConversation was too brief to generate meaningful insights."
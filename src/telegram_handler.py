@@ -9,12 +9,13 @@ from typing import Dict, List, Optional, Any
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackContext
 from config import config
-from user_db import get_user_property, set_user_property
+from user_db import get_user_property, set_user_property, record_user_activity
 from encryption import encrypt_message, decrypt_message
 from ai_providers import get_ai_response
 from summarizer import generate_daily_summary, generate_weekly_digest
 from mcp_intent_router import route_user_request, analyze_user_intent
-from message_storage import message_storage
+from message_storage import message_storage, message_ingestion_queue
+from rolling_summarizer import rolling_summarizer
 
 logger = logging.getLogger(__name__)
 
@@ -95,10 +96,9 @@ class TelegramHandler:
         """Update user activity tracking"""
         self.username_map[user_id] = username
         self.last_activity[user_id] = datetime.now()
-        
-        # Store in database
-        set_user_property(user_id, 'last_username', username)
-        set_user_property(user_id, 'last_activity', datetime.now().isoformat())
+
+        # Write-behind: coalesced in memory and flushed to the database in batches
+        record_user_activity(user_id, username)
     
     async def _store_message(self, message, user, chat):
         """Store message with encryption and metadata in persistent storage"""
@@ -162,8 +162,8 @@ class TelegramHandler:
                 # Skip forward information if not available
                 pass
             
-            # Store in persistent database with encryption
-            success = message_storage.store_message(message_data)
+            # Queue for batched, encrypted persistence (written within a few hundred ms)
+            success = await message_ingestion_queue.enqueue(message_data)
             
             if success:
                 # Also store in memory for quick access (legacy support)
@@ -180,9 +180,9 @@ class TelegramHandler:
                 if len(self.message_store[chat.id]) > max_messages:
                     self.message_store[chat.id] = self.message_store[chat.id][-max_messages:]
                 
-                logger.debug(f"Stored encrypted message from {user.username} in chat {chat.id} (persistent + memory)")
+                logger.debug(f"Queued encrypted message from {user.username} in chat {chat.id} (persistent + memory)")
             else:
-                logger.warning(f"Failed to store message in persistent storage for chat {chat.id}")
+                logger.warning(f"Failed to queue message for persistent storage in chat {chat.id}")
             
         except Exception as e:
             logger.error(f"Error storing message: {e}")
@@ -519,23 +519,21 @@ Use `/clear` to delete your data anytime.
             # Show processing message
             processing_msg = await update.effective_message.reply_text("🤔 Analyzing today's conversations...")
 
-            # Get today's messages from persistent storage (last 24 hours)
-            today_messages = message_storage.get_messages_for_period(chat_id, hours=24)
+            # Cached hourly summaries plus the messages since the last closed hour, including any still queued
+            await message_ingestion_queue.drain()
+            result = await rolling_summarizer.summarize_period(chat_id, hours=24, user_id=user_id)
 
-            if not today_messages:
+            if not result.message_count:
                 await processing_msg.edit_text("📝 No messages to summarize today.")
                 return
-            
-            # Generate summary
-            summary = await generate_daily_summary(today_messages, user_id)
+            summary = result.text
             
             # Store the summary for future reference (kept for 7 days)
-            unique_users = len(set(msg.get('user_id') for msg in today_messages))
             message_storage.store_daily_summary(
                 chat_id=chat_id,
                 summary_text=summary,
-                message_count=len(today_messages),
-                participant_count=unique_users
+                message_count=result.message_count,
+                participant_count=result.participant_count
             )
             
             # Update message with summary
@@ -0,0 +1,189 @@
+# src/token_counter.py
+"""
+Offline, per-provider token counting and context-limit-aware packing.
+Counters are registered per provider: OpenAI models use tiktoken's cached BPE files
+when tiktoken is installed, and every other model uses an estimator calibrated to
+its tokenizer family. Nothing here makes a network call.
+"""
+
+import abc
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Context windows of models not listed in ai_providers_enhanced.PROVIDER_CONFIGS
+MODEL_CONTEXT_LIMITS = {
+    'llama3-70b-8192': 8192,
+    'llama3-8b-8192': 8192,
+    'llama-3.1-70b-versatile': 131072,
+    'mixtral-8x7b-32768': 32768,
+    'gpt-4-turbo': 128000,
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+    'gemini-1.5-pro-latest': 1000000,
+    'gemini-1.5-flash-latest': 1000000,
+    'claude-3-sonnet-20240229': 200000,
+    'claude-3-5-sonnet-20241022': 200000,
+    'claude-3-5-haiku-20241022': 200000,
+}
+DEFAULT_CONTEXT_LIMIT = 8192
+
+# GPT-style pre-tokenization: contractions, words with their leading space, 1-3 digit runs,
+# punctuation runs, whitespace
+_PIECE_RE = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+
+class TokenCounter(abc.ABC):
+    """Counts tokens for one model family"""
+
+    name = 'base'
+    exact = False
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        """Tokens text occupies for this model family"""
+
+class CalibratedEstimator(TokenCounter):
+    """
+    Tokenizer-free estimate that walks the same pre-tokenized pieces a BPE tokenizer sees.
+    Common words cost one token, longer ones one token per chars_per_token, and
+    non-ASCII text one token per bytes_per_token UTF-8 bytes. The constants are fitted
+    per tokenizer family and round up, so estimates err on the high side.
+    """
+
+    def __init__(self, name: str, word_chars: int = 6, chars_per_token: float = 3.6,
+                 bytes_per_token: float = 2.2, digits_per_token: int = 3):
+        self.name = name
+        self.word_chars = word_chars
+        self.chars_per_token = chars_per_token
+        self.bytes_per_token = bytes_per_token
+        self.digits_per_token = digits_per_token
+
+    def count(self, text: str) -> int:
+        tokens = 0
+        for piece in _PIECE_RE.findall(text):
+            if not piece.isascii():
+                tokens += math.ceil(len(piece.encode('utf-8')) / self.bytes_per_token)
+            elif piece.isspace():
+                tokens += 1 if len(piece) < 4 else math.ceil(len(piece) / 4)
+            else:
+                stripped = piece.lstrip(' ')
+                if stripped.isdigit():
+                    tokens += math.ceil(len(stripped) / self.digits_per_token)
+                elif stripped.isalpha() and len(piece) <= self.word_chars:
+                    tokens += 1
+                else:
+                    tokens += math.ceil(len(piece) / self.chars_per_token)
+        return tokens
+
+class TiktokenCounter(TokenCounter):
+    """Exact counts from a tiktoken BPE encoding"""
+
+    exact = True
+
+    def __init__(self, encoding_name: str):
+        self.name = encoding_name
+        self.encoding = _load_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+@lru_cache(maxsize=None)
+def _load_encoding(encoding_name: str):
+    return tiktoken.get_encoding(encoding_name)
+
+# Estimators fitted per tokenizer family
+ESTIMATORS = {
+    'cl100k': CalibratedEstimator('cl100k_estimate', word_chars=8, chars_per_token=4.0, bytes_per_token=2.5),
+    'o200k': CalibratedEstimator('o200k_estimate', word_chars=9, chars_per_token=4.2, bytes_per_token=3.0),
+    'llama3': CalibratedEstimator('llama3_estimate', word_chars=8, chars_per_token=4.0, bytes_per_token=2.5),
+    'sentencepiece': CalibratedEstimator('sentencepiece_estimate', word_chars=7, chars_per_token=3.8, bytes_per_token=2.5),
+    'claude': CalibratedEstimator('claude_estimate', word_chars=6, chars_per_token=3.4, bytes_per_token=2.0),
+}
+
+def _bpe_or_estimate(encoding_name: str, estimator: str) -> TokenCounter:
+    if TIKTOKEN_AVAILABLE:
+        try:
+            return TiktokenCounter(encoding_name)
+        except Exception as e:
+            # The BPE file is not cached locally and there is no network
+            logger.warning(f"tiktoken encoding {encoding_name} unavailable, estimating: {e}")
+    return ESTIMATORS[estimator]
+
+def _openai_counter(model: str) -> TokenCounter:
+    if model.startswith(('gpt-4o', 'o1', 'o3', 'o4')):
+        return _bpe_or_estimate('o200k_base', 'o200k')
+    return _bpe_or_estimate('cl100k_base', 'cl100k')
+
+_COUNTER_FACTORIES: Dict[str, Callable[[str], TokenCounter]] = {
+    'openai': _openai_counter,
+    'openai_hosted': _openai_counter,
+    'groq': lambda model: ESTIMATORS['llama3'] if 'llama' in model.lower() else ESTIMATORS['cl100k'],
+    'gemini': lambda model: ESTIMATORS['sentencepiece'],
+    'anthropic': lambda model: ESTIMATORS['claude'],
+}
+
+def register_token_counter(provider: str, factory: Callable[[str], TokenCounter]):
+    """Install a counter factory for a provider, e.g. one backed by the provider's own tokenizer"""
+    _COUNTER_FACTORIES[provider] = factory
+    get_token_counter.cache_clear()
+
+@lru_cache(maxsize=64)
+def get_token_counter(provider: str, model: str) -> TokenCounter:
+    """Counter for a provider/model; unknown providers get the cl100k estimate"""
+    factory = _COUNTER_FACTORIES.get(provider)
+    return factory(model) if factory else ESTIMATORS['cl100k']
+
+def get_context_limit(provider: str, model: str) -> int:
+    """Context window in tokens, from PROVIDER_CONFIGS first, then the local table"""
+    try:
+        from ai_providers_enhanced import PROVIDER_CONFIGS
+        provider_config = PROVIDER_CONFIGS.get(provider)
+        if provider_config and model in provider_config.models:
+            return provider_config.models[model].context_limit
+    except ImportError:
+        pass
+    return MODEL_CONTEXT_LIMITS.get(model, DEFAULT_CONTEXT_LIMIT)
+
+def pack_contiguous(costs: List[int], capacity: int) -> List[Tuple[int, int]]:
+    """
+    Split items, kept in order, into [start, end) ranges whose costs each sum to at most
+    capacity. Uses the fewest ranges possible, then balances them by finding the smallest
+    per-range load that still needs no more ranges. Items over capacity get a range of their own.
+    """
+    if not costs:
+        return []
+
+    def greedy(limit: int) -> List[Tuple[int, int]]:
+        ranges = []
+        start, load = 0, 0
+        for i, cost in enumerate(costs):
+            if load + cost > limit and i > start:
+                ranges.append((start, i))
+                start, load = i, 0
+            load += cost
+        ranges.append((start, len(costs)))
+        return ranges
+
+    fewest = greedy(capacity)
+    if len(fewest) == 1:
+        return fewest
+
+    high = capacity
+    low = min(high, max(min(max(costs), capacity), math.ceil(sum(costs) / len(fewest))))
+    while low < high:
+        middle = (low + high) // 2
+        if len(greedy(middle)) <= len(fewest):
+            high = middle
+        else:
+            low = middle + 1
+    return greedy(low)
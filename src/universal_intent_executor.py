@@ -13,6 +13,7 @@ from enum import Enum
 import aiohttp
 import requests
 from datetime import datetime, timedelta
+from price_oracle import price_oracle
 
 logger = logging.getLogger(__name__)
 
@@ -484,13 +485,16 @@ class UniversalIntentExecutor:
 
     # Tool Implementation Functions
     async def _get_crypto_price(self, symbol: str, vs_currency: str = 'usd') -> Dict[str, Any]:
-        """Get real-time crypto price from public APIs"""
+        """Get real-time crypto price from the shared price oracle"""
         try:
-            from public_api_endpoints import get_crypto_price_public
-            result = await get_crypto_price_public(symbol, vs_currency)
+            if vs_currency.lower() == 'usd':
+                result = await price_oracle.get_quote(symbol)
+            else:
+                from public_api_endpoints import get_crypto_price_public
+                result = await get_crypto_price_public(symbol, vs_currency)
 
             # Ensure we have valid data
-            if 'error' not in result and result.get('price', 0) > 0:
+            if result and 'error' not in result and result.get('price', 0) > 0:
                 return result
             else:
                 # Fallback to mock data if all APIs fail
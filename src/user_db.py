@@ -1,8 +1,15 @@
 # src/user_db.py
 import sqlite3
+import asyncio
 import logging
+import threading
 import time
 import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import LifoQueue, Empty, Full
+from typing import Dict, Optional, Tuple
 from cryptography.fernet import Fernet
 from config import config
 
@@ -15,144 +22,464 @@ except Exception as e:
     logger.critical(f"Could not initialize database encryptor: {e}")
     fernet = None
 
-class UserDatabase:
-    """User database management class"""
-    
-    def __init__(self):
-        self.db_file = DB_FILE
-        self.fernet = fernet
-        logger.info("User database initialized with proper schema and indexes.")
+class ConnectionPool:
+    """
+    Thread-safe pool of persistent WAL-mode SQLite connections.
+    Connections are opened lazily and reused, so callers never pay for connect/close.
+    """
 
-def init_db(db_path=None):
-    db_file = db_path or DB_FILE
-    con = sqlite3.connect(db_file)
-    cur = con.cursor()
-    
-    # Enable foreign key constraints
-    cur.execute("PRAGMA foreign_keys = ON")
-    
-    # Create tables with proper foreign key relationships
-    cur.execute('''CREATE TABLE IF NOT EXISTS user_properties (
-        user_id INTEGER, 
-        key TEXT, 
-        value TEXT, 
-        PRIMARY KEY (user_id, key)
-    )''')
-    
-    cur.execute('''CREATE TABLE IF NOT EXISTS username_map (
-        user_id INTEGER PRIMARY KEY, 
-        username TEXT, 
-        last_seen INTEGER
-    )''')
-    
-    cur.execute('''CREATE TABLE IF NOT EXISTS onchain_alerts (
-        alert_id TEXT PRIMARY KEY, 
-        user_id INTEGER NOT NULL, 
-        chat_id INTEGER NOT NULL, 
-        alert_type TEXT NOT NULL, 
-        params TEXT NOT NULL, 
-        created_at INTEGER NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES user_properties (user_id) ON DELETE CASCADE
-    )''')
-    
-    # Create indexes for better performance
-    cur.execute('''CREATE INDEX IF NOT EXISTS idx_user_properties_user_id ON user_properties(user_id)''')
-    cur.execute('''CREATE INDEX IF NOT EXISTS idx_username_map_username ON username_map(username)''')
-    cur.execute('''CREATE INDEX IF NOT EXISTS idx_onchain_alerts_user_id ON onchain_alerts(user_id)''')
-    cur.execute('''CREATE INDEX IF NOT EXISTS idx_onchain_alerts_created_at ON onchain_alerts(created_at)''')
-    
-    con.commit()
-    con.close()
-    logger.info("User database initialized with proper schema and indexes.")
+    def __init__(self, database_path: str, pool_size: int = 4, timeout: float = 10.0):
+        self.database_path = database_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._created_connections = 0
+        self._closed = False
 
-def update_username_mapping(user_id: int, username: str):
-    if not username: return
-    con = sqlite3.connect(DB_FILE); cur = con.cursor()
-    cur.execute("INSERT OR REPLACE INTO username_map (user_id, username, last_seen) VALUES (?, ?, ?)", (user_id, username, int(time.time())))
-    con.commit(); con.close()
+    def _create_connection(self) -> sqlite3.Connection:
+        """Create a new database connection with optimizations"""
+        conn = sqlite3.connect(self.database_path, timeout=self.timeout, check_same_thread=False)
 
-def get_user_id_from_username(username: str) -> int | None:
-    con = sqlite3.connect(DB_FILE); cur = con.cursor()
-    res = cur.execute("SELECT user_id FROM username_map WHERE username = ?", (username,)); result = res.fetchone()
-    con.close(); return result[0] if result else None
+        # WAL lets readers proceed while a writer holds the lock
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
 
-def set_user_property(user_id: int, key: str, value: str, encrypted: bool = False):
-    if encrypted and not fernet: logger.error(f"Cannot set encrypted property '{key}': Encryptor unavailable."); return
-    final_value = fernet.encrypt(value.encode()).decode() if encrypted else value
-    
-    # Retry logic for database operations
-    for attempt in range(3):
+        with self._lock:
+            self._created_connections += 1
+        return conn
+
+    @contextmanager
+    def get_connection(self):
+        """Borrow a connection from the pool, opening one if none is idle"""
+        try:
+            conn = self._pool.get_nowait()
+        except Empty:
+            conn = self._create_connection()
+
+        try:
+            yield conn
+        finally:
+            try:
+                # Never hand out a connection with a half-finished transaction
+                if conn.in_transaction:
+                    conn.rollback()
+                self._release(conn)
+            except sqlite3.Error:
+                conn.close()
+
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, closing it if the pool is full or shut down"""
+        if self._closed:
+            conn.close()
+            return
         try:
-            con = sqlite3.connect(DB_FILE, timeout=10.0)
-            con.execute("PRAGMA busy_timeout = 10000")  # 10 second timeout
+            self._pool.put_nowait(conn)
+        except Full:
+            conn.close()
+
+    def stats(self) -> dict:
+        """Get pool statistics"""
+        return {
+            'pool_size': self.pool_size,
+            'idle_connections': self._pool.qsize(),
+            'created_connections': self._created_connections,
+        }
+
+    def close_all(self):
+        """Close all idle connections and stop pooling new ones"""
+        self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except Empty:
+                break
+            except Exception:
+                pass
+
+class ActivityWriteBuffer:
+    """
+    Write-behind buffer for high-frequency user activity updates.
+    Coalesces per-user writes in memory and flushes them in a single executemany
+    transaction every flush_interval_ms, or as soon as max_pending records are buffered.
+    """
+
+    def __init__(self, pool: ConnectionPool, executor: ThreadPoolExecutor,
+                 flush_interval_ms: int = 500, max_pending: int = 500):
+        self.pool = pool
+        self.executor = executor
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+
+        self._properties: Dict[Tuple[int, str], str] = {}
+        self._usernames: Dict[int, Tuple[str, int]] = {}
+        # Records swapped out by a flush that is still committing, kept readable
+        self._inflight_properties: Dict[Tuple[int, str], str] = {}
+        self._inflight_usernames: Dict[int, Tuple[str, int]] = {}
+
+        self._lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.stats = {
+            'records_buffered': 0,
+            'records_flushed': 0,
+            'flushes': 0,
+            'last_flush_ms': 0.0,
+        }
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._properties) + len(self._usernames)
+
+    def record_activity(self, user_id: int, username: str):
+        """Buffer the last_username/last_activity properties and username mapping for a user"""
+        with self._lock:
+            self._properties[(user_id, 'last_username')] = username
+            self._properties[(user_id, 'last_activity')] = datetime.now().isoformat()
+            if username:
+                self._usernames[user_id] = (username, int(time.time()))
+        self._after_write(3)
+
+    def set_property(self, user_id: int, key: str, value: str):
+        with self._lock:
+            self._properties[(user_id, key)] = value
+        self._after_write(1)
+
+    def set_username(self, user_id: int, username: str):
+        if not username: return
+        with self._lock:
+            self._usernames[user_id] = (username, int(time.time()))
+        self._after_write(1)
+
+    def discard_property(self, user_id: int, key: str):
+        """Drop a buffered value so it cannot overwrite a newer direct write"""
+        with self._lock:
+            self._properties.pop((user_id, key), None)
+
+    def get_pending_property(self, user_id: int, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._properties.get((user_id, key))
+            if value is None:
+                value = self._inflight_properties.get((user_id, key))
+        return value
+
+    def get_pending_user_id(self, username: str) -> Optional[int]:
+        with self._lock:
+            for mapping in (self._usernames, self._inflight_usernames):
+                for user_id, (name, _) in mapping.items():
+                    if name == username:
+                        return user_id
+        return None
+
+    def _after_write(self, records: int):
+        self.stats['records_buffered'] += records
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to flush in the background, write through
+            self.flush()
+            return
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if self.pending_count >= self.max_pending:
+            self._wakeup.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self.pending_count:
+                await loop.run_in_executor(self.executor, self.flush)
+
+    def flush(self) -> int:
+        """Write all buffered records in one transaction, returning how many were written"""
+        with self.flush_lock:
+            with self._lock:
+                properties, self._properties = self._properties, {}
+                usernames, self._usernames = self._usernames, {}
+                self._inflight_properties = properties
+                self._inflight_usernames = usernames
+            if not properties and not usernames:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with self.pool.get_connection() as con:
+                    with con:
+                        con.executemany(
+                            "INSERT OR REPLACE INTO user_properties (user_id, key, value) VALUES (?, ?, ?)",
+                            [(user_id, key, value) for (user_id, key), value in properties.items()])
+                        con.executemany(
+                            "INSERT OR REPLACE INTO username_map (user_id, username, last_seen) VALUES (?, ?, ?)",
+                            [(user_id, username, last_seen) for user_id, (username, last_seen) in usernames.items()])
+            except sqlite3.Error as e:
+                logger.error(f"Failed to flush {len(properties) + len(usernames)} buffered user records: {e}")
+                # Requeue without clobbering anything written since the swap
+                with self._lock:
+                    for item_key, value in properties.items():
+                        self._properties.setdefault(item_key, value)
+                    for user_id, mapping in usernames.items():
+                        self._usernames.setdefault(user_id, mapping)
+                return 0
+            finally:
+                with self._lock:
+                    self._inflight_properties = {}
+                    self._inflight_usernames = {}
+
+            written = len(properties) + len(usernames)
+            self.stats['records_flushed'] += written
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+            return written
+
+    def cancel(self):
+        """Cancel the background flusher without waiting for it; callers flush afterwards"""
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        loop = task.get_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            task.cancel()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+
+    async def stop(self):
+        """Cancel the background flusher and flush whatever is still buffered"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.flush)
+
+class UserDatabase:
+    """
+    User database management class.
+    Runs every query on a pooled connection; the *_async methods execute on a
+    small dedicated thread pool so event-loop handlers never block on SQLite.
+    """
+
+    def __init__(self, db_file: Optional[str] = None, pool_size: int = 4):
+        self.db_file = db_file or DB_FILE
+        self.fernet = fernet
+        self.pool = ConnectionPool(self.db_file, pool_size=pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='user_db')
+        self.activity_buffer = ActivityWriteBuffer(
+            self.pool, self._executor,
+            flush_interval_ms=config.get('ACTIVITY_FLUSH_INTERVAL_MS', 500),
+            max_pending=config.get('ACTIVITY_FLUSH_MAX_RECORDS', 500))
+
+    def init_schema(self):
+        with self.pool.get_connection() as con:
             cur = con.cursor()
-            cur.execute("INSERT OR REPLACE INTO user_properties (user_id, key, value) VALUES (?, ?, ?)", (user_id, key, final_value))
+
+            # Create tables with proper foreign key relationships
+            cur.execute('''CREATE TABLE IF NOT EXISTS user_properties (
+                user_id INTEGER,
+                key TEXT,
+                value TEXT,
+                PRIMARY KEY (user_id, key)
+            )''')
+
+            cur.execute('''CREATE TABLE IF NOT EXISTS username_map (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                last_seen INTEGER
+            )''')
+
+            cur.execute('''CREATE TABLE IF NOT EXISTS onchain_alerts (
+                alert_id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                chat_id INTEGER NOT NULL,
+                alert_type TEXT NOT NULL,
+                params TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES user_properties (user_id) ON DELETE CASCADE
+            )''')
+
+            # Create indexes for better performance
+            cur.execute('''CREATE INDEX IF NOT EXISTS idx_user_properties_user_id ON user_properties(user_id)''')
+            cur.execute('''CREATE INDEX IF NOT EXISTS idx_username_map_username ON username_map(username)''')
+            cur.execute('''CREATE INDEX IF NOT EXISTS idx_onchain_alerts_user_id ON onchain_alerts(user_id)''')
+            cur.execute('''CREATE INDEX IF NOT EXISTS idx_onchain_alerts_created_at ON onchain_alerts(created_at)''')
+
             con.commit()
-            con.close()
-            return
-        except sqlite3.OperationalError as e:
-            if attempt < 2:  # Retry up to 3 times
-                time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                continue
-            else:
-                logger.error(f"Database operation failed after 3 attempts: {e}")
-                if 'con' in locals():
-                    con.close()
+
+    def update_username_mapping(self, user_id: int, username: str):
+        self.activity_buffer.set_username(user_id, username)
+
+    def record_user_activity(self, user_id: int, username: str):
+        """Buffer per-message activity tracking; it reaches disk on the next batched flush"""
+        self.activity_buffer.record_activity(user_id, username)
+
+    def get_user_id_from_username(self, username: str) -> int | None:
+        pending = self.activity_buffer.get_pending_user_id(username)
+        if pending is not None:
+            return pending
+        try:
+            with self.pool.get_connection() as con:
+                result = con.execute("SELECT user_id FROM username_map WHERE username = ?", (username,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to look up username '{username}': {e}")
+            return None
+        return result[0] if result else None
+
+    def set_user_property(self, user_id: int, key: str, value: str, encrypted: bool = False):
+        if encrypted and not self.fernet: logger.error(f"Cannot set encrypted property '{key}': Encryptor unavailable."); return
+        final_value = self.fernet.encrypt(value.encode()).decode() if encrypted else value
+
+        # busy_timeout on the pooled connection waits out concurrent writers, no sleep-retry needed
+        try:
+            with self.activity_buffer.flush_lock, self.pool.get_connection() as con:
+                self.activity_buffer.discard_property(user_id, key)
+                con.execute("INSERT OR REPLACE INTO user_properties (user_id, key, value) VALUES (?, ?, ?)", (user_id, key, final_value))
+                con.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Database operation failed: {e}")
         except Exception as e:
             logger.error(f"Unexpected database error: {e}")
-            if 'con' in locals():
-                con.close()
-            break
 
-def get_user_property(user_id: int, key: str, default=None, encrypted: bool = False):
-    if encrypted and not fernet: 
-        logger.error(f"Cannot get encrypted property '{key}': Encryptor unavailable.")
-        return default
-    
-    # Retry logic for database operations
-    for attempt in range(3):
+    def get_user_property(self, user_id: int, key: str, default=None, encrypted: bool = False):
+        if encrypted and not self.fernet:
+            logger.error(f"Cannot get encrypted property '{key}': Encryptor unavailable.")
+            return default
+
+        if not encrypted:
+            pending = self.activity_buffer.get_pending_property(user_id, key)
+            if pending is not None:
+                return pending
+
         try:
-            con = sqlite3.connect(DB_FILE, timeout=10.0)
-            con.execute("PRAGMA busy_timeout = 10000")  # 10 second timeout
-            cur = con.cursor()
-            res = cur.execute("SELECT value FROM user_properties WHERE user_id = ? AND key = ?", (user_id, key))
-            result = res.fetchone()
-            con.close()
-            
-            if not result: 
-                return default
-            
-            value = result[0]
-            if encrypted:
-                try: 
-                    return fernet.decrypt(value.encode()).decode()
-                except Exception as e: 
-                    logger.error(f"Failed to decrypt property '{key}' for user {user_id}: {e}")
-                    return default
-            return value
-            
-        except sqlite3.OperationalError as e:
-            if attempt < 2:  # Retry up to 3 times
-                time.sleep(0.1 * (attempt + 1))  # Exponential backoff
-                continue
-            else:
-                logger.error(f"Database read operation failed after 3 attempts: {e}")
-                if 'con' in locals():
-                    con.close()
-                return default
+            with self.pool.get_connection() as con:
+                result = con.execute("SELECT value FROM user_properties WHERE user_id = ? AND key = ?", (user_id, key)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Database read operation failed: {e}")
+            return default
         except Exception as e:
             logger.error(f"Unexpected database error: {e}")
-            if 'con' in locals():
-                con.close()
             return default
 
+        if not result:
+            return default
+
+        value = result[0]
+        if encrypted:
+            try:
+                return self.fernet.decrypt(value.encode()).decode()
+            except Exception as e:
+                logger.error(f"Failed to decrypt property '{key}' for user {user_id}: {e}")
+                return default
+        return value
+
+    def add_alert_to_db(self, arkham_alert_id: str, user_id: int, chat_id: int, alert_type: str, params: dict):
+        with self.pool.get_connection() as con:
+            con.execute("INSERT INTO onchain_alerts (alert_id, user_id, chat_id, alert_type, params, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (arkham_alert_id, user_id, chat_id, alert_type, json.dumps(params), int(time.time())))
+            con.commit()
+
+    def count_user_alerts(self, user_id: int) -> int:
+        with self.pool.get_connection() as con:
+            return con.execute("SELECT COUNT(*) FROM onchain_alerts WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    async def run_async(self, func, *args, **kwargs):
+        """Run a database method on the dedicated thread pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def set_user_property_async(self, user_id: int, key: str, value: str, encrypted: bool = False):
+        return await self.run_async(self.set_user_property, user_id, key, value, encrypted=encrypted)
+
+    async def get_user_property_async(self, user_id: int, key: str, default=None, encrypted: bool = False):
+        return await self.run_async(self.get_user_property, user_id, key, default, encrypted=encrypted)
+
+    async def update_username_mapping_async(self, user_id: int, username: str):
+        # Buffered in memory, so there is nothing to offload
+        self.update_username_mapping(user_id, username)
+
+    async def get_user_id_from_username_async(self, username: str) -> int | None:
+        return await self.run_async(self.get_user_id_from_username, username)
+
+    def close(self):
+        # Stop the flusher first so it cannot submit to the executor once it is shut down
+        self.activity_buffer.cancel()
+        self.activity_buffer.flush()
+        self._executor.shutdown(wait=True)
+        self.pool.close_all()
+
+_database: Optional[UserDatabase] = None
+_database_lock = threading.Lock()
+
+def get_database() -> UserDatabase:
+    """Get the process-wide user database, creating it on first use"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = UserDatabase()
+    return _database
+
+def close_db():
+    """Close the process-wide user database and its connections"""
+    global _database
+    with _database_lock:
+        if _database is not None:
+            _database.close()
+            _database = None
+
+def init_db(db_path=None):
+    if db_path and db_path != DB_FILE:
+        database = UserDatabase(db_path, pool_size=1)
+        database.init_schema()
+        database.close()
+    else:
+        get_database().init_schema()
+    logger.info("User database initialized with proper schema and indexes.")
+
+def update_username_mapping(user_id: int, username: str):
+    get_database().update_username_mapping(user_id, username)
+
+def record_user_activity(user_id: int, username: str):
+    get_database().record_user_activity(user_id, username)
+
+def get_user_id_from_username(username: str) -> int | None:
+    return get_database().get_user_id_from_username(username)
+
+def set_user_property(user_id: int, key: str, value: str, encrypted: bool = False):
+    get_database().set_user_property(user_id, key, value, encrypted)
+
+def get_user_property(user_id: int, key: str, default=None, encrypted: bool = False):
+    return get_database().get_user_property(user_id, key, default, encrypted)
+
 def add_alert_to_db(arkham_alert_id: str, user_id: int, chat_id: int, alert_type: str, params: dict):
-    con = sqlite3.connect(DB_FILE); cur = con.cursor()
-    cur.execute("INSERT INTO onchain_alerts (alert_id, user_id, chat_id, alert_type, params, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                (arkham_alert_id, user_id, chat_id, alert_type, json.dumps(params), int(time.time())))
-    con.commit(); con.close()
+    get_database().add_alert_to_db(arkham_alert_id, user_id, chat_id, alert_type, params)
 
 def count_user_alerts(user_id: int) -> int:
-    con = sqlite3.connect(DB_FILE); cur = con.cursor()
-    res = cur.execute("SELECT COUNT(*) FROM onchain_alerts WHERE user_id = ?", (user_id,)); count = res.fetchone()[0]
-    con.close(); return count
\ No newline at end of file
+    return get_database().count_user_alerts(user_id)
+
+async def update_username_mapping_async(user_id: int, username: str):
+    await get_database().update_username_mapping_async(user_id, username)
+
+async def get_user_id_from_username_async(username: str) -> int | None:
+    return await get_database().get_user_id_from_username_async(username)
+
+async def set_user_property_async(user_id: int, key: str, value: str, encrypted: bool = False):
+    await get_database().set_user_property_async(user_id, key, value, encrypted)
+
+async def get_user_property_async(user_id: int, key: str, default=None, encrypted: bool = False):
+    return await get_database().get_user_property_async(user_id, key, default, encrypted)
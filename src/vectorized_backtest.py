@@ -0,0 +1,294 @@
+# src/vectorized_backtest.py
+"""
+NumPy-vectorized backtest core for AutomatedTradingSystem.
+Each strategy turns a close-price array into a per-bar holdings array with array
+operations only; equity, drawdown, Sharpe, win rate and the trade list are then
+derived from those arrays. Stateful entry/exit rules are resolved with a
+forward-filled "last event" mask instead of a per-bar loop.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+FREQUENCY_SECONDS = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400,
+    'monthly': 30 * 86400,
+}
+
+@dataclass
+class VectorBacktest:
+    """Per-bar arrays and per-trade arrays of one backtest"""
+    timestamps: np.ndarray  # int64 seconds
+    close: np.ndarray
+    equity: np.ndarray
+    drawdown: np.ndarray  # fraction below the running peak
+    holdings: np.ndarray  # units of the asset held at each bar's close
+    trade_entry: np.ndarray  # bar indices
+    trade_exit: np.ndarray
+    trade_units: np.ndarray
+    trade_pnl: np.ndarray
+    side: str = 'long'
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    def trades(self) -> List[Dict[str, Any]]:
+        """Trade records in the shape BacktestResult.trades uses"""
+        entry_times = self.timestamps[self.trade_entry].astype('datetime64[s]').tolist()
+        exit_times = self.timestamps[self.trade_exit].astype('datetime64[s]').tolist()
+        entry_prices = self.close[self.trade_entry].tolist()
+        exit_prices = self.close[self.trade_exit].tolist()
+        return [
+            {
+                'type': 'buy',
+                'price': entry_price,
+                'exit_price': exit_price,
+                'amount': units,
+                'cost': units * entry_price,
+                'timestamp': entry_time,
+                'entry_time': entry_time,
+                'exit_time': exit_time,
+                'pnl': pnl
+            }
+            for entry_time, exit_time, entry_price, exit_price, units, pnl in zip(
+                entry_times, exit_times, entry_prices, exit_prices,
+                self.trade_units.tolist(), self.trade_pnl.tolist())
+        ]
+
+def to_epoch_seconds(timestamps) -> np.ndarray:
+    """int64 epoch seconds from a DatetimeIndex, datetime64 array or numeric seconds"""
+    values = np.asarray(timestamps)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[s]').astype(np.int64)
+    return values.astype(np.int64)
+
+def hold_state(enter: np.ndarray, leave: np.ndarray) -> np.ndarray:
+    """
+    True from each bar where enter fires until the next bar where leave fires
+    (enter wins ties): the vectorized form of a one-position state machine.
+    Works along the last axis, so each row of a 2-D input is an independent position.
+    """
+    events = np.where(enter, 1, np.where(leave, 0, -1))
+    last = np.where(events >= 0, np.arange(events.shape[-1]), -1)
+    np.maximum.accumulate(last, axis=-1, out=last)
+    return (last >= 0) & (np.take_along_axis(events, np.maximum(last, 0), axis=-1) == 1)
+
+def _rolling_mean_std(values: np.ndarray, window: int):
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    cumulative_sq = np.concatenate(([0.0], np.cumsum(values * values)))
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if window <= len(values):
+        sums = cumulative[window:] - cumulative[:-window]
+        sums_sq = cumulative_sq[window:] - cumulative_sq[:-window]
+        mean[window - 1:] = sums / window
+        std[window - 1:] = np.sqrt(np.maximum(sums_sq / window - mean[window - 1:] ** 2, 0))
+    return mean, std
+
+def _segments(held: np.ndarray):
+    """Entry and exit bar indices of each run of True; open runs exit on the last bar"""
+    padded = np.concatenate(([False], held, [False])).astype(np.int8)
+    change = np.diff(padded)
+    entries = np.flatnonzero(change == 1)
+    exits = np.minimum(np.flatnonzero(change == -1), len(held) - 1)
+    return entries, exits
+
+def _exposure_equity(close: np.ndarray, held: np.ndarray, initial_capital: float, exposure: float, fee_rate: float):
+    """Equity of holding `exposure` of equity in the asset on held bars, rebalanced on entry and exit"""
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1
+    position = held.astype(float) * exposure
+    turnover = np.abs(np.diff(np.concatenate(([0.0], position))))
+    growth = np.ones(len(close))
+    growth[1:] += position[:-1] * returns[1:]
+    # Fees are charged on the traded notional after the bar's mark-to-market
+    growth *= 1 - turnover * fee_rate
+    equity = initial_capital * np.cumprod(growth)
+    holdings = position * equity / close
+    return equity, holdings
+
+def _signal_backtest(close, held, initial_capital, exposure, fee_rate):
+    equity, holdings = _exposure_equity(close, held, initial_capital, exposure, fee_rate)
+    entries, exits = _segments(held)
+    pnl = equity[exits] - equity[entries]
+    units = holdings[entries]
+    return equity, holdings, entries, exits, units, pnl
+
+def backtest_dca(close, timestamps, initial_capital, amount, frequency_seconds, fee_rate):
+    """Buy `amount` of the asset every frequency_seconds while cash lasts; every lot is held to the end"""
+    bar_seconds = max(int(np.median(np.diff(timestamps))) if len(timestamps) > 1 else frequency_seconds, 1)
+    step = max(int(round(frequency_seconds / bar_seconds)), 1)
+    affordable = int(initial_capital // amount) if amount > 0 else 0
+    buys = np.arange(0, len(close), step)[:affordable]
+
+    units = amount * (1 - fee_rate) / close[buys]
+    bought = np.zeros(len(close))
+    bought[buys] = units
+    spent = np.zeros(len(close))
+    spent[buys] = amount
+    holdings = np.cumsum(bought)
+    equity = initial_capital - np.cumsum(spent) + holdings * close
+
+    exits = np.full(len(buys), len(close) - 1)
+    pnl = (close[-1] - close[buys]) * units - amount * fee_rate
+    return equity, holdings, buys, exits, units, pnl
+
+def backtest_momentum(close, initial_capital, period, threshold, exposure, fee_rate):
+    """Long while the return over `period` bars is above threshold"""
+    momentum = np.zeros(len(close))
+    if period < len(close):
+        momentum[period:] = close[period:] / close[:-period] - 1
+    held = momentum > threshold
+    return _signal_backtest(close, held, initial_capital, exposure, fee_rate)
+
+def backtest_mean_reversion(close, initial_capital, period, entry_z, exit_z, exposure, fee_rate):
+    """Buy when price is entry_z standard deviations under its rolling mean, sell once it reverts to exit_z"""
+    mean, std = _rolling_mean_std(close, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(std > 0, (close - mean) / std, 0.0)
+    ready = ~np.isnan(mean)
+    held = hold_state(ready & (z <= -entry_z), ready & (z >= -exit_z))
+    return _signal_backtest(close, held, initial_capital, exposure, fee_rate)
+
+def backtest_grid(close, initial_capital, levels, lower, upper, fee_rate):
+    """
+    Grid of `levels` buy prices between lower and upper with equal capital per level.
+    A level buys when price closes at or below it and sells one grid step higher.
+    """
+    buy_prices = np.linspace(lower, upper, levels + 1)[:-1]
+    sell_prices = buy_prices + (upper - lower) / levels
+    lot = initial_capital / levels
+
+    # (levels, bars) state: each row is one level's independent position
+    held = hold_state(close[None, :] <= buy_prices[:, None], close[None, :] >= sell_prices[:, None])
+    padded = np.concatenate((np.zeros((levels, 1), bool), held), axis=1).astype(np.int8)
+    change = np.diff(padded, axis=1)
+    entered = change == 1
+    exited = change == -1
+
+    # Units bought on each entry, forward-filled over the bars the level holds them
+    entry_bar = np.where(entered, np.arange(len(close))[None, :], -1)
+    np.maximum.accumulate(entry_bar, axis=1, out=entry_bar)
+    entry_price = close[np.maximum(entry_bar, 0)]
+    units_held = np.where(held, lot * (1 - fee_rate) / entry_price, 0.0)
+
+    # Realized proceeds on exit bars: the lot units sold at that bar's close
+    previous_units = np.concatenate((np.zeros((levels, 1)), units_held[:, :-1]), axis=1)
+    realized = np.where(exited, previous_units * close[None, :] * (1 - fee_rate)
+                        - lot, 0.0)
+    cash = lot - np.where(held, lot, 0.0) + np.cumsum(realized, axis=1)
+    equity = (cash + units_held * close[None, :]).sum(axis=0)
+    holdings = units_held.sum(axis=0)
+
+    level_ids, entries = np.nonzero(entered)
+    order = np.argsort(entries, kind='stable')
+    level_ids, entries = level_ids[order], entries[order]
+    exits = np.full(len(entries), len(close) - 1)
+    if len(entries):
+        # The exit of an entry is the first exit of the same level after it
+        exit_levels, exit_bars = np.nonzero(exited)
+        keys = exit_levels.astype(np.int64) * (len(close) + 1) + exit_bars
+        keys.sort()
+        lookup = level_ids.astype(np.int64) * (len(close) + 1) + entries
+        found = np.searchsorted(keys, lookup)
+        match = found < len(keys)
+        match[match] &= keys[found[match]] // (len(close) + 1) == level_ids[match]
+        exits[match] = keys[found[match]] % (len(close) + 1)
+    units = lot * (1 - fee_rate) / close[entries]
+    closed = exits < len(close) - 1
+    sale = np.where(closed | (held[level_ids, -1] == 0), 1 - fee_rate, 1.0)
+    pnl = units * close[exits] * sale - lot
+    return equity, holdings, entries, exits, units, pnl
+
+def compute_metrics(equity: np.ndarray, timestamps: np.ndarray, trade_entry: np.ndarray,
+                    trade_exit: np.ndarray, trade_pnl: np.ndarray, initial_capital: float) -> Dict[str, float]:
+    """Return, drawdown, Sharpe and trade statistics from the equity curve and trade arrays"""
+    final_capital = float(equity[-1])
+    duration = float(timestamps[-1] - timestamps[0]) if len(timestamps) > 1 else 0.0
+    growth = final_capital / initial_capital
+    annual_return = (growth ** (SECONDS_PER_YEAR / duration) - 1) * 100 if duration > 0 and growth > 0 else 0.0
+
+    peak = np.maximum.accumulate(equity)
+    max_drawdown = float(np.max(1 - equity / peak)) * 100
+
+    returns = np.diff(equity) / equity[:-1]
+    std = float(np.std(returns)) if len(returns) else 0.0
+    bar_seconds = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 86400.0
+    periods_per_year = SECONDS_PER_YEAR / bar_seconds if bar_seconds > 0 else 252.0
+    sharpe_ratio = float(np.mean(returns) / std * np.sqrt(periods_per_year)) if std > 0 else 0.0
+
+    total_trades = int(len(trade_pnl))
+    win_rate = float(np.count_nonzero(trade_pnl > 0)) / total_trades * 100 if total_trades else 0.0
+    avg_trade_duration = float(np.mean(timestamps[trade_exit] - timestamps[trade_entry])) / 3600 if total_trades else 0.0
+
+    return {
+        'final_capital': final_capital,
+        'total_return': (growth - 1) * 100,
+        'annual_return': annual_return,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe_ratio,
+        'win_rate': win_rate,
+        'total_trades': total_trades,
+        'avg_trade_duration': avg_trade_duration,
+    }
+
+def run_backtest(strategy_type: str, close: Sequence[float], timestamps, initial_capital: float,
+                 params: Optional[Dict[str, Any]] = None) -> VectorBacktest:
+    """
+    Backtest one strategy type ('dca', 'grid', 'momentum', 'mean_reversion') over a close
+    series. Unsupported types hold cash. params: base_amount, rebalance_frequency,
+    max_position_size, fee_rate, grid_levels, grid_lower, grid_upper, grid_range_percent,
+    momentum_period, momentum_threshold, reversion_period, entry_z, exit_z.
+    """
+    params = params or {}
+    close = np.asarray(close, dtype=float)
+    timestamps = to_epoch_seconds(timestamps)
+    fee_rate = float(params.get('fee_rate', 0.001))
+    max_position_size = params.get('max_position_size')
+    exposure = min(1.0, float(max_position_size) / initial_capital) if max_position_size else 1.0
+
+    if strategy_type == 'dca':
+        frequency = params.get('rebalance_frequency', 'weekly')
+        frequency_seconds = FREQUENCY_SECONDS.get(frequency, FREQUENCY_SECONDS['weekly'])
+        result = backtest_dca(close, timestamps, initial_capital, float(params.get('base_amount', 100)),
+                              frequency_seconds, fee_rate)
+    elif strategy_type == 'grid':
+        range_percent = float(params.get('grid_range_percent', 20)) / 100
+        lower = float(params.get('grid_lower') or close[0] * (1 - range_percent))
+        upper = float(params.get('grid_upper') or close[0] * (1 + range_percent))
+        result = backtest_grid(close, initial_capital, max(int(params.get('grid_levels', 10)), 1),
+                               lower, upper, fee_rate)
+    elif strategy_type == 'momentum':
+        result = backtest_momentum(close, initial_capital, max(int(params.get('momentum_period', 24)), 1),
+                                   float(params.get('momentum_threshold', 0.0)), exposure, fee_rate)
+    elif strategy_type == 'mean_reversion':
+        result = backtest_mean_reversion(close, initial_capital, max(int(params.get('reversion_period', 48)), 2),
+                                         float(params.get('entry_z', 2.0)), float(params.get('exit_z', 0.0)),
+                                         exposure, fee_rate)
+    else:
+        logger.warning(f"No backtest model for strategy type {strategy_type}; holding cash")
+        empty = np.zeros(0, dtype=np.int64)
+        result = (np.full(len(close), float(initial_capital)), np.zeros(len(close)), empty, empty,
+                  np.zeros(0), np.zeros(0))
+
+    equity, holdings, entries, exits, units, pnl = result
+    peak = np.maximum.accumulate(equity)
+    backtest = VectorBacktest(
+        timestamps=timestamps,
+        close=close,
+        equity=equity,
+        drawdown=1 - equity / peak,
+        holdings=holdings,
+        trade_entry=entries,
+        trade_exit=exits,
+        trade_units=units,
+        trade_pnl=pnl,
+    )
+    backtest.metrics = compute_metrics(equity, timestamps, entries, exits, pnl, initial_capital)
+    return backtest
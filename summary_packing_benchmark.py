@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+SUMMARY PACKING BENCHMARK
+=========================
+LLM calls per daily summary of the recorded 24h chat fixture, per provider/model:
+the legacy len//4 estimate with greedy 100k-token chunks against tokenizer-based
+packing filled to each model's context window. Legacy chunks whose real size
+exceeds the context window are counted as failed requests.
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from enhanced_summarizer import EnhancedSummarizer
+from token_counter import get_context_limit
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'tests', 'fixtures', 'chat_24h.jsonl.gz')
+MODELS = [
+    ('groq', 'llama3-70b-8192'),
+    ('groq', 'meta-llama/Llama-4-Scout-17B-16E-Instruct'),
+    ('openai', 'gpt-4-turbo'),
+    ('openai', 'gpt-4o-mini'),
+    ('anthropic', 'claude-3-sonnet-20240229'),
+    ('gemini', 'gemini-2.0-flash'),
+]
+LEGACY_MAX_TOKENS = 100000
+
+
+def load_fixture():
+    with gzip.open(FIXTURE, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def legacy_chunks(messages):
+    """Chunking used before: len(text)//4 per message, greedy, fixed 2k reserve"""
+    chunks, current, tokens = [], [], 0
+    available = LEGACY_MAX_TOKENS - 2000
+    for message in messages:
+        message_tokens = len(message.get('text', '')) // 4
+        if tokens + message_tokens > available and current:
+            chunks.append(current)
+            current, tokens = [message], message_tokens
+        else:
+            current.append(message)
+            tokens += message_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def calls_for(chunks):
+    return len(chunks) + (1 if len(chunks) > 1 else 0)
+
+
+def run_benchmark():
+    messages = sorted(load_fixture(), key=lambda m: m['timestamp'])
+    print(f"Fixture: {len(messages)} messages, {sum(len(m['text']) for m in messages):,} characters over 24h\n")
+    print(f"{'provider/model':<52} {'context':>9} {'legacy calls':>13} {'failed':>7} {'packed calls':>13} {'fill':>6} {'pack ms':>8}")
+
+    for provider, model in MODELS:
+        summarizer = EnhancedSummarizer(provider=provider, model=model)
+        context_limit = get_context_limit(provider, model)
+
+        def request_tokens(chunk, page, total):
+            prompt = summarizer._chunk_prompt(summarizer.format_transcript(chunk), page, total,
+                                              summarizer.get_time_range(chunk), len(chunk))
+            return summarizer.estimate_tokens(prompt) + summarizer.response_token_reserve
+
+        legacy = legacy_chunks(messages)
+        failed = sum(1 for i, chunk in enumerate(legacy, 1) if request_tokens(chunk, i, len(legacy)) > context_limit)
+
+        start = time.perf_counter()
+        budget = summarizer.request_budget(summarizer.max_tokens_per_request)
+        if sum(summarizer.message_tokens(m) for m in messages) <= budget:
+            packed = [messages]
+        else:
+            packed = summarizer.pack_messages(messages, summarizer.max_tokens_per_request)
+        pack_ms = (time.perf_counter() - start) * 1000
+
+        sizes = [request_tokens(chunk, i, len(packed)) for i, chunk in enumerate(packed, 1)]
+        assert max(sizes) <= context_limit, f"{model}: packed request exceeds the context window"
+        fill = sum(sizes) / (len(sizes) * context_limit)
+
+        print(f"{provider + '/' + model:<52} {context_limit:>9,} {calls_for(legacy):>13} {failed:>7} "
+              f"{calls_for(packed):>13} {fill:>6.0%} {pack_ms:>8.0f}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -6,6 +6,7 @@ This tests all imports and basic functionality without connecting to Telegram.
 
 import sys
 import os
+import asyncio
 sys.path.append('src')
 
 def test_imports():
@@ -79,7 +80,7 @@ def test_basic_functionality():
         
         # Test DeFiLlama
         from crypto_research import query_defillama
-        result = query_defillama('tvl', 'lido')
+        result = asyncio.run(query_defillama('tvl', 'lido'))
         assert 'TVL' in result
         print("✅ DeFiLlama integration")
         
@@ -29,12 +29,12 @@ async def test_defillama_tvl_query():
         print(f"   Intent: {intent} (confidence: {confidence:.2f})")
         
         # Test actual DeFiLlama API call
-        protocol = search_protocol_by_name("uniswap")  # Use a known protocol
+        protocol = await search_protocol_by_name("uniswap")  # Use a known protocol
         if protocol and protocol.get("name"):
             print(f"   Found protocol: {protocol['name']}")
             
             # Test TVL query
-            tvl_result = query_defillama("tvl", slug=protocol.get("slug"))
+            tvl_result = await query_defillama("tvl", slug=protocol.get("slug"))
             print(f"   TVL result: {tvl_result[:100]}...")
             
             return {
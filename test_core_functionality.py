@@ -208,7 +208,7 @@ class CoreFunctionalityTester:
             
             # Test protocol search
             print("   Testing protocol search...")
-            protocol = search_protocol_by_name("uniswap")
+            protocol = await search_protocol_by_name("uniswap")
             
             if not protocol or not protocol.get("name"):
                 return {"success": False, "error": "Protocol search failed"}
@@ -217,7 +217,7 @@ class CoreFunctionalityTester:
             
             # Test TVL query
             print("   Testing TVL query...")
-            tvl_result = query_defillama("tvl", protocol_name="uniswap")
+            tvl_result = await query_defillama("tvl", protocol_name="uniswap")
             
             return {
                 "success": True,
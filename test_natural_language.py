@@ -85,7 +85,7 @@ async def test_rate_limiting():
         print(f"❌ Rate limiting test failed: {e}")
         return False
 
-def test_formatting():
+async def test_formatting():
     """Test improved formatting"""
     print("\n🎨 Testing Improved Formatting:")
     
@@ -94,7 +94,7 @@ def test_formatting():
         
         # Test DeFiLlama formatting
         print("   Testing DeFiLlama protocols formatting...")
-        result = query_defillama("protocols")
+        result = await query_defillama("protocols")
         print(f"   Result length: {len(result)} characters")
         print(f"   Contains emojis: {'🟢' in result or '🔴' in result}")
         print(f"   Contains formatted numbers: {'B' in result or 'M' in result}")
@@ -157,7 +157,7 @@ async def main():
     results.append(await test_rate_limiting())
     
     # Test formatting
-    results.append(test_formatting())
+    results.append(await test_formatting())
     
     # Test performance monitor
     results.append(test_performance_monitor())
@@ -187,7 +187,7 @@ class ProductionBotTester:
             
             # Search for protocol
             start_time = time.time()
-            protocol = search_protocol_by_name(protocol_name)
+            protocol = await search_protocol_by_name(protocol_name)
             search_time = time.time() - start_time
             
             if not protocol or protocol.get("success") == False:
@@ -199,7 +199,7 @@ class ProductionBotTester:
             
             # Get TVL data
             tvl_start = time.time()
-            tvl_result = query_defillama("tvl", slug=protocol.get("slug"))
+            tvl_result = await query_defillama("tvl", slug=protocol.get("slug"))
             tvl_time = time.time() - tvl_start
             
             return {
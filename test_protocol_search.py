@@ -19,7 +19,7 @@ os.environ.update({
     'BOT_MASTER_ENCRYPTION_KEY': 'dGVzdF9rZXlfMzJfY2hhcnNfbG9uZ19mb3I='
 })
 
-def test_protocol_search():
+async def test_protocol_search():
     """Test protocol search functionality"""
     print("🔍 Testing Protocol Search...")
     
@@ -39,7 +39,7 @@ def test_protocol_search():
             print(f"\n   🔍 Searching for: {protocol}")
             
             # Test search function
-            result = search_protocol_by_name(protocol)
+            result = await search_protocol_by_name(protocol)
             if result:
                 name = result.get('name', 'Unknown')
                 tvl = result.get('tvl', 0)
@@ -80,7 +80,7 @@ def test_natural_language_protocol_extraction():
         print(f"   ❌ Natural language protocol extraction test failed: {e}")
         return False
 
-def test_research_command_integration():
+async def test_research_command_integration():
     """Test research command integration"""
     print("\n🔬 Testing Research Command Integration...")
     
@@ -98,7 +98,7 @@ def test_research_command_integration():
             print(f"\n   🔬 Testing research for: {query}")
             
             # This is what the research command does
-            result = query_defillama("protocols", protocol_name=query)
+            result = await query_defillama("protocols", protocol_name=query)
             
             if result and not result.startswith("❌"):
                 print(f"   ✅ Research successful: {result[:100]}...")
@@ -148,13 +148,13 @@ async def main():
     results = []
     
     # Test protocol search
-    results.append(test_protocol_search())
+    results.append(await test_protocol_search())
     
     # Test natural language protocol extraction
     results.append(test_natural_language_protocol_extraction())
     
     # Test research command integration
-    results.append(test_research_command_integration())
+    results.append(await test_research_command_integration())
     
     # Test full natural language flow
     results.append(await test_full_natural_language_flow())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+ALERT EVALUATION ENGINE TEST SUITE
+==================================
+Tests for the symbol-grouped alert index behind AdvancedAlertsSystem.check_alerts.
+"""
+
+import sys
+import os
+import asyncio
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from alert_evaluation import AlertEvaluationEngine, ThresholdBook
+
+
+class Kind(Enum):
+    PRICE = "price"
+    TECHNICAL = "technical"
+    SENTIMENT = "sentiment"
+    WHALE = "whale"
+
+
+class Status(Enum):
+    ACTIVE = "active"
+    PAUSED = "paused"
+
+
+@dataclass
+class FakeAlert:
+    id: str
+    symbol: str
+    alert_type: Kind
+    condition: str
+    threshold: float
+    current_value: float = 0.0
+    status: Status = Status.ACTIVE
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FakeSentiment:
+    sentiment_score: float
+    volume: int = 10
+    trending_keywords: tuple = ()
+
+
+class Feed:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    async def __call__(self, symbols):
+        self.calls.append(list(symbols))
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+
+def _ids(fired):
+    return sorted(alert.id for alert, _ in fired)
+
+
+def test_threshold_book_ranges():
+    book = ThresholdBook()
+    for i, threshold in enumerate([10, 20, 20, 30]):
+        book.add(threshold, f"a{i}")
+    assert book.pop_below(20) == ['a0']
+    assert sorted(book.pop_below(20, inclusive=True)) == ['a1', 'a2']
+    assert book.remove(30, 'a3') and len(book) == 0
+
+    for i, threshold in enumerate([10, 20, 30, 40]):
+        book.add(threshold, f"b{i}")
+    assert book.pop_crossed(15, 35) == ['b1', 'b2']
+    assert book.pop_crossed(45, 40) == []  # crosses_below needs price < threshold
+    assert book.pop_crossed(40, 39) == ['b3']
+
+
+def test_price_operators_and_crossings():
+    feed = Feed({'BTC': 100.0})
+    engine = AlertEvaluationEngine(fetch_prices=feed)
+    alerts = [
+        FakeAlert('gt', 'btc', Kind.PRICE, '>', 99, current_value=90),
+        FakeAlert('ge', 'BTC', Kind.PRICE, '>=', 100, current_value=90),
+        FakeAlert('lt', 'BTC', Kind.PRICE, '<', 100, current_value=90),
+        FakeAlert('le', 'BTC', Kind.PRICE, '<=', 150, current_value=90),
+        FakeAlert('up_fresh', 'BTC', Kind.PRICE, 'crosses_above', 95, current_value=90),
+        FakeAlert('up_later', 'BTC', Kind.PRICE, 'crosses_above', 110, current_value=90),
+        FakeAlert('down_later', 'BTC', Kind.PRICE, 'crosses_below', 90, current_value=90),
+    ]
+    for alert in alerts:
+        engine.add(alert)
+
+    fired = asyncio.run(engine.evaluate())
+    assert _ids(fired) == ['ge', 'gt', 'le', 'up_fresh']
+    data = dict((alert.id, data) for alert, data in fired)['gt']
+    assert data['current_price'] == 100.0 and data['threshold'] == 99 and abs(data['price_change'] - 100 / 9) < 1e-9
+
+    feed.prices['BTC'] = 120.0
+    assert _ids(asyncio.run(engine.evaluate())) == ['up_later']
+    feed.prices['BTC'] = 80.0
+    assert _ids(asyncio.run(engine.evaluate())) == ['down_later', 'lt']
+    assert len(engine) == 0
+
+
+def test_one_fetch_per_symbol_and_only_triggered_touched():
+    feed = Feed({'BTC': 50_000.0, 'ETH': 3_000.0})
+    engine = AlertEvaluationEngine(fetch_prices=feed)
+    for i in range(10_000):
+        engine.add(FakeAlert(f"btc{i}", 'BTC', Kind.PRICE, '>', 40_000 + i * 2, current_value=45_000))
+    engine.add(FakeAlert('eth', 'ETH', Kind.PRICE, '<', 2_000))
+
+    fired = asyncio.run(engine.evaluate())
+    assert feed.calls == [['BTC', 'ETH']]
+    assert len(fired) == 5_000
+    assert engine.stats['alerts_touched'] == 5_000
+
+    engine.stats['alerts_touched'] = 0
+    assert asyncio.run(engine.evaluate()) == []
+    assert engine.stats['alerts_touched'] == 0
+
+
+def test_pause_remove_and_rebuild():
+    engine = AlertEvaluationEngine(fetch_prices=Feed({'SOL': 10.0}))
+    paused = FakeAlert('paused', 'SOL', Kind.PRICE, '>', 5)
+    deleted = FakeAlert('deleted', 'SOL', Kind.PRICE, '>', 5)
+    whale = FakeAlert('whale', 'SOL', Kind.WHALE, 'large_transfer', 1_000_000)
+    for alert in (paused, deleted, whale):
+        engine.add(alert)
+    assert 'whale' not in engine
+
+    paused.status = Status.PAUSED
+    engine.remove('paused')
+    engine.remove('deleted')
+    assert asyncio.run(engine.evaluate()) == []
+
+    paused.status = Status.ACTIVE
+    engine.rebuild([paused, whale])
+    assert _ids(asyncio.run(engine.evaluate())) == ['paused']
+
+
+def test_technical_and_sentiment_grouped_by_symbol():
+    technical_calls, sentiment_calls = [], []
+
+    async def technical(symbol):
+        technical_calls.append(symbol)
+        return {'rsi': 25, 'macd': 1.0, 'macd_signal': 2.0}
+
+    async def sentiment(symbol):
+        sentiment_calls.append(symbol)
+        return FakeSentiment(0.6)
+
+    engine = AlertEvaluationEngine(fetch_prices=Feed({}), fetch_technical=technical, fetch_sentiment=sentiment)
+    for i in range(50):
+        engine.add(FakeAlert(f"rsi{i}", 'ETH', Kind.TECHNICAL, 'oversold', 0,
+                             metadata={'indicator': 'rsi', 'condition': 'oversold'}))
+    engine.add(FakeAlert('macd', 'ETH', Kind.TECHNICAL, 'bullish_crossover', 0,
+                         metadata={'indicator': 'macd', 'condition': 'bullish_crossover'}))
+    engine.add(FakeAlert('moved', 'ETH', Kind.SENTIMENT, 'sentiment_change', 0.5, metadata={'baseline_sentiment': 0.0}))
+    engine.add(FakeAlert('steady', 'ETH', Kind.SENTIMENT, 'sentiment_change', 0.5, metadata={'baseline_sentiment': 0.5}))
+
+    fired = asyncio.run(engine.evaluate())
+    assert technical_calls == ['ETH'] and sentiment_calls == ['ETH']
+    assert len(fired) == 51
+    by_id = dict((alert.id, data) for alert, data in fired)
+    assert by_id['rsi0']['rsi'] == 25
+    assert abs(by_id['moved']['sentiment_change'] - 0.6) < 1e-9
+    assert sorted(engine._alerts) == ['macd', 'steady']
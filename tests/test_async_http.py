@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+ASYNC HTTP TEST SUITE
+=====================
+Tests for the shared async HTTP client (retries, caching, coalescing) and the event-loop lag monitor.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from aiohttp import web
+
+from async_http import AsyncHTTPClient, HTTPError
+from session_registry import session_registry
+from event_loop_monitor import EventLoopLagMonitor
+
+
+async def _serve(handlers):
+    app = web.Application()
+    for path, handler in handlers.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_retries_transient_statuses_then_succeeds():
+    calls = []
+
+    async def flaky(request):
+        calls.append(1)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.json_response({'ok': True})
+
+    async def exercise():
+        runner, base = await _serve({'/flaky': flaky})
+        client = AsyncHTTPClient(retries=3, backoff=0.001)
+        try:
+            return await client.get_json(f"{base}/flaky"), client.get_stats()
+        finally:
+            await session_registry.close()
+            await runner.cleanup()
+
+    data, stats = asyncio.run(exercise())
+    assert data == {'ok': True}
+    assert len(calls) == 3 and stats['retries'] == 2
+
+
+def test_http_errors_are_raised_by_get_json():
+    async def missing(request):
+        return web.json_response({'error': 'nope'}, status=404)
+
+    async def exercise():
+        runner, base = await _serve({'/missing': missing})
+        client = AsyncHTTPClient(retries=0)
+        try:
+            await client.get_json(f"{base}/missing")
+        except HTTPError as e:
+            return e
+        finally:
+            await session_registry.close()
+            await runner.cleanup()
+
+    error = asyncio.run(exercise())
+    assert error.status == 404 and error.json() == {'error': 'nope'}
+
+
+def test_cached_gets_are_coalesced_and_reused():
+    calls = []
+
+    async def slow(request):
+        calls.append(request.query.get('q'))
+        await asyncio.sleep(0.05)
+        return web.json_response({'q': request.query.get('q')})
+
+    async def exercise():
+        runner, base = await _serve({'/slow': slow})
+        client = AsyncHTTPClient()
+        try:
+            concurrent = await asyncio.gather(*(client.get(f"{base}/slow", params={'q': 'btc'}, cache_ttl=60)
+                                                for _ in range(20)))
+            cached = await client.get(f"{base}/slow", params={'q': 'btc'}, cache_ttl=60)
+            uncached = await client.get(f"{base}/slow", params={'q': 'btc'})
+            return concurrent, cached, uncached, client.get_stats()
+        finally:
+            await session_registry.close()
+            await runner.cleanup()
+
+    concurrent, cached, uncached, stats = asyncio.run(exercise())
+    assert all(response.json() == {'q': 'btc'} for response in concurrent)
+    assert cached.from_cache and not uncached.from_cache
+    assert calls == ['btc', 'btc']
+    assert stats['coalesced'] == 19 and stats['cache_hits'] == 1
+
+
+def test_lag_monitor_reports_blocking_callback():
+    def blocking_call():
+        time.sleep(0.3)
+
+    async def exercise():
+        monitor = EventLoopLagMonitor(threshold=0.1, interval=0.02)
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor.get_stats()
+
+    stats = asyncio.run(exercise())
+    assert stats['stalls'] == 1 and stats['max_lag'] >= 0.2
+    assert 'blocking_call' in stats['recent_stalls'][0]['stack']
+    assert not stats['running']
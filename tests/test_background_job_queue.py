@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+BACKGROUND JOB QUEUE TEST SUITE
+===============================
+Tests for the priority/fair-queuing scheduler of MCPBackgroundProcessor: immediate wakeups,
+per-user fairness, deadlines, cancellation and worker autoscaling.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from mcp_background_processor import MCPBackgroundProcessor
+
+
+def _processor(order=None, delay=0.0, **kwargs):
+    processor = MCPBackgroundProcessor(**kwargs)
+
+    async def fake_process(job):
+        if order is not None:
+            order.append((job.user_id, job.parameters.get('n')))
+        await asyncio.sleep(job.parameters.get('delay', delay))
+        return {"success": True, "type": job.job_type}
+
+    processor._process_job = fake_process
+    return processor
+
+
+async def _drain(processor):
+    await processor.job_queue.join()
+    await asyncio.sleep(0)
+
+
+def test_idle_workers_start_jobs_immediately():
+    async def exercise():
+        processor = _processor(min_workers=2)
+        await processor.initialize()
+        await asyncio.sleep(0.01)
+        job_ids = []
+        for n in range(5):
+            job_ids.append(await processor.submit_job(n, "market_analysis", {"n": n}))
+            await asyncio.sleep(0.01)
+        await _drain(processor)
+        statuses = [await processor.get_job_status(job_id) for job_id in job_ids]
+        stats = processor.get_queue_stats()
+        await processor.stop()
+        return statuses, stats
+
+    statuses, stats = asyncio.run(exercise())
+    assert all(status["status"] == "completed" for status in statuses)
+    assert stats["completed"] == 5 and stats["start_latency_ms"]["samples"] == 5
+    # The old poll loop slept a full second between checks
+    assert stats["start_latency_ms"]["p99"] < 50
+
+
+def test_users_are_served_round_robin_within_priority():
+    order = []
+
+    async def exercise():
+        processor = _processor(order, min_workers=1, max_workers=1)
+        for n in range(5):
+            await processor.submit_job(1, "market_analysis", {"n": n})
+        for n in range(2):
+            await processor.submit_job(2, "market_analysis", {"n": n})
+        await processor.submit_job(3, "market_analysis", {"n": 0}, priority=3)
+        await processor.initialize()
+        await _drain(processor)
+        await processor.stop()
+
+    asyncio.run(exercise())
+    assert order == [(3, 0), (1, 0), (2, 0), (1, 1), (2, 1), (1, 2), (1, 3), (1, 4)]
+
+
+def test_cancellation_and_deadlines():
+    async def exercise():
+        processor = _processor(min_workers=1, max_workers=1)
+        await processor.initialize()
+        running = await processor.submit_job(1, "market_analysis", {"delay": 5})
+        queued = await processor.submit_job(2, "market_analysis", {})
+        stale = await processor.submit_job(3, "market_analysis", {}, deadline_seconds=0.01)
+        await asyncio.sleep(0.05)
+        queued_status = (await processor.get_job_status(queued))["status"]
+
+        cancelled = [await processor.cancel_job(queued), await processor.cancel_job(running),
+                     await processor.cancel_job("missing")]
+        await _drain(processor)
+        overrun = await processor.submit_job(4, "market_analysis", {"delay": 5}, deadline_seconds=0.05)
+        await _drain(processor)
+
+        statuses = {job_id: processor.completed_jobs[job_id].status for job_id in (running, queued, stale, overrun)}
+        stats = processor.get_queue_stats()
+        await processor.stop()
+        return queued_status, cancelled, statuses, stats, (running, queued, stale, overrun)
+
+    queued_status, cancelled, statuses, stats, (running, queued, stale, overrun) = asyncio.run(exercise())
+    assert queued_status == "pending"
+    assert cancelled == [True, True, False]
+    assert statuses == {running: "cancelled", queued: "cancelled", stale: "expired", overrun: "expired"}
+    assert stats["cancelled"] == 2 and stats["expired"] == 2 and stats["started"] == 2
+    assert stats["queued"] == 0 and stats["processing"] == 0
+
+
+def test_workers_scale_with_queue_depth_and_retire_when_idle():
+    async def exercise():
+        processor = _processor(delay=0.05, min_workers=1, max_workers=3, worker_idle_timeout=0.05)
+        await processor.initialize()
+        for n in range(6):
+            await processor.submit_job(n, "market_analysis", {"n": n})
+        peak = len(processor.workers)
+        await _drain(processor)
+        await asyncio.sleep(0.2)
+        stats = processor.get_queue_stats()
+        await processor.stop()
+        return peak, stats
+
+    peak, stats = asyncio.run(exercise())
+    assert peak == 3
+    assert stats["workers"] == 1 and stats["workers_retired"] == 2
+    assert stats["completed"] == 6
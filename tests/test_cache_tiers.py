@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+CACHE TIERS TEST SUITE
+======================
+Tests for the Redis (L2) and SQLite (L3) tiers of IntelligentCacheManager.
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core import cache_manager as cache_module
+from production_core.cache_manager import IntelligentCacheManager, decode_payload, encode_payload
+
+
+def _manager(db_path=None):
+    return IntelligentCacheManager(enable_predictive_loading=False, db_path=db_path)
+
+
+def test_payloads_round_trip_and_compress_large_values():
+    small = encode_payload({'price': 1.5}, ['price_data'])
+    large = encode_payload({'text': 'bitcoin ' * 500}, None)
+
+    assert small[:1] == b'j' and decode_payload(small) == ({'price': 1.5}, ['price_data'])
+    assert large[:1] == b'z' and len(large) < 200
+    assert decode_payload(large) == ({'text': 'bitcoin ' * 500}, [])
+    with pytest.raises(TypeError):
+        encode_payload(object())
+
+
+def test_l3_survives_restart_and_promotes_with_remaining_ttl(tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+
+    async def exercise():
+        first = _manager(db_path)
+        assert await first.initialize() == {'l2': False, 'l3': True}
+        await first.set('price:btc', {'usd': 65000}, ttl=300, tags=['price_data'])
+        await first.set('forever', [1, 2, 3])
+        await first.close()
+
+        restarted = _manager(db_path)
+        await restarted.initialize()
+        value = await restarted.get('price:btc')
+        again = await restarted.get('price:btc')
+        l1_entry = restarted.l1_cache.cache['price:btc']
+        forever = await restarted.get('forever')
+        metrics = restarted.get_performance_metrics()
+        await restarted.close()
+        return value, again, l1_entry, forever, metrics
+
+    value, again, l1_entry, forever, metrics = asyncio.run(exercise())
+    assert value == again == {'usd': 65000}
+    assert 295 <= l1_entry.ttl <= 300 and l1_entry.tags == ['price_data']
+    assert forever == [1, 2, 3]
+    assert metrics['l3_hits'] == 2 and metrics['l1_hits'] == 1
+
+
+def test_expired_l3_entries_are_not_returned(tmp_path, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: clock[0])
+
+    async def exercise():
+        manager = _manager(str(tmp_path / 'cache.db'))
+        await manager.initialize()
+        await manager.set('short', 'lived', ttl=60, tier='l3')
+        clock[0] += 61
+        value = await manager.get('short')
+        await manager.close()
+        return value
+
+    assert asyncio.run(exercise()) is None
+
+
+def test_l2_is_shared_between_workers_and_tags_clear_every_tier(tmp_path):
+    fakeredis = pytest.importorskip('fakeredis')
+
+    async def exercise():
+        server = fakeredis.FakeServer()
+        worker_a = _manager(str(tmp_path / 'a.db'))
+        worker_b = _manager(str(tmp_path / 'b.db'))
+        await worker_a.initialize(redis_client=fakeredis.FakeAsyncRedis(server=server))
+        await worker_b.initialize(redis_client=fakeredis.FakeAsyncRedis(server=server))
+
+        await worker_a.set('analysis:1', {'summary': 'bullish ' * 200}, ttl=120, tags=['message_analysis'])
+        await worker_a.set('analysis:2', 'neutral', tags=['message_analysis', 'other'])
+        await worker_a.set('untagged', 'stays')
+        shared = await worker_b.get('analysis:1')
+        promoted_ttl = worker_b.l1_cache.cache['analysis:1'].ttl
+
+        cleared_b = await worker_b.clear_by_tags(['message_analysis'])
+        after = [await worker_a.get('analysis:1'), await worker_b.get('analysis:1')]
+        cleared_a = await worker_a.clear_by_tags(['message_analysis'])
+        after.append(await worker_a.get('analysis:2'))
+        untagged = await worker_b.get('untagged')
+        metrics = worker_a.get_performance_metrics()
+        await worker_a.close()
+        await worker_b.close()
+        return shared, promoted_ttl, cleared_b, cleared_a, after, untagged, metrics
+
+    shared, promoted_ttl, cleared_b, cleared_a, after, untagged, metrics = asyncio.run(exercise())
+    assert shared == {'summary': 'bullish ' * 200}
+    assert 115 <= promoted_ttl <= 120
+    # Worker B's L1 copy plus both keys in the shared L2
+    assert cleared_b == 3
+    # Worker A's L1 still held the values until its own tag clear; its L3 did too
+    assert after[0] == {'summary': 'bullish ' * 200} and after[1] is None
+    assert cleared_a == 4 and after[2] is None
+    assert untagged == 'stays'
+    assert metrics['l2_errors'] == 0 and metrics['l2_bytes_written'] < 1000
+
+
+def test_l2_tag_sets_expire_with_their_members_and_are_pruned(tmp_path):
+    fakeredis = pytest.importorskip('fakeredis')
+
+    async def exercise():
+        redis = fakeredis.FakeAsyncRedis()
+        manager = _manager()
+        await manager.initialize(redis_client=redis)
+        tag_key = manager._l2_tag_key
+
+        await manager.set('a', 1, ttl=60, tags=['prices'])
+        await manager.set('b', 2, ttl=600, tags=['prices', 'btc'])
+        await manager.set('c', 3, ttl=30, tags=['prices'])
+        await manager.set('d', 4, tags=['forever'])
+        await manager.set('e', 5, ttl=30, tags=['forever'])
+        ttls = [await redis.ttl(tag_key(tag)) for tag in ('prices', 'btc', 'forever')]
+
+        await manager.delete('a')
+        after_delete = await redis.smembers(tag_key('prices'))
+        await manager.clear_by_tags(['btc'])
+        after_clear = await redis.smembers(tag_key('prices'))
+        await manager.close()
+        return ttls, after_delete, after_clear
+
+    ttls, after_delete, after_clear = asyncio.run(exercise())
+    # Longest member TTL wins; a member without a TTL keeps its tag set persistent
+    assert 595 <= ttls[0] <= 600 and 595 <= ttls[1] <= 600 and ttls[2] == -1
+    assert after_delete == {b'b', b'c'}
+    assert after_clear == {b'c'}
+
+
+def test_unserializable_values_stay_in_l1(tmp_path):
+    async def exercise():
+        manager = _manager(str(tmp_path / 'cache.db'))
+        await manager.initialize()
+        marker = object()
+        await manager.set('obj', marker)
+        in_l1 = await manager.get('obj') is marker
+        in_l3 = await manager._get_from_l3('obj')
+        metrics = manager.get_performance_metrics()
+        await manager.close()
+        return in_l1, in_l3, metrics
+
+    in_l1, in_l3, metrics = asyncio.run(exercise())
+    assert in_l1 and in_l3 is None
+    assert metrics['uncacheable_values'] == 1
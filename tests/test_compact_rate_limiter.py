@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+COMPACT RATE LIMITER TEST SUITE
+===============================
+Tests for GCRA and approximate sliding windows, idle-identifier eviction and the Redis backend
+of the production_core RateLimiter.
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core import rate_limiter as rate_limiter_module
+from production_core.rate_limiter import (
+    RateLimitAlgorithm, RateLimitConfig, RateLimiter, TopTalkers, WindowState, gcra_acquire, window_acquire
+)
+
+
+def test_gcra_allows_burst_then_refills_at_rate():
+    tat, now = 0.0, 100.0
+    decisions = []
+    for _ in range(4):
+        tat, decision = gcra_acquire(tat, now, rate=2.0, burst=3)
+        decisions.append(decision)
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+    assert decisions[-1].retry_after == pytest.approx(0.5)
+
+    tat, decision = gcra_acquire(tat, now + 0.5, rate=2.0, burst=3)
+    assert decision.allowed and decision.remaining == 0
+    # Each allowed request pushes TAT one emission interval further
+    assert tat == pytest.approx(now + 2.0)
+
+
+def test_sliding_window_weights_previous_window():
+    state = WindowState(index=0)
+    results = [window_acquire(state, 5.0 + i * 0.1, window=10.0, limit=10).allowed for i in range(12)]
+    assert results.count(True) == 10
+
+    # Halfway through the next window half of the previous count still applies
+    decision = window_acquire(state, 15.0, window=10.0, limit=10)
+    assert decision.allowed and decision.remaining == 4
+    assert [window_acquire(state, 15.0, window=10.0, limit=10).allowed for _ in range(5)] == [True] * 4 + [False]
+
+    fixed = WindowState(index=0)
+    for _ in range(10):
+        window_acquire(fixed, 9.0, window=10.0, limit=10, weighted=False)
+    assert window_acquire(fixed, 10.0, window=10.0, limit=10, weighted=False).allowed
+
+
+def test_limiter_results_and_idle_eviction(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, 'monotonic', lambda: clock[0])
+
+    async def exercise():
+        limiter = RateLimiter(RateLimitConfig(requests_per_second=1.0, burst_size=2))
+        results = [await limiter.is_allowed(f"user{i % 3}") for i in range(9)]
+        active = limiter.store.count()
+        clock[0] += 10
+        await limiter.is_allowed('newcomer')
+        return results, active, limiter.store.count(), await limiter.get_metrics()
+
+    results, active, after_idle, metrics = asyncio.run(exercise())
+    assert [r.allowed for r in results] == [True] * 6 + [False] * 3
+    assert results[-1].retry_after == pytest.approx(1.0) and results[-1].limit == 2
+    assert active == 3
+    assert after_idle == 1 and metrics['evicted_limiters'] == 3
+    assert metrics['top_users'][0]['requests'] == 3 and metrics['denied_requests'] == 3
+
+
+def test_window_limiter_evicts_after_two_windows(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, 'monotonic', lambda: clock[0])
+
+    async def exercise():
+        limiter = RateLimiter(RateLimitConfig(requests_per_second=0.5, window_size_seconds=10,
+                                              algorithm=RateLimitAlgorithm.SLIDING_WINDOW))
+        results = [await limiter.is_allowed('user') for _ in range(6)]
+        clock[0] += 19
+        await limiter.is_allowed('other')
+        still_tracked = limiter.store.count()
+        clock[0] += 2
+        await limiter.is_allowed('other')
+        return results, still_tracked, limiter.store.count()
+
+    results, still_tracked, after = asyncio.run(exercise())
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert still_tracked == 2 and after == 1
+
+
+def test_top_talkers_is_bounded():
+    talkers = TopTalkers(capacity=2)
+    for identifier in ['a', 'a', 'a', 'b', 'c', 'c', 'd', 'e']:
+        talkers.record(identifier, allowed=True)
+    assert len(talkers.counters) <= 4
+    assert set(talkers.counters) == {'a', 'c', 'e'}
+    assert talkers.top(1)[0] == ('a', {'requests': 3, 'allowed': 3, 'denied': 0})
+
+
+def test_redis_backend_shares_limits_between_instances():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+
+    async def exercise():
+        server = fakeredis.FakeServer()
+        config = RateLimitConfig(requests_per_second=1.0, burst_size=3, distributed=True)
+        first = RateLimiter(config, fakeredis.FakeAsyncRedis(server=server), name='user_messages')
+        second = RateLimiter(config, fakeredis.FakeAsyncRedis(server=server), name='user_messages')
+        results = [await limiter.is_allowed('42') for limiter in (first, second, first, second)]
+
+        window_config = RateLimitConfig(requests_per_second=0.1, window_size_seconds=20, distributed=True,
+                                        algorithm=RateLimitAlgorithm.SLIDING_WINDOW)
+        windowed = RateLimiter(window_config, fakeredis.FakeAsyncRedis(server=server), name='prices')
+        window_results = [await windowed.is_allowed('42') for _ in range(3)]
+
+        ttl = await fakeredis.FakeAsyncRedis(server=server).pttl('rate_limit:user_messages:42')
+        await first.reset_limiter('42')
+        after_reset = await second.is_allowed('42')
+        return results, window_results, ttl, after_reset, await first.get_metrics()
+
+    results, window_results, ttl, after_reset, metrics = asyncio.run(exercise())
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[-1].retry_after == pytest.approx(1.0, abs=0.05)
+    assert [r.allowed for r in window_results] == [True, True, False]
+    assert 0 < ttl <= 3000
+    assert after_reset.allowed and after_reset.remaining == 2
+    assert metrics['backend'] == 'redis' and metrics['backend_errors'] == 0
@@ -318,11 +318,11 @@ class ComprehensiveBugHuntSuite:
                     if protocol is None:
                         continue
                     
-                    result = search_protocol(protocol)
-                    tvl_result = get_protocol_tvl(protocol)
+                    result = asyncio.run(search_protocol(protocol))
+                    tvl_result = asyncio.run(get_protocol_tvl(protocol))
                     
-                    # Should return valid responses or error dictionaries
-                    assert isinstance(result, dict), f"search_protocol should return dict for {protocol}"
+                    # Should return a match or None, and a result or error dictionary
+                    assert result is None or isinstance(result, dict), f"search_protocol should return dict or None for {protocol}"
                     assert isinstance(tvl_result, dict), f"get_protocol_tvl should return dict for {protocol}"
                     
                 except Exception as e:
@@ -333,8 +333,8 @@ class ComprehensiveBugHuntSuite:
             def concurrent_research_test(thread_id):
                 for i in range(2):  # Reduced iterations
                     try:
-                        search_protocol(f"test_protocol_{thread_id}")
-                        get_protocol_tvl(f"test_protocol_{thread_id}")
+                        asyncio.run(search_protocol(f"test_protocol_{thread_id}"))
+                        asyncio.run(get_protocol_tvl(f"test_protocol_{thread_id}"))
                     except Exception:
                         pass  # Expected for invalid protocols
             
@@ -351,7 +351,7 @@ class ComprehensiveBugHuntSuite:
             start_time = time.time()
             for i in range(5):  # Reduced to avoid hanging
                 try:
-                    search_protocol(f"rate_limit_test_{i}")
+                    asyncio.run(search_protocol(f"rate_limit_test_{i}"))
                 except Exception:
                     pass  # Expected for rate limiting
                 if time.time() - start_time > 5:  # Timeout after 5 seconds
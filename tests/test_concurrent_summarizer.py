@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+CONCURRENT SUMMARIZER TEST SUITE
+================================
+Tests for the rate-limit-aware chunk scheduler behind EnhancedSummarizer.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+import enhanced_summarizer
+from enhanced_summarizer import EnhancedSummarizer
+from llm_scheduler import GroqTokenBudget, RateLimitedScheduler
+from natural_language_processor import GroqRateLimiter
+
+
+class CountingBudget:
+    def __init__(self, allowed):
+        self.allowed = allowed
+        self.granted = []
+        self.name = 'counting'
+
+    async def try_acquire(self, tokens):
+        if len(self.granted) < self.allowed:
+            self.granted.append(tokens)
+            return True
+        return False
+
+
+def _messages(count, chars=400):
+    return [{'text': f"{i:04d} " + 'x' * chars, 'username': f"user{i % 5}", 'timestamp': 1_700_000_000 + i * 60}
+            for i in range(count)]
+
+
+def test_scheduler_runs_jobs_concurrently_and_yields_in_completion_order():
+    async def job(delay, value):
+        await asyncio.sleep(delay)
+        return value
+
+    async def exercise():
+        scheduler = RateLimitedScheduler(max_concurrency=3)
+        jobs = [(10, lambda d=d, i=i: job(d, i)) for i, d in enumerate([0.06, 0.02, 0.04])]
+        return [item async for item in scheduler.run(jobs)], scheduler.stats
+
+    order, stats = asyncio.run(exercise())
+    assert order == [(1, 1), (2, 2), (0, 0)]
+    assert stats['max_in_flight'] == 3 and stats['completed'] == 3
+
+
+def test_scheduler_waits_for_every_budget_and_keeps_partial_grants():
+    budget = CountingBudget(allowed=1)
+    groq_limiter = GroqRateLimiter(max_tokens_per_minute=100)
+
+    async def exercise():
+        scheduler = RateLimitedScheduler([budget, GroqTokenBudget(groq_limiter)], poll_interval=0.01)
+        jobs = [(500, lambda: asyncio.sleep(0, 'first')), (500, lambda: asyncio.sleep(0, 'second'))]
+        results = []
+        async for item in scheduler.run(jobs):
+            results.append(item)
+            if len(results) == 1:
+                # Open both budgets once the first job is through
+                budget.allowed = 2
+                groq_limiter.token_usage.clear()
+        return results, scheduler.stats
+
+    results, stats = asyncio.run(exercise())
+    assert results == [(0, 'first'), (1, 'second')]
+    # Oversized requests are clamped to the minute budget instead of waiting forever
+    assert [tokens for _, tokens in groq_limiter.token_usage] == [100]
+    assert budget.granted == [500, 500]
+    assert stats['budget_waits'] >= 1
+
+
+def test_pages_stream_concurrently_with_overview_last(monkeypatch):
+    in_flight = {'now': 0, 'max': 0}
+    prompts = []
+
+    async def fake_ai_response(prompt, user_id=0):
+        in_flight['now'] += 1
+        in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        await asyncio.sleep(0.01)
+        in_flight['now'] -= 1
+        prompts.append(prompt)
+        if 'high-level overview' in prompt:
+            return {'success': True, 'message': 'overview'}
+        return f"summary {prompt.split('**Chunk ')[1].split(' of')[0]}"
+
+    monkeypatch.setattr(enhanced_summarizer, 'get_ai_response', fake_ai_response)
+    summarizer = EnhancedSummarizer(max_tokens_per_request=3000, scheduler=RateLimitedScheduler(max_concurrency=4))
+
+    async def exercise():
+        return [page async for page in summarizer.stream_paginated_summary(_messages(200))]
+
+    pages = asyncio.run(exercise())
+    chunk_pages = pages[:-1]
+    assert len(chunk_pages) > 4
+    assert in_flight['max'] == 4
+    assert pages[-1].page_number == 0 and 'overview' in pages[-1].content
+    assert 'high-level overview' in prompts[-1]
+    assert sorted(page.page_number for page in chunk_pages) == list(range(1, len(chunk_pages) + 1))
+    assert all(page.content == f"summary {page.page_number}" for page in chunk_pages)
+
+    collected = asyncio.run(summarizer.generate_paginated_summary(_messages(200)))
+    assert [page.page_number for page in collected] == list(range(0, len(chunk_pages) + 1))
+
+
+def test_async_streams_are_packed_as_messages_arrive(monkeypatch):
+    pulled = []
+
+    async def fake_ai_response(prompt, user_id=0):
+        if 'high-level overview' in prompt:
+            return {'success': True, 'message': 'overview'}
+        return 'chunk summary'
+
+    monkeypatch.setattr(enhanced_summarizer, 'get_ai_response', fake_ai_response)
+    summarizer = EnhancedSummarizer(max_tokens_per_request=3000, scheduler=RateLimitedScheduler(max_concurrency=1))
+    messages = _messages(200)
+    messages[50]['text'] = 'y ' * 20000
+
+    async def stream():
+        for message in messages:
+            pulled.append(message)
+            yield message
+
+    async def exercise():
+        first_chunk = None
+        async for chunk in summarizer.chunk_message_stream(stream(), 3000):
+            first_chunk = (len(chunk), len(pulled))
+            break
+        chunks = [chunk async for chunk in summarizer.chunk_message_stream(stream(), 3000)]
+        return first_chunk, chunks, await summarizer.generate_paginated_summary(stream())
+
+    first_chunk, chunks, pages = asyncio.run(exercise())
+    # The first chunk is handed out before the rest of the stream is read
+    assert first_chunk[1] == first_chunk[0] + 1
+    # Oversized messages are truncated so every chunk fits the request budget
+    budget = summarizer.request_budget(3000)
+    assert all(sum(summarizer.message_tokens(message) for message in chunk) <= budget for chunk in chunks)
+    assert pages[0].page_number == 0 and pages[0].message_count == 200
+    assert [page.message_count for page in pages[1:]] == [len(chunk) for chunk in chunks]
@@ -287,16 +287,16 @@ class IntegrationTestSuite:
             from crypto_research import search_protocol_by_name, query_defillama
             
             # Test protocol search
-            result = search_protocol_by_name("uniswap")
+            result = asyncio.run(search_protocol_by_name("uniswap"))
             assert isinstance(result, dict), "Protocol search should return dict"
             
             # Test TVL query with real protocol
-            tvl_result = query_defillama("tvl", "uniswap")
+            tvl_result = asyncio.run(query_defillama("tvl", "uniswap"))
             assert isinstance(tvl_result, str), "TVL query should return string"
             assert len(tvl_result) > 10, "TVL result should contain meaningful data"
             
             # Test error handling with invalid protocol
-            invalid_result = query_defillama("tvl", "nonexistent_protocol_12345")
+            invalid_result = asyncio.run(query_defillama("tvl", "nonexistent_protocol_12345"))
             assert "not found" in invalid_result.lower() or "error" in invalid_result.lower(), \
                 "Should handle invalid protocols gracefully"
             
@@ -567,33 +567,26 @@ class EdgeCaseTestSuite:
     def test_network_failure_scenarios(self) -> bool:
         """Test network failure handling"""
         try:
-            from crypto_research import search_protocol_by_name
-            
-            # Test with mocked network failures
-            with patch('requests.get') as mock_get:
-                # Test timeout
-                mock_get.side_effect = Exception("Connection timeout")
-                result = search_protocol_by_name("test_protocol")
-                assert isinstance(result, dict), "Should handle network timeouts gracefully"
-                assert not result.get('success', True), "Should indicate failure"
-                
-                # Test HTTP errors
-                mock_response = MagicMock()
-                mock_response.status_code = 500
-                mock_response.raise_for_status.side_effect = Exception("HTTP 500 Error")
-                mock_get.return_value = mock_response
-                
-                result = search_protocol_by_name("test_protocol")
-                assert isinstance(result, dict), "Should handle HTTP errors gracefully"
-                
-                # Test malformed JSON response
-                mock_response.status_code = 200
-                mock_response.raise_for_status.side_effect = None
-                mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
-                mock_get.return_value = mock_response
-                
-                result = search_protocol_by_name("test_protocol")
-                assert isinstance(result, dict), "Should handle JSON decode errors"
+            from async_http import HTTPError
+            from crypto_research import http_client, protocol_snapshot, query_defillama, search_protocol_by_name
+            
+            # Test timeout while loading the protocol snapshot
+            with patch.object(protocol_snapshot, 'ensure_ready',
+                              AsyncMock(side_effect=Exception("Connection timeout"))):
+                result = asyncio.run(search_protocol_by_name("test_protocol"))
+                assert result is None, "Should handle network timeouts gracefully"
+            
+            # Test HTTP errors
+            with patch.object(http_client, 'get_json',
+                              AsyncMock(side_effect=HTTPError(500, "https://api.llama.fi/tvl/test_protocol"))):
+                result = asyncio.run(query_defillama("tvl", "test_protocol"))
+                assert isinstance(result, str) and "HTTP error" in result, "Should handle HTTP errors gracefully"
+            
+            # Test malformed JSON response
+            with patch.object(http_client, 'get_json',
+                              AsyncMock(side_effect=json.JSONDecodeError("Invalid JSON", "", 0))):
+                result = asyncio.run(query_defillama("tvl", "test_protocol"))
+                assert isinstance(result, str) and result.startswith("❌"), "Should handle JSON decode errors"
             
             self.results.append(("Network Failures", True, "Network failure handling working"))
             return True
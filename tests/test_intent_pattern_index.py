@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+INTENT PATTERN INDEX TEST SUITE
+===============================
+Tests for the compiled intent pattern index behind AgentMemoryDatabase.analyze_intent.
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+# The module-level agent_memory instance must not touch the tracked data/agent_memory.db
+os.environ.setdefault('AGENT_MEMORY_DB_PATH', os.path.join(tempfile.mkdtemp(), 'agent_memory.db'))
+
+from agent_memory_database import AgentMemoryDatabase
+from intent_pattern_index import AhoCorasick, IntentPatternIndex, extract_keywords
+
+
+def _insert(db_path, pattern_id, intent, pattern, threshold=0.8, clues=()):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('INSERT OR REPLACE INTO intent_patterns '
+                     '(pattern_id, intent, pattern, confidence_threshold, context_clues, disambiguation_questions) '
+                     'VALUES (?, ?, ?, ?, ?, ?)', (pattern_id, intent, pattern, threshold, json.dumps(list(clues)), '[]'))
+
+
+def test_keyword_extraction():
+    assert extract_keywords(r"(?:what'?s|how much|price).*?(?:of|for)?\s*([A-Z]{2,10}|btc)") == {'what', 'how much', 'price'}
+    assert extract_keywords(r"\$\d+") == {'$'}
+    assert extract_keywords(r"[a-z]+\s+(?:now)?") is None
+    assert AhoCorasick(['he', 'she', 'his', 'hers']).find_all('ushers') == {'he', 'she', 'hers'}
+
+
+def test_index_matches_table_scan_semantics():
+    rows = [
+        ('a', 'get_price', r'(?:price|cost).*?(btc|eth)', 0.8, json.dumps(['usd', 'price'])),
+        ('b', 'alert', r'(?:alert|notify).*?(?:when|if)', 0.85, json.dumps(['when'])),
+        ('c', 'ticker', r'\b[A-Z]{3,4}\b', 0.5, json.dumps([])),
+        ('d', 'broken', r'(unclosed', 0.99, json.dumps([])),
+    ]
+    index = IntentPatternIndex(rows)
+    assert len(index.patterns) == 3  # invalid regex skipped
+    assert index.unfiltered == [2]
+
+    intent, confidence = index.analyze("What's the PRICE of BTC in USD?")
+    assert intent == 'get_price' and abs(confidence - 0.9) < 1e-9
+    assert index.analyze("notify me when sol moves")[0] == 'alert'
+    assert index.analyze("gm")[0] == 'unknown'
+    assert index.analyze("hodl")[0] == 'ticker'
+
+
+def test_index_invalidates_on_table_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'agent_memory.db')
+        memory = AgentMemoryDatabase(db_path)
+        assert memory.analyze_intent("zorblax quux") == ("unknown", 0.0)
+        index = memory._intent_index
+
+        # Writes to other tables leave the index in place
+        memory.record_performance_metric('flow', 0.1, True)
+        memory.analyze_intent("gm")
+        assert memory._intent_index is index
+
+        # Writes from any other connection to intent_patterns rebuild it
+        _insert(db_path, 'zorblax_pattern', 'zorblax', r'zorblax', 0.95)
+        assert memory.analyze_intent("zorblax quux") == ("zorblax", 0.95)
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DELETE FROM intent_patterns WHERE pattern_id = 'zorblax_pattern'")
+        assert memory.analyze_intent("zorblax quux") == ("unknown", 0.0)
+
+
+def test_version_triggers_are_created_on_first_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'agent_memory.db')
+        memory = AgentMemoryDatabase(db_path)
+        tables = "SELECT name FROM sqlite_master WHERE name LIKE 'intent_patterns_%version'"
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute(tables).fetchall() == []
+        memory.analyze_intent("gm")
+        with sqlite3.connect(db_path) as conn:
+            assert len(conn.execute(tables).fetchall()) == 4
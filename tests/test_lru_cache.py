@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+LRU CACHE TEST SUITE
+====================
+Tests for the production_core L1 LRUCache: size accounting, monotonic TTLs and the tag index.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core import cache_manager as cache_module
+from production_core.cache_manager import LRUCache, estimate_size, json_size
+
+
+def test_estimate_size_tracks_json_size_for_typical_values():
+    values = [
+        'x' * 1000,
+        {'symbol': 'BTC', 'usd': 65000.5, 'change_24h': -1.2},
+        [{'t': i, 'close': 65000 + i} for i in range(500)],
+        {'analysis': 'bullish ' * 200, 'tags': ['btc', 'eth']},
+    ]
+    for value in values:
+        estimate, exact = estimate_size(value), json_size(value)
+        assert exact / 3 <= estimate <= exact * 3
+
+
+def test_memory_accounting_and_lru_eviction():
+    cache = LRUCache(max_size=3, size_estimator=len)
+    cache.set_nowait('a', 'x' * 10)
+    cache.set_nowait('b', 'x' * 20)
+    cache.set_nowait('a', 'x' * 5)
+    assert cache.current_memory == 25
+
+    cache.set_nowait('c', 'x')
+    assert cache.get_nowait('b') is not None
+    cache.set_nowait('d', 'x')
+    # 'a' was least recently used once 'b' was read
+    assert list(cache.cache) == ['c', 'b', 'd']
+    assert cache.current_memory == 22 and cache.get_stats()['evictions'] == 1
+
+    small = LRUCache(max_memory_mb=1, size_estimator=len)
+    small.set_nowait('big', 'x' * 600_000)
+    small.set_nowait('bigger', 'x' * 600_000)
+    assert list(small.cache) == ['bigger'] and small.current_memory == 600_000
+
+
+def test_ttls_use_the_monotonic_clock(monkeypatch):
+    clock = [500.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: clock[0])
+    cache = LRUCache(size_estimator=len)
+    cache.set_nowait('price', 'x' * 10, ttl=60)
+    cache.set_nowait('forever', 'y')
+
+    clock[0] += 59
+    assert cache.get_nowait('price') == 'x' * 10
+    clock[0] += 1
+    assert cache.get_nowait('price') is None
+    assert cache.get_nowait('forever') == 'y' and cache.current_memory == 1
+
+
+def test_clear_by_tags_uses_the_tag_index():
+    async def exercise():
+        cache = LRUCache()
+        await cache.set('btc', 1, tags=['price_data'])
+        await cache.set('eth', 2, tags=['price_data', 'eth'])
+        await cache.set('note', 3, tags=['eth'])
+        await cache.set('plain', 4)
+        await cache.set('btc', 5)
+        cleared = await cache.clear_by_tags(['price_data'])
+        return cache, cleared
+
+    cache, cleared = asyncio.run(exercise())
+    assert cleared == 1
+    assert sorted(cache.cache) == ['btc', 'note', 'plain']
+    assert cache.tag_index == {'eth': {'note'}}
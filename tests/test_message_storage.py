@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+MESSAGE STORAGE TEST SUITE
+==========================
+Tests for batched message ingestion and counter upserts.
+"""
+
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+# The module-level message_storage instance must not migrate the tracked data/messages.db
+os.environ.setdefault('MESSAGE_DB_PATH', os.path.join(tempfile.mkdtemp(), 'messages.db'))
+
+from message_storage import MessageStorage, MessageIngestionQueue
+
+
+def _message(i, chat_id=100, user_id=None):
+    return {
+        'message_id': i,
+        'chat_id': chat_id,
+        'user_id': user_id if user_id is not None else i % 3,
+        'username': f"user_{i % 3}",
+        'text': f"message {i}",
+        'timestamp': time.time(),
+    }
+
+
+def test_batch_store_counts_and_decrypts():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        assert storage.store_messages_batch([_message(i) for i in range(30)]) == 30
+        assert storage.store_message(_message(30, chat_id=200))
+
+        with sqlite3.connect(storage.db_path) as conn:
+            chats = dict(conn.execute("SELECT chat_id, total_messages FROM chat_metadata").fetchall())
+            users = dict(conn.execute("SELECT user_id, total_messages FROM user_activity").fetchall())
+        assert chats == {100: 30, 200: 1}
+        assert users == {0: 11, 1: 10, 2: 10}
+
+        messages = storage.get_messages_for_period(100)
+        assert [m['text'] for m in messages[:2]] == ['message 0', 'message 1']
+
+
+def test_bad_row_only_drops_itself():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        batch = [_message(i) for i in range(10)]
+        batch[4]['timestamp'] = None  # violates NOT NULL and aborts the batch transaction
+
+        assert storage.store_messages_batch(batch) == 9
+        texts = [m['text'] for m in storage.get_messages_for_period(100)]
+        assert len(texts) == 9 and 'message 4' not in texts
+        with sqlite3.connect(storage.db_path) as conn:
+            assert conn.execute("SELECT total_messages FROM chat_metadata WHERE chat_id = 100").fetchone() == (9,)
+
+
+def test_ingestion_queue_batches_and_reports_metrics():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        queue = MessageIngestionQueue(storage, batch_size=50, max_latency_ms=20)
+
+        async def exercise():
+            for i in range(120):
+                assert await queue.enqueue(_message(i))
+            await queue.stop()
+
+        asyncio.run(exercise())
+        metrics = queue.get_metrics()
+        assert metrics['stored'] == 120
+        assert metrics['failed'] == 0
+        assert metrics['queue_depth'] == 0
+        assert metrics['batches'] < 120
+        assert metrics['avg_batch_size'] > 1
+        assert len(storage.get_messages_for_period(100)) == 120
+
+
+def test_compact_ciphertext_and_legacy_hex_migration():
+    from encryption import encrypt_message, FORMAT_RAW_FERNET, CURRENT_FORMAT
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'messages.db')
+
+        # A database written by the hex-encoding code, before format_version existed
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''CREATE TABLE messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, message_id INTEGER NOT NULL,
+                chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL, username TEXT,
+                encrypted_text TEXT, message_type TEXT DEFAULT 'text', timestamp REAL NOT NULL,
+                date_created TEXT NOT NULL, is_edit BOOLEAN DEFAULT FALSE, is_deleted BOOLEAN DEFAULT FALSE,
+                reply_to_message_id INTEGER, forward_from_chat_id INTEGER, media_file_id TEXT, media_caption TEXT)''')
+            conn.execute("INSERT INTO messages (message_id, chat_id, user_id, username, encrypted_text, timestamp, date_created) "
+                         "VALUES (1, 100, 1, 'old', ?, ?, 'now')", (encrypt_message('legacy hello'), time.time() - 10))
+            conn.execute("INSERT INTO messages (message_id, chat_id, user_id, username, encrypted_text, timestamp, date_created) "
+                         "VALUES (2, 100, 1, 'old', 'plain fallback', ?, 'now')", (time.time() - 5,))
+
+        storage = MessageStorage(db_path)
+        storage.store_message(_message(3))
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT format_version, typeof(encrypted_text) FROM messages ORDER BY id").fetchall()
+        assert rows == [(FORMAT_RAW_FERNET, 'blob'), (0, 'text'), (CURRENT_FORMAT, 'blob')]
+
+        texts = [m['text'] for m in storage.get_messages_for_period(100)]
+        assert texts == ['legacy hello', 'plain fallback', 'message 3']
+
+
+def test_plaintext_fallback_rows_are_not_migrated(monkeypatch):
+    import message_storage
+    from encryption import FORMAT_PLAINTEXT
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        monkeypatch.setattr(message_storage, 'encrypt_message_compact', lambda text: None)
+        # Valid hex of valid base64, so a hex-format row would be rewritten by the migration
+        hex_looking = {**_message(1), 'text': '414243444546'}
+        assert storage.store_message(hex_looking)
+
+        assert storage.migrate_legacy_ciphertext() == 0
+        with sqlite3.connect(storage.db_path) as conn:
+            assert conn.execute("SELECT format_version, encrypted_text FROM messages").fetchall() == \
+                [(FORMAT_PLAINTEXT, '414243444546')]
+        assert [m['text'] for m in storage.get_messages_for_period(100)] == ['414243444546']
+
+
+def test_stream_messages_matches_bulk_read_across_chunks():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        base = time.time() - 3600
+        batch = [_message(i) for i in range(250)]
+        for i, message in enumerate(batch):
+            message['timestamp'] = base + i // 2  # duplicate timestamps exercise the (timestamp, id) cursor
+        storage.store_messages_batch(batch)
+
+        async def collect():
+            return [m async for m in storage.stream_messages_for_period(100, chunk_size=40)]
+
+        streamed = asyncio.run(collect())
+        assert [m['text'] for m in streamed] == [m['text'] for m in storage.get_messages_for_period(100)]
+        assert len(streamed) == 250
+
+
+def test_summarizers_consume_message_stream():
+    from summarizer import format_transcript, format_transcript_stream
+    from enhanced_summarizer import EnhancedSummarizer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        storage.store_messages_batch([_message(i) for i in range(60)])
+        summarizer = EnhancedSummarizer(provider='anthropic', model='claude-3-sonnet-20240229')
+
+        async def exercise():
+            transcript = await format_transcript_stream(storage.stream_messages_for_period(100, chunk_size=16))
+            chunks = [c async for c in summarizer.chunk_message_stream(storage.stream_messages_for_period(100), 2010)]
+            return transcript, chunks
+
+        transcript, chunks = asyncio.run(exercise())
+        assert transcript == format_transcript(storage.get_messages_for_period(100))
+        assert [len(c) for c in chunks] == [len(c) for c in summarizer.chunk_messages(storage.get_messages_for_period(100), 2010)]
+        assert len(chunks) > 1
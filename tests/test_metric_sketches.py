@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+METRIC SKETCHES TEST SUITE
+==========================
+Tests for the DDSketch-backed timers and histograms of the production_core MetricCollector.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from production_core.metrics_collector import (
+    DDSketch, MetricCollector, MetricDefinition, MetricType, SketchSeries
+)
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(4, 1.5) for _ in range(20000)] + [0.0, -5.0, -50.0]
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.9, 0.95, 0.99):
+        assert sketch.quantile(q) == pytest.approx(_exact_quantile(values, q), rel=0.01)
+    assert sketch.quantile(0.0) == -50.0 and sketch.quantile(1.0) == max(values)
+    assert sketch.count == len(values) and sketch.sum == pytest.approx(sum(values))
+    assert len(sketch.positive) < 1000
+
+
+def test_sketches_merge_and_round_trip_through_json():
+    first, second = DDSketch(), DDSketch()
+    for value in range(1, 1001):
+        (first if value % 2 else second).add(float(value))
+
+    restored = DDSketch.from_dict(json.loads(json.dumps(second.to_dict())))
+    first.merge(restored)
+    assert first.count == 1000 and first.min == 1.0 and first.max == 1000.0
+    assert first.quantile(0.5) == pytest.approx(500, rel=0.01)
+
+    with pytest.raises(ValueError):
+        first.merge(DDSketch(relative_accuracy=0.05))
+    assert DDSketch.from_dict(DDSketch().to_dict()).quantile(0.5) == 0.0
+
+
+def test_series_rolls_up_by_bucket_and_drops_expired_buckets():
+    series = SketchSeries(rollup_seconds=60, retention_hours=1)
+    base = 1_700_000_000.0 - 1_700_000_000.0 % 60
+    values = []
+    for minute in range(3):
+        for i in range(100):
+            value = float(minute * 100 + i + 1)
+            values.append(value)
+            series.record(value, timestamp=base + minute * 60 + i * 0.5)
+
+    assert len(series.rollups) == 3
+    summary = asyncio.run(series.calculate_summary())
+    assert summary.count == 300 and summary.sum_value == sum(values)
+    assert summary.avg_value == pytest.approx(statistics.mean(values))
+    assert summary.std_dev == pytest.approx(statistics.stdev(values))
+    assert summary.percentile_95 == pytest.approx(_exact_quantile(values, 0.95), rel=0.01)
+
+    # Range queries are answered at bucket granularity
+    second_minute = datetime.utcfromtimestamp(base + 90)
+    ranged = asyncio.run(series.calculate_summary(second_minute, second_minute))
+    assert ranged.count == 100 and ranged.min_value == 101.0
+
+    # Buckets are dropped once they end before the retention cutoff
+    series.record(1.0, timestamp=base + 3600 + 120)
+    assert [rollup.start for rollup in series.rollups] == [base + 120, base + 3720]
+
+
+def test_collector_uses_sketches_for_timers_and_keeps_raw_counters():
+    async def exercise():
+        collector = MetricCollector()
+        for ms in range(1, 501):
+            await collector.record_timer('request_duration_ms', float(ms), {'route': 'ask'})
+        await collector.record_counter('requests_total', 1)
+        summary = await collector.get_metric_summary('request_duration_ms')
+        latest = await collector.get_latest_value('request_duration_ms')
+        exported = json.loads(await collector.export_metrics('json'))
+        recent = await collector.get_metric_values('request_duration_ms',
+                                                   start_time=datetime.utcnow() - timedelta(minutes=1))
+        return collector, summary, latest, exported, recent
+
+    collector, summary, latest, exported, recent = asyncio.run(exercise())
+    assert isinstance(collector.time_series['request_duration_ms'], SketchSeries)
+    assert not isinstance(collector.time_series['requests_total'], SketchSeries)
+    assert summary.count == 500 and summary.name == 'request_duration_ms'
+    assert summary.median_value == pytest.approx(250, rel=0.01)
+    assert latest.value == 500.0 and latest.tags == {'route': 'ask'}
+    assert len(recent) == 100
+    assert exported['metrics']['request_duration_ms']['summary']['p99'] == pytest.approx(495, rel=0.01)
+
+
+def test_prometheus_export_merges_worker_sketches():
+    async def exercise():
+        workers = []
+        for offset in (0, 1000):
+            collector = MetricCollector()
+            collector.define_metric(MetricDefinition(
+                name='llm_latency_ms', metric_type=MetricType.HISTOGRAM,
+                description='LLM latency', tags={'service': 'mobius'}))
+            for ms in range(1, 1001):
+                await collector.record_histogram('llm_latency_ms', float(ms + offset))
+            workers.append(collector)
+        await workers[0].record_gauge('queue_depth', 7)
+        peer = json.loads(await workers[1].export_metrics('sketch'))
+        return await workers[0].export_metrics('prometheus', peer_sketches=[peer])
+
+    lines = asyncio.run(exercise()).splitlines()
+    assert '# TYPE llm_latency_ms summary' in lines
+    assert 'llm_latency_ms_count{service="mobius"} 2000' in lines
+    assert 'llm_latency_ms_sum{service="mobius"} 2001000.0' in lines
+    median = next(line for line in lines if 'quantile="0.5"' in line)
+    assert median.startswith('llm_latency_ms{service="mobius",quantile="0.5"} ')
+    assert float(median.split()[-1]) == pytest.approx(1000, rel=0.01)
+    assert 'queue_depth 7' in lines
+
+
+def test_prometheus_totals_are_cumulative_and_quantiles_recent():
+    collector = MetricCollector()
+    collector.define_metric(MetricDefinition(name='llm_latency_ms', metric_type=MetricType.HISTOGRAM,
+                                             description='LLM latency', retention_hours=1))
+    series = collector.time_series['llm_latency_ms']
+    now = time.time()
+
+    def scrape():
+        lines = asyncio.run(collector.export_metrics('prometheus')).splitlines()
+        values = {line.split()[0]: float(line.split()[-1]) for line in lines if not line.startswith('#')}
+        return values['llm_latency_ms_count'], values['llm_latency_ms_sum'], values['llm_latency_ms{quantile="0.5"}']
+
+    for _ in range(100):
+        series.record(1000.0, timestamp=now - 1800)
+    for _ in range(100):
+        series.record(10.0, timestamp=now - 1)
+    first = scrape()
+
+    # The old bucket ages out of retention once a new one opens
+    series.record(10.0, timestamp=now + 1900)
+    second = scrape()
+
+    assert first[:2] == (200, 101000.0)
+    assert first[2] == pytest.approx(10, rel=0.01)
+    assert len(series.rollups) == 2
+    assert second[:2] == (201, 101010.0)
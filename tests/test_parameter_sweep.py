@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+PARAMETER SWEEP TEST SUITE
+==========================
+Tests for the process-pool backtest sweep with shared price history and pruning.
+"""
+
+import sys
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from parameter_sweep import MAX_WORKERS, ParameterSweep, expand_range, run_parameter_sweep
+
+
+def price_history(bars: int = 4000, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.008, bars)))
+    return close, 1_600_000_000 + np.arange(bars) * 3600
+
+
+def test_expand_range_forms():
+    assert expand_range((6, 24, 6)) == [6, 12, 18, 24]
+    assert expand_range({'start': 0.0, 'stop': 0.03, 'step': 0.01}) == [0.0, 0.01, 0.02, 0.03]
+    assert expand_range(['daily', 'weekly']) == ['daily', 'weekly']
+    assert expand_range(5) == [5]
+    with pytest.raises(ValueError):
+        expand_range((1, 5, 0))
+
+
+def test_pruned_sweep_keeps_the_best_combination():
+    close, timestamps = price_history()
+    ranges = {'momentum_period': (4, 64, 4), 'momentum_threshold': (0.0, 0.04, 0.005)}
+    full = run_parameter_sweep('momentum', close, timestamps, 10000, ranges, max_workers=1, prune=False)
+    pruned = run_parameter_sweep('momentum', close, timestamps, 10000, ranges, max_workers=1)
+
+    assert full['evaluated'] == full['combinations'] == 16 * 9
+    assert pruned['evaluated'] + pruned['pruned'] == pruned['combinations']
+    assert pruned['pruned'] > 0
+    assert pruned['results'][0]['params'] == full['results'][0]['params']
+    assert [row['rank'] for row in full['results']] == list(range(1, len(full['results']) + 1))
+    sharpes = [row['sharpe_ratio'] for row in full['results']]
+    assert sharpes == sorted(sharpes, reverse=True)
+
+
+def test_process_pool_matches_in_process_and_releases_shared_memory():
+    close, timestamps = price_history(bars=1500)
+    ranges = {'grid_levels': [4, 8, 12], 'grid_range_percent': (10, 30, 10)}
+    serial = run_parameter_sweep('grid', close, timestamps, 5000, ranges, max_workers=1, prune=False)
+
+    with ParameterSweep('grid', close, timestamps, 5000, max_workers=2) as sweep:
+        block_names = [block.name for block in sweep._blocks]
+        # Workers never fork the calling process
+        assert sweep._pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+        parallel = sweep.run(ranges, prune=False)
+    assert parallel['workers'] == 2
+    assert [(row['params'], row['final_capital']) for row in parallel['results']] == \
+        [(row['params'], row['final_capital']) for row in serial['results']]
+
+    for name in block_names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_worker_count_is_capped():
+    close, timestamps = price_history(bars=50)
+    assert ParameterSweep('grid', close, timestamps, 5000, max_workers=64).max_workers == MAX_WORKERS
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+PRICE ORACLE TEST SUITE
+=======================
+Tests for caching, single-flight coalescing and micro-batching in the shared price oracle.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from price_oracle import PriceOracle, resolve_coin_id
+
+PRICES = {'bitcoin': 65000.0, 'ethereum': 3200.0, 'solana': 150.0}
+
+
+class FakeUpstream:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.batches = []
+        self.singles = []
+
+    async def fetch_batch(self, coin_ids):
+        self.batches.append(list(coin_ids))
+        await asyncio.sleep(self.delay)
+        return {coin_id: {'price': PRICES[coin_id], 'source': 'fake'} for coin_id in coin_ids if coin_id in PRICES}
+
+    async def fetch_single(self, coin_id):
+        self.singles.append(coin_id)
+        return {'price': 1.5, 'source': 'fallback'} if coin_id == 'fallbackcoin' else None
+
+
+def _oracle(upstream, **kwargs):
+    return PriceOracle(fetch_batch=upstream.fetch_batch, fetch_single=upstream.fetch_single, **kwargs)
+
+
+def test_concurrent_requests_share_one_upstream_call():
+    upstream = FakeUpstream()
+    oracle = _oracle(upstream)
+
+    async def exercise():
+        return await asyncio.gather(*(oracle.get_price('BTC') for _ in range(200)))
+
+    prices = asyncio.run(exercise())
+    assert prices == [65000.0] * 200
+    assert upstream.batches == [['bitcoin']]
+    assert oracle.stats['coalesced'] == 199
+
+
+def test_symbols_are_micro_batched_and_cached():
+    upstream = FakeUpstream()
+    oracle = _oracle(upstream)
+
+    async def exercise():
+        prices = await oracle.get_prices(['BTC', 'eth', 'solana', 'bitcoin'])
+        cached = await oracle.get_quote('ETH')
+        return prices, cached
+
+    prices, cached = asyncio.run(exercise())
+    assert prices == {'BTC': 65000.0, 'eth': 3200.0, 'solana': 150.0, 'bitcoin': 65000.0}
+    assert len(upstream.batches) == 1 and sorted(upstream.batches[0]) == ['bitcoin', 'ethereum', 'solana']
+    assert cached['symbol'] == 'ETH' and cached['price'] == 3200.0
+    assert oracle.stats['cache_hits'] == 1
+
+
+def test_batch_size_limit_and_fallback_for_missing_coins():
+    upstream = FakeUpstream()
+    oracle = _oracle(upstream, max_batch_size=2)
+
+    async def exercise():
+        return await oracle.get_prices(['BTC', 'ETH', 'fallbackcoin', 'nosuchcoin'])
+
+    prices = asyncio.run(exercise())
+    assert prices == {'BTC': 65000.0, 'ETH': 3200.0, 'fallbackcoin': 1.5, 'nosuchcoin': 0.0}
+    assert len(upstream.batches) == 2
+    assert sorted(upstream.singles) == ['fallbackcoin', 'nosuchcoin']
+
+    # Unknown coins are negatively cached, so a second event loop does not refetch them
+    assert asyncio.run(oracle.get_quote('nosuchcoin')) is None
+    assert sorted(upstream.singles) == ['fallbackcoin', 'nosuchcoin']
+
+
+def test_expired_and_max_age_refetch():
+    upstream = FakeUpstream(delay=0)
+    oracle = _oracle(upstream, ttl=60)
+
+    async def exercise():
+        await oracle.get_price('SOL')
+        await oracle.get_price('SOL')
+        await asyncio.sleep(0.02)
+        await oracle.get_price('SOL', max_age=0.01)
+
+    asyncio.run(exercise())
+    assert upstream.batches == [['solana'], ['solana']]
+    assert resolve_coin_id(' matic ') == 'matic-network'
+
+
+def test_cache_is_a_bounded_lru():
+    upstream = FakeUpstream(delay=0)
+    oracle = _oracle(upstream, max_entries=2)
+
+    async def exercise():
+        await oracle.get_price('BTC')
+        await oracle.get_price('junk1')
+        await oracle.get_price('BTC')
+        await oracle.get_price('junk2')
+
+    asyncio.run(exercise())
+    # Unknown user symbols are cached negatively but evicted least recently used first
+    assert list(oracle._cache) == ['bitcoin', 'junk2']
+    assert oracle.stats['evictions'] == 1
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PROTOCOL SNAPSHOT TEST SUITE
+============================
+Tests for the persisted, indexed DeFiLlama protocol catalogue.
+"""
+
+import sys
+import os
+import asyncio
+import random
+import string
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from protocol_snapshot import ProtocolSnapshotStore
+
+KNOWN = [
+    {'name': 'Lido', 'slug': 'lido', 'symbol': 'LDO', 'tvl': 30e9, 'category': 'Liquid Staking', 'chains': ['Ethereum']},
+    {'name': 'AAVE V3', 'slug': 'aave-v3', 'symbol': 'AAVE', 'tvl': 20e9, 'category': 'Lending', 'chains': ['Ethereum']},
+    {'name': 'Uniswap V3', 'slug': 'uniswap-v3', 'symbol': 'UNI', 'tvl': 5e9, 'category': 'Dexes', 'chains': ['Ethereum']},
+    {'name': 'Uniswap V2', 'slug': 'uniswap-v2', 'symbol': 'UNI', 'tvl': 2e9, 'category': 'Dexes', 'chains': ['Ethereum']},
+    {'name': 'PancakeSwap AMM', 'slug': 'pancakeswap-amm', 'symbol': 'CAKE', 'tvl': 1.5e9, 'category': 'Dexes',
+     'chains': ['BSC'], 'chainTvls': {'BSC': 1.5e9}, 'description': 'dropped from the snapshot'},
+    {'name': 'Tiny Fork', 'slug': 'tiny-fork', 'symbol': '-', 'tvl': None, 'category': 'Dexes', 'chains': []},
+]
+
+
+def _catalogue(size):
+    rng = random.Random(13)
+    protocols = list(KNOWN)
+    for i in range(size):
+        name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))).title() + f" {rng.choice(['Finance', 'Swap', 'V2', 'DAO'])}"
+        protocols.append({'name': name, 'slug': f"p{i}-{name.lower().replace(' ', '-')}", 'symbol': name[:3].upper(),
+                          'tvl': rng.uniform(0, 1e9), 'category': 'Yield', 'chains': ['Ethereum']})
+    return protocols
+
+
+def test_search_top_and_get_from_snapshot():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return _catalogue(50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProtocolSnapshotStore(os.path.join(tmp, 'protocols.db'), fetch=fetch)
+        assert asyncio.run(store.ensure_ready())
+        assert asyncio.run(store.ensure_ready())
+        assert len(calls) == 1
+
+        assert [p['slug'] for p in store.top(3)] == ['lido', 'aave-v3', 'uniswap-v3']
+        assert [p['slug'] for p in store.search('uniswap')[:2]] == ['uniswap-v3', 'uniswap-v2']
+        assert store.search('UNI')[0]['slug'] == 'uniswap-v3'          # symbol, then by TVL
+        assert store.search('pancake')[0]['slug'] == 'pancakeswap-amm'  # prefix of name
+        assert store.search('cakeswap')[0]['slug'] == 'pancakeswap-amm'  # substring
+        assert store.search('uniswop')[0]['name'].startswith('Uniswap')  # fuzzy
+        assert store.search('zzzzqqq') == []
+        assert store.get('Aave-V3')['name'] == 'AAVE V3'
+        assert store.get('lido')['tvl'] == 30e9
+        assert 'chainTvls' not in store.get('pancakeswap-amm')
+
+        # Returned records are copies
+        store.get('lido')['tvl'] = 0
+        assert store.get('lido')['tvl'] == 30e9
+
+
+def test_snapshot_persists_and_failed_refresh_keeps_old_data():
+    async def fetch():
+        return _catalogue(10)
+
+    async def broken():
+        raise ConnectionError("offline")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'protocols.db')
+        assert asyncio.run(ProtocolSnapshotStore(path, fetch=fetch).refresh())
+
+        reloaded = ProtocolSnapshotStore(path, fetch=broken)
+        assert asyncio.run(reloaded.ensure_ready())
+        assert not reloaded.is_stale()
+        assert not asyncio.run(reloaded.refresh())
+        assert reloaded.top(1)[0]['slug'] == 'lido'
+        assert reloaded.get_stats()['failed_refreshes'] == 1
+
+
+def test_lookups_are_submillisecond_at_catalogue_scale():
+    async def fetch():
+        return _catalogue(6000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProtocolSnapshotStore(os.path.join(tmp, 'protocols.db'), fetch=fetch)
+        asyncio.run(store.refresh())
+        queries = ['uniswap', 'aave', 'lido', 'pancake', 'curve finance', 'uniswop']
+        start = time.perf_counter()
+        for _ in range(50):
+            for query in queries:
+                store.search(query)
+            store.top(10)
+            store.get('uniswap-v3')
+        per_lookup = (time.perf_counter() - start) / (50 * (len(queries) + 2))
+        assert per_lookup < 0.001
+
+
+def test_database_is_created_lazily():
+    async def fetch():
+        return _catalogue(5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'nested', 'protocols.db')
+        store = ProtocolSnapshotStore(path, fetch=fetch)
+        assert not os.path.exists(path)
+        assert asyncio.run(store.ensure_ready())
+        assert os.path.exists(path)
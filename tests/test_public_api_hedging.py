@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+PUBLIC API HEDGING TEST SUITE
+=============================
+Tests for hedged multi-source price lookups in PublicCryptoAPIs.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from public_api_endpoints import PublicCryptoAPIs, LatencyHistogram
+
+
+def _fake_apis(behaviour, hedged=True):
+    """behaviour: source name -> (delay seconds, price or None to fail)"""
+    apis = PublicCryptoAPIs(hedged=hedged)
+    cancelled = []
+
+    def make(name, delay, price):
+        async def source(symbol, vs_currency='usd'):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            if price is None:
+                raise Exception(f"{name} down")
+            return {'symbol': symbol.upper(), 'price': price, 'source': name}
+        return source
+
+    sources = {name: make(name, *behaviour.get(name, (0.01, None))) for name in apis.fallback_apis}
+    apis._price_sources = lambda: sources
+    return apis, cancelled
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    apis, cancelled = _fake_apis({'coingecko_public': (2.0, 100.0), 'coinpaprika': (0.01, 101.0)})
+
+    start = time.perf_counter()
+    result = asyncio.run(apis.get_crypto_price_multi_source('btc'))
+    elapsed = time.perf_counter() - start
+
+    assert result['source'] == 'coinpaprika'
+    assert elapsed < apis.DEFAULT_HEDGE_DELAY + 0.5
+    assert cancelled == ['coingecko_public']
+    assert apis.hedge_stats['hedged_launches'] == 1
+
+
+def test_cancelled_hedge_losers_record_their_elapsed_time():
+    apis, cancelled = _fake_apis({'coingecko_public': (2.0, 100.0), 'coinpaprika': (0.01, 101.0)})
+    for _ in range(10):
+        apis.latency['coingecko_public'].record(0.02, True)
+    assert apis.get_source_order()[0] == 'coingecko_public'
+
+    # The once-fast source got slow: it keeps losing the hedge until its p50 catches up
+    rounds = 0
+    while apis.get_source_order()[0] == 'coingecko_public' and rounds < 30:
+        assert asyncio.run(apis.get_crypto_price_multi_source('btc'))['source'] == 'coinpaprika'
+        rounds += 1
+
+    histogram = apis.latency['coingecko_public']
+    assert apis.get_source_order()[0] == 'coinpaprika'
+    assert cancelled.count('coingecko_public') == rounds == histogram.censored
+    assert histogram.success_rate == 1.0 and histogram.quantile(0.5) > 0.02
+
+
+def test_failed_source_is_replaced_immediately():
+    apis, _ = _fake_apis({'coingecko_public': (0.0, None), 'coinpaprika': (0.0, None), 'coincap': (0.0, 55.0)})
+    result = asyncio.run(apis.get_crypto_price_multi_source('eth'))
+    assert result['source'] == 'coincap'
+    assert apis.hedge_stats['hedged_launches'] == 0
+
+
+def test_order_follows_latency_history():
+    apis, _ = _fake_apis({})
+    for _ in range(20):
+        apis.latency['coingecko_public'].record(0.8, True)
+        apis.latency['binance_public'].record(0.05, True)
+        apis.latency['coincap'].record(0.05, False)
+    order = apis.get_source_order()
+    assert order[0] == 'binance_public'
+    assert order.index('coincap') > order.index('coingecko_public')
+    assert 0.04 <= apis._hedge_delay('binance_public') <= 0.07
+
+
+def test_all_sources_failing_returns_error():
+    for hedged in (True, False):
+        apis, _ = _fake_apis({}, hedged=hedged)
+        result = asyncio.run(apis.get_crypto_price_multi_source('doge'))
+        assert result['source'] == 'failed' and result['price'] == 0
+        assert apis.get_source_stats()['sources']['coincap']['success_rate'] == 0.0
+
+
+def test_histogram_quantiles_and_decay():
+    histogram = LatencyHistogram(max_samples=100)
+    for i in range(150):
+        histogram.record(0.1 if i % 2 else 1.0, True)
+    assert histogram.samples <= 100
+    assert 0.1 <= histogram.quantile(0.5) <= 1.25
+    assert histogram.quantile(0.99) >= 1.0
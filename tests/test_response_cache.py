@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+RESPONSE CACHE TEST SUITE
+=========================
+Tests for the exact and semantic LLM response cache.
+"""
+
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+os.environ.setdefault('AGENT_MEMORY_DB_PATH', os.path.join(tempfile.mkdtemp(), 'agent_memory.db'))
+
+import response_cache as response_cache_module
+from agent_memory_database import AgentMemoryDatabase
+from response_cache import BYPASS_INTENTS, INTENT_TTLS, ResponseCache, embed_text
+
+SYSTEM = {'role': 'system', 'content': 'You are Möbius, a helpful crypto trading assistant. User intent: explain_defi.'}
+
+
+def _ask(question, system=SYSTEM):
+    return [system, {'role': 'user', 'content': question}]
+
+
+def test_exact_tier_normalizes_case_punctuation_and_whitespace():
+    cache = ResponseCache(semantic=False)
+    cache.put(_ask('What is DeFi?'), 'groq', 'llama', 'DeFi is...', latency=1.5, intent='explain_defi')
+
+    assert cache.get(_ask('  what is   defi '), 'groq', 'llama', intent='explain_defi') == 'DeFi is...'
+    assert cache.get(_ask('What is DeFi?'), 'openai', 'llama', intent='explain_defi') is None
+    assert cache.get(_ask('What is DeFi?'), 'groq', 'other-model', intent='explain_defi') is None
+    assert cache.get(_ask('What is staking?'), 'groq', 'llama', intent='explain_defi') is None
+
+    stats = cache.get_stats()
+    assert stats['exact_hits'] == 1 and stats['misses'] == 3
+    assert stats['latency_saved'] == 1.5 and stats['hit_rate'] == 0.25
+
+
+def test_semantic_tier_matches_paraphrases_within_the_same_context():
+    cache = ResponseCache()
+    cache.put(_ask('Explain staking'), 'groq', 'llama', 'Staking is...', latency=2.0)
+
+    assert cache.get(_ask('can you explain staking please'), 'groq', 'llama') == 'Staking is...'
+    assert cache.get(_ask('what is restaking'), 'groq', 'llama') is None
+    other_context = {'role': 'system', 'content': 'Answer as a pirate.'}
+    assert cache.get(_ask('can you explain staking please', other_context), 'groq', 'llama') is None
+    assert cache.get_stats()['semantic_hits'] == 1
+
+
+def test_embedding_separates_topics():
+    assert embed_text('what are liquidity pools') @ embed_text('What is a liquidity pool?') > 0.99
+    assert embed_text('how does uniswap work') @ embed_text('how does aave work') < 0.5
+
+
+def test_time_sensitive_intents_and_questions_bypass_the_cache():
+    cache = ResponseCache()
+    cache.put(_ask('bitcoin'), 'groq', 'llama', 'BTC is $1', latency=1.0, intent='get_crypto_price')
+    cache.put(_ask('what is happening in crypto today'), 'groq', 'llama', 'Stuff', latency=1.0)
+
+    assert cache.get(_ask('bitcoin'), 'groq', 'llama', intent='get_crypto_price') is None
+    assert cache.get(_ask('bitcoin'), 'groq', 'llama') is None
+    assert cache.get(_ask('what is happening in crypto today'), 'groq', 'llama') is None
+    assert cache.get_stats()['bypassed'] == 2 and cache.get_stats()['entries'] == 0
+
+
+def test_ttl_per_intent_and_lru_eviction(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, 'monotonic', lambda: clock[0])
+    cache = ResponseCache(max_entries=2)
+    cache.put(_ask('what is a dao'), 'groq', 'llama', 'A DAO is...', latency=1.0, intent='explain_defi')
+    cache.put(_ask('best yield on usdc'), 'groq', 'llama', 'Aave...', latency=1.0, intent='find_yield_farming')
+
+    clock[0] += 901
+    assert cache.get(_ask('best yield on usdc'), 'groq', 'llama', intent='find_yield_farming') is None
+    assert cache.get(_ask('what is a dao'), 'groq', 'llama', intent='explain_defi') == 'A DAO is...'
+
+    cache.put(_ask('what is a nft'), 'groq', 'llama', 'An NFT...', latency=1.0)
+    cache.put(_ask('what is a rollup'), 'groq', 'llama', 'A rollup...', latency=1.0)
+    assert cache.get_stats()['entries'] == 2 and cache.get_stats()['evictions'] == 1
+    assert cache.get(_ask('what is a dao'), 'groq', 'llama') is None
+
+
+def test_ttls_are_keyed_by_the_intents_the_classifier_returns():
+    workdir = tempfile.mkdtemp()
+    try:
+        # A fresh database is seeded from the comprehensive training set; the shipped one has the basic patterns
+        fresh = AgentMemoryDatabase(os.path.join(workdir, 'fresh.db'))
+        shipped_path = os.path.join(workdir, 'shipped.db')
+        shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'data', 'agent_memory.db'), shipped_path)
+        shipped = AgentMemoryDatabase(shipped_path)
+
+        classified = {
+            question: database.analyze_intent(question)[0]
+            for database, question in (
+                (fresh, 'how much is eth right now'),
+                (fresh, 'what is impermanent loss'),
+                (fresh, 'best yield farming opportunities'),
+                (shipped, 'what is the price of bitcoin'),
+                (shipped, 'what is defi'),
+                (shipped, 'alert me when btc reaches 100k'),
+            )
+        }
+        returned = set()
+        for database in (fresh, shipped):
+            conn = sqlite3.connect(database.db_path)
+            returned.update(row[0] for row in conn.execute('SELECT DISTINCT intent FROM intent_patterns'))
+            conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    assert returned <= set(INTENT_TTLS) | BYPASS_INTENTS
+    ttl = {question: ResponseCache.ttl_for(intent) for question, intent in classified.items()}
+    assert ttl['how much is eth right now'] == 0
+    assert ttl['what is the price of bitcoin'] == 0
+    assert ttl['alert me when btc reaches 100k'] == 0
+    assert ttl['what is impermanent loss'] == ttl['what is defi'] == 24 * 3600
+    assert ttl['best yield farming opportunities'] == 900
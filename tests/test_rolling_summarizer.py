@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+ROLLING SUMMARIZER TEST SUITE
+=============================
+Tests for incremental bucket summaries and hierarchical merging.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+# The module-level message_storage instance must not migrate the tracked data/messages.db
+os.environ.setdefault('MESSAGE_DB_PATH', os.path.join(tempfile.mkdtemp(), 'messages.db'))
+
+from message_storage import MessageStorage
+from rolling_summarizer import RollingSummarizer
+
+HOUR = 3600
+NOW = 1_700_000_000 // (6 * HOUR) * (6 * HOUR) + 30 * 60  # half an hour into a 6h block
+
+
+class FlakyLLM:
+    """Fails every bucket prompt containing `marker`"""
+
+    def __init__(self, marker):
+        self.marker = marker
+        self.prompts = []
+
+    async def __call__(self, prompt, user_id=0):
+        self.prompts.append(prompt)
+        if self.marker in prompt:
+            raise ConnectionError('provider down')
+        return "- summary"
+
+
+class FakeLLM:
+    def __init__(self, reply="- summary"):
+        self.reply = reply
+        self.prompts = []
+
+    async def __call__(self, prompt, user_id=0):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def _fill(storage, hours=24, per_hour=5):
+    batch = []
+    for h in range(hours + 1):
+        for i in range(per_hour):
+            timestamp = NOW - h * HOUR + i
+            if timestamp <= NOW:
+                batch.append({
+                    'message_id': h * 100 + i,
+                    'chat_id': 100,
+                    'user_id': i,
+                    'username': f"user_{i}",
+                    'text': f"hour {h} message {i}",
+                    'timestamp': timestamp,
+                })
+    storage.store_messages_batch(batch)
+
+
+def test_second_summary_costs_one_call():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        _fill(storage)
+        llm = FakeLLM()
+        summarizer = RollingSummarizer(storage, llm)
+
+        first = asyncio.run(summarizer.summarize_period(100, hours=24, now=NOW))
+        assert first.message_count > 0
+        assert first.participant_count == 5
+        assert first.llm_calls > 24  # every closed hour, the 6h merges and the final call
+
+        second = asyncio.run(summarizer.summarize_period(100, hours=24, now=NOW))
+        assert second.llm_calls == 1
+        assert second.message_count == first.message_count
+        final_prompt = llm.prompts[-1]
+        assert "RECENT MESSAGES" in final_prompt and "hour 0 message 0" in final_prompt
+        # Closed hours reach the final prompt only as cached summaries, never as transcript
+        assert "hour 3 message" not in final_prompt
+
+        # An hour later only the newly closed hour is summarized
+        third = asyncio.run(summarizer.summarize_period(100, hours=24, now=NOW + HOUR))
+        assert third.llm_calls == 2
+
+
+def test_merged_blocks_are_persisted():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        _fill(storage)
+        asyncio.run(RollingSummarizer(storage, FakeLLM()).refresh(100, hours=24, now=NOW))
+
+        blocks = storage.get_bucket_summaries(100, 6 * HOUR, 0, NOW)
+        assert len(blocks) == 4
+        assert all(block['message_count'] == 30 for block in blocks.values())
+
+        # A fresh summarizer over the same database only needs the final call
+        fresh = RollingSummarizer(storage, FakeLLM())
+        assert asyncio.run(fresh.summarize_period(100, hours=24, now=NOW)).llm_calls == 1
+
+
+def test_failed_calls_are_not_persisted():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        _fill(storage, hours=2)
+        failing = RollingSummarizer(storage, FakeLLM("Error: API key for the active provider ('groq') is not set."))
+        result = asyncio.run(failing.summarize_period(100, hours=3, now=NOW))
+        assert "Unable to generate summary" in result.text
+        assert failing.stats['failed_calls'] > 0
+
+        hourly = storage.get_bucket_summaries(100, HOUR, 0, NOW)
+        assert all(entry['summary'] == '' for entry in hourly.values())  # only empty buckets cached
+
+        retry = RollingSummarizer(storage, FakeLLM())
+        assert asyncio.run(retry.summarize_period(100, hours=3, now=NOW)).llm_calls == 3
+
+
+def test_blocks_with_a_failed_hour_are_not_persisted():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = MessageStorage(os.path.join(tmp, 'messages.db'))
+        _fill(storage)
+        asyncio.run(RollingSummarizer(storage, FlakyLLM("hour 8 message")).refresh(100, hours=24, now=NOW))
+
+        blocks = storage.get_bucket_summaries(100, 6 * HOUR, 0, NOW)
+        assert len(blocks) == 3
+        assert not any("summary unavailable" in block['summary'] for block in blocks.values())
+
+        # The failed hour and its block are retried: one bucket call, one merge, the final call
+        retry = RollingSummarizer(storage, FakeLLM())
+        assert asyncio.run(retry.summarize_period(100, hours=24, now=NOW)).llm_calls == 3
+        assert len(storage.get_bucket_summaries(100, 6 * HOUR, 0, NOW)) == 4
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+SESSION REGISTRY TEST SUITE
+===========================
+Tests for the process-wide per-host aiohttp session registry.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from aiohttp import web
+
+from session_registry import SessionRegistry
+
+
+async def _serve():
+    async def echo(request):
+        return web.json_response({'agent': request.headers.get('User-Agent'), 'extra': request.headers.get('X-Extra')})
+
+    app = web.Application()
+    app.router.add_get('/echo', echo)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def test_host_key_normalizes_default_ports():
+    assert SessionRegistry.host_key('https://API.llama.fi/protocols') == 'https://api.llama.fi:443'
+    assert SessionRegistry.host_key('http://example.com/a?b=1') == 'http://example.com:80'
+    assert SessionRegistry.host_key('http://127.0.0.1:8080/x') == 'http://127.0.0.1:8080'
+
+
+def test_sessions_are_shared_per_host_and_connections_reused():
+    async def exercise():
+        runner, port = await _serve()
+        registry = SessionRegistry()
+        try:
+            first = registry.session(headers={'User-Agent': 'first'})
+            second = registry.session(headers={'User-Agent': 'second'}, timeout=5)
+            bodies = []
+            for view, extra in ((first, None), (second, 'yes'), (first, None)):
+                headers = {'X-Extra': extra} if extra else None
+                async with view.get(f"http://127.0.0.1:{port}/echo", headers=headers) as response:
+                    bodies.append(await response.json())
+            same = registry.session_for(f"http://127.0.0.1:{port}/a") is registry.session_for(f"http://127.0.0.1:{port}/b")
+            other = registry.session_for(f"http://localhost:{port}/a") is registry.session_for(f"http://127.0.0.1:{port}/a")
+            return bodies, same, other, registry.get_stats()
+        finally:
+            await registry.close()
+            await runner.cleanup()
+
+    bodies, same, other, stats = asyncio.run(exercise())
+    assert [body['agent'] for body in bodies] == ['first', 'second', 'first']
+    assert bodies[1]['extra'] == 'yes'
+    assert same and not other
+
+    host = stats['hosts'][next(key for key in stats['hosts'] if '127.0.0.1' in key)]
+    assert host['requests'] == 3
+    assert host['connections_created'] == 1 and host['connections_reused'] == 2
+    assert abs(host['reuse_rate'] - 2 / 3) < 1e-9
+    assert host['open_connections'] == 1
+
+
+def test_close_closes_every_session():
+    async def exercise():
+        registry = SessionRegistry()
+        session = registry.session_for('https://api.llama.fi/protocols')
+        await registry.close()
+        return session.closed, registry.session().closed, registry.get_stats()['sessions']
+
+    session_closed, view_closed, sessions = asyncio.run(exercise())
+    assert session_closed and view_closed and sessions == 0
+
+
+def test_views_release_only_their_own_reference():
+    async def exercise():
+        registry = SessionRegistry()
+        first, second = registry.session(), registry.session(timeout=5)
+        session = registry.session_for('https://api.llama.fi/protocols')
+        await first.close()
+        await first.close()
+        after_first = (first.closed, second.closed, session.closed)
+        try:
+            first.get('https://api.llama.fi/protocols')
+            reused = True
+        except RuntimeError:
+            reused = False
+        await second.close()
+        return after_first, reused, session.closed
+
+    after_first, reused, closed_by_last = asyncio.run(exercise())
+    assert after_first == (True, False, False)
+    assert not reused
+    assert closed_by_last
+
+
+def test_sessions_of_a_previous_event_loop_are_closed():
+    registry = SessionRegistry()
+
+    async def open_session():
+        return registry.session_for('https://api.llama.fi/protocols')
+
+    async def replace_session():
+        replacement = registry.session_for('https://api.llama.fi/protocols')
+        await asyncio.sleep(0)
+        await registry.close()
+        return replacement
+
+    old = asyncio.run(open_session())
+    new = asyncio.run(replace_session())
+    assert old is not new and old.closed and new.closed
+
+
+def test_every_holder_releases_its_view(monkeypatch):
+    import async_http
+    import defillama_api
+    from production_core import performance_optimizer
+
+    registry = SessionRegistry()
+    for module in (async_http, defillama_api, performance_optimizer):
+        monkeypatch.setattr(module, 'session_registry', registry)
+
+    async def exercise():
+        client = async_http.AsyncHTTPClient()
+        llama = defillama_api.DeFiLlamaAPI()
+        pool = performance_optimizer.ConnectionPool(idle_timeout=0)
+        await client.get_session()
+        await llama._get_session()
+        await pool.get_connection('a')
+        await pool.get_connection('b')
+        session = registry.session_for('https://api.llama.fi/protocols')
+        held = registry._views
+
+        await asyncio.sleep(0.01)
+        await pool.cleanup_idle_connections()
+        await client.close()
+        await llama.close()
+        after_holders = (registry._views, session.closed)
+        await pool.close_all()
+        return held, after_holders
+
+    held, after_holders = asyncio.run(exercise())
+    assert held == 4
+    assert after_holders == (0, True)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+STREAMING INDICATORS TEST SUITE
+===============================
+Tests for the O(1)-per-candle indicator engine against full-series pandas references.
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from streaming_indicators import CANDLE_SECONDS, RollingWindow, StreamingIndicatorEngine, compute_indicators
+
+
+def random_prices(count: int = 400, seed: int = 5, start: float = 60000.0):
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+
+
+def reference_indicators(prices: np.ndarray) -> pd.DataFrame:
+    close = pd.Series(prices)
+    ema_12 = close.ewm(span=12, min_periods=12, adjust=False).mean()
+    ema_26 = close.ewm(span=26, min_periods=26, adjust=False).mean()
+    macd = ema_12 - ema_26
+    diff = close.diff()
+    gain = diff.clip(lower=0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    loss = (-diff).clip(lower=0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    middle = close.rolling(20).mean()
+    std = close.rolling(20).std(ddof=0)
+    deviation = close.rolling(20).apply(lambda window: np.mean(np.abs(window - window.mean())), raw=True)
+    high, low = close.rolling(14).max(), close.rolling(14).min()
+    stoch_k = 100 * (close - low) / (high - low)
+    return pd.DataFrame({
+        'sma_20': middle,
+        'sma_50': close.rolling(50).mean(),
+        'ema_12': ema_12,
+        'ema_26': ema_26,
+        'macd': macd,
+        'macd_signal': macd.ewm(span=9, min_periods=9, adjust=False).mean(),
+        'rsi': 100 - 100 / (1 + gain / loss),
+        'bb_upper': middle + 2 * std,
+        'bb_lower': middle - 2 * std,
+        'cci': (close - middle) / (0.015 * deviation),
+        'stoch_k': stoch_k,
+        'stoch_d': stoch_k.rolling(3).mean(),
+        'williams_r': -100 * (high - close) / (high - low),
+    })
+
+
+def test_streaming_values_match_full_series_reference():
+    prices = random_prices()
+    streamed = pd.DataFrame(compute_indicators(prices))
+    reference = reference_indicators(prices)
+    for column in reference.columns:
+        expected = reference[column]
+        actual = streamed[column] if column in streamed else pd.Series(np.nan, index=expected.index)
+        # Warm-up lengths match: a value exists exactly where the reference has one
+        assert (actual.notna() == expected.notna()).all(), column
+        ready = expected.notna()
+        assert np.allclose(actual[ready], expected[ready], rtol=1e-9, atol=1e-6), column
+
+
+def test_rolling_window_stays_accurate_over_long_streams():
+    rng = np.random.default_rng(1)
+    values = 60000 + np.cumsum(rng.normal(0, 50, 200000))
+    window = RollingWindow(20)
+    for value in values:
+        window.push(value)
+    assert np.isclose(window.mean, values[-20:].mean(), rtol=1e-12)
+    assert np.isclose(window.std, values[-20:].std(), rtol=1e-6)
+
+
+def test_engine_fetches_history_once_then_only_new_candles():
+    prices = random_prices(count=800)
+    start = time.time() - 800 * CANDLE_SECONDS
+    # Hourly candles plus a partial "now" point 20 minutes after the last one
+    timeline = [(start + i * CANDLE_SECONDS, float(price), 1.0) for i, price in enumerate(prices)]
+    calls = []
+    visible = {'count': 700}
+
+    async def fetch_history(coin_id, days):
+        calls.append((coin_id, days))
+        await asyncio.sleep(0.01)
+        candles = timeline[:visible['count']]
+        last_time, last_price, _ = candles[-1]
+        return candles[-days * 24:] + [(last_time + 1200, last_price * 1.01, 1.0)]
+
+    engine = StreamingIndicatorEngine(capacity=720, refresh_interval=0, fetch_history=fetch_history)
+
+    async def scenario():
+        ready = await asyncio.gather(*(engine.ensure('BTC') for _ in range(5)))
+        assert all(ready)
+        assert calls == [('bitcoin', 30)]
+        assert engine.stats['coalesced'] == 4
+        visible['count'] = 800
+        return await engine.get_indicators('btc')
+
+    latest = asyncio.run(scenario())
+    # 100 hours behind: the refresh fetches just enough days to close the gap
+    assert calls[-1] == ('bitcoin', 6)
+    # The partial points were dropped, so the state equals a pass over the hourly series
+    expected = compute_indicators(prices)[-1]
+    assert latest.keys() == expected.keys()
+    assert all(np.isclose(latest[key], expected[key]) for key in expected)
+
+    history = engine.history('bitcoin')
+    assert len(history) == 720
+    assert history[-1]['price'] == prices[-1] and 'rsi' in history[-1]
+    assert engine.latest('unknown-coin') is None
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+TOKEN COUNTER TEST SUITE
+========================
+Tests for offline per-provider token counting and context-limit-aware chunk packing.
+"""
+
+import sys
+import os
+import gzip
+import json
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+import token_counter
+from enhanced_summarizer import EnhancedSummarizer
+from token_counter import (TokenCounter, get_context_limit, get_token_counter, pack_contiguous,
+                           register_token_counter)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'chat_24h.jsonl.gz')
+
+
+class CharCounter(TokenCounter):
+    name = 'chars'
+    exact = True
+
+    def count(self, text):
+        return len(text)
+
+
+def test_pack_contiguous_uses_fewest_balanced_ranges():
+    costs = [5, 5, 5, 5, 5, 5, 5, 1]
+    ranges = pack_contiguous(costs, 20)
+    # Greedy also needs two ranges, but leaves the second one nearly empty
+    assert ranges == [(0, 4), (4, 8)]
+    assert pack_contiguous([], 10) == []
+    assert pack_contiguous([3, 30, 3], 10) == [(0, 1), (1, 2), (2, 3)]
+    assert pack_contiguous([1, 2, 3], 100) == [(0, 3)]
+
+
+def test_estimators_are_offline_and_per_provider():
+    llama = get_token_counter('groq', 'llama3-70b-8192')
+    claude = get_token_counter('anthropic', 'claude-3-sonnet-20240229')
+    assert llama is not claude
+    text = "gm! BTC just hit 67,432.10 🚀 https://example.com/some/long/path"
+    assert 10 < llama.count(text) < len(text)
+    assert llama.count("gm gm") == 2
+    assert llama.count("🚀🚀🚀") > llama.count("abc")
+    assert claude.count(text) >= llama.count(text)
+
+    assert get_context_limit('groq', 'llama3-70b-8192') == 8192
+    assert get_context_limit('gemini', 'gemini-2.0-flash') == 500000
+
+
+def test_registered_counter_is_used(monkeypatch):
+    monkeypatch.setattr(token_counter, '_COUNTER_FACTORIES', dict(token_counter._COUNTER_FACTORIES))
+    register_token_counter('custom', lambda model: CharCounter())
+    try:
+        assert get_token_counter('custom', 'any').count("abcd") == 4
+    finally:
+        get_token_counter.cache_clear()
+
+    class Uncounted(TokenCounter):
+        name = 'uncounted'
+
+    with pytest.raises(TypeError):
+        Uncounted()
+
+
+def test_packed_chunks_fill_but_never_exceed_the_context_window():
+    with gzip.open(FIXTURE, 'rt', encoding='utf-8') as f:
+        messages = [json.loads(line) for line in f]
+    messages.append({'text': 'x ' * 20000, 'username': 'spammer', 'timestamp': messages[-1]['timestamp'] + 1})
+
+    summarizer = EnhancedSummarizer(provider='groq', model='llama3-70b-8192')
+    assert summarizer.max_tokens_per_request == 8192
+    chunks = summarizer.pack_messages(messages, summarizer.max_tokens_per_request)
+    assert sum(len(chunk) for chunk in chunks) == len(messages)
+
+    sizes = []
+    for i, chunk in enumerate(chunks, 1):
+        prompt = summarizer._chunk_prompt(summarizer.format_transcript(chunk), i, len(chunks),
+                                          summarizer.get_time_range(chunk), len(chunk))
+        sizes.append(summarizer.estimate_tokens(prompt) + summarizer.response_token_reserve)
+    assert max(sizes) <= 8192
+    assert sum(sizes) / len(sizes) > 0.85 * 8192
+    assert chunks[-1][-1]['text'].endswith('[truncated]')
+
+    # Fewer chunks than the greedy split cannot exist
+    assert len(chunks) == len(summarizer.chunk_messages(messages[:-1], 8192)) + 1
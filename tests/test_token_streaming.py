@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+TOKEN STREAMING TEST SUITE
+==========================
+Tests for provider token streaming, time-to-first-token tracking and throttled Telegram edits.
+"""
+
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from telegram.error import RetryAfter
+
+from ai_provider_manager import AIProvider, AIProviderManager, ALL_PROVIDERS_FAILED_MESSAGE
+from response_cache import ResponseCache
+import ai_provider_manager as ai_provider_module
+import streaming_response_engine as streaming_module
+from streaming_response_engine import TelegramTokenStreamer
+
+
+class _FakeCompletions:
+    def __init__(self, tokens, fail=False):
+        self.tokens = tokens
+        self.fail = fail
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.fail:
+            raise ConnectionError('provider down')
+        if not kwargs.get('stream'):
+            text = ''.join(token for token in self.tokens if token)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+        async def chunks():
+            for token in self.tokens:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        return chunks()
+
+
+def _openai_style_client(tokens, fail=False):
+    completions = _FakeCompletions(tokens, fail)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), completions
+
+
+def _manager(monkeypatch, clients):
+    monkeypatch.setattr(ai_provider_module, 'response_cache', ResponseCache())
+    manager = AIProviderManager()
+    manager.provider_clients = clients
+    manager.current_provider = AIProvider.GROQ
+    return manager
+
+
+def _collect(iterator):
+    async def run():
+        return [chunk async for chunk in iterator]
+    return asyncio.run(run())
+
+
+MESSAGES = [{'role': 'user', 'content': 'Explain staking'}]
+
+
+def test_stream_text_yields_deltas_and_records_first_token(monkeypatch):
+    groq, completions = _openai_style_client(['Staking ', None, 'locks ', 'tokens.'])
+    manager = _manager(monkeypatch, {AIProvider.GROQ: groq})
+
+    assert _collect(manager.stream_text(MESSAGES)) == ['Staking ', 'locks ', 'tokens.']
+    assert completions.calls[0]['stream'] is True
+
+    stats = manager.get_usage_stats()['time_to_first_token']['groq']
+    assert stats['streams'] == 1 and stats['p95'] >= 0
+
+    # The complete answer is cached and replayed without calling the provider
+    assert _collect(manager.stream_text(MESSAGES)) == ['Staking locks tokens.']
+    assert len(completions.calls) == 1
+
+
+def test_stream_falls_back_before_first_token(monkeypatch):
+    groq, _ = _openai_style_client([], fail=True)
+    openai, _ = _openai_style_client(['from ', 'openai'])
+    manager = _manager(monkeypatch, {AIProvider.GROQ: groq, AIProvider.OPENAI: openai})
+
+    assert asyncio.run(manager.generate_text(MESSAGES, stream=True)) == 'from openai'
+    assert 'openai' in manager.get_first_token_stats() and 'groq' not in manager.get_first_token_stats()
+
+    # The answer is cached under the provider that gave it, not the one that was asked
+    cache = ai_provider_module.response_cache
+    assert cache.get(MESSAGES, 'openai', manager.providers[AIProvider.OPENAI].default_model) == 'from openai'
+    assert cache.get(MESSAGES, 'groq', manager.providers[AIProvider.GROQ].default_model) is None
+
+
+def test_generate_text_caches_fallback_answers_under_the_answering_provider(monkeypatch):
+    groq, _ = _openai_style_client([], fail=True)
+    openai, _ = _openai_style_client(['from openai'])
+    manager = _manager(monkeypatch, {AIProvider.GROQ: groq, AIProvider.OPENAI: openai})
+
+    assert asyncio.run(manager.generate_text(MESSAGES)) == 'from openai'
+    cache = ai_provider_module.response_cache
+    assert cache.get(MESSAGES, 'openai', manager.providers[AIProvider.OPENAI].default_model) == 'from openai'
+    assert cache.get(MESSAGES, 'groq', manager.providers[AIProvider.GROQ].default_model) is None
+
+
+def test_stream_reports_failure_when_no_provider_streams(monkeypatch):
+    groq, _ = _openai_style_client([], fail=True)
+    manager = _manager(monkeypatch, {AIProvider.GROQ: groq})
+
+    assert _collect(manager.stream_text(MESSAGES, use_cache=False)) == [ALL_PROVIDERS_FAILED_MESSAGE]
+
+
+class _FakeMessage:
+    def __init__(self, log, chat_id=1, rate_limit_once=False, retry_after=0):
+        self.chat_id = chat_id
+        self.log = log
+        self.rate_limit_once = rate_limit_once
+        self.retry_after = retry_after
+        self.text = ''
+
+    async def edit_text(self, text, parse_mode=None):
+        if self.rate_limit_once:
+            self.rate_limit_once = False
+            raise RetryAfter(self.retry_after)
+        self.text = text
+        self.log.append((id(self), text))
+
+    async def reply_text(self, text, parse_mode=None):
+        message = _FakeMessage(self.log, self.chat_id)
+        message.text = text
+        return message
+
+
+async def _tokens(parts, delay=0.0):
+    for part in parts:
+        await asyncio.sleep(delay)
+        yield part
+
+
+def _fake_clock(monkeypatch):
+    """Drive the streamer's clock by hand so throttling tests never really sleep"""
+    clock = {'now': 1000.0}
+
+    async def sleep(delay):
+        clock['now'] += max(delay, 0.0)
+
+    monkeypatch.setattr(streaming_module, 'time', SimpleNamespace(monotonic=lambda: clock['now']))
+    monkeypatch.setattr(streaming_module, 'asyncio', SimpleNamespace(sleep=sleep))
+    return clock
+
+
+def test_telegram_streamer_flushes_first_token_then_throttles(monkeypatch):
+    _fake_clock(monkeypatch)
+    log = []
+    message = _FakeMessage(log)
+    streamer = TelegramTokenStreamer(private_interval=10.0)
+
+    answer = asyncio.run(streamer.stream(_tokens(['Hello', ' there', ' friend']), message, 'private'))
+
+    assert answer == 'Hello there friend'
+    # First token shown immediately with a cursor, then only the final edit
+    assert [text for _, text in log] == ['Hello' + TelegramTokenStreamer.CURSOR, 'Hello there friend']
+    stats = streamer.get_stats()
+    assert stats['skipped_edits'] == 2 and stats['first_token_samples'] == 1
+
+
+def test_telegram_streamer_waits_out_a_rate_limited_first_flush(monkeypatch):
+    clock = _fake_clock(monkeypatch)
+    log = []
+    message = _FakeMessage(log, rate_limit_once=True, retry_after=5)
+    streamer = TelegramTokenStreamer(private_interval=0.0)
+
+    answer = asyncio.run(streamer.stream(_tokens(['Hello', ' there', ' friend']), message, 'private'))
+
+    assert answer == 'Hello there friend'
+    # No edits while Telegram's back-off is running; the final edit waits it out
+    assert [text for _, text in log] == ['Hello there friend']
+    stats = streamer.get_stats()
+    assert stats['rate_limited'] == 1 and stats['skipped_edits'] == 2
+    assert clock['now'] >= 1005.0
+
+
+def test_telegram_streamer_backs_off_on_retry_after_and_splits_long_text():
+    log = []
+    message = _FakeMessage(log, rate_limit_once=True)
+    streamer = TelegramTokenStreamer(private_interval=0.0)
+    streamer.max_length = 20
+
+    answer = asyncio.run(streamer.stream(_tokens(['line one\n', 'line two\n', 'line three']), message, 'private'))
+
+    assert answer == 'line one\nline two\nline three'
+    assert streamer.get_stats()['rate_limited'] == 1
+    assert message.text == 'line one\nline two'
+    assert log[-1][1] == 'line three' and log[-1][0] != id(message)
+
+
+def test_enhanced_handler_streams_ai_replies_when_given_the_update(monkeypatch):
+    import streaming_response_engine
+    import enhanced_response_handler as handler_module
+
+    streamed = []
+
+    async def fake_stream_ai_reply(update, messages, **kwargs):
+        streamed.append((update, messages))
+        return 'streamed answer'
+
+    async def fake_generate(messages, **kwargs):
+        return 'plain answer'
+
+    monkeypatch.setattr(streaming_response_engine, 'stream_ai_reply', fake_stream_ai_reply)
+    monkeypatch.setattr(handler_module, 'generate_ai_response', fake_generate)
+    handler = handler_module.EnhancedResponseHandler()
+    update = object()
+
+    assert asyncio.run(handler._generate_reply('hi', {'telegram_update': update})) == ('streamed answer', True)
+    assert streamed == [(update, [{'role': 'user', 'content': 'hi'}])]
+    assert asyncio.run(handler._generate_reply('hi', None)) == ('plain answer', False)
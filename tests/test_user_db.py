@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+USER DB TEST SUITE
+==================
+Tests for the pooled user database backend.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from user_db import UserDatabase
+
+
+def _make_db(tmp_path):
+    db = UserDatabase(os.path.join(tmp_path, 'users.sqlite'), pool_size=2)
+    db.init_schema()
+    return db
+
+
+def test_property_round_trip_reuses_connections():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(tmp)
+        for i in range(50):
+            db.set_user_property(1, 'counter', str(i))
+
+        assert db.get_user_property(1, 'counter') == '49'
+        assert db.get_user_property(1, 'missing', 'fallback') == 'fallback'
+        assert db.pool.stats()['created_connections'] == 1
+        db.close()
+
+
+def test_wal_mode_enabled():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(tmp)
+        with db.pool.get_connection() as con:
+            assert con.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        db.close()
+
+
+def test_username_mapping_and_alerts():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(tmp)
+        db.update_username_mapping(7, 'alice')
+        db.update_username_mapping(7, 'alice_renamed')
+        assert db.get_user_id_from_username('alice_renamed') == 7
+        assert db.get_user_id_from_username('alice') is None
+
+        db.add_alert_to_db('alert-1', 7, 100, 'wallet', {'address': '0xabc'})
+        assert db.count_user_alerts(7) == 1
+        db.close()
+
+
+def test_async_facade():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(tmp)
+
+        async def exercise():
+            await asyncio.gather(*(db.set_user_property_async(uid, 'tier', 'retail') for uid in range(20)))
+            values = await asyncio.gather(*(db.get_user_property_async(uid, 'tier') for uid in range(20)))
+            await db.update_username_mapping_async(3, 'carol')
+            return values, await db.get_user_id_from_username_async('carol')
+
+        values, user_id = asyncio.run(exercise())
+        assert values == ['retail'] * 20
+        assert user_id == 3
+        db.close()
+
+
+def test_activity_buffer_coalesces_and_flushes_in_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(tmp)
+        db.activity_buffer.flush_interval = 60  # only size-triggered or explicit flushes
+
+        async def exercise():
+            for i in range(100):
+                db.record_user_activity(i % 5, f"user_{i % 5}")
+            # Five users, three records each, nothing written yet
+            assert db.activity_buffer.pending_count == 15
+            assert db.activity_buffer.stats['flushes'] == 0
+            assert db.get_user_property(2, 'last_username') == 'user_2'
+            assert db.get_user_id_from_username('user_4') == 4
+            await db.activity_buffer.stop()
+
+        asyncio.run(exercise())
+        assert db.activity_buffer.pending_count == 0
+        assert db.activity_buffer.stats['flushes'] == 1
+        assert db.activity_buffer.stats['records_flushed'] == 15
+
+        with db.pool.get_connection() as con:
+            assert con.execute("SELECT COUNT(*) FROM username_map").fetchone()[0] == 5
+            assert con.execute("SELECT COUNT(*) FROM user_properties").fetchone()[0] == 10
+        db.close()
+
+
+def test_direct_write_wins_over_buffered_value():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _make_db(tmp)
+
+        async def exercise():
+            db.activity_buffer.set_property(1, 'last_username', 'stale')
+            db.set_user_property(1, 'last_username', 'fresh')
+            await db.activity_buffer.stop()
+
+        asyncio.run(exercise())
+        assert db.get_user_property(1, 'last_username') == 'fresh'
+        db.close()
+
+
+def test_close_flushes_pending_activity():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'users.sqlite')
+        db = UserDatabase(path, pool_size=1)
+        db.init_schema()
+        db.activity_buffer.flush_interval = 60
+
+        async def exercise():
+            db.record_user_activity(9, 'dave')
+
+        asyncio.run(exercise())
+        db.close()
+
+        reopened = UserDatabase(path, pool_size=1)
+        assert reopened.get_user_property(9, 'last_username') == 'dave'
+        reopened.close()
+
+
+def test_close_stops_the_flusher_and_writes_buffered_records():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'users.sqlite')
+
+        async def exercise():
+            db = UserDatabase(path, pool_size=2)
+            db.init_schema()
+            db.activity_buffer.flush_interval = 60
+            db.update_username_mapping(9, 'carol')
+            task = db.activity_buffer._task
+            db.close()
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(exercise())
+        assert task.cancelled()
+        reopened = UserDatabase(path, pool_size=1)
+        assert reopened.get_user_id_from_username('carol') == 9
+        reopened.close()
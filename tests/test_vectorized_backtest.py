@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+VECTORIZED BACKTEST TEST SUITE
+==============================
+Tests for the NumPy backtest core, checked against straightforward bar-by-bar loops.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from vectorized_backtest import hold_state, run_backtest
+
+HOUR = 3600
+
+
+def random_walk(bars: int = 2000, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    timestamps = 1_600_000_000 + np.arange(bars) * HOUR
+    return close, timestamps
+
+
+def test_hold_state_matches_state_machine():
+    rng = np.random.default_rng(0)
+    enter = rng.random(500) < 0.05
+    leave = rng.random(500) < 0.05
+    expected = []
+    holding = False
+    for entered, left in zip(enter, leave):
+        if entered:
+            holding = True
+        elif left:
+            holding = False
+        expected.append(holding)
+    assert hold_state(enter, leave).tolist() == expected
+    # Rows of a 2-D input are independent positions
+    stacked = hold_state(np.vstack([enter, leave]), np.vstack([leave, enter]))
+    assert stacked[0].tolist() == expected
+    assert stacked[1].tolist() == hold_state(leave, enter).tolist()
+
+
+def test_dca_matches_loop():
+    close, timestamps = random_walk()
+    amount, capital = 50.0, 3000.0
+    backtest = run_backtest('dca', close, timestamps, capital,
+                            {'base_amount': amount, 'rebalance_frequency': 'daily', 'fee_rate': 0.0})
+
+    cash, units = capital, 0.0
+    for i in range(0, len(close), 24):
+        if cash >= amount:
+            units += amount / close[i]
+            cash -= amount
+    assert backtest.metrics['total_trades'] == int(capital // amount)
+    assert np.isclose(backtest.metrics['final_capital'], cash + units * close[-1])
+    assert np.isclose(backtest.trade_pnl.sum(), backtest.metrics['final_capital'] - capital)
+
+
+def test_momentum_matches_loop_with_fees():
+    close, timestamps = random_walk()
+    fee, period = 0.001, 12
+    backtest = run_backtest('momentum', close, timestamps, 10000,
+                            {'momentum_period': period, 'momentum_threshold': 0.01, 'fee_rate': fee})
+
+    equity, position = 10000.0, 0.0
+    for t in range(len(close)):
+        if t:
+            equity *= 1 + position * (close[t] / close[t - 1] - 1)
+        target = 1.0 if t >= period and close[t] / close[t - period] - 1 > 0.01 else 0.0
+        equity *= 1 - abs(target - position) * fee
+        position = target
+    assert np.isclose(backtest.equity[-1], equity)
+    assert np.all(backtest.drawdown >= 0)
+    assert backtest.metrics['max_drawdown'] == backtest.drawdown.max() * 100
+    for trade in backtest.trades():
+        assert trade['exit_time'] > trade['entry_time']
+
+
+def test_grid_and_mean_reversion_trades_reconcile_with_equity():
+    # An oscillating price crosses every grid level many times
+    bars = 3000
+    close = 100 + 8 * np.sin(np.arange(bars) / 40) + np.linspace(0, 3, bars)
+    timestamps = 1_600_000_000 + np.arange(bars) * HOUR
+    grid = run_backtest('grid', close, timestamps, 10000, {'grid_levels': 8, 'grid_lower': 90, 'grid_upper': 110})
+    assert grid.metrics['total_trades'] > 8
+    assert np.isclose(grid.trade_pnl.sum(), grid.metrics['final_capital'] - 10000)
+    assert grid.metrics['win_rate'] > 50
+
+    reversion = run_backtest('mean_reversion', close, timestamps, 10000,
+                             {'reversion_period': 30, 'entry_z': 1.5, 'max_position_size': 5000})
+    assert reversion.metrics['total_trades'] > 0
+    # max_position_size caps exposure at half the capital
+    held = reversion.holdings > 0
+    assert np.allclose(reversion.holdings[held] * close[held], reversion.equity[held] * 0.5)
+
+    idle = run_backtest('arbitrage', close, timestamps, 10000)
+    assert idle.metrics['final_capital'] == 10000 and idle.metrics['total_trades'] == 0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+USER DB MICROBENCHMARK
+======================
+Compares the legacy connect-per-call property access against the pooled
+WAL-mode user_db backend, sync, through the async facade and through the
+write-behind activity buffer.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault('MOBIUS_TEST_MODE', '1')
+
+from user_db import UserDatabase
+
+OPERATIONS = 5000
+
+
+def legacy_set_user_property(db_file: str, user_id: int, key: str, value: str):
+    """Connect-per-call write path used before the pooled backend"""
+    con = sqlite3.connect(db_file, timeout=10.0)
+    con.execute("PRAGMA busy_timeout = 10000")
+    cur = con.cursor()
+    cur.execute("INSERT OR REPLACE INTO user_properties (user_id, key, value) VALUES (?, ?, ?)", (user_id, key, value))
+    con.commit()
+    con.close()
+
+
+def legacy_get_user_property(db_file: str, user_id: int, key: str):
+    """Connect-per-call read path used before the pooled backend"""
+    con = sqlite3.connect(db_file, timeout=10.0)
+    con.execute("PRAGMA busy_timeout = 10000")
+    result = con.execute("SELECT value FROM user_properties WHERE user_id = ? AND key = ?", (user_id, key)).fetchone()
+    con.close()
+    return result[0] if result else None
+
+
+def report(label: str, elapsed: float):
+    print(f"{label:<32} {OPERATIONS / elapsed:>12,.0f} ops/sec")
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, 'legacy.sqlite')
+        pooled_file = os.path.join(tmp, 'pooled.sqlite')
+
+        legacy_db = UserDatabase(legacy_file, pool_size=1)
+        legacy_db.init_schema()
+        legacy_db.close()
+
+        # The legacy path ran on the default rollback journal
+        con = sqlite3.connect(legacy_file)
+        con.execute("PRAGMA journal_mode=DELETE")
+        con.close()
+
+        start = time.perf_counter()
+        for i in range(OPERATIONS):
+            legacy_set_user_property(legacy_file, i % 100, 'last_activity', str(i))
+        report("legacy set_user_property", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(OPERATIONS):
+            legacy_get_user_property(legacy_file, i % 100, 'last_activity')
+        report("legacy get_user_property", time.perf_counter() - start)
+
+        db = UserDatabase(pooled_file)
+        db.init_schema()
+
+        start = time.perf_counter()
+        for i in range(OPERATIONS):
+            db.set_user_property(i % 100, 'last_activity', str(i))
+        report("pooled set_user_property", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(OPERATIONS):
+            db.get_user_property(i % 100, 'last_activity')
+        report("pooled get_user_property", time.perf_counter() - start)
+
+        async def async_reads():
+            await asyncio.gather(*(db.get_user_property_async(i % 100, 'last_activity') for i in range(OPERATIONS)))
+
+        start = time.perf_counter()
+        asyncio.run(async_reads())
+        report("async get_user_property", time.perf_counter() - start)
+
+        async def buffered_activity():
+            for i in range(OPERATIONS):
+                db.record_user_activity(i % 100, f"user_{i % 100}")
+            await db.activity_buffer.stop()
+
+        start = time.perf_counter()
+        asyncio.run(buffered_activity())
+        report("write-behind record_activity", time.perf_counter() - start)
+        print(f"{'':<32} {db.activity_buffer.stats['flushes']} flush(es), "
+              f"{db.activity_buffer.stats['records_flushed']} rows written")
+
+        db.close()
+
+
+if __name__ == '__main__':
+    run_benchmark()